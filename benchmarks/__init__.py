@@ -0,0 +1 @@
+"""Benchmarks for generate-container-packages (not part of the installed package)."""
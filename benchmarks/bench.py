@@ -0,0 +1,382 @@
+"""Benchmark harness for the packaging pipeline and the CasaOS converter.
+
+Generates a synthetic catalog, runs each benchmark once for timing and once
+under tracemalloc for peak memory, and writes the results as JSON. Asset
+downloads are served by a local HTTP stand-in, so no network is needed.
+
+Usage:
+    python -m benchmarks --apps 50 --services 3 --env-vars 20 -o results.json
+    python -m benchmarks --apps 50 --compare baseline.json
+"""
+
+import argparse
+import functools
+import http.server
+import json
+import platform
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+from benchmarks.synthetic import (
+    CatalogSpec,
+    generate_app_catalog,
+    generate_asset_files,
+    generate_casaos_catalog,
+)
+from generate_container_packages import __version__
+from generate_container_packages.builder import build_package
+from generate_container_packages.converters.casaos.assets import AssetManager
+from generate_container_packages.converters.casaos.batch import BatchConverter
+from generate_container_packages.converters.casaos.models import ConversionContext
+from generate_container_packages.converters.casaos.parser import CasaOSParser
+from generate_container_packages.converters.casaos.updater import (
+    CasaOSUpdateDetector,
+)
+from generate_container_packages.loader import load_input_files
+from generate_container_packages.renderer import render_all_templates
+from generate_container_packages.validator import validate_input_directory
+
+BENCHMARKS = ("validate", "render", "build", "convert", "detect_changes", "assets")
+
+
+def measure(
+    name: str, fn: Callable[[], Any], items: int, memory: bool = True
+) -> dict[str, Any]:
+    """Run a benchmark for wall/CPU time and, separately, peak memory.
+
+    Memory is measured in a second run because tracemalloc slows down
+    allocation-heavy code and would distort the timings.
+
+    Args:
+        name: Benchmark name
+        fn: Zero-argument callable doing the work (must be repeatable)
+        items: Number of items processed per call (for throughput)
+        memory: Also measure peak traced memory
+
+    Returns:
+        Result dict with wall_seconds, cpu_seconds, items_per_second and
+        peak_memory_bytes (None when not measured)
+    """
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    fn()
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+
+    peak = None
+    if memory:
+        tracemalloc.start()
+        try:
+            fn()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    return {
+        "name": name,
+        "status": "ok",
+        "items": items,
+        "wall_seconds": round(wall, 6),
+        "cpu_seconds": round(cpu, 6),
+        "items_per_second": round(items / wall, 3) if wall > 0 else None,
+        "peak_memory_bytes": peak,
+    }
+
+
+@contextmanager
+def asset_server(root: Path) -> Iterator[str]:
+    """Serve a directory over HTTP on localhost (AssetManager stand-in).
+
+    Args:
+        root: Directory to serve
+
+    Yields:
+        Base URL of the server
+    """
+
+    class QuietHandler(http.server.SimpleHTTPRequestHandler):
+        def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+            pass
+
+    handler = functools.partial(QuietHandler, directory=str(root))
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def run_benchmarks(
+    spec: CatalogSpec,
+    work_dir: Path,
+    only: tuple[str, ...] = BENCHMARKS,
+    workers: int | None = None,
+    memory: bool = True,
+) -> list[dict[str, Any]]:
+    """Generate a catalog and run the selected benchmarks.
+
+    Args:
+        spec: Catalog scale parameters
+        work_dir: Scratch directory for inputs and outputs
+        only: Benchmarks to run
+        workers: Worker count for BatchConverter
+        memory: Measure peak memory
+
+    Returns:
+        One result dict per benchmark
+    """
+    results: list[dict[str, Any]] = []
+    app_dirs = generate_app_catalog(work_dir / "apps", spec)
+    runs = iter(range(1_000_000))
+
+    def fresh_dir(prefix: str) -> Path:
+        path = work_dir / f"{prefix}-{next(runs)}"
+        path.mkdir(parents=True)
+        return path
+
+    if "validate" in only:
+
+        def validate_all() -> None:
+            for app_dir in app_dirs:
+                assert validate_input_directory(app_dir).success
+
+        results.append(measure("validate", validate_all, len(app_dirs), memory))
+
+    if "render" in only:
+
+        def render_all() -> None:
+            out = fresh_dir("render")
+            for app_dir in app_dirs:
+                render_all_templates(load_input_files(app_dir), out / app_dir.name)
+
+        results.append(measure("render", render_all, len(app_dirs), memory))
+
+    if "build" in only:
+        if shutil.which("dpkg-buildpackage") is None or shutil.which("dh") is None:
+            results.append(
+                {
+                    "name": "build",
+                    "status": "skipped",
+                    "reason": "dpkg-buildpackage or debhelper not found",
+                }
+            )
+        else:
+
+            def build_all() -> None:
+                out = fresh_dir("build")
+                for app_dir in app_dirs:
+                    app_def = load_input_files(app_dir)
+                    rendered = out / f"{app_dir.name}-rendered"
+                    render_all_templates(app_def, rendered)
+                    build_package(app_def, rendered, out)
+
+            results.append(measure("build", build_all, len(app_dirs), memory))
+
+    casaos_needed = {"convert", "detect_changes", "assets"} & set(only)
+    if casaos_needed:
+        asset_root = work_dir / "asset-server"
+        generate_asset_files(asset_root, spec)
+        with asset_server(asset_root) as base_url:
+            casaos_dir = work_dir / "casaos"
+            casaos_apps = generate_casaos_catalog(casaos_dir, spec, base_url)
+            converted_dir = work_dir / "converted"
+            BatchConverter(max_workers=workers).convert_batch(casaos_dir, converted_dir)
+
+            if "convert" in only:
+
+                def convert_all() -> None:
+                    result = BatchConverter(max_workers=workers).convert_batch(
+                        casaos_dir, fresh_dir("convert")
+                    )
+                    assert result.failure_count == 0, result.errors[:3]
+
+                results.append(
+                    measure("convert", convert_all, len(casaos_apps), memory)
+                )
+
+            if "detect_changes" in only:
+
+                def detect() -> None:
+                    CasaOSUpdateDetector(casaos_dir, converted_dir).detect_changes()
+
+                results.append(
+                    measure("detect_changes", detect, len(casaos_apps), memory)
+                )
+
+            if "assets" in only:
+                parser = CasaOSParser()
+                parsed = [
+                    parser.parse_from_file(app_dir / "docker-compose.yml")
+                    for app_dir in casaos_apps
+                ]
+
+                def download_all() -> None:
+                    out = fresh_dir("assets")
+                    for app in parsed:
+                        context = ConversionContext(
+                            source_format="casaos",
+                            app_id=app.id,
+                            warnings=[],
+                            errors=[],
+                            downloaded_assets=[],
+                        )
+                        AssetManager(out / app.id).download_all_assets(
+                            app.icon, app.screenshots or [], app.id, context
+                        )
+
+                results.append(measure("assets", download_all, len(parsed), memory))
+
+    return results
+
+
+def compare_results(
+    current: list[dict[str, Any]], baseline: list[dict[str, Any]]
+) -> str:
+    """Format a comparison table of two result lists.
+
+    Args:
+        current: Results of this run
+        baseline: Results loaded from an earlier JSON file
+
+    Returns:
+        Table with wall time and peak memory changes per benchmark
+    """
+
+    def change(new: float | None, old: float | None) -> str:
+        if not new or not old:
+            return "n/a"
+        return f"{(new - old) / old * 100:+.1f}%"
+
+    by_name = {r["name"]: r for r in baseline}
+    lines = [
+        f"{'Benchmark':<16}{'Wall':>12}{'Change':>10}{'Peak MiB':>12}{'Change':>10}"
+    ]
+    for result in current:
+        if result.get("status") != "ok":
+            continue
+        old = by_name.get(result["name"], {})
+        peak = result.get("peak_memory_bytes")
+        lines.append(
+            f"{result['name']:<16}"
+            f"{result['wall_seconds']:>11.3f}s"
+            f"{change(result['wall_seconds'], old.get('wall_seconds')):>10}"
+            f"{(peak or 0) / 2**20:>12.2f}"
+            f"{change(peak, old.get('peak_memory_bytes')):>10}"
+        )
+    return "\n".join(lines)
+
+
+def create_argument_parser() -> argparse.ArgumentParser:
+    """Create argument parser for the benchmark harness.
+
+    Returns:
+        Configured ArgumentParser instance
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description="Benchmark generate-container-packages on a synthetic catalog",
+    )
+    parser.add_argument("--apps", type=int, default=20, help="Number of apps")
+    parser.add_argument("--services", type=int, default=2, help="Services per app")
+    parser.add_argument(
+        "--env-vars", type=int, default=10, help="Environment variables per service"
+    )
+    parser.add_argument(
+        "--asset-kb", type=int, default=16, help="Size of each icon/screenshot in KiB"
+    )
+    parser.add_argument(
+        "--screenshots", type=int, default=1, help="Screenshots per app"
+    )
+    parser.add_argument(
+        "--only",
+        metavar="NAMES",
+        default=",".join(BENCHMARKS),
+        help=f"Comma-separated benchmarks to run (default: {','.join(BENCHMARKS)})",
+    )
+    parser.add_argument("--workers", type=int, help="Workers for batch conversion")
+    parser.add_argument(
+        "--no-memory", action="store_true", help="Skip the peak memory pass"
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        metavar="FILE",
+        default="benchmark-results.json",
+        help="Result file (default: benchmark-results.json)",
+    )
+    parser.add_argument(
+        "--compare", metavar="FILE", help="Earlier result file to compare against"
+    )
+    parser.add_argument(
+        "--keep", action="store_true", help="Keep the generated catalog and outputs"
+    )
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Benchmark harness entry point.
+
+    Args:
+        argv: Command-line arguments
+
+    Returns:
+        Exit code
+    """
+    args = create_argument_parser().parse_args(argv)
+    only = tuple(name.strip() for name in args.only.split(",") if name.strip())
+    unknown = set(only) - set(BENCHMARKS)
+    if unknown:
+        print(
+            f"ERROR: Unknown benchmarks: {', '.join(sorted(unknown))}", file=sys.stderr
+        )
+        return 1
+
+    spec = CatalogSpec(
+        apps=args.apps,
+        services=args.services,
+        env_vars=args.env_vars,
+        asset_kb=args.asset_kb,
+        screenshots=args.screenshots,
+    )
+    work_dir = Path(tempfile.mkdtemp(prefix="gcp-bench-"))
+    try:
+        results = run_benchmarks(
+            spec, work_dir, only=only, workers=args.workers, memory=not args.no_memory
+        )
+    finally:
+        if args.keep:
+            print(f"Benchmark files kept at: {work_dir}")
+        else:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    document = {
+        "tool_version": __version__,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": datetime.now(UTC).isoformat(),
+        "spec": spec.to_dict(),
+        "results": results,
+    }
+    Path(args.output).write_text(json.dumps(document, indent=2), encoding="utf-8")
+
+    baseline = []
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))["results"]
+    print(compare_results(results, baseline))
+    for result in results:
+        if result.get("status") == "skipped":
+            print(f"{result['name']:<16}skipped: {result['reason']}")
+    print(f"\nResults written to {args.output}")
+    return 0
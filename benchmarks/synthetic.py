@@ -0,0 +1,259 @@
+"""Synthetic app definitions and CasaOS catalogs for benchmarking.
+
+Generated inputs are valid for the real pipeline: app definitions pass
+validate_input_directory() and CasaOS apps convert with the default
+mappings. Content is deterministic for a given spec so that runs of
+different tool versions see identical inputs.
+"""
+
+import io
+import random
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+import yaml
+from PIL import Image
+
+
+@dataclass(frozen=True)
+class CatalogSpec:
+    """Scale parameters for a synthetic catalog.
+
+    Attributes:
+        apps: Number of apps
+        services: Services per docker-compose.yml
+        env_vars: Environment variables (and config fields) per service
+        asset_kb: Approximate size of each icon/screenshot in KiB
+        screenshots: Screenshots per app
+        seed: Random seed for image content
+    """
+
+    apps: int = 20
+    services: int = 2
+    env_vars: int = 10
+    asset_kb: int = 16
+    screenshots: int = 1
+    seed: int = 0
+
+    def to_dict(self) -> dict:
+        """Return the spec as a JSON-serializable dict."""
+        return asdict(self)
+
+
+def make_png(size_kb: int, seed: int = 0) -> bytes:
+    """Create a valid PNG of roughly the requested size.
+
+    Random pixels do not compress, so the image size is close to
+    width * height * 3 bytes.
+
+    Args:
+        size_kb: Target size in KiB
+        seed: Random seed
+
+    Returns:
+        PNG file content
+    """
+    side = max(8, int((size_kb * 1024 / 3) ** 0.5))
+    rng = random.Random(seed)
+    image = Image.frombytes("RGB", (side, side), rng.randbytes(side * side * 3))
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def _env_name(index: int) -> str:
+    return f"SETTING_{index:03d}"
+
+
+def generate_app_definition(root: Path, index: int, spec: CatalogSpec) -> Path:
+    """Write one synthetic app definition directory.
+
+    Args:
+        root: Parent directory
+        index: App number (used in names and ports)
+        spec: Catalog scale parameters
+
+    Returns:
+        Path to the app definition directory
+    """
+    app_id = f"bench-app-{index:04d}"
+    package_name = f"{app_id}-container"
+    app_dir = root / app_id
+    app_dir.mkdir(parents=True, exist_ok=True)
+
+    env_names = [_env_name(i) for i in range(spec.env_vars)]
+    metadata = {
+        "name": f"Bench App {index}",
+        "app_id": app_id,
+        "version": f"1.{index}.0",
+        "upstream_version": f"1.{index}.0",
+        "description": f"Synthetic benchmark application {index}",
+        "long_description": "Generated for performance measurements.\n" * 3,
+        "homepage": f"https://example.com/{app_id}",
+        "maintainer": "Bench <bench@example.com>",
+        "license": "MIT",
+        "tags": ["role::container-app", "implemented-in::docker"],
+        "debian_section": "net",
+        "architecture": "all",
+        "icon": "icon.png",
+        "screenshots": [f"screenshot{i}.png" for i in range(spec.screenshots)],
+        "web_ui": {
+            "enabled": True,
+            "path": "/",
+            "port": 10000 + index,
+            "protocol": "http",
+        },
+        "default_config": {name: f"value-{i}" for i, name in enumerate(env_names)},
+    }
+    config = {
+        "version": "1.0",
+        "groups": [
+            {
+                "id": "general",
+                "label": "General Settings",
+                "description": "Synthetic settings",
+                "fields": [
+                    {
+                        "id": name,
+                        "label": name.title(),
+                        "type": "string",
+                        "default": f"value-{i}",
+                        "required": False,
+                        "description": f"Synthetic setting {i}",
+                    }
+                    for i, name in enumerate(env_names)
+                ],
+            }
+        ],
+    }
+    services = {}
+    for service_index in range(spec.services):
+        services[f"svc{service_index}"] = {
+            "image": f"example/bench-{service_index}:1.{index}.0",
+            "container_name": f"{app_id}-svc{service_index}",
+            "environment": [f"{name}=${{{name}}}" for name in env_names],
+            "volumes": [
+                f"/var/lib/container-apps/{package_name}/data/svc{service_index}:/data:rw"
+            ],
+            "restart": "unless-stopped",
+            "logging": {"driver": "journald", "options": {"tag": "{{.Name}}"}},
+        }
+    services["svc0"]["ports"] = [f"{10000 + index}:80"]
+    compose = {"services": services}
+
+    _write_yaml(app_dir / "metadata.yaml", metadata)
+    _write_yaml(app_dir / "config.yml", config)
+    _write_yaml(app_dir / "docker-compose.yml", compose)
+
+    png = make_png(spec.asset_kb, seed=spec.seed + index)
+    (app_dir / "icon.png").write_bytes(png)
+    for i in range(spec.screenshots):
+        (app_dir / f"screenshot{i}.png").write_bytes(png)
+
+    return app_dir
+
+
+def generate_app_catalog(root: Path, spec: CatalogSpec) -> list[Path]:
+    """Write spec.apps synthetic app definition directories.
+
+    Args:
+        root: Catalog directory
+        spec: Catalog scale parameters
+
+    Returns:
+        App definition directories
+    """
+    return [generate_app_definition(root, i, spec) for i in range(spec.apps)]
+
+
+def generate_casaos_catalog(
+    root: Path, spec: CatalogSpec, asset_base_url: str = "https://example.com"
+) -> list[Path]:
+    """Write a synthetic CasaOS app store (one directory per app).
+
+    Args:
+        root: Catalog directory
+        spec: Catalog scale parameters
+        asset_base_url: Base URL for icon and screenshot links
+
+    Returns:
+        CasaOS app directories
+    """
+    app_dirs = []
+    for index in range(spec.apps):
+        app_id = f"benchapp{index:04d}"
+        app_dir = root / app_id
+        app_dir.mkdir(parents=True, exist_ok=True)
+
+        env_names = [_env_name(i) for i in range(spec.env_vars)]
+        services = {}
+        for service_index in range(spec.services):
+            services[f"svc{service_index}"] = {
+                "image": f"example/bench-{service_index}:1.{index}.0",
+                "restart": "unless-stopped",
+                "ports": [
+                    {
+                        "target": 80,
+                        "published": str(20000 + index * 10 + service_index),
+                        "protocol": "tcp",
+                    }
+                ],
+                "volumes": [
+                    {
+                        "type": "bind",
+                        "source": f"/DATA/AppData/$AppID/svc{service_index}",
+                        "target": "/data",
+                    }
+                ],
+                "environment": {name: f"value-{i}" for i, name in enumerate(env_names)},
+                "x-casaos": {
+                    "envs": [
+                        {"container": name, "description": {"en_us": f"Setting {i}"}}
+                        for i, name in enumerate(env_names)
+                    ],
+                },
+            }
+
+        compose = {
+            "name": app_id,
+            "services": services,
+            "x-casaos": {
+                "architectures": ["amd64", "arm64"],
+                "main": "svc0",
+                "author": "self",
+                "category": "Utilities",
+                "description": {"en_us": f"Synthetic CasaOS app {index}"},
+                "tagline": {"en_us": "Benchmark"},
+                "developer": "bench",
+                "icon": f"{asset_base_url}/icon-{index}.png",
+                "screenshot_link": [
+                    f"{asset_base_url}/screenshot-{index}-{i}.png"
+                    for i in range(spec.screenshots)
+                ],
+                "port_map": str(20000 + index * 10),
+            },
+        }
+        _write_yaml(app_dir / "docker-compose.yml", compose)
+        app_dirs.append(app_dir)
+
+    return app_dirs
+
+
+def generate_asset_files(root: Path, spec: CatalogSpec) -> None:
+    """Write the icons and screenshots referenced by a CasaOS catalog.
+
+    Args:
+        root: Directory served by the local HTTP stand-in
+        spec: Catalog scale parameters
+    """
+    root.mkdir(parents=True, exist_ok=True)
+    for index in range(spec.apps):
+        png = make_png(spec.asset_kb, seed=spec.seed + index)
+        (root / f"icon-{index}.png").write_bytes(png)
+        for i in range(spec.screenshots):
+            (root / f"screenshot-{index}-{i}.png").write_bytes(png)
+
+
+def _write_yaml(path: Path, data: dict) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        yaml.safe_dump(data, f, sort_keys=False)
@@ -2,7 +2,25 @@
 
 import sys
 
-from generate_container_packages.cli import main
+
+def main() -> int:
+    """Dispatch to the thin daemon client or the full CLI.
+
+    The client subcommand is handled before importing the CLI so that it
+    does not pay for importing pydantic, jinja2 and yaml.
+
+    Returns:
+        Exit code
+    """
+    if len(sys.argv) > 1 and sys.argv[1] == "client":
+        from generate_container_packages.client import main as client_main
+
+        return client_main(sys.argv[2:])
+
+    from generate_container_packages.cli import main as cli_main
+
+    return cli_main()
+
 
 if __name__ == "__main__":
     sys.exit(main())
@@ -0,0 +1,433 @@
+"""Aggregated AppStream collection for a set of container packages.
+
+Each package installs its own metainfo file, so software centers have to
+find and parse one file per app and resolve icons under /usr/share/pixmaps.
+For store builds, AppStreamCatalog additionally produces a single collection
+(<origin>.xml.gz) and the cached icon tarballs (icons-64x64.tar.gz,
+icons-128x128.tar.gz) in the layout used by Debian's DEP-11 metadata, to be
+installed as /usr/share/swcatalog/xml/<origin>.xml.gz and extracted to
+/usr/share/swcatalog/icons/<origin>/<size>/.
+
+The collection is assembled from per-app fragments kept in the catalog
+directory. A fragment records a digest of its inputs, so apps whose metadata
+and icon are unchanged are neither re-rendered nor have their icons
+re-scaled; only the cheap concatenation and compression steps run for every
+update, and output files are rewritten only when their content changes.
+"""
+
+import argparse
+import gzip
+import hashlib
+import io
+import logging
+import os
+import shutil
+import subprocess
+import sys
+import tarfile
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+from PIL import Image, ImageOps
+
+from generate_container_packages import __version__
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ORIGIN = "container-apps"
+COLLECTION_VERSION = "0.14"
+ICON_SIZES = (64, 128)
+FRAGMENTS_DIR = "fragments"
+
+
+class AppStreamError(Exception):
+    """Raised when an app cannot be added to the collection."""
+
+
+class AppStreamCatalog:
+    """AppStream collection maintained incrementally from per-app fragments."""
+
+    def __init__(self, catalog_dir: Path, origin: str = DEFAULT_ORIGIN) -> None:
+        """Initialize catalog in a directory.
+
+        Args:
+            catalog_dir: Output directory for the collection and icon tarballs
+            origin: Collection origin (also names the collection file)
+        """
+        self.catalog_dir = catalog_dir
+        self.origin = origin
+        self.fragments_dir = catalog_dir / FRAGMENTS_DIR
+
+    def is_current(self, package_name: str, digest: str) -> bool:
+        """Check whether a package's fragment was built from the same inputs.
+
+        Args:
+            package_name: Debian package name
+            digest: Digest of the fragment inputs
+
+        Returns:
+            True if the fragment exists and matches the digest
+        """
+        try:
+            stored = (self.fragments_dir / f"{package_name}.digest").read_text()
+        except FileNotFoundError:
+            return False
+        return (
+            stored.strip() == digest
+            and (self.fragments_dir / f"{package_name}.xml").exists()
+        )
+
+    def add(
+        self,
+        package_name: str,
+        metainfo: str,
+        icon_path: Path | None = None,
+        digest: str | None = None,
+    ) -> bool:
+        """Add or update the fragment of a package.
+
+        Args:
+            package_name: Debian package name
+            metainfo: Rendered metainfo XML of the package
+            icon_path: Icon file (PNG or SVG)
+            digest: Digest of the fragment inputs (default: digest of
+                metainfo and icon content)
+
+        Returns:
+            True if the fragment was rewritten, False if it was current
+
+        Raises:
+            AppStreamError: If the metainfo or SVG icon cannot be processed
+        """
+        if digest is None:
+            digest = fragment_digest(metainfo.encode("utf-8"), icon_path)
+        if self.is_current(package_name, digest):
+            return False
+
+        icons = _scaled_icons(icon_path) if icon_path else {}
+        component = metainfo_to_component(package_name, metainfo, sorted(icons))
+
+        self.fragments_dir.mkdir(parents=True, exist_ok=True)
+        for size in ICON_SIZES:
+            icon_file = self._icon_file(package_name, size)
+            if size in icons:
+                icon_file.parent.mkdir(parents=True, exist_ok=True)
+                _write_if_changed(icon_file, icons[size])
+            else:
+                icon_file.unlink(missing_ok=True)
+        _write_if_changed(
+            self.fragments_dir / f"{package_name}.xml", component.encode("utf-8")
+        )
+        (self.fragments_dir / f"{package_name}.digest").write_text(digest + "\n")
+        logger.debug(f"Updated AppStream fragment for {package_name}")
+        return True
+
+    def packages(self) -> list[str]:
+        """Return the package names with a fragment, sorted."""
+        if not self.fragments_dir.is_dir():
+            return []
+        return sorted(path.stem for path in self.fragments_dir.glob("*.xml"))
+
+    def remove(self, package_name: str) -> None:
+        """Remove the fragment and icons of a package.
+
+        Args:
+            package_name: Debian package name
+        """
+        for suffix in (".xml", ".digest"):
+            (self.fragments_dir / f"{package_name}{suffix}").unlink(missing_ok=True)
+        for size in ICON_SIZES:
+            self._icon_file(package_name, size).unlink(missing_ok=True)
+
+    def write(self) -> list[Path]:
+        """Assemble the collection and icon tarballs from the fragments.
+
+        Returns:
+            Output files whose content changed
+        """
+        packages = self.packages()
+        parts = [
+            '<?xml version="1.0" encoding="UTF-8"?>\n',
+            f'<components version="{COLLECTION_VERSION}" origin="{self.origin}">\n',
+        ]
+        for package_name in packages:
+            parts.append(
+                (self.fragments_dir / f"{package_name}.xml").read_text(encoding="utf-8")
+            )
+        parts.append("</components>\n")
+        # mtime=0 keeps the archives identical for identical content
+        outputs = {
+            self.catalog_dir / f"{self.origin}.xml.gz": gzip.compress(
+                "".join(parts).encode("utf-8"), compresslevel=9, mtime=0
+            )
+        }
+        for size in ICON_SIZES:
+            icons = [
+                path
+                for name in packages
+                if (path := self._icon_file(name, size)).exists()
+            ]
+            outputs[self.catalog_dir / f"icons-{size}x{size}.tar.gz"] = _icon_tarball(
+                icons
+            )
+
+        self.catalog_dir.mkdir(parents=True, exist_ok=True)
+        return [path for path, data in outputs.items() if _write_if_changed(path, data)]
+
+    def _icon_file(self, package_name: str, size: int) -> Path:
+        return self.fragments_dir / "icons" / f"{size}x{size}" / f"{package_name}.png"
+
+
+def fragment_digest(inputs: bytes, icon_path: Path | None = None) -> str:
+    """Digest the inputs of a fragment.
+
+    Args:
+        inputs: Content the component is generated from
+        icon_path: Icon file
+
+    Returns:
+        Hex digest (also covering the tool version)
+    """
+    h = hashlib.sha256(__version__.encode("utf-8"))
+    h.update(b"\0" + inputs)
+    if icon_path is not None:
+        h.update(b"\0" + icon_path.read_bytes())
+    return h.hexdigest()
+
+
+def metainfo_to_component(
+    package_name: str, metainfo: str, icon_sizes: list[int] | None = None
+) -> str:
+    """Convert a metainfo file to a collection component.
+
+    Adds the pkgname element and, if cached icons are available, replaces
+    the local icon with cached icon references.
+
+    Args:
+        package_name: Debian package name
+        metainfo: Metainfo XML
+        icon_sizes: Sizes of the cached icons
+
+    Returns:
+        Component XML (indented for the collection, with trailing newline)
+
+    Raises:
+        AppStreamError: If the metainfo is not valid XML
+    """
+    try:
+        component = ET.fromstring(metainfo)
+    except ET.ParseError as e:
+        raise AppStreamError(f"{package_name}: invalid metainfo XML: {e}") from e
+
+    pkgname = ET.Element("pkgname")
+    pkgname.text = package_name
+    component.insert(1, pkgname)
+
+    if icon_sizes:
+        position = len(component)
+        for icon in component.findall("icon"):
+            position = min(position, list(component).index(icon))
+            component.remove(icon)
+        for size in reversed(icon_sizes):
+            icon = ET.Element(
+                "icon", {"type": "cached", "width": str(size), "height": str(size)}
+            )
+            icon.text = f"{package_name}.png"
+            component.insert(position, icon)
+
+    ET.indent(component, space="  ", level=1)
+    return "  " + ET.tostring(component, encoding="unicode").rstrip() + "\n"
+
+
+def _scaled_icons(icon_path: Path) -> dict[int, bytes]:
+    """Scale an icon to the cached icon sizes.
+
+    SVG icons are rasterized with rsvg-convert; without it, and for raster
+    icons Pillow cannot read, they are left as local icons.
+
+    Returns:
+        PNG content per size (empty if the icon cannot be cached)
+
+    Raises:
+        AppStreamError: If rsvg-convert fails
+    """
+    if icon_path.suffix.lower() == ".svg":
+        if shutil.which("rsvg-convert") is None:
+            logger.warning(
+                f"rsvg-convert not found, not caching SVG icon {icon_path}. "
+                "Install with: apt install librsvg2-bin"
+            )
+            return {}
+        icons = {}
+        for size in ICON_SIZES:
+            result = subprocess.run(
+                ["rsvg-convert", "-w", str(size), "-h", str(size), str(icon_path)],
+                capture_output=True,
+                check=False,
+            )
+            if result.returncode != 0:
+                raise AppStreamError(
+                    f"Cannot rasterize {icon_path}: {result.stderr.decode().strip()}"
+                )
+            icons[size] = result.stdout
+        return icons
+
+    try:
+        with Image.open(icon_path) as image:
+            source = image.convert("RGBA")
+    except OSError as e:
+        logger.warning(f"Not caching unreadable icon {icon_path}: {e}")
+        return {}
+
+    icons = {}
+    for size in ICON_SIZES:
+        scaled = ImageOps.contain(source, (size, size), Image.Resampling.LANCZOS)
+        canvas = Image.new("RGBA", (size, size))
+        canvas.paste(scaled, ((size - scaled.width) // 2, (size - scaled.height) // 2))
+        buffer = io.BytesIO()
+        canvas.save(buffer, format="PNG", optimize=True)
+        icons[size] = buffer.getvalue()
+    return icons
+
+
+def _icon_tarball(icons: list[Path]) -> bytes:
+    """Create a reproducible tar.gz with the icons at its root."""
+    buffer = io.BytesIO()
+    with gzip.GzipFile(fileobj=buffer, mode="wb", compresslevel=9, mtime=0) as gz:
+        with tarfile.open(fileobj=gz, mode="w", format=tarfile.GNU_FORMAT) as tar:
+            for path in icons:
+                data = path.read_bytes()
+                info = tarfile.TarInfo(path.name)
+                info.size = len(data)
+                info.mode = 0o644
+                tar.addfile(info, io.BytesIO(data))
+    return buffer.getvalue()
+
+
+def _write_if_changed(path: Path, data: bytes) -> bool:
+    """Atomically replace a file unless it already has the content."""
+    try:
+        if path.read_bytes() == data:
+            return False
+    except FileNotFoundError:
+        pass
+    tmp = path.with_name(f".{path.name}.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+    return True
+
+
+def appstream_catalog_command(args: argparse.Namespace) -> int:
+    """Execute appstream-catalog subcommand.
+
+    Args:
+        args: Parsed appstream-catalog arguments
+
+    Returns:
+        Exit code
+    """
+    from jinja2 import TemplateError
+
+    from generate_container_packages.cli import (
+        EXIT_SUCCESS,
+        EXIT_TEMPLATE_ERROR,
+        EXIT_VALIDATION_ERROR,
+    )
+    from generate_container_packages.loader import load_input_files, load_yaml
+    from generate_container_packages.naming import compute_package_name
+    from generate_container_packages.renderer import render_metainfo
+
+    catalog = AppStreamCatalog(Path(args.output).resolve(), origin=args.origin)
+    exit_code = EXIT_SUCCESS
+    seen: set[str] = set()
+    rendered = 0
+
+    for app_dir in (Path(d).resolve() for d in args.app_dirs):
+        try:
+            metadata_bytes = (app_dir / "metadata.yaml").read_bytes()
+            package_name = compute_package_name(
+                load_yaml(app_dir / "metadata.yaml")["app_id"],
+                prefix=args.prefix,
+                suffix=args.suffix,
+            )
+            seen.add(package_name)
+            icon_path = next(
+                (p for p in (app_dir / "icon.svg", app_dir / "icon.png") if p.exists()),
+                None,
+            )
+            digest = fragment_digest(
+                f"{args.prefix}\0{args.suffix}\0".encode() + metadata_bytes, icon_path
+            )
+            if catalog.is_current(package_name, digest):
+                continue
+
+            app_def = load_input_files(app_dir, prefix=args.prefix, suffix=args.suffix)
+            catalog.add(
+                package_name, render_metainfo(app_def), app_def.icon_path, digest
+            )
+            rendered += 1
+        except (OSError, KeyError, ValueError, AppStreamError) as e:
+            print(f"ERROR: {app_dir}: {e}", file=sys.stderr)
+            exit_code = EXIT_VALIDATION_ERROR
+        except TemplateError as e:
+            print(f"ERROR: {app_dir}: {e}", file=sys.stderr)
+            exit_code = EXIT_TEMPLATE_ERROR
+
+    if args.prune and exit_code == EXIT_SUCCESS:
+        for package_name in set(catalog.packages()) - seen:
+            catalog.remove(package_name)
+            logger.info(f"Removed AppStream fragment for {package_name}")
+
+    changed = catalog.write()
+    print(
+        f"AppStream catalog: {len(catalog.packages())} components, "
+        f"{rendered} rendered, {len(changed)} files updated in {catalog.catalog_dir}"
+    )
+    return exit_code
+
+
+def create_appstream_catalog_argument_parser() -> argparse.ArgumentParser:
+    """Create argument parser for the appstream-catalog subcommand.
+
+    Returns:
+        Configured ArgumentParser instance
+    """
+    parser = argparse.ArgumentParser(
+        prog="generate-container-packages appstream-catalog",
+        description=(
+            "Incrementally build an AppStream collection and cached icon "
+            "tarballs for a set of app definitions"
+        ),
+    )
+    parser.add_argument(
+        "app_dirs", metavar="APP_DIR", nargs="+", help="App definition directories"
+    )
+    parser.add_argument(
+        "-o", "--output", metavar="DIR", required=True, help="Catalog directory"
+    )
+    parser.add_argument(
+        "--origin",
+        default=DEFAULT_ORIGIN,
+        help=f"Collection origin (default: {DEFAULT_ORIGIN})",
+    )
+    parser.add_argument(
+        "--prune",
+        action="store_true",
+        help="Remove components of apps not given on the command line",
+    )
+    parser.add_argument(
+        "--prefix", help="Package name prefix (e.g., 'marine', 'halos', 'casaos')"
+    )
+    parser.add_argument(
+        "--suffix",
+        default="container",
+        help="Package name suffix (default: 'container')",
+    )
+
+    verbosity = parser.add_mutually_exclusive_group()
+    verbosity.add_argument(
+        "-v", "--verbose", action="store_true", help="Verbose output"
+    )
+    verbosity.add_argument("--debug", action="store_true", help="Debug output")
+    verbosity.add_argument("-q", "--quiet", action="store_true", help="Errors only")
+    return parser
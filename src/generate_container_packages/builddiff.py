@@ -0,0 +1,543 @@
+"""Diff of the generated package files between two builds of each app.
+
+`generate-container-packages diff` stages the package source tree of every
+app twice, in memory and in parallel worker processes, and prints a unified diff
+per changed file. No package is built and dpkg is never run.
+
+The two sides differ in their inputs, their tool, or both:
+
+- --from/--to REV take the app directories from a git revision instead of
+  the working tree (extracted with git archive).
+- --from-tool/--to-tool CMD stage with another installed version of this
+  tool. CMD is run with the hidden stage-dump subcommand, which prints the
+  staged tree as JSON. Releases up to 0.5.3 lack it; such a tool is
+  rejected before any app is staged.
+
+Build timestamps are pinned to a fixed date on both sides, so only real
+content changes show up.
+"""
+
+import argparse
+import base64
+import difflib
+import io
+import json
+import logging
+import os
+import shlex
+import subprocess
+import sys
+import tarfile
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from functools import partial
+from pathlib import Path
+
+from generate_container_packages import __version__
+from generate_container_packages.multibuild import find_app_dirs
+from generate_container_packages.plan import stage_app
+from generate_container_packages.staging import StagedTree
+from generate_container_packages.validator import ValidationCache
+
+logger = logging.getLogger(__name__)
+
+# Staged file contents keyed by path: (permission bits, content)
+Snapshot = dict[str, tuple[int, bytes]]
+
+
+class DiffError(Exception):
+    """Raised when one side of a diff cannot be staged."""
+
+
+@dataclass
+class AppDiff:
+    """Differences between the two staged trees of one app.
+
+    Attributes:
+        app_id: App identifier (directory name if neither side is valid)
+        lines: Unified diff lines (with trailing newlines)
+        files: Paths that differ
+        error: Why the app could not be compared
+    """
+
+    app_id: str
+    lines: list[str] = field(default_factory=list)
+    files: list[str] = field(default_factory=list)
+    error: str | None = None
+
+
+def snapshot(tree: StagedTree) -> Snapshot:
+    """Read a staged tree into memory.
+
+    Modes are normalized to 0o755 or 0o644 as git records them, so files
+    checked out with different umasks compare equal.
+
+    Args:
+        tree: Staged package source tree
+
+    Returns:
+        Mode and content of every staged file
+    """
+    return {
+        path: (_git_mode(tree.files[path].effective_mode()), tree.read_bytes(path))
+        for path in sorted(tree.files)
+    }
+
+
+def _git_mode(mode: int) -> int:
+    """Reduce permission bits to executable or not."""
+    return 0o755 if mode & 0o111 else 0o644
+
+
+def dump_snapshot(app_id: str, files: Snapshot) -> str:
+    """Serialize a snapshot for the stage-dump subcommand.
+
+    Args:
+        app_id: App identifier
+        files: Staged files
+
+    Returns:
+        JSON document with the tool version and base64 file contents
+    """
+    return json.dumps(
+        {
+            "app_id": app_id,
+            "tool_version": __version__,
+            "files": {
+                path: {"mode": mode, "content": base64.b64encode(content).decode()}
+                for path, (mode, content) in files.items()
+            },
+        }
+    )
+
+
+def load_snapshot(text: str) -> tuple[str, Snapshot]:
+    """Parse stage-dump output.
+
+    Args:
+        text: JSON document written by dump_snapshot()
+
+    Returns:
+        Tuple of (app ID, staged files)
+
+    Raises:
+        DiffError: If the document is malformed
+    """
+    try:
+        data = json.loads(text)
+        files = {
+            path: (entry["mode"], base64.b64decode(entry["content"]))
+            for path, entry in data["files"].items()
+        }
+        return data["app_id"], files
+    except (ValueError, KeyError, TypeError) as e:
+        raise DiffError(f"Invalid stage-dump output: {e}") from e
+
+
+def stage_snapshot(
+    input_dir: Path,
+    prefix: str | None,
+    suffix: str,
+    tool: str | None = None,
+    validation_cache: ValidationCache | None = None,
+) -> tuple[str, Snapshot]:
+    """Stage one side of an app diff.
+
+    Args:
+        input_dir: App definition directory
+        prefix: Package name prefix
+        suffix: Package name suffix
+        tool: Command of another tool version to stage with, or None to
+            stage in this process
+        validation_cache: Optional cache shared between apps (in-process only)
+
+    Returns:
+        Tuple of (app ID, staged files)
+
+    Raises:
+        DiffError: If the app cannot be staged
+    """
+    if tool is None:
+        try:
+            app_id, tree = stage_app(input_dir, prefix, suffix, validation_cache)
+            return app_id, snapshot(tree)
+        except Exception as e:
+            raise DiffError(str(e)) from e
+
+    cmd = [*shlex.split(tool), "stage-dump", str(input_dir), "--suffix", suffix]
+    if prefix:
+        cmd += ["--prefix", prefix]
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, check=False)
+    except OSError as e:
+        raise DiffError(f"Cannot run {tool!r}: {e}") from e
+    if result.returncode != 0:
+        raise DiffError(result.stderr.strip() or f"{tool!r} stage-dump failed")
+    return load_snapshot(result.stdout)
+
+
+def check_tool(tool: str) -> None:
+    """Check that a tool command provides the stage-dump subcommand.
+
+    Versions without it parse "stage-dump" as the input directory of a
+    build, so their help text is checked rather than their exit code.
+
+    Args:
+        tool: Command of another tool version
+
+    Raises:
+        DiffError: If the tool cannot be run or lacks stage-dump
+    """
+    cmd = [*shlex.split(tool), "stage-dump", "--help"]
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, check=False)
+    except OSError as e:
+        raise DiffError(f"Cannot run {tool!r}: {e}") from e
+    if result.returncode != 0 or " stage-dump " not in result.stdout:
+        raise DiffError(
+            f"{tool!r} has no stage-dump subcommand; "
+            "--from-tool/--to-tool need a version that includes the diff command"
+        )
+
+
+def checkout(ref: str, app_dirs: list[Path], dest: Path) -> dict[Path, Path]:
+    """Extract app directories as of a git revision.
+
+    Args:
+        ref: Git revision
+        app_dirs: App directories in the working tree (absolute)
+        dest: Empty directory to extract into
+
+    Returns:
+        Extracted directory per app directory; apps that do not exist at
+        ref are left out
+
+    Raises:
+        DiffError: If git fails or ref is unknown
+    """
+
+    def git(cwd: Path, *args: str) -> bytes:
+        try:
+            result = subprocess.run(
+                ["git", *args], cwd=cwd, capture_output=True, check=False
+            )
+        except FileNotFoundError as e:
+            raise DiffError("git is not installed") from e
+        if result.returncode != 0:
+            message = result.stderr.decode(errors="replace").strip()
+            raise DiffError(message or f"git {args[0]} failed")
+        return result.stdout
+
+    extracted: dict[Path, Path] = {}
+    for app_dir in app_dirs:
+        top = Path(git(app_dir, "rev-parse", "--show-toplevel").decode().strip())
+        relative = app_dir.resolve().relative_to(top.resolve()).as_posix()
+        if not git(top, "ls-tree", "--name-only", ref, "--", relative):
+            continue
+        archive = git(top, "archive", "--format=tar", ref, "--", relative)
+        with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+            if hasattr(tarfile, "data_filter"):
+                tar.extractall(dest, filter="data")
+            else:  # pragma: no cover - Python < 3.11.4
+                tar.extractall(dest)  # noqa: S202
+        extracted[app_dir] = dest / relative
+    return extracted
+
+
+def diff_snapshots(app_id: str, old: Snapshot, new: Snapshot) -> AppDiff:
+    """Compare two staged trees of an app.
+
+    Args:
+        app_id: App identifier used in the diff headers
+        old: Files of the "from" side
+        new: Files of the "to" side
+
+    Returns:
+        Unified diff of every differing file
+    """
+    result = AppDiff(app_id)
+    for path in sorted(old.keys() | new.keys()):
+        a, b = old.get(path), new.get(path)
+        if a == b:
+            continue
+        result.files.append(path)
+        label_a = f"a/{app_id}/{path}" if a else "/dev/null"
+        label_b = f"b/{app_id}/{path}" if b else "/dev/null"
+        if a and b and a[0] != b[0]:
+            result.lines.append(f"mode {label_a} {a[0]:o} -> {b[0]:o}\n")
+        if a and b and a[1] == b[1]:
+            continue
+        old_text = _text(a[1]) if a else ""
+        new_text = _text(b[1]) if b else ""
+        if old_text is None or new_text is None:
+            result.lines.append(f"Binary files {label_a} and {label_b} differ\n")
+            continue
+        for line in difflib.unified_diff(
+            old_text.splitlines(keepends=True),
+            new_text.splitlines(keepends=True),
+            label_a,
+            label_b,
+        ):
+            result.lines.append(line if line.endswith("\n") else line + "\n")
+    return result
+
+
+def _text(content: bytes) -> str | None:
+    """Decode file content for diffing, or None for binary files."""
+    if b"\0" in content:
+        return None
+    try:
+        return content.decode("utf-8")
+    except UnicodeDecodeError:
+        return None
+
+
+def diff_apps(
+    pairs: list[tuple[Path | None, Path | None]],
+    prefix: str | None = None,
+    suffix: str = "container",
+    from_tool: str | None = None,
+    to_tool: str | None = None,
+    jobs: int | None = None,
+) -> list[AppDiff]:
+    """Diff the staged trees of several apps concurrently.
+
+    Staging in this process is CPU-bound, so apps are spread over worker
+    processes unless both sides are staged by tool commands, whose
+    subprocesses are waited for from threads.
+
+    Args:
+        pairs: (from, to) app directories per app; None for a side where
+            the app does not exist
+        prefix: Package name prefix
+        suffix: Package name suffix
+        from_tool: Tool command for the "from" side (None: this process)
+        to_tool: Tool command for the "to" side (None: this process)
+        jobs: Maximum concurrent apps (default: CPU count)
+
+    Returns:
+        One result per pair, in input order
+    """
+    workers = max(1, min(jobs or os.cpu_count() or 1, len(pairs) or 1))
+    diff = partial(
+        _diff_pair, prefix=prefix, suffix=suffix, from_tool=from_tool, to_tool=to_tool
+    )
+    if workers > 1 and (from_tool is None or to_tool is None):
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(diff, pairs))
+
+    # Validation results are shared between the threads
+    diff = partial(diff, validation_cache=ValidationCache())
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(diff, pairs))
+
+
+def _diff_pair(
+    pair: tuple[Path | None, Path | None],
+    prefix: str | None,
+    suffix: str,
+    from_tool: str | None,
+    to_tool: str | None,
+    validation_cache: ValidationCache | None = None,
+) -> AppDiff:
+    """Stage both sides of one app and diff them (see diff_apps())."""
+    name = next(p for p in pair if p is not None).name
+    sides = []
+    try:
+        for input_dir, tool in zip(pair, (from_tool, to_tool), strict=True):
+            if input_dir is None:
+                sides.append((None, {}))
+            else:
+                sides.append(
+                    stage_snapshot(input_dir, prefix, suffix, tool, validation_cache)
+                )
+    except DiffError as e:
+        return AppDiff(name, error=str(e))
+    (old_id, old), (new_id, new) = sides
+    return diff_snapshots(new_id or old_id or name, old, new)
+
+
+def diff_command(args: argparse.Namespace) -> int:
+    """Execute diff subcommand.
+
+    Args:
+        args: Parsed diff arguments
+
+    Returns:
+        Exit code: validation error if an app cannot be staged on either
+        side; with --exit-code, 1 as well if any file differs
+    """
+    from generate_container_packages.cli import EXIT_SUCCESS, EXIT_VALIDATION_ERROR
+
+    app_dirs = [Path(p).resolve() for p in args.app_dirs]
+    app_dirs = [d for p in app_dirs for d in (find_app_dirs([p]) or [p])]
+
+    try:
+        for tool in {args.from_tool, args.to_tool} - {None}:
+            check_tool(tool)
+    except DiffError as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return EXIT_VALIDATION_ERROR
+
+    with tempfile.TemporaryDirectory(prefix="container-diff-") as tmp:
+        try:
+            sides = []
+            for name, ref in (("from", args.from_ref), ("to", args.to_ref)):
+                if ref is None:
+                    sides.append({d: d for d in app_dirs})
+                else:
+                    sides.append(checkout(ref, app_dirs, Path(tmp) / name))
+        except DiffError as e:
+            print(f"ERROR: {e}", file=sys.stderr)
+            return EXIT_VALIDATION_ERROR
+
+        pairs = [(sides[0].get(d), sides[1].get(d)) for d in app_dirs]
+        pairs = [pair for pair in pairs if pair != (None, None)]
+        results = diff_apps(
+            pairs,
+            prefix=args.prefix,
+            suffix=args.suffix,
+            from_tool=args.from_tool,
+            to_tool=args.to_tool,
+            jobs=args.jobs,
+        )
+
+    failed = [r for r in results if r.error]
+    changed = [r for r in results if r.files]
+    for result in results:
+        if result.error:
+            print(f"ERROR: {result.app_id}: {result.error}", file=sys.stderr)
+        elif not args.stat:
+            sys.stdout.writelines(result.lines)
+        else:
+            for path in result.files:
+                print(f"{result.app_id}/{path}")
+    print(
+        f"{len(changed)} of {len(results)} apps differ, "
+        f"{sum(len(r.files) for r in changed)} files changed",
+        file=sys.stderr,
+    )
+
+    if failed:
+        return EXIT_VALIDATION_ERROR
+    if args.exit_code and changed:
+        return 1
+    return EXIT_SUCCESS
+
+
+def create_diff_argument_parser() -> argparse.ArgumentParser:
+    """Create argument parser for the diff subcommand.
+
+    Returns:
+        Configured ArgumentParser instance
+    """
+    parser = argparse.ArgumentParser(
+        prog="generate-container-packages diff",
+        description=(
+            "Show how the generated package files of apps differ between two "
+            "input revisions or two tool versions, without building"
+        ),
+    )
+    parser.add_argument(
+        "app_dirs",
+        metavar="DIR",
+        nargs="+",
+        help="App definition directories, or directories containing them",
+    )
+    parser.add_argument(
+        "--from",
+        dest="from_ref",
+        metavar="REV",
+        help="Git revision of the app inputs to diff from (default: working tree)",
+    )
+    parser.add_argument(
+        "--to",
+        dest="to_ref",
+        metavar="REV",
+        help="Git revision of the app inputs to diff to (default: working tree)",
+    )
+    parser.add_argument(
+        "--from-tool",
+        metavar="CMD",
+        help=(
+            "Command of the tool version to diff from, e.g. "
+            "'/opt/old-venv/bin/generate-container-packages' (default: this one); "
+            "it must include the stage-dump subcommand (newer than 0.5.3)"
+        ),
+    )
+    parser.add_argument(
+        "--to-tool",
+        metavar="CMD",
+        help=(
+            "Command of the tool version to diff to, with stage-dump like "
+            "--from-tool (default: this one)"
+        ),
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        metavar="N",
+        help="Maximum concurrent apps (default: CPU count)",
+    )
+    parser.add_argument(
+        "--stat", action="store_true", help="Only list the changed files"
+    )
+    parser.add_argument(
+        "--exit-code",
+        action="store_true",
+        help="Exit with 1 if any file differs",
+    )
+    parser.add_argument(
+        "--prefix", help="Package name prefix (e.g., 'marine', 'halos', 'casaos')"
+    )
+    parser.add_argument(
+        "--suffix",
+        default="container",
+        help="Package name suffix (default: 'container')",
+    )
+
+    verbosity = parser.add_mutually_exclusive_group()
+    verbosity.add_argument(
+        "-v", "--verbose", action="store_true", help="Verbose output"
+    )
+    verbosity.add_argument("--debug", action="store_true", help="Debug output")
+    verbosity.add_argument("-q", "--quiet", action="store_true", help="Errors only")
+    return parser
+
+
+def stage_dump_command(args: argparse.Namespace) -> int:
+    """Execute the hidden stage-dump subcommand used by diff --from-tool.
+
+    Args:
+        args: Parsed stage-dump arguments
+
+    Returns:
+        Exit code
+    """
+    from generate_container_packages.cli import EXIT_SUCCESS, EXIT_VALIDATION_ERROR
+
+    try:
+        app_id, files = stage_snapshot(Path(args.input_dir), args.prefix, args.suffix)
+    except DiffError as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return EXIT_VALIDATION_ERROR
+    sys.stdout.write(dump_snapshot(app_id, files) + "\n")
+    return EXIT_SUCCESS
+
+
+def create_stage_dump_argument_parser() -> argparse.ArgumentParser:
+    """Create argument parser for the stage-dump subcommand.
+
+    Returns:
+        Configured ArgumentParser instance
+    """
+    parser = argparse.ArgumentParser(
+        prog="generate-container-packages stage-dump",
+        description="Print the staged package tree of an app as JSON (for diff)",
+    )
+    parser.add_argument("input_dir", metavar="INPUT_DIR")
+    parser.add_argument("--prefix")
+    parser.add_argument("--suffix", default="container")
+    return parser
@@ -1,8 +1,10 @@
 """Debian package building module."""
 
+import os
 import shutil
 import subprocess
 import tempfile
+from dataclasses import dataclass
 from pathlib import Path
 from typing import Any
 
@@ -13,30 +15,171 @@ from generate_container_packages.labels import generate_homarr_labels
 from generate_container_packages.loader import AppDefinition
 from generate_container_packages.middleware import generate_forwardauth_middleware
 from generate_container_packages.oidc_snippet import generate_oidc_snippet
-from generate_container_packages.prestart import generate_prestart_script
+from generate_container_packages.prestart import (
+    generate_prestart_script,
+    generate_routing_prestart_script,
+)
 from generate_container_packages.registry import generate_registry_toml
+from generate_container_packages.renderer import EXECUTABLE_DEBIAN_FILES
+from generate_container_packages.repository import (
+    RepositoryError,
+    parse_control,
+    read_control_fields,
+)
 from generate_container_packages.routing import generate_routing_yml
+from generate_container_packages.staging import StagedTree, hash_file
 from generate_container_packages.systemd_check import inject_systemd_check
+from generate_container_packages.timing import phase
 from generate_container_packages.traefik import inject_traefik_network
+from schemas.metadata import check_compression_level
+
+# Compressor dpkg-deb uses when none is configured
+DEFAULT_COMPRESSOR = "xz"
 
 
 class BuildError(Exception):
     """Raised when package build fails."""
 
 
+@dataclass(frozen=True)
+class CompressionProfile:
+    """dpkg-deb compression settings for a package build.
+
+    Unset fields keep dpkg-deb's defaults. The profile is passed to
+    dpkg-deb (called by dpkg-buildpackage through dh_builddeb) via the
+    DPKG_DEB_* environment variables, so it does not change the staged
+    package source tree.
+
+    Attributes:
+        type: Compressor (xz, zstd, gzip or none)
+        level: Compression level
+        threads: Maximum compressor threads on the build host (0 = all CPUs)
+    """
+
+    type: str | None = None
+    level: int | None = None
+    threads: int | None = None
+
+    def __post_init__(self) -> None:
+        """Validate the fields that do not depend on other profiles.
+
+        The level of a profile without a type is only checked by validate()
+        once it is combined with the app's profile.
+
+        Raises:
+            ValueError: If the level is invalid for the given type or
+                threads is negative
+        """
+        if self.type is not None:
+            check_compression_level(self.type, self.level)
+        if self.threads is not None and self.threads < 0:
+            raise ValueError("compression threads must not be negative")
+
+    def validate(self) -> "CompressionProfile":
+        """Check the level against the effective compressor.
+
+        Returns:
+            This profile
+
+        Raises:
+            ValueError: If the level is invalid for the compressor
+        """
+        check_compression_level(self.type or DEFAULT_COMPRESSOR, self.level)
+        return self
+
+    @classmethod
+    def from_metadata(cls, metadata: dict[str, Any]) -> "CompressionProfile":
+        """Create the per-app profile from metadata.yaml's compression field.
+
+        Args:
+            metadata: Package metadata
+
+        Returns:
+            Profile (empty if the app has no compression field)
+        """
+        compression = metadata.get("compression") or {}
+        return cls(type=compression.get("type"), level=compression.get("level"))
+
+    def override(self, other: "CompressionProfile | None") -> "CompressionProfile":
+        """Combine with a profile that takes precedence (e.g. from the CLI).
+
+        A different compressor in other discards this profile's level.
+
+        Args:
+            other: Overriding profile, or None
+
+        Returns:
+            Combined profile
+        """
+        if other is None:
+            return self
+        level = self.level
+        if other.level is not None or (other.type and other.type != self.type):
+            level = other.level
+        return CompressionProfile(
+            type=other.type or self.type,
+            level=level,
+            threads=other.threads if other.threads is not None else self.threads,
+        )
+
+    def environment(self) -> dict[str, str]:
+        """Return the dpkg-deb environment variables for this profile."""
+        env = {}
+        if self.type is not None:
+            env["DPKG_DEB_COMPRESSOR_TYPE"] = self.type
+        if self.level is not None:
+            env["DPKG_DEB_COMPRESSOR_LEVEL"] = str(self.level)
+        if self.threads is not None:
+            env["DPKG_DEB_THREADS_MAX"] = str(self.threads)
+        return env
+
+    def __str__(self) -> str:
+        """Describe the profile for build summaries."""
+        text = self.type or f"dpkg default ({DEFAULT_COMPRESSOR})"
+        if self.level is not None:
+            text += f" level {self.level}"
+        if self.threads is not None:
+            text += f", {self.threads or 'all'} threads"
+        return text
+
+
+def resolve_compression(
+    metadata: dict[str, Any], override: CompressionProfile | None = None
+) -> CompressionProfile:
+    """Determine the compression profile of a build.
+
+    Args:
+        metadata: Package metadata (per-app profile)
+        override: Per-build profile taking precedence, or None
+
+    Returns:
+        Effective compression profile
+
+    Raises:
+        ValueError: If the combined level is invalid for the compressor
+    """
+    return CompressionProfile.from_metadata(metadata).override(override).validate()
+
+
 def build_package(
     app_def: AppDefinition,
     rendered_dir: Path,
     output_dir: Path,
     keep_temp: bool = False,
+    compression: CompressionProfile | None = None,
 ) -> Path:
     """Build Debian package from application definition and rendered templates.
 
+    Reproducible builds (app_def.source_date_epoch set) get normalized file
+    timestamps.
+
     Args:
         app_def: Application definition with metadata and files
         rendered_dir: Directory containing rendered template files
         output_dir: Directory to place built artifacts
         keep_temp: If True, preserve build directory after build
+        compression: Per-build compression profile, overriding the app's
+            compression field
 
     Returns:
         Path to generated .deb file
@@ -56,24 +199,15 @@ def build_package(
         # Prepare build directory
         prepare_build_directory(app_def, rendered_dir, source_dir)
 
-        # Set correct permissions
-        set_permissions(source_dir)
-
-        # Build package
-        run_dpkg_buildpackage(source_dir)
-
-        # Collect artifacts
-        artifacts = collect_artifacts(build_dir, output_dir, pkg_name, version)
-
-        if not artifacts:
-            raise BuildError("No .deb file generated by dpkg-buildpackage")
-
-        # Return path to .deb file
-        deb_file = next((a for a in artifacts if a.suffix == ".deb"), None)
-        if not deb_file:
-            raise BuildError("No .deb file found in build artifacts")
-
-        return deb_file
+        return _build_source_directory(
+            build_dir,
+            source_dir,
+            output_dir,
+            pkg_name,
+            version,
+            app_def.source_date_epoch,
+            resolve_compression(app_def.metadata, compression),
+        )
 
     except BuildError:
         # Re-raise expected build errors without preservation message
@@ -92,6 +226,110 @@ def build_package(
             shutil.rmtree(build_dir)
 
 
+def build_staged_package(
+    tree: StagedTree,
+    pkg_name: str,
+    version: str,
+    output_dir: Path,
+    keep_temp: bool = False,
+    source_date_epoch: int | None = None,
+    compression: CompressionProfile | None = None,
+) -> Path:
+    """Build Debian package from an in-memory staged source tree.
+
+    Args:
+        tree: Staged package source tree (see stage_package())
+        pkg_name: Package name
+        version: Package version
+        output_dir: Directory to place built artifacts
+        keep_temp: If True, preserve build directory after build
+        source_date_epoch: Build date for a reproducible build; None for a
+            regular build
+        compression: Effective compression profile (see resolve_compression())
+
+    Returns:
+        Path to generated .deb file
+
+    Raises:
+        BuildError: If package build fails
+    """
+    build_dir = Path(tempfile.mkdtemp(prefix="container-pkg-"))
+
+    try:
+        source_dir = build_dir / f"{pkg_name}-{version}"
+        with phase("stage"):
+            tree.write(source_dir)
+        return _build_source_directory(
+            build_dir,
+            source_dir,
+            output_dir,
+            pkg_name,
+            version,
+            source_date_epoch,
+            compression,
+        )
+
+    finally:
+        if keep_temp:
+            print(f"Build directory preserved at: {build_dir}")
+        elif build_dir.exists():
+            shutil.rmtree(build_dir)
+
+
+def _build_source_directory(
+    build_dir: Path,
+    source_dir: Path,
+    output_dir: Path,
+    pkg_name: str,
+    version: str,
+    source_date_epoch: int | None = None,
+    compression: CompressionProfile | None = None,
+) -> Path:
+    """Run dpkg-buildpackage on a prepared source directory.
+
+    Args:
+        build_dir: Parent of source_dir, where dpkg-buildpackage puts artifacts
+        source_dir: Prepared package source directory
+        output_dir: Directory to place built artifacts
+        pkg_name: Package name
+        version: Package version
+        source_date_epoch: Build date for a reproducible build, or None
+        compression: Compression profile, or None for dpkg's default
+
+    Returns:
+        Path to generated .deb file
+
+    Raises:
+        BuildError: If package build fails
+    """
+    # Set correct permissions
+    set_permissions(source_dir)
+    if source_date_epoch is not None:
+        normalize_mtimes(source_dir, source_date_epoch)
+
+    # Build package
+    with phase("dpkg"):
+        run_dpkg_buildpackage(
+            source_dir,
+            source_date_epoch=source_date_epoch,
+            compression=compression,
+        )
+
+    # Collect artifacts
+    with phase("collect"):
+        artifacts = collect_artifacts(build_dir, output_dir, pkg_name, version)
+
+    if not artifacts:
+        raise BuildError("No .deb file generated by dpkg-buildpackage")
+
+    # Return path to .deb file
+    deb_file = next((a for a in artifacts if a.suffix == ".deb"), None)
+    if not deb_file:
+        raise BuildError("No .deb file found in build artifacts")
+
+    return deb_file
+
+
 def prepare_build_directory(
     app_def: AppDefinition, rendered_dir: Path, source_dir: Path
 ) -> None:
@@ -102,14 +340,15 @@ def prepare_build_directory(
         rendered_dir: Directory with rendered template files
         source_dir: Source directory to prepare
     """
-    # Create directory structure
-    source_dir.mkdir(parents=True, exist_ok=True)
+    with phase("stage"):
+        # Create directory structure
+        source_dir.mkdir(parents=True, exist_ok=True)
 
-    # Copy source files from input directory
-    copy_source_files(app_def, source_dir)
+        # Copy source files from input directory
+        copy_source_files(app_def, source_dir)
 
-    # Copy rendered template files from rendered directory
-    copy_rendered_files(rendered_dir, source_dir)
+        # Copy rendered template files from rendered directory
+        copy_rendered_files(rendered_dir, source_dir)
 
 
 def copy_source_files(app_def: AppDefinition, source_dir: Path) -> None:
@@ -122,6 +361,26 @@ def copy_source_files(app_def: AppDefinition, source_dir: Path) -> None:
     Raises:
         BuildError: If required file is missing
     """
+    stage_source_files(app_def).write(source_dir)
+
+
+def stage_source_files(app_def: AppDefinition) -> StagedTree:
+    """Stage application source files and generated runtime files in memory.
+
+    Describes exactly what copy_source_files() writes, without touching
+    the filesystem.
+
+    Args:
+        app_def: Application definition with file paths
+
+    Returns:
+        StagedTree with all files of the source directory except debian/
+
+    Raises:
+        BuildError: If required file is missing
+    """
+    tree = StagedTree()
+
     # Get input directory from AppDefinition
     input_dir = app_def.input_dir
 
@@ -131,71 +390,101 @@ def copy_source_files(app_def: AppDefinition, source_dir: Path) -> None:
         src = input_dir / filename
         if not src.exists():
             raise BuildError(f"Required file missing: {filename}")
-        dst = source_dir / filename
-        shutil.copy2(src, dst)
+        tree.add_source(filename, src)
 
     # Check docker-compose.yml exists
     compose_src = input_dir / "docker-compose.yml"
     if not compose_src.exists():
         raise BuildError("Required file missing: docker-compose.yml")
 
-    # Inject Homarr labels into docker-compose.yml
-    compose_with_labels = inject_homarr_labels(
-        app_def.compose, app_def.metadata, app_def.icon_path
-    )
-
-    # Inject Traefik network (labels generated at runtime from routing.yml)
-    compose_with_labels = inject_traefik_network(compose_with_labels, app_def.metadata)
-
-    # Inject systemd check to prevent direct docker compose usage
-    compose_with_labels = inject_systemd_check(compose_with_labels)
-
-    # Inject init: true for proper signal handling on shutdown
-    compose_with_labels = inject_init(compose_with_labels)
-
-    # Fix boolean restart values that PyYAML parsed from "no"/"yes"
-    compose_with_labels = _fix_restart_policy(compose_with_labels)
-    compose_dst = source_dir / "docker-compose.yml"
-    with open(compose_dst, "w", encoding="utf-8") as f:
-        yaml.dump(compose_with_labels, f, default_flow_style=False, sort_keys=False)
+    with phase("compose"):
+        tree.add_content("docker-compose.yml", render_compose(app_def))
 
     # Copy optional icon
     if app_def.icon_path and app_def.icon_path.exists():
-        dst = source_dir / app_def.icon_path.name
-        shutil.copy2(app_def.icon_path, dst)
+        tree.add_source(app_def.icon_path.name, app_def.icon_path)
 
     # Copy optional screenshots
     for screenshot_path in app_def.screenshot_paths:
         if screenshot_path.exists():
-            dst = source_dir / screenshot_path.name
-            shutil.copy2(screenshot_path, dst)
+            tree.add_source(screenshot_path.name, screenshot_path)
 
     # Copy optional assets directory
     if app_def.assets_dir and app_def.assets_dir.exists():
-        shutil.copytree(app_def.assets_dir, source_dir / "assets")
+        tree.add_directory("assets", app_def.assets_dir)
 
     # Copy optional default-data directory
     # These files are installed to lib dir and copied to data volume on first install
     if app_def.default_data_dir and app_def.default_data_dir.exists():
-        shutil.copytree(app_def.default_data_dir, source_dir / "default-data")
+        tree.add_directory("default-data", app_def.default_data_dir)
 
     # Generate env.template from default_config
-    generate_env_template(app_def, source_dir)
+    _stage_env_template(tree, app_def)
 
     # Generate prestart.sh script
-    generate_prestart_file(app_def, source_dir)
+    _stage_prestart_file(tree, app_def)
 
     # Generate app registry file for homarr-container-adapter
-    generate_registry_file(app_def, source_dir)
+    _stage_registry_file(tree, app_def)
 
     # Generate OIDC client snippet for Authelia (if OIDC app)
-    generate_oidc_snippet_file(app_def, source_dir)
+    _stage_oidc_snippet_file(tree, app_def)
 
     # Generate per-app ForwardAuth middleware (if custom headers)
-    generate_middleware_file(app_def, source_dir)
+    _stage_middleware_file(tree, app_def)
 
     # Generate routing.yml for generic proxy routing
-    generate_routing_file(app_def, source_dir)
+    _stage_routing_file(tree, app_def)
+
+    return tree
+
+
+def stage_package(app_def: AppDefinition, rendered: dict[str, str]) -> StagedTree:
+    """Stage the complete package source directory in memory.
+
+    Args:
+        app_def: Application definition
+        rendered: Rendered template files as returned by render_templates()
+
+    Returns:
+        StagedTree with the same files prepare_build_directory() produces
+
+    Raises:
+        BuildError: If required file is missing
+    """
+    tree = stage_source_files(app_def)
+    for path, content in rendered.items():
+        mode = 0o755 if Path(path).name in EXECUTABLE_DEBIAN_FILES else None
+        tree.add_content(path, content, mode=mode)
+    return tree
+
+
+def render_compose(app_def: AppDefinition) -> str:
+    """Render the packaged docker-compose.yml with all injections applied.
+
+    Args:
+        app_def: Application definition
+
+    Returns:
+        docker-compose.yml content
+    """
+    # Inject Homarr labels into docker-compose.yml
+    compose_with_labels = inject_homarr_labels(
+        app_def.compose, app_def.metadata, app_def.icon_path
+    )
+
+    # Inject Traefik network (labels generated at runtime from routing.yml)
+    compose_with_labels = inject_traefik_network(compose_with_labels, app_def.metadata)
+
+    # Inject systemd check to prevent direct docker compose usage
+    compose_with_labels = inject_systemd_check(compose_with_labels)
+
+    # Inject init: true for proper signal handling on shutdown
+    compose_with_labels = inject_init(compose_with_labels)
+
+    # Fix boolean restart values that PyYAML parsed from "no"/"yes"
+    compose_with_labels = _fix_restart_policy(compose_with_labels)
+    return yaml.dump(compose_with_labels, default_flow_style=False, sort_keys=False)
 
 
 def generate_env_template(app_def: AppDefinition, source_dir: Path) -> None:
@@ -209,6 +498,13 @@ def generate_env_template(app_def: AppDefinition, source_dir: Path) -> None:
     - env.template: Full defaults including system variables (-> env.defaults)
     - env.user-template: App defaults as comments for user reference (-> env)
     """
+    tree = StagedTree()
+    _stage_env_template(tree, app_def)
+    tree.write(source_dir)
+
+
+def _stage_env_template(tree: StagedTree, app_def: AppDefinition) -> None:
+    """Stage env.template and env.user-template (see generate_env_template)."""
     package_name = app_def.metadata["package_name"]
     default_config = app_def.metadata.get("default_config", {})
 
@@ -240,8 +536,7 @@ def generate_env_template(app_def: AppDefinition, source_dir: Path) -> None:
         escaped_config[key] = value_str
         lines.append(f'{key}="{value_str}"\n')
 
-    env_template = source_dir / "env.template"
-    env_template.write_text("".join(lines), encoding="utf-8")
+    tree.add_content("env.template", "".join(lines))
 
     # Generate env.user-template (commented defaults for user env file)
     # No system variables here - apps define their own PUID/PGID/TZ if needed
@@ -257,8 +552,7 @@ def generate_env_template(app_def: AppDefinition, source_dir: Path) -> None:
     for key, value_str in escaped_config.items():
         user_lines.append(f'#{key}="{value_str}"\n')
 
-    env_user_template = source_dir / "env.user-template"
-    env_user_template.write_text("".join(user_lines), encoding="utf-8")
+    tree.add_content("env.user-template", "".join(user_lines))
 
 
 def copy_rendered_files(rendered_dir: Path, source_dir: Path) -> None:
@@ -297,11 +591,77 @@ def set_permissions(source_dir: Path) -> None:
             script_file.chmod(0o755)
 
 
-def run_dpkg_buildpackage(source_dir: Path) -> subprocess.CompletedProcess:
+def normalize_mtimes(source_dir: Path, epoch: int) -> None:
+    """Set the modification time of every staged file and directory.
+
+    Copied input files otherwise carry their checkout time into the .deb,
+    so identical inputs would not produce identical packages.
+
+    Args:
+        source_dir: Prepared package source directory
+        epoch: Modification time to apply (seconds since the epoch)
+    """
+    for path in sorted(source_dir.rglob("*"), reverse=True):
+        os.utime(path, (epoch, epoch), follow_symlinks=False)
+    os.utime(source_dir, (epoch, epoch))
+
+
+def package_digest(deb_file: Path) -> str:
+    """Compute the digest that identifies a built package.
+
+    Reproducible builds of identical inputs yield identical digests, so
+    caches can key on it.
+
+    Args:
+        deb_file: Built .deb file
+
+    Returns:
+        Digest in the form "sha256:<hex>"
+    """
+    return f"sha256:{hash_file(deb_file)}"
+
+
+def package_sizes(deb_file: Path) -> tuple[int, int | None]:
+    """Return the compressed and installed size of a built package.
+
+    Args:
+        deb_file: Built .deb file
+
+    Returns:
+        Tuple of (.deb size in bytes, installed size in bytes or None if
+        the control file cannot be read)
+    """
+    size = deb_file.stat().st_size
+    try:
+        fields = parse_control(read_control_fields(deb_file))
+        installed = int(fields["Installed-Size"]) * 1024
+    except (RepositoryError, FileNotFoundError, KeyError, ValueError):
+        installed = None
+    return size, installed
+
+
+def format_size(size: int) -> str:
+    """Format a byte count for build summaries (e.g. "1.4 MiB")."""
+    value = float(size)
+    for unit in ("B", "KiB", "MiB"):
+        if value < 1024:
+            return f"{value:.0f} {unit}" if unit == "B" else f"{value:.1f} {unit}"
+        value /= 1024
+    return f"{value:.1f} GiB"
+
+
+def run_dpkg_buildpackage(
+    source_dir: Path,
+    source_date_epoch: int | None = None,
+    compression: CompressionProfile | None = None,
+) -> subprocess.CompletedProcess:
     """Execute dpkg-buildpackage to build package.
 
     Args:
         source_dir: Source directory to build from
+        source_date_epoch: Exported as SOURCE_DATE_EPOCH so dpkg-deb clamps
+            timestamps and debhelper normalizes the package contents
+        compression: Compression profile exported to dpkg-deb
 
     Returns:
         CompletedProcess result
@@ -312,6 +672,11 @@ def run_dpkg_buildpackage(source_dir: Path) -> subprocess.CompletedProcess:
     # Build command: binary only, unsigned
     cmd = ["dpkg-buildpackage", "-b", "-us", "-uc"]
 
+    overrides = compression.environment() if compression is not None else {}
+    if source_date_epoch is not None:
+        overrides["SOURCE_DATE_EPOCH"] = str(source_date_epoch)
+    env = {**os.environ, **overrides} if overrides else None
+
     try:
         result = subprocess.run(
             cmd,
@@ -319,6 +684,7 @@ def run_dpkg_buildpackage(source_dir: Path) -> subprocess.CompletedProcess:
             capture_output=True,
             text=True,
             check=False,
+            env=env,
         )
 
         # Check if build was successful
@@ -465,19 +831,23 @@ def generate_prestart_file(app_def: AppDefinition, source_dir: Path) -> None:
         app_def: Application definition
         source_dir: Destination directory
     """
-    prestart_file = source_dir / "prestart.sh"
+    tree = StagedTree()
+    _stage_prestart_file(tree, app_def)
+    tree.write(source_dir)
+
+
+def _stage_prestart_file(tree: StagedTree, app_def: AppDefinition) -> None:
+    """Stage the file written by generate_prestart_file()."""
     custom_prestart = app_def.input_dir / "prestart.sh"
 
+    # Script is always installed executable
     if custom_prestart.exists():
         # Use custom prestart script from app directory
-        shutil.copy2(custom_prestart, prestart_file)
+        tree.add_source("prestart.sh", custom_prestart, mode=0o755)
     else:
         # Generate default prestart script
         script_content = generate_prestart_script(app_def)
-        prestart_file.write_text(script_content, encoding="utf-8")
-
-    # Make executable
-    prestart_file.chmod(0o755)
+        tree.add_content("prestart.sh", script_content, mode=0o755)
 
 
 def generate_registry_file(app_def: AppDefinition, source_dir: Path) -> None:
@@ -497,6 +867,13 @@ def generate_registry_file(app_def: AppDefinition, source_dir: Path) -> None:
 
     The file is only generated if web_ui is enabled in metadata.
     """
+    tree = StagedTree()
+    _stage_registry_file(tree, app_def)
+    tree.write(source_dir)
+
+
+def _stage_registry_file(tree: StagedTree, app_def: AppDefinition) -> None:
+    """Stage the file written by generate_registry_file()."""
     registry_content = generate_registry_toml(
         app_def.metadata, app_def.compose, app_def.icon_path
     )
@@ -505,8 +882,7 @@ def generate_registry_file(app_def: AppDefinition, source_dir: Path) -> None:
         # web_ui not enabled, skip registry file generation
         return
 
-    registry_file = source_dir / "webapp-registry.toml"
-    registry_file.write_text(registry_content, encoding="utf-8")
+    tree.add_content("webapp-registry.toml", registry_content)
 
 
 def generate_oidc_snippet_file(app_def: AppDefinition, source_dir: Path) -> None:
@@ -521,14 +897,20 @@ def generate_oidc_snippet_file(app_def: AppDefinition, source_dir: Path) -> None
 
     The file is only generated if traefik.auth is 'oidc' in metadata.
     """
+    tree = StagedTree()
+    _stage_oidc_snippet_file(tree, app_def)
+    tree.write(source_dir)
+
+
+def _stage_oidc_snippet_file(tree: StagedTree, app_def: AppDefinition) -> None:
+    """Stage the file written by generate_oidc_snippet_file()."""
     snippet_content = generate_oidc_snippet(app_def.metadata)
 
     if snippet_content is None:
         # Not an OIDC app, skip snippet generation
         return
 
-    oidc_snippet_file = source_dir / "oidc-client.yml"
-    oidc_snippet_file.write_text(snippet_content, encoding="utf-8")
+    tree.add_content("oidc-client.yml", snippet_content)
 
 
 def generate_middleware_file(app_def: AppDefinition, source_dir: Path) -> None:
@@ -544,14 +926,20 @@ def generate_middleware_file(app_def: AppDefinition, source_dir: Path) -> None:
 
     The file is only generated if custom forward_auth headers are specified.
     """
+    tree = StagedTree()
+    _stage_middleware_file(tree, app_def)
+    tree.write(source_dir)
+
+
+def _stage_middleware_file(tree: StagedTree, app_def: AppDefinition) -> None:
+    """Stage the file written by generate_middleware_file()."""
     middleware_content = generate_forwardauth_middleware(app_def.metadata)
 
     if middleware_content is None:
         # No custom headers, skip middleware generation
         return
 
-    middleware_file = source_dir / "traefik-middleware.yml"
-    middleware_file.write_text(middleware_content, encoding="utf-8")
+    tree.add_content("traefik-middleware.yml", middleware_content)
 
 
 def generate_routing_file(app_def: AppDefinition, source_dir: Path) -> None:
@@ -566,8 +954,17 @@ def generate_routing_file(app_def: AppDefinition, source_dir: Path) -> None:
         source_dir: Destination directory
 
     The file is only generated if routing or traefik config is present,
-    or if web_ui is enabled.
+    or if web_ui is enabled. A configure-routing.sh prestart script that
+    runs the proxy's routing command only when its inputs changed is
+    generated alongside it.
     """
+    tree = StagedTree()
+    _stage_routing_file(tree, app_def)
+    tree.write(source_dir)
+
+
+def _stage_routing_file(tree: StagedTree, app_def: AppDefinition) -> None:
+    """Stage the file written by generate_routing_file()."""
     routing_content = generate_routing_yml(
         app_def.metadata, app_def.compose, app_def.metadata["package_name"]
     )
@@ -576,5 +973,16 @@ def generate_routing_file(app_def: AppDefinition, source_dir: Path) -> None:
         # No routing needed, skip file generation
         return
 
-    routing_file = source_dir / "routing.yml"
-    routing_file.write_text(routing_content, encoding="utf-8")
+    tree.add_content("routing.yml", routing_content)
+
+    # ExecStartPre wrapper that skips configure-container-routing when the
+    # routing inputs are unchanged
+    tree.add_content(
+        "configure-routing.sh",
+        generate_routing_prestart_script(
+            app_def.metadata["package_name"],
+            app_def.metadata.get("app_id", ""),
+            routing_content,
+        ),
+        mode=0o755,
+    )
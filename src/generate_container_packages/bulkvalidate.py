@@ -0,0 +1,409 @@
+"""Validation of many app definitions in one process.
+
+Pre-merge checks of an app repository validate every app directory. Doing
+that with one --validate process per app pays interpreter start-up and
+schema compilation ~150 times; validate_apps() validates all of them
+concurrently in one process, sharing the compiled Pydantic schemas, the
+trusted model memo and the cached dpkg version checks.
+
+Results are printed as text, JSON or JUnit XML (for CI test reports). With
+--changed-since, only app directories containing files changed since a git
+ref (including uncommitted and untracked files) are validated.
+"""
+
+import argparse
+import json
+import logging
+import os
+import subprocess
+import sys
+import time
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any
+
+from generate_container_packages.multibuild import find_app_dirs
+from generate_container_packages.validator import (
+    ValidationCache,
+    validate_input_directory,
+)
+
+logger = logging.getLogger(__name__)
+
+OUTPUT_FORMATS = ("text", "json", "junit")
+
+
+class GitError(Exception):
+    """Raised when changed files cannot be determined with git."""
+
+
+@dataclass
+class AppValidation:
+    """Validation outcome of one app directory.
+
+    Attributes:
+        input_dir: App definition directory
+        success: Whether validation passed
+        errors: Validation errors
+        warnings: Validation warnings
+        elapsed_seconds: Time spent validating this app
+    """
+
+    input_dir: str
+    success: bool
+    errors: list[str] = field(default_factory=list)
+    warnings: list[str] = field(default_factory=list)
+    elapsed_seconds: float = 0.0
+
+
+def find_validation_dirs(paths: list[Path]) -> list[Path]:
+    """Expand arguments into app directories to validate.
+
+    Catalog directories are expanded as for build-all. A directory that is
+    neither an app nor contains any is validated itself, so missing
+    metadata.yaml is reported instead of the app being silently skipped.
+
+    Args:
+        paths: App definition directories, or directories containing them
+
+    Returns:
+        Directories to validate, without duplicates
+    """
+    app_dirs: dict[Path, None] = {}
+    for path in paths:
+        found = find_app_dirs([path])
+        for app_dir in found or [path]:
+            app_dirs[app_dir] = None
+    return list(app_dirs)
+
+
+def _git(cwd: Path, *args: str) -> list[str]:
+    """Run git and return its non-empty output lines.
+
+    Raises:
+        GitError: If git is unavailable or the command fails
+    """
+    try:
+        result = subprocess.run(
+            ["git", *args],
+            cwd=cwd,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except FileNotFoundError as e:
+        raise GitError("git is not installed") from e
+    except subprocess.CalledProcessError as e:
+        raise GitError(e.stderr.strip() or f"git {args[0]} failed") from e
+    return [line for line in result.stdout.splitlines() if line]
+
+
+def repository_root(path: Path) -> Path:
+    """Find the top directory of the git repository containing a path.
+
+    Args:
+        path: File or directory (need not exist)
+
+    Returns:
+        Absolute repository top directory
+
+    Raises:
+        GitError: If the path is not inside a git repository
+    """
+    cwd = next(p for p in (path, *path.parents) if p.is_dir())
+    return Path(_git(cwd, "rev-parse", "--show-toplevel")[0]).resolve()
+
+
+def changed_files(ref: str, cwd: Path) -> set[Path]:
+    """List files changed since a git ref, including working tree changes.
+
+    Args:
+        ref: Git revision to compare against (e.g. origin/main)
+        cwd: Directory inside the repository
+
+    Returns:
+        Absolute paths of changed, added, deleted and untracked files
+
+    Raises:
+        GitError: If git is unavailable or the ref is unknown
+    """
+    # Run from the top: ls-files reports paths relative to its cwd
+    top = repository_root(cwd)
+    names = _git(top, "diff", "--name-only", ref, "--")
+    names += _git(top, "ls-files", "--others", "--exclude-standard")
+    return {(top / name).resolve() for name in names}
+
+
+def changed_since(ref: str, app_dirs: list[Path]) -> set[Path]:
+    """List files changed since a git ref in the repositories of app directories.
+
+    Args:
+        ref: Git revision to compare against
+        app_dirs: App directories (absolute); git runs once per repository
+
+    Returns:
+        Absolute paths of changed files
+
+    Raises:
+        GitError: If an app is not in a git repository or the ref is unknown
+    """
+    roots: list[Path] = []
+    changed: set[Path] = set()
+    for app_dir in app_dirs:
+        if any(app_dir.is_relative_to(root) for root in roots):
+            continue
+        root = repository_root(app_dir)
+        roots.append(root)
+        changed |= changed_files(ref, root)
+    return changed
+
+
+def select_changed(app_dirs: list[Path], changed: set[Path]) -> list[Path]:
+    """Keep app directories that contain a changed file.
+
+    Args:
+        app_dirs: Candidate app directories (absolute)
+        changed: Absolute paths of changed files
+
+    Returns:
+        App directories with at least one changed file, in input order
+    """
+    parents = {parent for path in changed for parent in path.parents}
+    return [app_dir for app_dir in app_dirs if app_dir in parents]
+
+
+def validate_apps(app_dirs: list[Path], jobs: int | None = None) -> list[AppValidation]:
+    """Validate app directories concurrently.
+
+    Args:
+        app_dirs: App definition directories
+        jobs: Maximum concurrent validations (default: CPU count)
+
+    Returns:
+        One result per directory, in input order
+    """
+    cache = ValidationCache()
+
+    def validate(app_dir: Path) -> AppValidation:
+        start = time.perf_counter()
+        try:
+            result = validate_input_directory(app_dir, cache=cache)
+            outcome = AppValidation(
+                input_dir=str(app_dir),
+                success=result.success,
+                errors=list(result.errors),
+                warnings=[w.message for w in result.warnings],
+            )
+        except Exception as e:
+            logger.debug(f"Validation of {app_dir} raised", exc_info=True)
+            outcome = AppValidation(
+                input_dir=str(app_dir), success=False, errors=[str(e)]
+            )
+        outcome.elapsed_seconds = round(time.perf_counter() - start, 3)
+        return outcome
+
+    workers = max(1, min(jobs or os.cpu_count() or 1, len(app_dirs) or 1))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(validate, app_dirs))
+
+
+def results_to_json(results: list[AppValidation], elapsed: float) -> str:
+    """Format results as a JSON document.
+
+    Args:
+        results: Per-app results
+        elapsed: Total wall time in seconds
+
+    Returns:
+        JSON text with per-app results and a summary
+    """
+    failed = sum(1 for r in results if not r.success)
+    document: dict[str, Any] = {
+        "total": len(results),
+        "passed": len(results) - failed,
+        "failed": failed,
+        "elapsed_seconds": round(elapsed, 3),
+        "apps": [asdict(r) for r in results],
+    }
+    return json.dumps(document, indent=2)
+
+
+def results_to_junit(results: list[AppValidation], elapsed: float) -> str:
+    """Format results as JUnit XML.
+
+    Each app is a test case named after its directory; validation errors
+    become a failure, warnings go to system-out.
+
+    Args:
+        results: Per-app results
+        elapsed: Total wall time in seconds
+
+    Returns:
+        JUnit XML text
+    """
+    failed = sum(1 for r in results if not r.success)
+    suite = ET.Element(
+        "testsuite",
+        name="validate-all",
+        tests=str(len(results)),
+        failures=str(failed),
+        errors="0",
+        time=f"{elapsed:.3f}",
+    )
+    for result in results:
+        case = ET.SubElement(
+            suite,
+            "testcase",
+            classname="validate",
+            name=Path(result.input_dir).name,
+            file=result.input_dir,
+            time=f"{result.elapsed_seconds:.3f}",
+        )
+        if not result.success:
+            failure = ET.SubElement(
+                case,
+                "failure",
+                message=result.errors[0] if result.errors else "Validation failed",
+            )
+            failure.text = "\n".join(result.errors)
+        if result.warnings:
+            ET.SubElement(case, "system-out").text = "\n".join(result.warnings)
+    ET.indent(suite)
+    return ET.tostring(suite, encoding="unicode", xml_declaration=True) + "\n"
+
+
+def results_to_text(results: list[AppValidation], elapsed: float) -> str:
+    """Format results for the terminal.
+
+    Args:
+        results: Per-app results
+        elapsed: Total wall time in seconds
+
+    Returns:
+        One line per app plus errors, warnings and a summary line
+    """
+    lines = []
+    for result in results:
+        mark = "✓" if result.success else "✗"
+        lines.append(f"{mark} {result.input_dir} ({result.elapsed_seconds:.2f}s)")
+        lines.extend(f"    {error}" for error in result.errors)
+        lines.extend(f"    (warning) {warning}" for warning in result.warnings)
+    lines.append(summary_line(results, elapsed))
+    return "\n".join(lines) + "\n"
+
+
+def summary_line(results: list[AppValidation], elapsed: float) -> str:
+    """Summarize results in one line.
+
+    Args:
+        results: Per-app results
+        elapsed: Total wall time in seconds
+
+    Returns:
+        Passed and failed counts with the total time
+    """
+    failed = sum(1 for r in results if not r.success)
+    return (
+        f"{len(results) - failed} passed, {failed} failed "
+        f"in {elapsed:.2f}s ({len(results)} apps)"
+    )
+
+
+FORMATTERS = {
+    "text": results_to_text,
+    "json": results_to_json,
+    "junit": results_to_junit,
+}
+
+
+def validate_all_command(args: argparse.Namespace) -> int:
+    """Execute validate-all subcommand.
+
+    Args:
+        args: Parsed validate-all arguments
+
+    Returns:
+        Exit code (validation error if any app failed)
+    """
+    from generate_container_packages.cli import EXIT_SUCCESS, EXIT_VALIDATION_ERROR
+
+    start = time.perf_counter()
+    app_dirs = find_validation_dirs([Path(p).resolve() for p in args.app_dirs])
+
+    if args.changed_since:
+        try:
+            changed = changed_since(args.changed_since, app_dirs)
+        except GitError as e:
+            print(f"ERROR: Cannot determine changed files: {e}", file=sys.stderr)
+            return EXIT_VALIDATION_ERROR
+        app_dirs = select_changed(app_dirs, changed)
+        logger.info(f"{len(app_dirs)} apps changed since {args.changed_since}")
+
+    results = validate_apps(app_dirs, jobs=args.jobs)
+    elapsed = time.perf_counter() - start
+    report = FORMATTERS[args.format](results, elapsed)
+
+    if args.output:
+        Path(args.output).write_text(report, encoding="utf-8")
+        print(f"{summary_line(results, elapsed)}, report: {args.output}")
+    else:
+        sys.stdout.write(report)
+
+    if any(not r.success for r in results):
+        return EXIT_VALIDATION_ERROR
+    return EXIT_SUCCESS
+
+
+def create_validate_all_argument_parser() -> argparse.ArgumentParser:
+    """Create argument parser for the validate-all subcommand.
+
+    Returns:
+        Configured ArgumentParser instance
+    """
+    parser = argparse.ArgumentParser(
+        prog="generate-container-packages validate-all",
+        description="Validate many app definitions concurrently in one process",
+    )
+    parser.add_argument(
+        "app_dirs",
+        metavar="DIR",
+        nargs="+",
+        help="App definition directories, or directories containing them",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        metavar="N",
+        help="Maximum concurrent validations (default: CPU count)",
+    )
+    parser.add_argument(
+        "--format",
+        choices=OUTPUT_FORMATS,
+        default="text",
+        help="Report format (default: text)",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        metavar="FILE",
+        help="Write the report to FILE and only print a summary",
+    )
+    parser.add_argument(
+        "--changed-since",
+        metavar="REF",
+        help=(
+            "Only validate app directories with files changed since git REF "
+            "(including uncommitted and untracked files)"
+        ),
+    )
+
+    verbosity = parser.add_mutually_exclusive_group()
+    verbosity.add_argument(
+        "-v", "--verbose", action="store_true", help="Verbose output"
+    )
+    verbosity.add_argument("--debug", action="store_true", help="Debug output")
+    verbosity.add_argument("-q", "--quiet", action="store_true", help="Errors only")
+    return parser
@@ -0,0 +1,427 @@
+"""Precomputed catalog index for container stores.
+
+cockpit-apt filters a store's packages by origin, section, tag and name at
+browse time. The catalog index moves that work to publish time: it selects
+the packages matching a store definition once and stores them together with
+posting lists (package positions per section, tag and category), so the store
+UI can load and filter the catalog with a single small read instead of
+scanning the whole APT cache.
+
+Packages are read from app definitions (metadata.yaml) or from built .deb
+files. Directories of .deb files are scanned in memory through
+RepositoryIndex, reusing the stanzas recorded by repo-index for unchanged
+packages; the repository itself is never modified.
+"""
+
+import argparse
+import json
+import logging
+import os
+import subprocess
+import sys
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+import yaml
+from pydantic import ValidationError
+
+from generate_container_packages.loader import load_yaml
+from generate_container_packages.naming import compute_package_name
+from generate_container_packages.repository import (
+    RepositoryError,
+    RepositoryIndex,
+    parse_control,
+    read_control_fields,
+)
+from generate_container_packages.validator import validate_store
+from schemas.store import StoreConfig, StoreFilter
+
+logger = logging.getLogger(__name__)
+
+CATALOG_VERSION = 1
+
+# Tag prefix linking packages to the store's category_metadata entries
+CATEGORY_TAG_PREFIX = "category::"
+# Tag carrying the human-readable name in built packages
+DISPLAY_NAME_TAG_PREFIX = "x-display-name::"
+
+
+class CatalogError(Exception):
+    """Raised when a package source cannot be read."""
+
+
+@dataclass
+class CatalogPackage:
+    """Store-relevant fields of one package.
+
+    Attributes:
+        name: Debian package name
+        version: Package version
+        section: Debian section
+        summary: Short description
+        display_name: Human-readable application name
+        tags: Debian tags (without the display name tag)
+        origin: Repository origin, or None if unknown
+    """
+
+    name: str
+    version: str
+    section: str
+    summary: str
+    display_name: str
+    tags: list[str] = field(default_factory=list)
+    origin: str | None = None
+
+
+def package_from_metadata(
+    path: Path,
+    prefix: str | None = None,
+    suffix: str = "container",
+    origin: str | None = None,
+) -> CatalogPackage:
+    """Read catalog fields from an app definition.
+
+    Args:
+        path: metadata.yaml file
+        prefix: Package name prefix
+        suffix: Package name suffix
+        origin: Repository origin the package is published to
+
+    Returns:
+        Catalog package
+
+    Raises:
+        CatalogError: If required fields are missing
+    """
+    metadata = load_yaml(path)
+    try:
+        return CatalogPackage(
+            name=compute_package_name(metadata["app_id"], prefix=prefix, suffix=suffix),
+            version=str(metadata["version"]),
+            section=metadata["debian_section"],
+            summary=metadata["description"],
+            display_name=metadata["name"],
+            tags=list(metadata.get("tags", [])),
+            origin=origin,
+        )
+    except KeyError as e:
+        raise CatalogError(f"{path}: missing field {e}") from e
+
+
+def package_from_control(control: str, origin: str | None = None) -> CatalogPackage:
+    """Read catalog fields from a control paragraph of a built package.
+
+    Args:
+        control: Control paragraph (as printed by dpkg-deb or in Packages)
+        origin: Repository origin
+
+    Returns:
+        Catalog package
+
+    Raises:
+        CatalogError: If Package or Version is missing
+    """
+    fields = parse_control(control)
+    if "Package" not in fields or "Version" not in fields:
+        raise CatalogError("control paragraph has no Package or Version field")
+
+    tags = []
+    display_name = fields["Package"]
+    for tag in fields.get("Tag", "").replace("\n", " ").split(","):
+        tag = tag.strip()
+        if tag.startswith(DISPLAY_NAME_TAG_PREFIX):
+            display_name = tag[len(DISPLAY_NAME_TAG_PREFIX) :]
+        elif tag:
+            tags.append(tag)
+
+    return CatalogPackage(
+        name=fields["Package"],
+        version=fields["Version"],
+        section=fields.get("Section", ""),
+        summary=fields.get("Description", "").split("\n", 1)[0],
+        display_name=display_name,
+        tags=tags,
+        origin=origin,
+    )
+
+
+def collect_packages(
+    sources: list[Path],
+    prefix: str | None = None,
+    suffix: str = "container",
+    origin: str | None = None,
+) -> list[CatalogPackage]:
+    """Read packages from app definitions, .deb files and repositories.
+
+    Each source is a metadata.yaml file, an app definition directory, a .deb
+    file or a directory of .deb files. Repository directories use the Origin
+    recorded by repo-index (or of their Release file) when no origin is given;
+    origin only applies to the catalog entries, never to the repository. When a package occurs more
+    than once, the highest version is kept.
+
+    Args:
+        sources: Package sources
+        prefix: Package name prefix for app definitions
+        suffix: Package name suffix for app definitions
+        origin: Repository origin of the packages
+
+    Returns:
+        Packages sorted by name
+
+    Raises:
+        CatalogError: If a source cannot be read
+        FileNotFoundError: If dpkg-deb is needed but not installed
+    """
+    packages: dict[str, CatalogPackage] = {}
+
+    def add(package: CatalogPackage) -> None:
+        current = packages.get(package.name)
+        if current is None or _version_newer(package.version, current.version):
+            packages[package.name] = package
+
+    for source in sources:
+        if source.is_file() and source.suffix == ".deb":
+            try:
+                add(package_from_control(read_control_fields(source), origin))
+            except (RepositoryError, CatalogError) as e:
+                raise CatalogError(f"{source}: {e}") from e
+        elif source.is_file():
+            add(package_from_metadata(source, prefix, suffix, origin))
+        elif (source / "metadata.yaml").is_file():
+            add(package_from_metadata(source / "metadata.yaml", prefix, suffix, origin))
+        elif source.is_dir():
+            index = RepositoryIndex(source)
+            try:
+                index.scan()
+            except RepositoryError as e:
+                raise CatalogError(str(e)) from e
+            repo_origin = (
+                origin or index.release_fields["Origin"] or _release_origin(source)
+            )
+            for entry in index.entries.values():
+                add(package_from_control(entry.stanza, repo_origin))
+        else:
+            raise CatalogError(f"Package source not found: {source}")
+
+    return sorted(packages.values(), key=lambda p: p.name)
+
+
+def _release_origin(repo_dir: Path) -> str | None:
+    """Read the Origin field of a repository's published Release file."""
+    try:
+        release = (repo_dir / "Release").read_text(encoding="utf-8")
+    except FileNotFoundError:
+        return None
+    return parse_control(release).get("Origin")
+
+
+def matches_filter(package: CatalogPackage, filters: StoreFilter) -> bool:
+    """Check a package against store filter criteria.
+
+    Criteria of one type are OR-ed, different types are AND-ed. Packages of
+    unknown origin are assumed to come from the store's repositories.
+
+    Args:
+        package: Package to check
+        filters: Store filter criteria
+
+    Returns:
+        True if the package belongs to the store
+    """
+    if package.origin is not None and package.origin not in filters.include_origins:
+        return False
+    if filters.include_sections and package.section not in filters.include_sections:
+        return False
+    if filters.include_tags and not set(package.tags) & set(filters.include_tags):
+        return False
+    if filters.include_packages and package.name not in filters.include_packages:
+        return False
+    return True
+
+
+def build_catalog_index(
+    store: StoreConfig, packages: list[CatalogPackage]
+) -> dict[str, object]:
+    """Build the catalog index of a store.
+
+    Posting lists hold positions in the "packages" list, in ascending order,
+    so that filters can be combined by intersecting sorted integer lists.
+
+    Args:
+        store: Validated store definition
+        packages: Candidate packages (sorted by name)
+
+    Returns:
+        JSON-serializable catalog index
+    """
+    selected = [p for p in packages if matches_filter(p, store.filters)]
+    sections: dict[str, list[int]] = {}
+    tags: dict[str, list[int]] = {}
+    for position, package in enumerate(selected):
+        sections.setdefault(package.section, []).append(position)
+        for tag in sorted(set(package.tags)):
+            tags.setdefault(tag, []).append(position)
+
+    categories = []
+    for category in store.category_metadata:
+        entry = category.model_dump(exclude_none=True)
+        entry["packages"] = tags.get(f"{CATEGORY_TAG_PREFIX}{category.id}", [])
+        categories.append(entry)
+
+    return {
+        "version": CATALOG_VERSION,
+        "store": store.model_dump(
+            include={"id", "name", "description", "icon", "banner"},
+            exclude_none=True,
+        ),
+        "packages": [asdict(p) for p in selected],
+        "sections": dict(sorted(sections.items())),
+        "tags": dict(sorted(tags.items())),
+        "categories": categories,
+    }
+
+
+def write_catalog_index(index: dict[str, object], path: Path) -> bool:
+    """Write a catalog index as compact JSON.
+
+    The file is replaced atomically and left untouched if its content would
+    not change, so HTTP caches and file watchers on the device see no update.
+
+    Args:
+        index: Catalog index
+        path: Output file
+
+    Returns:
+        True if the file was written
+    """
+    data = json.dumps(index, separators=(",", ":"), sort_keys=True).encode("utf-8")
+    try:
+        if path.read_bytes() == data:
+            return False
+    except FileNotFoundError:
+        pass
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+    return True
+
+
+def _version_newer(version: str, other: str) -> bool:
+    """Return whether version is greater than other (Debian ordering)."""
+    if version == other:
+        return False
+    try:
+        result = subprocess.run(
+            ["dpkg", "--compare-versions", version, "gt", other],
+            capture_output=True,
+            check=False,
+        )
+    except FileNotFoundError:
+        logger.warning(f"dpkg not found, keeping first of versions {other}, {version}")
+        return False
+    return result.returncode == 0
+
+
+def store_index_command(args: argparse.Namespace) -> int:
+    """Execute store-index subcommand.
+
+    Args:
+        args: Parsed store-index arguments
+
+    Returns:
+        Exit code
+    """
+    from generate_container_packages.cli import (
+        EXIT_DEPENDENCY_ERROR,
+        EXIT_SUCCESS,
+        EXIT_VALIDATION_ERROR,
+    )
+
+    try:
+        store = validate_store(Path(args.store))
+    except FileNotFoundError:
+        print(f"ERROR: Store definition not found: {args.store}", file=sys.stderr)
+        return EXIT_VALIDATION_ERROR
+    except (ValidationError, yaml.YAMLError) as e:
+        print(f"ERROR: Invalid store definition {args.store}:\n{e}", file=sys.stderr)
+        return EXIT_VALIDATION_ERROR
+
+    try:
+        packages = collect_packages(
+            [Path(source) for source in args.sources],
+            prefix=args.prefix,
+            suffix=args.suffix,
+            origin=args.origin,
+        )
+    except CatalogError as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return EXIT_VALIDATION_ERROR
+    except FileNotFoundError as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return EXIT_DEPENDENCY_ERROR
+
+    index = build_catalog_index(store, packages)
+    output = Path(args.output or f"{store.id}.catalog.json")
+    written = write_catalog_index(index, output)
+    state = "written" if written else "unchanged"
+    print(
+        f"Catalog index {state}: {output} "
+        f"({len(index['packages'])} of {len(packages)} packages)"
+    )
+    return EXIT_SUCCESS
+
+
+def create_store_index_argument_parser() -> argparse.ArgumentParser:
+    """Create argument parser for the store-index subcommand.
+
+    Returns:
+        Configured ArgumentParser instance
+    """
+    parser = argparse.ArgumentParser(
+        prog="generate-container-packages store-index",
+        description=(
+            "Build a precomputed catalog index (package list and section, tag "
+            "and category posting lists) for a container store"
+        ),
+    )
+    parser.add_argument("store", metavar="STORE", help="Store definition YAML file")
+    parser.add_argument(
+        "sources",
+        metavar="SOURCE",
+        nargs="+",
+        help=(
+            "App definition directory, metadata.yaml, .deb file or directory "
+            "of .deb files"
+        ),
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        metavar="FILE",
+        help="Output file (default: <store-id>.catalog.json)",
+    )
+    parser.add_argument(
+        "--origin",
+        metavar="TEXT",
+        help=(
+            "Origin of the packages in the catalog (default: the repository's "
+            "Origin; unknown origins match the store). Repositories are not modified"
+        ),
+    )
+    parser.add_argument(
+        "--prefix", help="Package name prefix for app definitions (e.g., 'marine')"
+    )
+    parser.add_argument(
+        "--suffix",
+        default="container",
+        help="Package name suffix for app definitions (default: 'container')",
+    )
+
+    verbosity = parser.add_mutually_exclusive_group()
+    verbosity.add_argument(
+        "-v", "--verbose", action="store_true", help="Verbose output"
+    )
+    verbosity.add_argument("--debug", action="store_true", help="Debug output")
+    verbosity.add_argument("-q", "--quiet", action="store_true", help="Errors only")
+    return parser
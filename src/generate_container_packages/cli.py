@@ -13,10 +13,19 @@ from jinja2 import TemplateError
 from pydantic import ValidationError
 
 from generate_container_packages import __version__
-from generate_container_packages.builder import BuildError, build_package
-from generate_container_packages.loader import load_input_files
+from generate_container_packages.builder import (
+    BuildError,
+    CompressionProfile,
+    build_package,
+    format_size,
+    package_digest,
+    package_sizes,
+    resolve_compression,
+)
+from generate_container_packages.loader import AppDefinition, load_input_files
 from generate_container_packages.renderer import render_all_templates
 from generate_container_packages.template_context import VolumeOwnershipError
+from generate_container_packages.timing import phase, recorder
 from generate_container_packages.validator import validate_input_directory
 
 if TYPE_CHECKING:
@@ -44,6 +53,7 @@ try:
     from generate_container_packages.converters.casaos.models import ConversionContext
     from generate_container_packages.converters.casaos.output import OutputWriter
     from generate_container_packages.converters.casaos.parser import CasaOSParser
+    from generate_container_packages.converters.casaos.source import SourceDocument
     from generate_container_packages.converters.casaos.transformer import (
         MetadataTransformer,
     )
@@ -213,6 +223,7 @@ def _convert_single(
     parser: "CasaOSParser",
     transformer: "MetadataTransformer",
     args: argparse.Namespace,
+    document: "SourceDocument | None" = None,
 ) -> int:
     """Convert a single CasaOS app.
 
@@ -222,6 +233,7 @@ def _convert_single(
         parser: CasaOS parser instance
         transformer: Metadata transformer instance
         args: Command-line arguments
+        document: Compose file already read (and hashed) by the caller
 
     Returns:
         Exit code
@@ -245,8 +257,10 @@ def _convert_single(
 
         logger.info(f"Converting {compose_file}...")
 
-        # Parse CasaOS app
-        casaos_app = parser.parse_from_file(compose_file)
+        # Parse CasaOS app, reading and hashing the compose file only once
+        if document is None or document.path != compose_file:
+            document = SourceDocument.read(compose_file)
+        casaos_app = parser.parse_document(document)
 
         # Create conversion context
         context = ConversionContext(
@@ -261,8 +275,8 @@ def _convert_single(
         transformed = transformer.transform(
             casaos_app,
             context,
-            source_file_path=compose_file,
             source_url=args.upstream_url if hasattr(args, "upstream_url") else None,
+            source=document,
         )
 
         # Enrich metadata with required fields that CasaOS doesn't provide
@@ -378,6 +392,12 @@ def _convert_batch(
         print(f"ERROR: {e}", file=sys.stderr)
         return EXIT_VALIDATION_ERROR
 
+    max_pending = getattr(args, "max_pending", None)
+    if max_pending is not None and max_pending <= 0:
+        logger.error("Invalid --max-pending value")
+        print("ERROR: --max-pending must be positive", file=sys.stderr)
+        return EXIT_VALIDATION_ERROR
+
     # Determine mappings directory
     if hasattr(args, "mappings_dir") and args.mappings_dir:
         mappings_dir = Path(args.mappings_dir)
@@ -403,6 +423,8 @@ def _convert_batch(
         mappings_dir=mappings_dir,
         upstream_url=args.upstream_url if hasattr(args, "upstream_url") else None,
         progress_callback=progress_callback if not args.quiet else None,
+        max_pending=max_pending,
+        report_path=Path(args.report) if getattr(args, "report", None) else None,
     )
 
     # Print summary
@@ -413,6 +435,10 @@ def _convert_batch(
         print(f"  Success: {result.success_count}")
         print(f"  Failed: {result.failure_count}")
         print(f"  Total: {result.total}")
+        print(f"  Files written: {result.files_written}")
+        print(f"  Files unchanged: {result.files_unchanged}")
+        if result.report_path:
+            print(f"  Report: {result.report_path}")
 
     # Show errors if any
     if result.errors and not args.quiet:
@@ -499,7 +525,17 @@ def _convert_sync(
             print(f"[{i}/{len(apps_to_convert)}] {app_dir.name}...", end=" ")
 
         try:
-            result = _convert_single(app_dir, converted_dir, parser, transformer, args)
+            upstream = detector.upstream_apps.get(app_dir.name)
+            document = upstream.document if upstream else None
+            detector.release_document(app_dir.name)
+            result = _convert_single(
+                app_dir,
+                converted_dir,
+                parser,
+                transformer,
+                args,
+                document=document,
+            )
             if result == EXIT_SUCCESS:
                 success_count += 1
                 if not args.quiet:
@@ -535,7 +571,109 @@ def main() -> int:
         # Skip 'convert-casaos' from sys.argv when parsing
         args = parser.parse_args(sys.argv[2:])
         setup_logging(args)
-        return convert_casaos_command(args)
+        start_timing(args)
+        try:
+            return convert_casaos_command(args)
+        finally:
+            report_timing(args)
+
+    # Build daemon serving validate/render/build/convert jobs
+    if len(sys.argv) > 1 and sys.argv[1] == "serve":
+        from generate_container_packages.server import (
+            create_serve_argument_parser,
+            serve_command,
+        )
+
+        args = create_serve_argument_parser().parse_args(sys.argv[2:])
+        setup_logging(args)
+        return serve_command(args)
+
+    # Incremental APT repository index for a directory of built packages
+    if len(sys.argv) > 1 and sys.argv[1] == "repo-index":
+        from generate_container_packages.repository import (
+            create_repo_index_argument_parser,
+            repo_index_command,
+        )
+
+        args = create_repo_index_argument_parser().parse_args(sys.argv[2:])
+        setup_logging(args)
+        return repo_index_command(args)
+
+    # Precomputed catalog index for a container store
+    if len(sys.argv) > 1 and sys.argv[1] == "store-index":
+        from generate_container_packages.catalog import (
+            create_store_index_argument_parser,
+            store_index_command,
+        )
+
+        args = create_store_index_argument_parser().parse_args(sys.argv[2:])
+        setup_logging(args)
+        return store_index_command(args)
+
+    # Aggregated AppStream collection for a set of app definitions
+    if len(sys.argv) > 1 and sys.argv[1] == "appstream-catalog":
+        from generate_container_packages.appstream import (
+            appstream_catalog_command,
+            create_appstream_catalog_argument_parser,
+        )
+
+        args = create_appstream_catalog_argument_parser().parse_args(sys.argv[2:])
+        setup_logging(args)
+        return appstream_catalog_command(args)
+
+    # Compiled index of the routing and webapp registry directories
+    if len(sys.argv) > 1 and sys.argv[1] == "registry-index":
+        from generate_container_packages.registry_index import (
+            create_registry_index_argument_parser,
+            registry_index_command,
+        )
+
+        args = create_registry_index_argument_parser().parse_args(sys.argv[2:])
+        setup_logging(args)
+        return registry_index_command(args)
+
+    # Dependency-ordered build of many apps
+    if len(sys.argv) > 1 and sys.argv[1] == "build-all":
+        from generate_container_packages.multibuild import (
+            build_all_command,
+            create_build_all_argument_parser,
+        )
+
+        args = create_build_all_argument_parser().parse_args(sys.argv[2:])
+        setup_logging(args)
+        return build_all_command(args)
+
+    # Bulk validation of many app definitions in one process
+    if len(sys.argv) > 1 and sys.argv[1] == "validate-all":
+        from generate_container_packages.bulkvalidate import (
+            create_validate_all_argument_parser,
+            validate_all_command,
+        )
+
+        args = create_validate_all_argument_parser().parse_args(sys.argv[2:])
+        setup_logging(args)
+        return validate_all_command(args)
+
+    # Diff of the staged package trees of two input revisions or tool versions
+    if len(sys.argv) > 1 and sys.argv[1] == "diff":
+        from generate_container_packages.builddiff import (
+            create_diff_argument_parser,
+            diff_command,
+        )
+
+        args = create_diff_argument_parser().parse_args(sys.argv[2:])
+        setup_logging(args)
+        return diff_command(args)
+
+    # Staged package tree as JSON, run by diff --from-tool/--to-tool
+    if len(sys.argv) > 1 and sys.argv[1] == "stage-dump":
+        from generate_container_packages.builddiff import (
+            create_stage_dump_argument_parser,
+            stage_dump_command,
+        )
+
+        args = create_stage_dump_argument_parser().parse_args(sys.argv[2:])
+        return stage_dump_command(args)
 
     # Default behavior: build package (backward compatibility)
     parser = create_build_argument_parser()
@@ -543,6 +681,7 @@ def main() -> int:
 
     # Configure logging based on verbosity
     setup_logging(args)
+    start_timing(args)
 
     try:
         # Convert input_dir to Path
@@ -556,9 +695,22 @@ def main() -> int:
             logger.error(f"Input path is not a directory: {input_dir}")
             return EXIT_VALIDATION_ERROR
 
+        try:
+            compression = compression_from_args(args)
+        except ValueError as e:
+            logger.error(f"Invalid compression options: {e}")
+            return EXIT_VALIDATION_ERROR
+
+        if args.watch:
+            return watch_command(args, input_dir, compression)
+
+        if args.plan:
+            return plan_command(args, input_dir)
+
         # Step 1: Validate input files
         logger.info(f"Validating input directory: {input_dir}")
-        validation_result = validate_input_directory(input_dir)
+        with phase("validate"):
+            validation_result = validate_input_directory(input_dir)
 
         if not validation_result.success:
             logger.error("Validation failed.")
@@ -585,15 +737,29 @@ def main() -> int:
 
         # Step 2: Load input files
         logger.info("Loading input files...")
-        app_def = load_input_files(input_dir, prefix=args.prefix, suffix=args.suffix)
+        with phase("load"):
+            app_def = load_input_files(
+                input_dir,
+                prefix=args.prefix,
+                suffix=args.suffix,
+                validation=validation_result,
+                reproducible=args.reproducible,
+            )
         logger.info("✓ Files loaded")
 
+        try:
+            compression = resolve_compression(app_def.metadata, compression)
+        except ValueError as e:
+            logger.error(f"Invalid compression options: {e}")
+            return EXIT_VALIDATION_ERROR
+
         # Step 3: Render templates
         logger.info("Rendering templates...")
         rendered_dir = Path(tempfile.mkdtemp(prefix="render-"))
 
         try:
-            render_all_templates(app_def, rendered_dir)
+            with phase("render"):
+                render_all_templates(app_def, rendered_dir)
             logger.info("✓ Templates rendered")
 
             # Check build dependencies before building
@@ -602,10 +768,18 @@ def main() -> int:
             # Step 4: Build package
             output_dir = Path(args.output).resolve()
             logger.info(f"Building package (output: {output_dir})...")
-            deb_file = build_package(
-                app_def, rendered_dir, output_dir, keep_temp=args.keep_temp
-            )
+            with phase("build"):
+                deb_file = build_package(
+                    app_def,
+                    rendered_dir,
+                    output_dir,
+                    keep_temp=args.keep_temp,
+                    compression=compression,
+                )
             logger.info(f"✓ Package built successfully: {deb_file}")
+            digest = package_digest(deb_file)
+            if args.record_state:
+                _record_build(args, input_dir, output_dir, app_def, deb_file, digest)
 
             # Success message
             pkg_name = app_def.metadata["package_name"]
@@ -613,6 +787,49 @@ def main() -> int:
             print(f"  Package: {pkg_name}")
             print(f"  Version: {app_def.metadata['version']}")
             print(f"  Output: {output_dir}")
+            print(f"  Digest: {digest}")
+            size, installed = package_sizes(deb_file)
+            print(f"  Compression: {compression}")
+            print(
+                f"  Size: {format_size(size)}"
+                + (f" (installed: {format_size(installed)})" if installed else "")
+            )
+
+            if args.update_index:
+                from generate_container_packages.repository import (
+                    RepositoryError,
+                    RepositoryIndex,
+                    print_index_update,
+                )
+
+                try:
+                    with phase("index"):
+                        result = RepositoryIndex(output_dir).update()
+                except RepositoryError as e:
+                    raise BuildError(f"Repository index update failed: {e}") from e
+                print_index_update(result, output_dir)
+
+            if args.appstream_catalog:
+                from generate_container_packages.appstream import (
+                    AppStreamCatalog,
+                    AppStreamError,
+                )
+
+                catalog = AppStreamCatalog(
+                    Path(args.appstream_catalog).resolve(), origin=args.appstream_origin
+                )
+                metainfo = rendered_dir / "debian" / f"{pkg_name}.metainfo.xml"
+                try:
+                    with phase("appstream"):
+                        catalog.add(
+                            pkg_name,
+                            metainfo.read_text(encoding="utf-8"),
+                            app_def.icon_path,
+                        )
+                        catalog.write()
+                except AppStreamError as e:
+                    raise BuildError(f"AppStream catalog update failed: {e}") from e
+                print(f"  AppStream catalog: {catalog.catalog_dir}")
 
             return EXIT_SUCCESS
         finally:
@@ -675,6 +892,9 @@ def main() -> int:
             traceback.print_exc()
         return EXIT_BUILD_ERROR
 
+    finally:
+        report_timing(args)
+
 
 def create_build_argument_parser() -> argparse.ArgumentParser:
     """Create argument parser for default build command (backward compatibility).
@@ -741,11 +961,77 @@ def create_build_argument_parser() -> argparse.ArgumentParser:
             "Also applies to @ dependency references in metadata."
         ),
     )
+    parser.add_argument(
+        "--reproducible",
+        action="store_true",
+        help=(
+            "Reproducible build: take the build date from SOURCE_DATE_EPOCH, "
+            "the last git commit of INPUT_DIR or the newest input file, and "
+            "normalize file timestamps so identical inputs yield identical .debs"
+        ),
+    )
     parser.add_argument(
         "--keep-temp",
         action="store_true",
         help="Keep temporary build directory (useful for debugging)",
     )
+    parser.add_argument(
+        "--update-index",
+        action="store_true",
+        help=(
+            "After building, incrementally update the APT repository index "
+            "(Packages, Packages.gz, Release) in the output directory"
+        ),
+    )
+    parser.add_argument(
+        "--appstream-catalog",
+        metavar="DIR",
+        help=(
+            "After building, add the app to the aggregated AppStream collection "
+            "and cached icon tarballs in DIR"
+        ),
+    )
+    parser.add_argument(
+        "--appstream-origin",
+        metavar="NAME",
+        default="container-apps",
+        help="Origin of the AppStream collection (default: container-apps)",
+    )
+
+    parser.add_argument(
+        "--plan",
+        action="store_true",
+        help=(
+            "Only report whether a build would change the package (and which "
+            "files) compared to the last build in the output directory"
+        ),
+    )
+    parser.add_argument(
+        "--record-state",
+        action="store_true",
+        help=(
+            "Record the build in the output directory's .build-state.json "
+            "for --plan and build-all --changed-only"
+        ),
+    )
+
+    # Watch options
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help=(
+            "Keep running and rebuild incrementally whenever input files change "
+            "(combine with --validate to only re-validate)"
+        ),
+    )
+    parser.add_argument(
+        "--poll",
+        action="store_true",
+        help="With --watch, poll for changes instead of using inotify",
+    )
+
+    add_compression_arguments(parser)
+    add_timing_arguments(parser)
 
     # Version
     parser.add_argument(
@@ -755,6 +1041,95 @@ def create_build_argument_parser() -> argparse.ArgumentParser:
     return parser
 
 
+def plan_command(args: argparse.Namespace, input_dir: Path) -> int:
+    """Execute --plan for a single app.
+
+    Args:
+        args: Parsed command-line arguments
+        input_dir: Resolved input directory
+
+    Returns:
+        Exit code (validation error if the app cannot be staged)
+    """
+    from generate_container_packages.multibuild import load_build_state
+    from generate_container_packages.plan import format_plan, plan_apps
+
+    plans = plan_apps(
+        [input_dir],
+        load_build_state(Path(args.output).resolve()),
+        prefix=args.prefix,
+        suffix=args.suffix,
+    )
+    sys.stdout.write(format_plan(plans))
+    if plans[0].status == "invalid":
+        return EXIT_VALIDATION_ERROR
+    return EXIT_SUCCESS
+
+
+def _record_build(
+    args: argparse.Namespace,
+    input_dir: Path,
+    output_dir: Path,
+    app_def: AppDefinition,
+    deb_file: Path,
+    digest: str,
+) -> None:
+    """Record a successful build in the output directory's build state.
+
+    The staged files are digested from the already loaded app, whose build
+    date is pinned for that (see plan.stage_definition()).
+    """
+    from generate_container_packages.multibuild import input_digest, save_build_record
+    from generate_container_packages.plan import stage_definition, staged_digests
+
+    record = {
+        "inputs": input_digest(input_dir, args.prefix, args.suffix),
+        "deb_file": str(deb_file),
+        "digest": digest,
+        "files": staged_digests(stage_definition(app_def)),
+    }
+    save_build_record(output_dir, app_def.metadata["app_id"], record)
+
+
+def watch_command(
+    args: argparse.Namespace,
+    input_dir: Path,
+    compression: CompressionProfile | None = None,
+) -> int:
+    """Execute watch mode for the build command.
+
+    Args:
+        args: Parsed command-line arguments
+        input_dir: Resolved input directory
+        compression: Per-build compression profile from the command line
+
+    Returns:
+        Exit code (only returned once interrupted)
+    """
+    from generate_container_packages.watch import IncrementalBuilder, watch
+
+    if not args.validate:
+        check_dependencies()
+
+    builder = IncrementalBuilder(
+        input_dir,
+        Path(args.output).resolve(),
+        prefix=args.prefix,
+        suffix=args.suffix,
+        validate_only=args.validate,
+        keep_temp=args.keep_temp,
+        reproducible=args.reproducible,
+        compression=compression,
+    )
+
+    print(f"Watching {input_dir} for changes (Ctrl+C to stop)...")
+    try:
+        watch(builder, poll=args.poll)
+    except KeyboardInterrupt:
+        print("\nStopped watching", file=sys.stderr)
+    return EXIT_SUCCESS
+
+
 def create_argument_parser() -> argparse.ArgumentParser:
     """Create argument parser for convert-casaos subcommand.
 
@@ -817,6 +1192,21 @@ def create_argument_parser() -> argparse.ArgumentParser:
         help="Number of parallel workers for batch conversion (default: CPU count)",
     )
 
+    parser.add_argument(
+        "--max-pending",
+        type=int,
+        metavar="N",
+        help="Maximum apps queued or in progress at once in batch mode "
+        "(default: 2 x workers)",
+    )
+
+    parser.add_argument(
+        "--report",
+        metavar="FILE",
+        help="Stream per-app batch results to a JSON Lines file instead of "
+        "keeping them in memory",
+    )
+
     # Verbosity options
     verbosity = parser.add_mutually_exclusive_group()
     verbosity.add_argument(
@@ -832,6 +1222,8 @@ def create_argument_parser() -> argparse.ArgumentParser:
         "-q", "--quiet", action="store_true", help="Quiet mode (errors only)"
     )
 
+    add_timing_arguments(parser)
+
     # Version
     parser.add_argument(
         "--version", action="version", version=f"%(prog)s {__version__}"
@@ -840,6 +1232,109 @@ def create_argument_parser() -> argparse.ArgumentParser:
     return parser
 
 
+def add_timing_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add --timings/--profile options to a parser.
+
+    Args:
+        parser: Parser to extend
+    """
+    parser.add_argument(
+        "--timings",
+        action="store_true",
+        help="Print wall and CPU time per phase when done",
+    )
+    parser.add_argument(
+        "--profile",
+        metavar="FILE",
+        help="Write per-phase timings to FILE (Chrome trace by default)",
+    )
+    parser.add_argument(
+        "--profile-format",
+        choices=["chrome", "json"],
+        default="chrome",
+        help="Format of the --profile file (default: chrome)",
+    )
+
+
+def add_compression_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add --compression* options to a parser.
+
+    Args:
+        parser: Parser to extend
+    """
+    parser.add_argument(
+        "--compression",
+        choices=["xz", "zstd", "gzip", "none"],
+        help=(
+            "Package compressor, overriding the app's compression field "
+            "(default: the app's setting, else dpkg-deb's default)"
+        ),
+    )
+    parser.add_argument(
+        "--compression-level",
+        type=int,
+        metavar="N",
+        help="Compression level (xz: 0-9, zstd: 1-22, gzip: 1-9)",
+    )
+    parser.add_argument(
+        "--compression-threads",
+        type=int,
+        metavar="N",
+        help="Maximum compressor threads (0: one per CPU)",
+    )
+
+
+def compression_from_args(args: argparse.Namespace) -> CompressionProfile | None:
+    """Create the per-build compression profile from command-line options.
+
+    Args:
+        args: Parsed arguments (see add_compression_arguments())
+
+    Returns:
+        Profile, or None if no compression option was given
+
+    Raises:
+        ValueError: If the options are invalid
+    """
+    if (
+        args.compression is None
+        and args.compression_level is None
+        and args.compression_threads is None
+    ):
+        return None
+    return CompressionProfile(
+        type=args.compression,
+        level=args.compression_level,
+        threads=args.compression_threads,
+    )
+
+
+def start_timing(args: argparse.Namespace) -> None:
+    """Enable phase timing if requested on the command line.
+
+    Args:
+        args: Parsed command-line arguments
+    """
+    if args.timings or args.profile:
+        recorder.enable()
+
+
+def report_timing(args: argparse.Namespace) -> None:
+    """Print and/or write recorded phase timings.
+
+    Args:
+        args: Parsed command-line arguments
+    """
+    if not recorder.enabled:
+        return
+    recorder.disable()
+    if args.timings:
+        recorder.print_table(sys.stderr)
+    if args.profile:
+        recorder.write(Path(args.profile), format=args.profile_format)
+        logger.info(f"Timings written to {args.profile}")
+
+
 def setup_logging(args: argparse.Namespace) -> None:
     """Configure logging based on command-line arguments.
 
@@ -0,0 +1,228 @@
+"""Thin client for the generate-container-packages build daemon.
+
+This module deliberately imports only the standard library so that a client
+invocation does not pay for importing pydantic, jinja2 and yaml; all work is
+done by a warm `generate-container-packages serve` process.
+"""
+
+import argparse
+import http.client
+import json
+import os
+import socket
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any
+
+# Exit codes (mirrors cli.py, which is not imported to keep the client light)
+EXIT_SUCCESS = 0
+EXIT_VALIDATION_ERROR = 1
+EXIT_BUILD_ERROR = 3
+EXIT_DEPENDENCY_ERROR = 4
+
+JOB_TYPES = ("validate", "render", "build", "convert")
+
+
+def default_socket_path() -> Path:
+    """Return the default Unix socket path of the build daemon.
+
+    Returns:
+        $XDG_RUNTIME_DIR/generate-container-packages.sock if XDG_RUNTIME_DIR
+        is set, otherwise a per-user path in the temporary directory
+    """
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        return Path(runtime_dir) / "generate-container-packages.sock"
+    return (
+        Path(tempfile.gettempdir()) / f"generate-container-packages-{os.getuid()}.sock"
+    )
+
+
+def default_token_path() -> Path:
+    """Return the default path of the HTTP API token of the build daemon.
+
+    Returns:
+        Path next to default_socket_path(), with a .token suffix
+    """
+    return default_socket_path().with_suffix(".token")
+
+
+def read_token(token_path: Path | None = None) -> str | None:
+    """Read the HTTP API token written by the daemon.
+
+    Args:
+        token_path: Token file (default: default_token_path())
+
+    Returns:
+        Token, or None if the file does not exist
+    """
+    try:
+        return (token_path or default_token_path()).read_text().strip()
+    except FileNotFoundError:
+        return None
+
+
+def send_job(
+    job: dict[str, Any],
+    socket_path: Path | None = None,
+    port: int | None = None,
+    timeout: float | None = None,
+    token: str | None = None,
+) -> dict[str, Any]:
+    """Send one job to the daemon and wait for its result.
+
+    Args:
+        job: Job request (see server.run_job for the format)
+        socket_path: Unix socket of the daemon (default: default_socket_path())
+        port: Use the localhost HTTP API on this port instead of the socket
+        timeout: Socket timeout in seconds (None waits indefinitely)
+        token: HTTP API token (default: read from default_token_path())
+
+    Returns:
+        Job result dictionary
+
+    Raises:
+        OSError: If the daemon cannot be reached
+        ValueError: If the daemon sends an invalid response
+    """
+    payload = json.dumps(job).encode("utf-8")
+
+    if port is not None:
+        headers = {"Content-Type": "application/json"}
+        token = token or read_token()
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=timeout)
+        try:
+            conn.request("POST", "/jobs", body=payload, headers=headers)
+            body = conn.getresponse().read()
+        finally:
+            conn.close()
+    else:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(str(socket_path or default_socket_path()))
+            sock.sendall(payload + b"\n")
+            with sock.makefile("rb") as stream:
+                body = stream.readline()
+
+    try:
+        result = json.loads(body)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Invalid response from daemon: {e}") from e
+    if not isinstance(result, dict):
+        raise ValueError("Invalid response from daemon: expected a JSON object")
+    return result
+
+
+def build_job(args: argparse.Namespace) -> dict[str, Any]:
+    """Build a job request from parsed client arguments.
+
+    Paths are resolved here because the daemon may run in another directory.
+
+    Args:
+        args: Parsed client arguments
+
+    Returns:
+        Job request dictionary
+    """
+    job: dict[str, Any] = {"type": args.job}
+    if args.job == "convert":
+        job["source"] = str(Path(args.input).resolve())
+        job["batch"] = args.batch
+        job["download_assets"] = args.download_assets
+    else:
+        job["input_dir"] = str(Path(args.input).resolve())
+        job["prefix"] = args.prefix
+        job["suffix"] = args.suffix
+    if args.output is not None:
+        job["output_dir"] = str(Path(args.output).resolve())
+    return job
+
+
+def create_client_argument_parser() -> argparse.ArgumentParser:
+    """Create argument parser for the client subcommand.
+
+    Returns:
+        Configured ArgumentParser instance
+    """
+    parser = argparse.ArgumentParser(
+        prog="generate-container-packages client",
+        description="Submit a job to a running generate-container-packages daemon",
+    )
+    parser.add_argument("job", choices=JOB_TYPES, help="Job type")
+    parser.add_argument(
+        "input",
+        metavar="INPUT",
+        help="App input directory (or CasaOS source for convert)",
+    )
+    parser.add_argument("-o", "--output", metavar="DIR", help="Output directory")
+    parser.add_argument("--prefix", metavar="PREFIX", help="Package name prefix")
+    parser.add_argument(
+        "--suffix", metavar="SUFFIX", default="container", help="Package name suffix"
+    )
+    parser.add_argument(
+        "--batch", action="store_true", help="Batch mode for convert jobs"
+    )
+    parser.add_argument(
+        "--download-assets",
+        action="store_true",
+        help="Download icons and screenshots for convert jobs",
+    )
+
+    transport = parser.add_mutually_exclusive_group()
+    transport.add_argument(
+        "--socket", metavar="PATH", help="Daemon Unix socket (default: per-user path)"
+    )
+    transport.add_argument(
+        "--port", type=int, metavar="PORT", help="Use the localhost HTTP API on PORT"
+    )
+    parser.add_argument(
+        "--token-file",
+        metavar="PATH",
+        help=f"HTTP API token file (default: {default_token_path()})",
+    )
+    parser.add_argument("--json", action="store_true", help="Print the raw JSON result")
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Client entry point.
+
+    Args:
+        argv: Arguments after the 'client' subcommand
+
+    Returns:
+        Exit code reported by the daemon, or 4 if it cannot be reached
+    """
+    args = create_client_argument_parser().parse_args(argv)
+
+    try:
+        result = send_job(
+            build_job(args),
+            socket_path=Path(args.socket) if args.socket else None,
+            port=args.port,
+            token=read_token(Path(args.token_file)) if args.token_file else None,
+        )
+    except (OSError, ValueError) as e:
+        print(f"ERROR: Cannot reach build daemon: {e}", file=sys.stderr)
+        return EXIT_DEPENDENCY_ERROR
+
+    exit_code = int(result.get("exit_code", EXIT_BUILD_ERROR))
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return exit_code
+
+    for warning in result.get("warnings", []):
+        print(f"  (warning) {warning}", file=sys.stderr)
+    if exit_code != EXIT_SUCCESS:
+        print(f"\nERROR: {result.get('error', 'Job failed')}\n", file=sys.stderr)
+        for error in result.get("errors", []):
+            print(f"  - {error}", file=sys.stderr)
+    elif result.get("deb_file"):
+        print(f"Success! Package generated: {Path(result['deb_file']).name}")
+    else:
+        print(f"{args.job.capitalize()} successful!")
+    return exit_code
@@ -11,6 +11,7 @@ from generate_container_packages.converters.casaos.models import (
 )
 from generate_container_packages.converters.casaos.output import OutputWriter
 from generate_container_packages.converters.casaos.parser import CasaOSParser
+from generate_container_packages.converters.casaos.source import SourceDocument
 from generate_container_packages.converters.casaos.transformer import (
     MetadataTransformer,
 )
@@ -29,6 +30,7 @@ __all__ = [
     "ConversionContext",
     "OutputWriter",
     "CasaOSParser",
+    "SourceDocument",
     "MetadataTransformer",
     "CasaOSUpdateDetector",
     "UpdateReport",
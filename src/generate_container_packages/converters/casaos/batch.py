@@ -4,13 +4,17 @@ Provides BatchConverter for converting multiple CasaOS applications
 in parallel with configurable worker limits and progress tracking.
 """
 
+import json
 import logging
 import os
 import time
 from collections.abc import Callable
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from dataclasses import dataclass, field
 from pathlib import Path
+from typing import TextIO
+
+from generate_container_packages.timing import phase
 
 from ..exceptions import ConversionError
 from .assets import AssetManager
@@ -24,6 +28,7 @@ from .constants import (
 from .models import ConversionContext
 from .output import OutputWriter
 from .parser import CasaOSParser
+from .source import SourceDocument
 from .transformer import MetadataTransformer
 
 logger = logging.getLogger(__name__)
@@ -40,11 +45,19 @@ class ConversionJob:
     total: int  # Total number of apps in batch
     error: str | None = None
     warnings: list[str] = field(default_factory=list)
+    files_written: int = 0
+    files_unchanged: int = 0
 
 
 @dataclass
 class BatchResult:
-    """Results from a batch conversion operation."""
+    """Results from a batch conversion operation.
+
+    When a report file is used, errors and warnings are streamed to it and
+    the errors/warnings lists stay empty; warning_count is always set.
+    files_written/files_unchanged count output files that were rewritten
+    or left untouched because their content did not change.
+    """
 
     total: int
     success_count: int
@@ -52,6 +65,10 @@ class BatchResult:
     errors: list[tuple[str, str]]  # [(app_id, error_message), ...]
     warnings: list[tuple[str, str]]  # [(app_id, warning_message), ...]
     elapsed_seconds: float
+    warning_count: int = 0
+    report_path: Path | None = None
+    files_written: int = 0
+    files_unchanged: int = 0
 
 
 class BatchConverter:
@@ -130,9 +147,16 @@ class BatchConverter:
         mappings_dir: Path | None = None,
         upstream_url: str | None = None,
         progress_callback: Callable[[ConversionJob], None] | None = None,
+        max_pending: int | None = None,
+        report_path: Path | None = None,
     ) -> BatchResult:
         """Convert multiple CasaOS apps in parallel.
 
+        At most max_pending jobs are queued or running at any time, so the
+        memory held by in-flight jobs does not grow with the catalog size.
+        With report_path, per-app results are streamed to a JSON Lines file
+        instead of being accumulated in the returned BatchResult.
+
         Args:
             source_dir: Directory containing app subdirectories
             output_dir: Output directory for converted apps
@@ -140,6 +164,8 @@ class BatchConverter:
             mappings_dir: Custom mappings directory (optional)
             upstream_url: Upstream repository URL for source tracking
             progress_callback: Optional callback for progress updates
+            max_pending: Submission window size (default: 2 x max_workers)
+            report_path: JSON Lines file receiving one record per app
 
         Returns:
             BatchResult with conversion statistics and errors
@@ -174,73 +200,93 @@ class BatchConverter:
         if mappings_dir is None:
             mappings_dir = get_default_mappings_dir()
 
+        # One transformer for the whole batch, so its field type and path
+        # memos are shared by all apps (memoized values do not depend on
+        # the app being converted)
+        transformer = MetadataTransformer(mappings_dir)
+
         # Create output directory
         output_dir = Path(output_dir)
         output_dir.mkdir(parents=True, exist_ok=True)
 
-        # Prepare jobs
-        jobs = []
-        for i, app_dir in enumerate(app_dirs, 1):
-            job = ConversionJob(
-                app_dir=app_dir,
-                app_id=app_dir.name,  # Will be updated after parsing
-                status="pending",
-                index=i,
-                total=total,
-            )
-            jobs.append(job)
+        if max_pending is not None and max_pending <= 0:
+            raise ValueError("max_pending must be positive")
+        window = max_pending or self.max_workers * 2
 
         # Convert apps in parallel
         success_count = 0
         failure_count = 0
-        errors = []
-        warnings = []
-
-        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            # Submit all jobs
-            future_to_job = {}
-            for job in jobs:
-                future = executor.submit(
-                    self._convert_single_app,
-                    job,
-                    output_dir,
-                    download_assets,
-                    mappings_dir,
-                    upstream_url,
-                )
-                future_to_job[future] = job
+        warning_count = 0
+        files_written = 0
+        files_unchanged = 0
+        errors: list[tuple[str, str]] = []
+        warnings: list[tuple[str, str]] = []
+
+        report: TextIO | None = None
+        if report_path is not None:
+            report_path = Path(report_path)
+            report_path.parent.mkdir(parents=True, exist_ok=True)
+            report = open(report_path, "w", encoding="utf-8")  # noqa: SIM115
 
-            # Collect results as they complete
-            for future in as_completed(future_to_job):
-                job = future_to_job[future]
-
-                try:
-                    result = future.result()
-                    if result["success"]:
-                        job.status = "success"
-                        success_count += 1
-                    else:
-                        job.status = "failed"
-                        failure_count += 1
-                        errors.append((job.app_id, result["error"]))
-
-                    # Collect warnings
-                    for warning in result.get("warnings", []):
-                        warnings.append((job.app_id, warning))
-                        job.warnings.append(warning)
-
-                    if result.get("error"):
-                        job.error = result["error"]
-
-                except Exception as e:
-                    job.status = "failed"
-                    job.error = str(e)
-                    failure_count += 1
-                    errors.append((job.app_id, str(e)))
-
-                # Call progress callback
-                if progress_callback:
-                    progress_callback(job)
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                pending: dict[Future, ConversionJob] = {}
+                app_iter = iter(enumerate(app_dirs, 1))
+
+                while True:
+                    # Top up the submission window
+                    for i, app_dir in app_iter:
+                        job = ConversionJob(
+                            app_dir=app_dir,
+                            app_id=app_dir.name,  # Will be updated after parsing
+                            status="pending",
+                            index=i,
+                            total=total,
+                        )
+                        future = executor.submit(
+                            self._convert_single_app,
+                            job,
+                            output_dir,
+                            download_assets,
+                            transformer,
+                            upstream_url,
+                        )
+                        pending[future] = job
+                        if len(pending) >= window:
+                            break
+
+                    if not pending:
+                        break
+
+                    # Collect results as they complete
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        job = pending.pop(future)
+                        self._collect_result(job, future)
+
+                        if job.status == "success":
+                            success_count += 1
+                        else:
+                            failure_count += 1
+                        warning_count += len(job.warnings)
+                        files_written += job.files_written
+                        files_unchanged += job.files_unchanged
+
+                        if report is not None:
+                            report.write(json.dumps(_job_record(job)) + "\n")
+                        else:
+                            if job.status == "failed":
+                                errors.append((job.app_id, job.error or ""))
+                            warnings.extend(
+                                (job.app_id, warning) for warning in job.warnings
+                            )
+
+                        # Call progress callback
+                        if progress_callback:
+                            progress_callback(job)
+        finally:
+            if report is not None:
+                report.close()
 
         elapsed = time.time() - start_time
 
@@ -251,14 +297,39 @@ class BatchConverter:
             errors=errors,
             warnings=warnings,
             elapsed_seconds=elapsed,
+            warning_count=warning_count,
+            report_path=report_path,
+            files_written=files_written,
+            files_unchanged=files_unchanged,
         )
 
+    def _collect_result(self, job: ConversionJob, future: Future) -> None:
+        """Record the outcome of a finished conversion future on its job.
+
+        Args:
+            job: Job the future belongs to
+            future: Completed future returned by _convert_single_app
+        """
+        try:
+            result = future.result()
+        except Exception as e:
+            job.status = "failed"
+            job.error = str(e)
+            return
+
+        job.status = "success" if result["success"] else "failed"
+        job.warnings.extend(result.get("warnings", []))
+        if result.get("error"):
+            job.error = result["error"]
+        job.files_written = result.get("files_written", 0)
+        job.files_unchanged = result.get("files_unchanged", 0)
+
     def _convert_single_app(
         self,
         job: ConversionJob,
         output_dir: Path,
         download_assets: bool,
-        mappings_dir: Path,
+        transformer: MetadataTransformer,
         upstream_url: str | None,
     ) -> dict:
         """Convert a single app (executed in worker thread).
@@ -267,18 +338,21 @@ class BatchConverter:
             job: Conversion job with app info
             output_dir: Output directory for converted app
             download_assets: Whether to download assets
-            mappings_dir: Mappings directory
+            transformer: Transformer shared by all apps of the batch
             upstream_url: Upstream URL for tracking
 
         Returns:
-            Dict with keys: success (bool), error (str), warnings (list)
+            Dict with keys: success (bool), error (str), warnings (list),
+            files_written (int), files_unchanged (int)
         """
         try:
             job.status = "running"
 
             # Parse CasaOS app
             compose_file = job.app_dir / "docker-compose.yml"
-            casaos_app = self.parser.parse_from_file(compose_file)
+            with phase("convert:parse", app=job.app_dir.name):
+                document = SourceDocument.read(compose_file)
+                casaos_app = self.parser.parse_document(document)
 
             # Update job with actual app ID
             job.app_id = casaos_app.id
@@ -293,13 +367,13 @@ class BatchConverter:
             )
 
             # Transform to HaLOS format
-            transformer = MetadataTransformer(mappings_dir)
-            transformed = transformer.transform(
-                casaos_app,
-                context,
-                source_file_path=compose_file,
-                source_url=upstream_url,
-            )
+            with phase("convert:transform", app=casaos_app.id):
+                transformed = transformer.transform(
+                    casaos_app,
+                    context,
+                    source_url=upstream_url,
+                    source=document,
+                )
 
             # Enrich metadata with required fields
             metadata = transformed["metadata"]
@@ -307,24 +381,26 @@ class BatchConverter:
 
             # Write output files
             app_output_dir = output_dir / casaos_app.id
-            writer = OutputWriter(app_output_dir)
-            writer.write_package(
-                metadata,
-                transformed["config"],
-                transformed["compose"],
-                context,
-            )
+            with phase("convert:write", app=casaos_app.id):
+                writer = OutputWriter(app_output_dir)
+                writer.write_package(
+                    metadata,
+                    transformed["config"],
+                    transformed["compose"],
+                    context,
+                )
 
             # Download assets if requested
             if download_assets:
                 try:
-                    asset_manager = AssetManager(app_output_dir)
-                    asset_manager.download_all_assets(
-                        casaos_app.icon,
-                        casaos_app.screenshots or [],
-                        casaos_app.id,
-                        context,
-                    )
+                    with phase("convert:assets", app=casaos_app.id):
+                        asset_manager = AssetManager(app_output_dir)
+                        asset_manager.download_all_assets(
+                            casaos_app.icon,
+                            casaos_app.screenshots or [],
+                            casaos_app.id,
+                            context,
+                        )
                 except Exception as e:
                     context.warnings.append(f"Asset download failed: {e}")
 
@@ -332,6 +408,8 @@ class BatchConverter:
                 "success": True,
                 "error": None,
                 "warnings": context.warnings,
+                "files_written": len(writer.written),
+                "files_unchanged": len(writer.unchanged),
             }
 
         except Exception as e:
@@ -387,3 +465,17 @@ class BatchConverter:
 
         if "architecture" not in metadata or not metadata["architecture"]:
             metadata["architecture"] = DEFAULT_ARCHITECTURE
+
+
+def _job_record(job: ConversionJob) -> dict:
+    """Serialize a finished job as one JSON Lines report record."""
+    return {
+        "index": job.index,
+        "app_id": job.app_id,
+        "app_dir": str(job.app_dir),
+        "status": job.status,
+        "error": job.error,
+        "warnings": job.warnings,
+        "files_written": job.files_written,
+        "files_unchanged": job.files_unchanged,
+    }
@@ -2,19 +2,31 @@
 
 Writes metadata.yaml, config.yml, and docker-compose.yml files with
 schema validation and proper YAML formatting.
+
+Files are rendered in memory and only replaced (atomically) when their
+content changed, ignoring volatile fields such as the conversion
+timestamp, so re-converting an unchanged upstream app touches no file.
 """
 
 import copy
+import os
 from pathlib import Path
 from typing import Any
 
 import yaml
 
+from generate_container_packages.validator import validate_document
 from schemas.config import ConfigSchema
 from schemas.metadata import PackageMetadata
 
 from .models import ConversionContext
 
+# Fields that change on every conversion without changing the package,
+# as key paths per output file
+VOLATILE_FIELDS: dict[str, tuple[tuple[str, ...], ...]] = {
+    "metadata.yaml": (("source_metadata", "conversion_timestamp"),),
+}
+
 
 class OutputWriter:
     """Writes HaLOS package files to disk with validation.
@@ -27,17 +39,27 @@ class OutputWriter:
     - Validates metadata against PackageMetadata schema
     - Validates config against ConfigSchema schema
     - Strips any remaining x-casaos extensions from compose
-    - Writes three files: metadata.yaml, config.yml, docker-compose.yml
+    - Writes three files: metadata.yaml, config.yml, docker-compose.yml,
+      skipping files whose content is unchanged
+
+    Attributes:
+        written: Names of files written by this writer
+        unchanged: Names of files left untouched because they were unchanged
     """
 
-    def __init__(self, output_dir: Path) -> None:
+    def __init__(self, output_dir: Path, skip_unchanged: bool = True) -> None:
         """Initialize output writer.
 
         Args:
             output_dir: Directory to write output files
+            skip_unchanged: Keep existing files whose content only differs
+                in volatile fields (see VOLATILE_FIELDS)
         """
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.skip_unchanged = skip_unchanged
+        self.written: list[str] = []
+        self.unchanged: list[str] = []
 
     def write_package(
         self,
@@ -45,11 +67,14 @@ class OutputWriter:
         config: dict[str, Any],
         compose: dict[str, Any],
         context: ConversionContext,
-    ) -> None:
+    ) -> list[str]:
         """Write all package files with validation.
 
-        Validates metadata and config against schemas before writing.
-        Strips any x-casaos extensions from compose.
+        Validates the rendered metadata and config against schemas before
+        writing. The validated models are remembered by the digest of the
+        rendered content, so building the written package in the same
+        process does not validate them again. Strips any x-casaos
+        extensions from compose.
 
         Args:
             metadata: Metadata dict (must validate against PackageMetadata)
@@ -57,38 +82,45 @@ class OutputWriter:
             compose: Docker Compose dict (x-casaos will be stripped)
             context: Conversion context for tracking errors
 
+        Returns:
+            Names of the files that were written (unchanged files are skipped)
+
         Raises:
             ValidationError: If metadata or config don't validate against schemas
             OSError: If file writing fails
         """
-        # Validate metadata against schema
-        try:
-            PackageMetadata.model_validate(metadata)
-        except Exception as e:
-            error_msg = f"Metadata validation failed: {e}"
-            context.errors.append(error_msg)
-            raise
-
-        # Validate config against schema
-        try:
-            ConfigSchema.model_validate(config)
-        except Exception as e:
-            error_msg = f"Config validation failed: {e}"
-            context.errors.append(error_msg)
-            raise
-
         # Strip any remaining x-casaos extensions from compose
         compose_clean = self._strip_xcasaos(compose)
 
+        contents = {
+            "metadata.yaml": _render_yaml(metadata),
+            "config.yml": _render_yaml(config),
+            "docker-compose.yml": _render_yaml(compose_clean),
+        }
+
+        # Validate the rendered documents against the schemas
+        for name, model_cls, label in (
+            ("metadata.yaml", PackageMetadata, "Metadata"),
+            ("config.yml", ConfigSchema, "Config"),
+        ):
+            try:
+                validate_document(model_cls, contents[name].encode("utf-8"))
+            except Exception as e:
+                error_msg = f"{label} validation failed: {e}"
+                context.errors.append(error_msg)
+                raise
+
         # Write files
+        written = []
         try:
-            self._write_yaml(self.output_dir / "metadata.yaml", metadata)
-            self._write_yaml(self.output_dir / "config.yml", config)
-            self._write_yaml(self.output_dir / "docker-compose.yml", compose_clean)
+            for name, content in contents.items():
+                if self._write_yaml(self.output_dir / name, content):
+                    written.append(name)
         except OSError as e:
             error_msg = f"Failed to write output files: {e}"
             context.errors.append(error_msg)
             raise
+        return written
 
     def _strip_xcasaos(self, compose: dict[str, Any]) -> dict[str, Any]:
         """Strip x-casaos extensions from compose dict.
@@ -116,24 +148,89 @@ class OutputWriter:
 
         return compose_clean
 
-    def _write_yaml(self, path: Path, data: dict[str, Any]) -> None:
-        """Write data as YAML file with proper formatting.
+    def _write_yaml(self, path: Path, content: str) -> bool:
+        """Write a rendered YAML file.
 
-        Uses PyYAML with settings for readable output:
-        - Block style (not inline flow style)
-        - Sorted keys for consistency
-        - Proper indentation
+        The file is replaced atomically (temporary file + rename), and not
+        at all if it already holds the same content apart from volatile
+        fields.
 
         Args:
             path: Output file path
-            data: Data to write as YAML
+            content: YAML text from _render_yaml()
+
+        Returns:
+            Whether the file was written
+        """
+        if self.skip_unchanged and self._is_unchanged(path, content):
+            self.unchanged.append(path.name)
+            return False
+
+        tmp = path.with_name(f".{path.name}.tmp")
+        try:
+            tmp.write_text(content, encoding="utf-8")
+            os.replace(tmp, path)
+        except OSError:
+            tmp.unlink(missing_ok=True)
+            raise
+        self.written.append(path.name)
+        return True
+
+    def _is_unchanged(self, path: Path, content: str) -> bool:
+        """Check whether a file already holds equivalent YAML content.
+
+        Args:
+            path: Existing output file
+            content: Newly rendered YAML
+
+        Returns:
+            True if the file exists and parses to the same data as content,
+            ignoring the volatile fields of this file
         """
-        with open(path, "w") as f:
-            yaml.dump(
-                data,
-                f,
-                default_flow_style=False,  # Use block style, not inline {}
-                sort_keys=True,  # Sort keys for consistency
-                allow_unicode=True,  # Support Unicode characters
-                indent=2,  # 2-space indentation
-            )
+        try:
+            existing = path.read_text(encoding="utf-8")
+        except (FileNotFoundError, UnicodeDecodeError):
+            return False
+        if existing == content:
+            return True
+
+        volatile = VOLATILE_FIELDS.get(path.name)
+        if not volatile:
+            return False
+        try:
+            old_data = yaml.safe_load(existing)
+        except yaml.YAMLError:
+            return False
+        new_data = yaml.safe_load(content)
+        return _without_fields(old_data, volatile) == _without_fields(
+            new_data, volatile
+        )
+
+
+def _render_yaml(data: dict[str, Any]) -> str:
+    """Render data as YAML with proper formatting.
+
+    Uses PyYAML with settings for readable output:
+    - Block style (not inline flow style)
+    - Sorted keys for consistency
+    - Proper indentation
+    """
+    return yaml.dump(
+        data,
+        default_flow_style=False,  # Use block style, not inline {}
+        sort_keys=True,  # Sort keys for consistency
+        allow_unicode=True,  # Support Unicode characters
+        indent=2,  # 2-space indentation
+    )
+
+
+def _without_fields(data: Any, fields: tuple[tuple[str, ...], ...]) -> Any:
+    """Copy parsed YAML data without the given key paths."""
+    data = copy.deepcopy(data)
+    for key_path in fields:
+        node = data
+        for key in key_path[:-1]:
+            node = node.get(key) if isinstance(node, dict) else None
+        if isinstance(node, dict):
+            node.pop(key_path[-1], None)
+    return data
@@ -14,6 +14,7 @@ from generate_container_packages.converters.casaos.models import (
     CasaOSService,
     CasaOSVolume,
 )
+from generate_container_packages.converters.casaos.source import SourceDocument
 from generate_container_packages.converters.exceptions import (
     ValidationError as ConverterValidationError,
 )
@@ -52,13 +53,37 @@ class CasaOSParser:
         if not compose_file.exists():
             raise FileNotFoundError(f"Compose file not found: {compose_file}")
 
+        return self.parse_document(SourceDocument.read(compose_file))
+
+    def parse_document(self, document: SourceDocument) -> CasaOSApp:
+        """Parse a CasaOS app from a source document.
+
+        The parsed mapping is stored on the document, so a document that
+        was already parsed is not decoded again.
+
+        Args:
+            document: Source document read from a docker-compose.yml file
+
+        Returns:
+            CasaOSApp model instance
+
+        Raises:
+            ConverterValidationError: If the file format is invalid
+        """
         # Track file path for better error messages
-        self._current_file = compose_file
+        self._current_file = document.path
         self.warnings.clear()  # Reset warnings for new parse
 
-        yaml_content = compose_file.read_text()
         try:
-            return self.parse_from_string(yaml_content)
+            if document.data is None:
+                try:
+                    text = document.text
+                except UnicodeDecodeError as e:
+                    raise ConverterValidationError(
+                        self._error_context(f"Invalid UTF-8 content: {e}")
+                    ) from e
+                document.data = self._load_yaml(text)
+            return self._parse_compose_data(document.data)
         finally:
             self._current_file = None
 
@@ -135,6 +160,20 @@ class CasaOSParser:
         Raises:
             ConverterValidationError: If the YAML is invalid or missing required fields
         """
+        return self._parse_compose_data(self._load_yaml(yaml_content))
+
+    def _load_yaml(self, yaml_content: str) -> dict[str, Any]:
+        """Load docker compose YAML into a dictionary.
+
+        Args:
+            yaml_content: Docker compose YAML content as string
+
+        Returns:
+            Parsed YAML data
+
+        Raises:
+            ConverterValidationError: If the YAML is invalid or not a mapping
+        """
         try:
             data = yaml.safe_load(yaml_content)
         except yaml.YAMLError as e:
@@ -147,7 +186,7 @@ class CasaOSParser:
                 self._error_context("Docker compose file must be a YAML dictionary")
             )
 
-        return self._parse_compose_data(data)
+        return data
 
     def _parse_compose_data(self, data: dict[str, Any]) -> CasaOSApp:
         """Parse compose data dictionary into CasaOSApp.
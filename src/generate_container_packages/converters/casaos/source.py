@@ -0,0 +1,62 @@
+"""Upstream source documents read once per conversion run."""
+
+import hashlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+
+@dataclass
+class SourceDocument:
+    """Raw bytes of an upstream file together with their digest.
+
+    The document is read and hashed once and then handed through
+    parse → transform → output (and sync), so the same file is never
+    re-read to fill in source_metadata.upstream_hash.
+
+    Attributes:
+        path: File the document was read from
+        content: Raw file content
+        digest: Hexadecimal SHA256 hash of content
+        data: Parsed YAML mapping, set by CasaOSParser.parse_document()
+    """
+
+    path: Path
+    content: bytes
+    digest: str
+    data: dict[str, Any] | None = None
+
+    @classmethod
+    def from_bytes(cls, path: Path, content: bytes) -> "SourceDocument":
+        """Create a document from content already in memory.
+
+        Args:
+            path: File the content belongs to (used in messages)
+            content: Raw file content
+
+        Returns:
+            SourceDocument with computed digest
+        """
+        return cls(
+            path=path, content=content, digest=hashlib.sha256(content).hexdigest()
+        )
+
+    @classmethod
+    def read(cls, path: Path) -> "SourceDocument":
+        """Read and hash a file.
+
+        Args:
+            path: File to read
+
+        Returns:
+            SourceDocument with the file's content and digest
+
+        Raises:
+            FileNotFoundError: If the file doesn't exist
+        """
+        return cls.from_bytes(path, path.read_bytes())
+
+    @property
+    def text(self) -> str:
+        """Content decoded as UTF-8."""
+        return self.content.decode("utf-8")
@@ -6,6 +6,8 @@ and package naming.
 """
 
 import re
+import threading
+from collections import OrderedDict
 from datetime import UTC, datetime
 from pathlib import Path
 from typing import Any
@@ -16,6 +18,120 @@ from generate_container_packages.naming import derive_app_id
 from generate_container_packages.utils import compute_file_hash
 
 from .models import CasaOSApp, CasaOSEnvVar, ConversionContext
+from .source import SourceDocument
+
+# Constructs whose meaning changes when a pattern is embedded in a larger one
+_UNCOMBINABLE = re.compile(r"\\[1-9]|\(\?P=|\(\?[aiLmsux-]+\)")
+
+
+def _combine_patterns(patterns: list[str]) -> re.Pattern[str] | None:
+    """Compile patterns into one alternation preserving their order.
+
+    Each pattern becomes a named group "__<index>"; with re.match the first
+    alternative that matches wins, exactly like trying the patterns in turn.
+
+    Args:
+        patterns: Regular expressions in priority order
+
+    Returns:
+        Combined regex, or None if a pattern uses backreferences or global
+        inline flags (callers then match the patterns one by one)
+    """
+    if not patterns or any(_UNCOMBINABLE.search(p) for p in patterns):
+        return None
+    combined = "|".join(f"(?P<__{i}>{p})" for i, p in enumerate(patterns))
+    try:
+        return re.compile(combined)
+    except re.error:
+        return None
+
+
+# Bounds of the transformer memos, so a transformer shared by a whole
+# catalog conversion does not grow with the number of apps
+MEMO_MAX = 4096
+PATH_RULES_MAX = 64
+
+_MISSING = object()
+
+
+class _LRUMemo:
+    """Thread-safe memo keeping only the most recently used entries."""
+
+    def __init__(self, maxsize: int) -> None:
+        """Initialize an empty memo.
+
+        Args:
+            maxsize: Maximum number of entries
+        """
+        self.maxsize = maxsize
+        self._entries: OrderedDict[Any, Any] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Any) -> Any:
+        """Return the value for a key, or _MISSING if it is not memoized."""
+        with self._lock:
+            value = self._entries.get(key, _MISSING)
+            if value is not _MISSING:
+                self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: Any, value: Any) -> None:
+        """Memoize a value, evicting the least recently used entries."""
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        """Return the number of memoized entries."""
+        return len(self._entries)
+
+
+# Placeholders for the app id in paths.yaml and in CasaOS volume paths
+_APP_PLACEHOLDERS = ("{app}", "{app_id}", "$AppID")
+
+
+def _substitute_app_id(text: str, app_id: str) -> str:
+    """Replace app id placeholders in a path or path template."""
+    for placeholder in _APP_PLACEHOLDERS:
+        text = text.replace(placeholder, app_id)
+    return text
+
+
+class _PrefixTrie:
+    """Character trie mapping path prefixes to ordered rules.
+
+    match() returns the rule with the lowest index among all rules whose
+    prefix starts the path, i.e. the rule a first-match-wins scan over
+    startswith() checks would pick, in one walk over the path.
+    """
+
+    _RULE = ""  # Key of a node's rule; never a single path character
+
+    def __init__(self) -> None:
+        self._root: dict[str, Any] = {}
+
+    def add(self, prefix: str, index: int, rule: Any) -> None:
+        """Add a rule; an earlier index wins over a later one."""
+        node = self._root
+        for char in prefix:
+            node = node.setdefault(char, {})
+        if self._RULE not in node or node[self._RULE][0] > index:
+            node[self._RULE] = (index, rule)
+
+    def match(self, path: str) -> Any | None:
+        """Find the earliest rule whose prefix starts the path."""
+        best = self._root.get(self._RULE)
+        node = self._root
+        for char in path:
+            node = node.get(char)
+            if node is None:
+                break
+            candidate = node.get(self._RULE)
+            if candidate is not None and (best is None or candidate[0] < best[0]):
+                best = candidate
+        return best[1] if best is not None else None
 
 
 class MetadataTransformer:
@@ -100,6 +216,27 @@ class MetadataTransformer:
                     "group": pattern_def.get("group", "configuration"),
                 }
             )
+        # All patterns as one alternation, tried in a single regex pass
+        self._field_type_matcher = _combine_patterns(
+            [p["pattern"] for p in self._field_type_data["patterns"]]
+        )
+        # Path rules: preserved prefixes are checked with one startswith(),
+        # transforms are compiled per app id on first use (see _path_rules)
+        self._preserved_paths = tuple(
+            self._path_data.get("special_cases", {}).get("preserve", [])
+        )
+        self._path_transforms = [
+            (t["from"], t["to"]) for t in self._path_data.get("transforms", [])
+        ]
+        self._prepend_data_root = (
+            self._path_data.get("default", {}).get("action", "") == "prepend_data_root"
+        )
+        self._app_path_rules = _LRUMemo(PATH_RULES_MAX)
+        self._path_cache = _LRUMemo(MEMO_MAX)
+
+        # Env var name -> matching pattern definition (None if none matches);
+        # names like PUID, TZ or PASSWORD recur across most apps
+        self._field_type_memo = _LRUMemo(MEMO_MAX)
 
     def transform(
         self,
@@ -107,6 +244,7 @@ class MetadataTransformer:
         context: ConversionContext,
         source_file_path: Path | None = None,
         source_url: str | None = None,
+        source: SourceDocument | None = None,
     ) -> dict[str, Any]:
         """Transform CasaOS app to HaLOS format.
 
@@ -124,6 +262,8 @@ class MetadataTransformer:
             context: Conversion context for tracking warnings/errors
             source_file_path: Path to source docker-compose.yml (for hash computation)
             source_url: URL to upstream repository (for source tracking)
+            source: Source document the app was parsed from; its digest is
+                used instead of re-reading source_file_path
 
         Returns:
             Dictionary with keys:
@@ -153,12 +293,15 @@ class MetadataTransformer:
 
         # Build source_metadata if source tracking parameters provided
         source_metadata = None
-        if source_file_path and source_url:
+        if (source or source_file_path) and source_url:
+            upstream_hash = (
+                source.digest if source else compute_file_hash(source_file_path)
+            )
             source_metadata = {
                 "type": context.source_format,
                 "app_id": context.app_id,
                 "source_url": source_url,
-                "upstream_hash": compute_file_hash(source_file_path),
+                "upstream_hash": upstream_hash,
                 "conversion_timestamp": datetime.now(UTC).isoformat(),
             }
 
@@ -415,13 +558,13 @@ class MetadataTransformer:
             Tuple of (field_type, validation_rules, group_hint)
         """
         # Try pattern matching first
-        for pattern_def in self._compiled_patterns:
-            if pattern_def["regex"].match(env_var.name):
-                return (
-                    pattern_def["type"],
-                    pattern_def["validation"],
-                    pattern_def["group"],
-                )
+        pattern_def = self._match_field_pattern(env_var.name)
+        if pattern_def is not None:
+            return (
+                pattern_def["type"],
+                pattern_def["validation"],
+                pattern_def["group"],
+            )
 
         # Fall back to CasaOS type hint
         defaults = self._field_type_data.get("defaults", {})
@@ -438,6 +581,35 @@ class MetadataTransformer:
 
         return field_type, {}, group
 
+    def _match_field_pattern(self, name: str) -> dict[str, Any] | None:
+        """Find the first field type pattern matching an env var name.
+
+        Args:
+            name: Environment variable name
+
+        Returns:
+            Compiled pattern definition, or None if no pattern matches
+        """
+        pattern_def = self._field_type_memo.get(name)
+        if pattern_def is not _MISSING:
+            return pattern_def
+
+        pattern_def = None
+        if self._field_type_matcher is not None:
+            match = self._field_type_matcher.match(name)
+            if match:
+                # The outermost group closes last, so lastgroup names the
+                # alternative that matched (first match wins)
+                pattern_def = self._compiled_patterns[int(match.lastgroup[2:])]
+        else:
+            for candidate in self._compiled_patterns:
+                if candidate["regex"].match(name):
+                    pattern_def = candidate
+                    break
+
+        self._field_type_memo.put(name, pattern_def)
+        return pattern_def
+
     def _extract_version_from_image(self, image_tag: str) -> str | None:
         """Extract semantic version from Docker image tag.
 
@@ -621,6 +793,8 @@ class MetadataTransformer:
         Transformation rules are evaluated in order from the mappings file.
         The first rule that matches is applied, subsequent rules are skipped.
         Order matters - more specific rules should come before general ones.
+        The rules are compiled into a prefix trie once per app id and results
+        are cached per (app_id, path).
 
         Args:
             path: CasaOS volume path (may contain {app} or {app_id} variables)
@@ -639,45 +813,51 @@ class MetadataTransformer:
             >>> _transform_path("/custom/path", "myapp")
             "${CONTAINER_DATA_ROOT}/custom/path"  # Default
         """
+        key = (app_id, path)
+        result = self._path_cache.get(key)
+        if result is not _MISSING:
+            return result
+
         # First, replace {app}, {app_id}, or $AppID variables in the incoming path
         # This allows patterns like "/DATA/AppData/{app}/" or "/DATA/AppData/$AppID" to match actual paths
-        path = path.replace("{app}", app_id)
-        path = path.replace("{app_id}", app_id)
-        path = path.replace("$AppID", app_id)
+        resolved = _substitute_app_id(path, app_id)
 
         # Check if path should be preserved (system paths like /etc, /var, etc.)
-        preserved_paths = self._path_data.get("special_cases", {}).get("preserve", [])
-        for preserved in preserved_paths:
-            if path.startswith(preserved):
-                return path
-
-        # Apply transformation rules in order (FIRST MATCH WINS)
-        # More specific rules should be placed before general ones in paths.yaml
-        transforms = self._path_data.get("transforms", [])
-        for transform in transforms:
-            from_pattern = transform["from"]
-            to_pattern = transform["to"]
-
-            # Also replace variables in pattern for matching
-            from_pattern_with_app = (
-                from_pattern.replace("{app}", app_id)
-                .replace("{app_id}", app_id)
-                .replace("$AppID", app_id)
-            )
+        if resolved.startswith(self._preserved_paths):
+            result = resolved
+        else:
+            # Apply transformation rules (FIRST MATCH WINS); the exact match
+            # of a rule is the prefix match with an empty remainder
+            rule = self._path_rules(app_id).match(resolved)
+            if rule is not None:
+                from_prefix, to_pattern = rule
+                result = to_pattern + resolved[len(from_prefix) :]
+            elif self._prepend_data_root:
+                # Default behavior: prepend CONTAINER_DATA_ROOT
+                result = f"${{CONTAINER_DATA_ROOT}}{resolved}"
+            else:
+                result = resolved
+
+        self._path_cache.put(key, result)
+        return result
 
-            # Handle exact matches and prefix matches
-            if path == from_pattern_with_app:
-                return to_pattern
-            elif path.startswith(from_pattern_with_app):
-                # Replace the prefix
-                return to_pattern + path[len(from_pattern_with_app) :]
+    def _path_rules(self, app_id: str) -> _PrefixTrie:
+        """Get the transformation rules of paths.yaml compiled for an app.
 
-        # Default behavior: prepend CONTAINER_DATA_ROOT
-        default_action = self._path_data.get("default", {}).get("action", "")
-        if default_action == "prepend_data_root":
-            return f"${{CONTAINER_DATA_ROOT}}{path}"
+        Args:
+            app_id: Application identifier substituted into the rules
 
-        return path
+        Returns:
+            Prefix trie of (from, to) rules in file order
+        """
+        rules = self._app_path_rules.get(app_id)
+        if rules is _MISSING:
+            rules = _PrefixTrie()
+            for index, (from_pattern, to_pattern) in enumerate(self._path_transforms):
+                from_prefix = _substitute_app_id(from_pattern, app_id)
+                rules.add(from_prefix, index, (from_prefix, to_pattern))
+            self._app_path_rules.put(app_id, rules)
+        return rules
 
     def _build_clean_compose(self, casaos_app: CasaOSApp) -> dict[str, Any]:
         """Build docker-compose dictionary with x-casaos metadata removed.
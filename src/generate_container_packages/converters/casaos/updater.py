@@ -11,7 +11,7 @@ from pathlib import Path
 import yaml
 from pydantic import ValidationError
 
-from generate_container_packages.utils import compute_file_hash
+from generate_container_packages.converters.casaos.source import SourceDocument
 from schemas import SourceMetadata
 
 
@@ -22,6 +22,7 @@ class UpstreamApp:
     app_id: str
     compose_path: Path
     compose_hash: str
+    document: SourceDocument | None = None
 
 
 @dataclass
@@ -131,6 +132,9 @@ class CasaOSUpdateDetector:
         """
         self.upstream_dir = Path(upstream_dir)
         self.converted_dir = Path(converted_dir)
+        # Upstream apps of the last detect_changes(); only new and updated
+        # apps keep their documents, until release_document() after conversion
+        self.upstream_apps: dict[str, UpstreamApp] = {}
 
     def detect_changes(self) -> UpdateReport:
         """Compare upstream with converted apps and generate report.
@@ -139,6 +143,7 @@ class CasaOSUpdateDetector:
             UpdateReport with lists of new, updated, and removed apps
         """
         upstream_apps = self._scan_upstream()
+        self.upstream_apps = upstream_apps
         converted_apps = self._scan_converted()
 
         # Detect new apps (in upstream but not converted)
@@ -162,6 +167,11 @@ class CasaOSUpdateDetector:
             app_id for app_id in converted_apps if app_id not in upstream_apps
         ]
 
+        # Unchanged apps are not converted, so their content is not needed
+        to_convert = set(new_apps) | {app.app_id for app in updated_apps}
+        for app_id in upstream_apps.keys() - to_convert:
+            self.release_document(app_id)
+
         return UpdateReport(
             new_apps=new_apps,
             updated_apps=updated_apps,
@@ -169,6 +179,16 @@ class CasaOSUpdateDetector:
             timestamp=datetime.now(UTC),
         )
 
+    def release_document(self, app_id: str) -> None:
+        """Drop the content of an upstream app's document, keeping path and hash.
+
+        Args:
+            app_id: Upstream app identifier
+        """
+        app = self.upstream_apps.get(app_id)
+        if app is not None:
+            app.document = None
+
     def _scan_upstream(self) -> dict[str, UpstreamApp]:
         """Scan upstream directory for CasaOS apps.
 
@@ -191,8 +211,9 @@ class CasaOSUpdateDetector:
             if not compose_file.exists():
                 continue
 
-            # Compute hash of compose file
-            compose_hash = compute_file_hash(compose_file)
+            # Read and hash the compose file once; the document is reused
+            # when the app is converted
+            document = SourceDocument.read(compose_file)
 
             # Use directory name as app_id
             app_id = app_dir.name
@@ -200,7 +221,8 @@ class CasaOSUpdateDetector:
             apps[app_id] = UpstreamApp(
                 app_id=app_id,
                 compose_path=compose_file,
-                compose_hash=compose_hash,
+                compose_hash=document.digest,
+                document=document,
             )
 
         return apps
@@ -1,11 +1,14 @@
 """File loading and data model construction."""
 
+import copy
 import logging
+import os
 import stat
+import subprocess
 from dataclasses import dataclass
 from datetime import UTC, datetime
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 import yaml
 
@@ -15,6 +18,9 @@ from generate_container_packages.naming import (
     expand_dependencies,
 )
 
+if TYPE_CHECKING:
+    from generate_container_packages.validator import ValidationResult
+
 logger = logging.getLogger(__name__)
 
 
@@ -54,6 +60,7 @@ class AppDefinition:
         asset_files: list[AssetFile] | None = None,
         default_data_dir: Path | None = None,
         default_data_files: list[AssetFile] | None = None,
+        source_date: datetime | None = None,
     ):
         """Initialize AppDefinition.
 
@@ -68,6 +75,8 @@ class AppDefinition:
             asset_files: List of AssetFile objects with path and permissions info
             default_data_dir: Path to default-data directory (if exists)
             default_data_files: List of AssetFile objects for default data files
+            source_date: Fixed build date for reproducible builds (see
+                resolve_source_date()); the current time is used if None
         """
         self.metadata = metadata
         self.compose = compose
@@ -81,21 +90,35 @@ class AppDefinition:
         self.default_data_files = default_data_files or []
 
         # Computed fields
-        now = datetime.now(UTC)
-        self.timestamp = now.isoformat()  # ISO 8601 for general use
+        self.source_date_epoch = (
+            int(source_date.timestamp()) if source_date is not None else None
+        )
+        self.set_build_date(source_date or datetime.now(UTC))
+        self.tool_version = __version__
+
+    def set_build_date(self, date: datetime) -> None:
+        """Set the build timestamps used in the changelog and AppStream data.
+
+        Args:
+            date: Timezone-aware build date
+        """
+        self.timestamp = date.isoformat()  # ISO 8601 for general use
 
         # RFC 2822 for Debian changelog (with colon in timezone offset)
-        tz_str = now.strftime("%z")
+        tz_str = date.strftime("%z")
         self.timestamp_rfc2822 = (
-            now.strftime("%a, %d %b %Y %H:%M:%S ") + tz_str[:3] + ":" + tz_str[3:]
+            date.strftime("%a, %d %b %Y %H:%M:%S ") + tz_str[:3] + ":" + tz_str[3:]
         )
 
-        self.date_only = now.strftime("%Y-%m-%d")  # YYYY-MM-DD for AppStream
-        self.tool_version = __version__
+        self.date_only = date.strftime("%Y-%m-%d")  # YYYY-MM-DD for AppStream
 
 
 def load_input_files(
-    directory: Path, prefix: str | None = None, suffix: str = "container"
+    directory: Path,
+    prefix: str | None = None,
+    suffix: str = "container",
+    validation: "ValidationResult | None" = None,
+    reproducible: bool = False,
 ) -> AppDefinition:
     """Load all input files from directory into unified data model.
 
@@ -103,6 +126,11 @@ def load_input_files(
         directory: Path to input directory
         prefix: Optional package name prefix (e.g., "marine", "halos", "casaos")
         suffix: Package name suffix (default: "container", use "" for no suffix)
+        validation: Successful validate_input_directory() result for the same
+            directory; the YAML it parsed is reused instead of re-reading
+            and re-parsing the input files
+        reproducible: Derive the build date from the inputs instead of the
+            current time (SOURCE_DATE_EPOCH is honoured either way)
 
     Returns:
         AppDefinition with all loaded data, including computed package_name
@@ -112,9 +140,14 @@ def load_input_files(
         yaml.YAMLError: If YAML parsing fails
     """
     # Load required files
-    metadata = load_yaml(directory / "metadata.yaml")
-    compose = load_yaml(directory / "docker-compose.yml")
-    config = load_yaml(directory / "config.yml")
+    if validation is not None and validation.raw_metadata is not None:
+        metadata = copy.deepcopy(validation.raw_metadata)
+        compose = copy.deepcopy(validation.compose)
+        config = copy.deepcopy(validation.raw_config)
+    else:
+        metadata = load_yaml(directory / "metadata.yaml")
+        compose = load_yaml(directory / "docker-compose.yml")
+        config = load_yaml(directory / "config.yml")
 
     # Reject deprecated package_name field
     if "package_name" in metadata:
@@ -182,9 +215,65 @@ def load_input_files(
         asset_files=asset_files,
         default_data_dir=default_data_dir,
         default_data_files=default_data_files,
+        source_date=resolve_source_date(directory, reproducible=reproducible),
     )
 
 
+def resolve_source_date(directory: Path, reproducible: bool = False) -> datetime | None:
+    """Determine the fixed build date of a reproducible build.
+
+    Follows the reproducible-builds.org convention: SOURCE_DATE_EPOCH wins
+    if set. Otherwise, in reproducible mode, the date of the last git commit
+    touching the input directory is used, falling back to the newest
+    modification time of the input files outside a git checkout.
+
+    Args:
+        directory: App input directory
+        reproducible: Derive a date from the inputs if SOURCE_DATE_EPOCH
+            is not set
+
+    Returns:
+        UTC build date, or None to use the current time
+
+    Raises:
+        ValueError: If SOURCE_DATE_EPOCH is not a non-negative integer
+    """
+    epoch = os.environ.get("SOURCE_DATE_EPOCH")
+    if epoch:
+        if not epoch.isdigit():
+            raise ValueError(f"Invalid SOURCE_DATE_EPOCH: {epoch!r}")
+        return datetime.fromtimestamp(int(epoch), UTC)
+    if not reproducible:
+        return None
+
+    commit_time = _git_commit_time(directory)
+    if commit_time is not None:
+        return datetime.fromtimestamp(commit_time, UTC)
+
+    mtimes = [
+        int(path.stat().st_mtime) for path in directory.rglob("*") if path.is_file()
+    ]
+    return datetime.fromtimestamp(max(mtimes, default=0), UTC)
+
+
+def _git_commit_time(directory: Path) -> int | None:
+    """Return the commit time of the last commit touching a directory."""
+    try:
+        result = subprocess.run(
+            ["git", "log", "-1", "--format=%ct", "--", "."],
+            cwd=directory,
+            capture_output=True,
+            text=True,
+            check=False,
+        )
+    except OSError:
+        return None
+    output = result.stdout.strip()
+    if result.returncode != 0 or not output.isdigit():
+        return None
+    return int(output)
+
+
 def load_yaml(path: Path) -> dict[str, Any]:
     """Load and parse YAML file.
 
@@ -0,0 +1,639 @@
+"""Dependency-aware build of many apps of one store.
+
+Apps of a store reference each other with @app_id entries in depends,
+recommends and suggests (see naming.expand_dependencies). DependencyGraph
+builds the inter-app graph from the metadata.yaml files, reports missing @
+targets and dependency cycles before anything is built, and orders the apps
+in topological waves: every app of a wave only depends on apps of earlier
+waves, so all apps of a wave are built in parallel.
+
+With --changed-only, only apps whose input files changed since their last
+successful build are rebuilt, together with every app that (transitively)
+depends on them. Input digests of successful builds are kept in
+.build-state.json in the output directory, together with the digests of the
+staged files that --plan compares against (see plan.py).
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import re
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from generate_container_packages import __version__
+from generate_container_packages.builder import CompressionProfile, format_size
+from generate_container_packages.loader import load_yaml
+from generate_container_packages.plan import (
+    PlanError,
+    format_plan,
+    plan_apps,
+    planned_digests,
+)
+from generate_container_packages.server import run_job
+from generate_container_packages.validator import ValidationCache
+
+logger = logging.getLogger(__name__)
+
+# Fields whose @ references must name an app of the store
+DEPENDENCY_FIELDS = ("depends", "recommends", "suggests")
+# Fields whose @ references order builds (suggests may legitimately be cyclic)
+ORDERING_FIELDS = ("depends", "recommends")
+
+BUILD_STATE_FILE = ".build-state.json"
+BUILD_STATE_VERSION = 1
+
+_APP_REFERENCE = re.compile(r"^@([a-z0-9][a-z0-9-]*)")
+
+
+class DependencyError(Exception):
+    """Raised when the inter-app dependency graph is invalid."""
+
+
+@dataclass
+class AppNode:
+    """One app of the dependency graph.
+
+    Attributes:
+        app_id: App identifier from metadata.yaml
+        input_dir: App definition directory
+        requires: App IDs referenced in ordering fields
+        references: App IDs referenced in any dependency field
+    """
+
+    app_id: str
+    input_dir: Path
+    requires: set[str] = field(default_factory=set)
+    references: set[str] = field(default_factory=set)
+
+
+def app_references(entries: list[str] | None) -> set[str]:
+    """Extract the app IDs of @ references in a dependency list.
+
+    Args:
+        entries: Dependency strings such as "@influxdb" or "docker.io"
+
+    Returns:
+        Referenced app IDs (version constraints and alternatives after the
+        first app ID are ignored)
+    """
+    refs = set()
+    for entry in entries or []:
+        match = _APP_REFERENCE.match(entry.strip())
+        if match:
+            refs.add(match.group(1))
+    return refs
+
+
+class DependencyGraph:
+    """Inter-app dependency graph of a store."""
+
+    def __init__(self, nodes: dict[str, AppNode]) -> None:
+        """Initialize graph.
+
+        Args:
+            nodes: Apps keyed by app ID
+        """
+        self.nodes = nodes
+        self.dependents: dict[str, set[str]] = {app_id: set() for app_id in nodes}
+        for node in nodes.values():
+            for required in node.requires:
+                if required in self.dependents:
+                    self.dependents[required].add(node.app_id)
+
+    @classmethod
+    def from_app_dirs(cls, app_dirs: list[Path]) -> "DependencyGraph":
+        """Build the graph from app definition directories.
+
+        Args:
+            app_dirs: App definition directories (each with metadata.yaml)
+
+        Returns:
+            Dependency graph
+
+        Raises:
+            DependencyError: If two directories define the same app_id
+        """
+        nodes: dict[str, AppNode] = {}
+        for app_dir in app_dirs:
+            metadata = load_yaml(app_dir / "metadata.yaml")
+            app_id = metadata["app_id"]
+            if app_id in nodes:
+                raise DependencyError(
+                    f"Duplicate app_id '{app_id}' in {nodes[app_id].input_dir} "
+                    f"and {app_dir}"
+                )
+            nodes[app_id] = AppNode(
+                app_id=app_id,
+                input_dir=app_dir,
+                requires=set().union(
+                    *(app_references(metadata.get(f)) for f in ORDERING_FIELDS)
+                ),
+                references=set().union(
+                    *(app_references(metadata.get(f)) for f in DEPENDENCY_FIELDS)
+                ),
+            )
+        return cls(nodes)
+
+    def missing(self) -> dict[str, list[str]]:
+        """Return @ references to apps that are not part of the graph."""
+        missing = {}
+        for app_id, node in sorted(self.nodes.items()):
+            unknown = sorted(node.references - set(self.nodes))
+            if unknown:
+                missing[app_id] = unknown
+        return missing
+
+    def cycles(self) -> list[list[str]]:
+        """Return dependency cycles (strongly connected components).
+
+        Returns:
+            Each cycle as a sorted list of app IDs
+        """
+        index: dict[str, int] = {}
+        lowlink: dict[str, int] = {}
+        stack: list[str] = []
+        on_stack: set[str] = set()
+        cycles = []
+
+        def visit(app_id: str) -> None:
+            # Tarjan's algorithm; recursion depth is bounded by the number of apps
+            index[app_id] = lowlink[app_id] = len(index)
+            stack.append(app_id)
+            on_stack.add(app_id)
+            for required in sorted(self.nodes[app_id].requires & set(self.nodes)):
+                if required not in index:
+                    visit(required)
+                    lowlink[app_id] = min(lowlink[app_id], lowlink[required])
+                elif required in on_stack:
+                    lowlink[app_id] = min(lowlink[app_id], index[required])
+            if lowlink[app_id] == index[app_id]:
+                component = []
+                while True:
+                    member = stack.pop()
+                    on_stack.discard(member)
+                    component.append(member)
+                    if member == app_id:
+                        break
+                if len(component) > 1 or app_id in self.nodes[app_id].requires:
+                    cycles.append(sorted(component))
+
+        for app_id in sorted(self.nodes):
+            if app_id not in index:
+                visit(app_id)
+        return sorted(cycles)
+
+    def check(self) -> None:
+        """Validate the graph before building.
+
+        Raises:
+            DependencyError: If @ targets are missing or dependencies are cyclic
+        """
+        problems = [
+            f"{app_id}: unknown @ reference(s) {', '.join('@' + r for r in refs)}"
+            for app_id, refs in self.missing().items()
+        ]
+        problems.extend(
+            f"dependency cycle among: {', '.join(cycle)}" for cycle in self.cycles()
+        )
+        if problems:
+            raise DependencyError("\n".join(problems))
+
+    def waves(self, selected: set[str] | None = None) -> list[list[str]]:
+        """Order apps in topological waves.
+
+        Args:
+            selected: Apps to schedule (default: all). Dependencies outside
+                the selection are treated as already built.
+
+        Returns:
+            Waves of app IDs (sorted within each wave)
+
+        Raises:
+            DependencyError: If the selected apps contain a cycle
+        """
+        remaining = set(self.nodes) if selected is None else set(selected)
+        waves = []
+        while remaining:
+            wave = sorted(
+                app_id
+                for app_id in remaining
+                if not (self.nodes[app_id].requires & remaining) - {app_id}
+                and app_id not in self.nodes[app_id].requires
+            )
+            if not wave:
+                raise DependencyError(
+                    f"dependency cycle among: {', '.join(sorted(remaining))}"
+                )
+            waves.append(wave)
+            remaining.difference_update(wave)
+        return waves
+
+    def dependents_closure(self, changed: set[str]) -> set[str]:
+        """Return changed apps plus all apps that transitively depend on them.
+
+        Args:
+            changed: Changed app IDs
+
+        Returns:
+            App IDs to rebuild
+        """
+        closure = set()
+        pending = [app_id for app_id in changed if app_id in self.nodes]
+        while pending:
+            app_id = pending.pop()
+            if app_id in closure:
+                continue
+            closure.add(app_id)
+            pending.extend(self.dependents[app_id] - closure)
+        return closure
+
+
+def find_app_dirs(paths: list[Path]) -> list[Path]:
+    """Expand catalog directories into app definition directories.
+
+    Args:
+        paths: App definition directories, or directories containing them
+
+    Returns:
+        App definition directories (with metadata.yaml)
+    """
+    app_dirs = []
+    for path in paths:
+        if (path / "metadata.yaml").is_file():
+            app_dirs.append(path)
+        else:
+            app_dirs.extend(
+                sorted(p.parent for p in path.glob("*/metadata.yaml") if p.is_file())
+            )
+    return app_dirs
+
+
+def input_digest(input_dir: Path, prefix: str | None, suffix: str) -> str:
+    """Digest everything a build of an app depends on.
+
+    Args:
+        input_dir: App definition directory
+        prefix: Package name prefix
+        suffix: Package name suffix
+
+    Returns:
+        Hex digest of the tool version, naming options and all input files
+    """
+    h = hashlib.sha256(f"{__version__}\0{prefix or ''}\0{suffix}\0".encode())
+    for path in sorted(p for p in input_dir.rglob("*") if p.is_file()):
+        h.update(path.relative_to(input_dir).as_posix().encode() + b"\0")
+        h.update(hashlib.sha256(path.read_bytes()).digest())
+    return h.hexdigest()
+
+
+def load_build_state(output_dir: Path) -> dict[str, dict[str, Any]]:
+    """Load the per-app records of the last successful builds.
+
+    Args:
+        output_dir: Build output directory
+
+    Returns:
+        Records keyed by app ID (empty if missing or unreadable)
+    """
+    path = output_dir / BUILD_STATE_FILE
+    try:
+        state = json.loads(path.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return {}
+    except ValueError as e:
+        logger.warning(f"Ignoring unreadable build state {path}: {e}")
+        return {}
+    if state.get("version") != BUILD_STATE_VERSION:
+        return {}
+    return state.get("apps", {})
+
+
+def save_build_state(output_dir: Path, apps: dict[str, dict[str, Any]]) -> None:
+    """Write the per-app build records.
+
+    Args:
+        output_dir: Build output directory
+        apps: Records keyed by app ID
+    """
+    path = output_dir / BUILD_STATE_FILE
+    data = {"version": BUILD_STATE_VERSION, "apps": apps}
+    tmp = path.with_name(f".{path.name}.tmp")
+    tmp.write_text(json.dumps(data, indent=1, sort_keys=True), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def staged_files(
+    input_dir: Path,
+    prefix: str | None,
+    suffix: str,
+    validation_cache: ValidationCache | None = None,
+) -> dict[str, str] | None:
+    """Digest the staged files of an app for its build record.
+
+    Args:
+        input_dir: App definition directory
+        prefix: Package name prefix
+        suffix: Package name suffix
+        validation_cache: Optional validation cache shared between apps
+
+    Returns:
+        Planned digests (see plan.planned_digests()), or None if the app
+        cannot be staged
+    """
+    try:
+        _, files = planned_digests(
+            input_dir, prefix, suffix, validation_cache=validation_cache
+        )
+    except (PlanError, OSError, ValueError) as e:
+        logger.warning(f"Not recording staged files of {input_dir}: {e}")
+        return None
+    return files
+
+
+def save_build_record(output_dir: Path, app_id: str, record: dict[str, Any]) -> None:
+    """Add or replace one app's record in the build state.
+
+    Args:
+        output_dir: Build output directory
+        app_id: App identifier
+        record: Build record with "inputs", "deb_file", "digest" and "files"
+    """
+    state = load_build_state(output_dir)
+    state[app_id] = record
+    save_build_state(output_dir, state)
+
+
+def build_waves(
+    graph: DependencyGraph,
+    waves: list[list[str]],
+    output_dir: Path,
+    jobs: int | None = None,
+    prefix: str | None = None,
+    suffix: str = "container",
+    digests: dict[str, str] | None = None,
+    reproducible: bool = False,
+    compression: CompressionProfile | None = None,
+) -> dict[str, dict[str, Any]]:
+    """Build apps wave by wave, each wave in parallel.
+
+    Apps whose dependency failed are skipped. Successful builds are recorded
+    in the build state.
+
+    Args:
+        graph: Dependency graph
+        waves: Waves from DependencyGraph.waves()
+        output_dir: Directory for the built packages
+        jobs: Maximum parallel builds (default: CPU count)
+        prefix: Package name prefix
+        suffix: Package name suffix
+        digests: Input digests to record (computed if not given)
+        reproducible: Build reproducibly (see the build --reproducible option)
+        compression: Per-build compression profile overriding each app's
+            compression field
+
+    Returns:
+        Job result per app ID (see server.run_job); skipped apps have
+        status "skipped"
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+    state = load_build_state(output_dir)
+    cache = ValidationCache()
+    results: dict[str, dict[str, Any]] = {}
+    failed: set[str] = set()
+
+    def build(app_id: str) -> dict[str, Any]:
+        job = {
+            "type": "build",
+            "input_dir": str(graph.nodes[app_id].input_dir),
+            "output_dir": str(output_dir),
+            "prefix": prefix,
+            "suffix": suffix,
+            "reproducible": reproducible,
+        }
+        if compression is not None:
+            job["compression"] = {
+                "type": compression.type,
+                "level": compression.level,
+                "threads": compression.threads,
+            }
+        result = run_job(job, cache)
+        if result["exit_code"] == 0:
+            result["files"] = staged_files(
+                graph.nodes[app_id].input_dir, prefix, suffix, cache
+            )
+        return result
+
+    with ThreadPoolExecutor(max_workers=jobs or os.cpu_count() or 4) as executor:
+        for number, wave in enumerate(waves, 1):
+            blocked = [a for a in wave if graph.nodes[a].requires & failed]
+            for app_id in blocked:
+                failed.add(app_id)
+                results[app_id] = {"exit_code": None, "status": "skipped"}
+            runnable = [a for a in wave if a not in blocked]
+            logger.info(f"Wave {number}/{len(waves)}: {', '.join(runnable)}")
+            for app_id, result in zip(
+                runnable, executor.map(build, runnable), strict=True
+            ):
+                results[app_id] = result
+                if result["exit_code"] != 0:
+                    failed.add(app_id)
+                    continue
+                digest = (digests or {}).get(app_id) or input_digest(
+                    graph.nodes[app_id].input_dir, prefix, suffix
+                )
+                state[app_id] = {
+                    "inputs": digest,
+                    "deb_file": result.get("deb_file"),
+                    "digest": result.get("digest"),
+                }
+                if result.get("files") is not None:
+                    state[app_id]["files"] = result["files"]
+
+    save_build_state(output_dir, state)
+    return results
+
+
+def build_all_command(args: argparse.Namespace) -> int:
+    """Execute build-all subcommand.
+
+    Args:
+        args: Parsed build-all arguments
+
+    Returns:
+        Exit code (first failing app's exit code, or success)
+    """
+    from generate_container_packages.cli import (
+        EXIT_SUCCESS,
+        EXIT_VALIDATION_ERROR,
+        compression_from_args,
+    )
+
+    try:
+        compression = compression_from_args(args)
+    except ValueError as e:
+        print(f"ERROR: Invalid compression options: {e}", file=sys.stderr)
+        return EXIT_VALIDATION_ERROR
+
+    app_dirs = find_app_dirs([Path(p).resolve() for p in args.app_dirs])
+    if not app_dirs:
+        print("ERROR: No app definitions found", file=sys.stderr)
+        return EXIT_VALIDATION_ERROR
+
+    try:
+        graph = DependencyGraph.from_app_dirs(app_dirs)
+        graph.check()
+    except (DependencyError, KeyError, OSError, ValueError) as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return EXIT_VALIDATION_ERROR
+
+    output_dir = Path(args.output).resolve()
+    if args.plan:
+        plans = plan_apps(
+            [graph.nodes[a].input_dir for a in sorted(graph.nodes)],
+            load_build_state(output_dir),
+            prefix=args.prefix,
+            suffix=args.suffix,
+            jobs=args.jobs,
+        )
+        sys.stdout.write(format_plan(plans))
+        if any(p.status == "invalid" for p in plans):
+            return EXIT_VALIDATION_ERROR
+        return EXIT_SUCCESS
+
+    selected = None
+    digests: dict[str, str] = {}
+    if args.changed_only:
+        state = load_build_state(output_dir)
+        digests = {
+            app_id: input_digest(node.input_dir, args.prefix, args.suffix)
+            for app_id, node in graph.nodes.items()
+        }
+        changed = {
+            app_id
+            for app_id, digest in digests.items()
+            if state.get(app_id, {}).get("inputs") != digest
+        }
+        selected = graph.dependents_closure(changed)
+        print(
+            f"{len(changed)} changed, {len(selected) - len(changed)} dependents, "
+            f"{len(graph.nodes) - len(selected)} unchanged"
+        )
+
+    waves = graph.waves(selected)
+    for number, wave in enumerate(waves, 1):
+        print(f"Wave {number}: {' '.join(wave)}")
+    if args.dry_run or not waves:
+        return EXIT_SUCCESS
+
+    results = build_waves(
+        graph,
+        waves,
+        output_dir,
+        jobs=args.jobs,
+        prefix=args.prefix,
+        suffix=args.suffix,
+        digests=digests,
+        reproducible=args.reproducible,
+        compression=compression,
+    )
+
+    exit_code = EXIT_SUCCESS
+    for wave in waves:
+        for app_id in wave:
+            result = results[app_id]
+            if result["status"] == "success":
+                size = f" ({format_size(result['size'])}, {result['compression']})"
+                print(f"  ✓ {app_id}: {Path(result['deb_file']).name}{size}")
+                continue
+            if result["status"] == "skipped":
+                print(f"  - {app_id}: skipped (dependency failed)", file=sys.stderr)
+                continue
+            print(f"  ✗ {app_id}: {result.get('error')}", file=sys.stderr)
+            for error in result.get("errors", []):
+                print(f"      {error}", file=sys.stderr)
+            if exit_code == EXIT_SUCCESS:
+                exit_code = result["exit_code"]
+    return exit_code
+
+
+def create_build_all_argument_parser() -> argparse.ArgumentParser:
+    """Create argument parser for the build-all subcommand.
+
+    Returns:
+        Configured ArgumentParser instance
+    """
+    from generate_container_packages.cli import add_compression_arguments
+
+    parser = argparse.ArgumentParser(
+        prog="generate-container-packages build-all",
+        description=(
+            "Build many apps in dependency order, in parallel within each "
+            "topological wave"
+        ),
+    )
+    parser.add_argument(
+        "app_dirs",
+        metavar="DIR",
+        nargs="+",
+        help="App definition directories, or directories containing them",
+    )
+    parser.add_argument(
+        "-o", "--output", metavar="DIR", default=".", help="Output directory"
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        metavar="N",
+        help="Maximum parallel builds per wave (default: CPU count)",
+    )
+    parser.add_argument(
+        "--changed-only",
+        action="store_true",
+        help=(
+            "Only rebuild apps whose inputs changed since their last successful "
+            "build, plus the apps depending on them"
+        ),
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Only print the build waves",
+    )
+    parser.add_argument(
+        "--plan",
+        action="store_true",
+        help=(
+            "Only report which apps would produce changed packages (and which "
+            "files change) compared to the last build in the output directory"
+        ),
+    )
+    parser.add_argument(
+        "--reproducible",
+        action="store_true",
+        help="Build reproducibly, so identical inputs yield identical .debs",
+    )
+    parser.add_argument(
+        "--prefix", help="Package name prefix (e.g., 'marine', 'halos', 'casaos')"
+    )
+    parser.add_argument(
+        "--suffix",
+        default="container",
+        help="Package name suffix (default: 'container')",
+    )
+
+    add_compression_arguments(parser)
+
+    verbosity = parser.add_mutually_exclusive_group()
+    verbosity.add_argument(
+        "-v", "--verbose", action="store_true", help="Verbose output"
+    )
+    verbosity.add_argument("--debug", action="store_true", help="Debug output")
+    verbosity.add_argument("-q", "--quiet", action="store_true", help="Errors only")
+    return parser
@@ -0,0 +1,236 @@
+"""Build plans: which apps a build would actually change, without dpkg.
+
+A plan validates, loads and renders each app in memory, stages the package
+source tree (compose after all injections, env.template, prestart.sh,
+routing.yml, rendered debian/ files, copied inputs) and compares per-file
+digests with those recorded at the last successful build in
+.build-state.json. Each app is reported as unchanged, changed (with the
+affected files) or new, in milliseconds per app.
+
+Build timestamps (changelog and AppStream release date) are pinned to a
+fixed date while planning, so they never count as a change.
+"""
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+from generate_container_packages.builder import stage_package
+from generate_container_packages.loader import AppDefinition, load_input_files
+from generate_container_packages.renderer import render_templates
+from generate_container_packages.staging import FileDigestCache, StagedTree
+from generate_container_packages.validator import (
+    ValidationCache,
+    validate_input_directory,
+)
+
+logger = logging.getLogger(__name__)
+
+# Build date used for planned digests
+PLAN_DATE = datetime(1970, 1, 1, tzinfo=UTC)
+
+
+class PlanError(Exception):
+    """Raised when an app cannot be staged for planning."""
+
+
+@dataclass
+class AppPlan:
+    """What a build of one app would do.
+
+    Attributes:
+        input_dir: App definition directory
+        app_id: App identifier (directory name if metadata is unreadable)
+        status: "unchanged", "changed", "new" or "invalid"
+        files: Changed paths; added files are prefixed with "+", removed
+            files with "-"
+        error: Why the app cannot be built (status "invalid")
+    """
+
+    input_dir: str
+    app_id: str
+    status: str
+    files: list[str] = field(default_factory=list)
+    error: str | None = None
+
+    def describe(self) -> str:
+        """Describe the plan in one line."""
+        if self.status == "changed" and self.files:
+            return f"{self.app_id}: changed ({', '.join(self.files)})"
+        if self.status == "invalid":
+            return f"{self.app_id}: invalid ({self.error})"
+        return f"{self.app_id}: {self.status}"
+
+
+def stage_app(
+    input_dir: Path,
+    prefix: str | None = None,
+    suffix: str = "container",
+    validation_cache: ValidationCache | None = None,
+) -> tuple[str, StagedTree]:
+    """Stage an app in memory with build timestamps pinned to PLAN_DATE.
+
+    Args:
+        input_dir: App definition directory
+        prefix: Package name prefix
+        suffix: Package name suffix
+        validation_cache: Optional cache shared between apps
+
+    Returns:
+        Tuple of (app ID, staged package source tree)
+
+    Raises:
+        PlanError: If validation fails
+    """
+    validation = validate_input_directory(input_dir, cache=validation_cache)
+    if not validation.success:
+        raise PlanError("; ".join(validation.errors) or "Validation failed")
+
+    app_def = load_input_files(
+        input_dir, prefix=prefix, suffix=suffix, validation=validation
+    )
+    return app_def.metadata["app_id"], stage_definition(app_def)
+
+
+def stage_definition(app_def: AppDefinition) -> StagedTree:
+    """Stage a loaded app in memory with build timestamps pinned to PLAN_DATE.
+
+    Args:
+        app_def: Validated and loaded app (its build date is changed)
+
+    Returns:
+        Staged package source tree
+    """
+    app_def.set_build_date(PLAN_DATE)
+    return stage_package(app_def, render_templates(app_def))
+
+
+def staged_digests(
+    tree: StagedTree, digest_cache: FileDigestCache | None = None
+) -> dict[str, str]:
+    """Digest every file of a staged tree for a build record.
+
+    Args:
+        tree: Staged tree (see stage_definition())
+        digest_cache: Optional digest cache for copied input files
+
+    Returns:
+        Mapping of staged path to "<mode>:<sha256>"
+    """
+    return {
+        path: f"{tree.files[path].effective_mode():o}:{digest}"
+        for path, digest in tree.digests(digest_cache).items()
+    }
+
+
+def planned_digests(
+    input_dir: Path,
+    prefix: str | None = None,
+    suffix: str = "container",
+    validation_cache: ValidationCache | None = None,
+    digest_cache: FileDigestCache | None = None,
+) -> tuple[str, dict[str, str]]:
+    """Stage an app in memory and digest every file that would be packaged.
+
+    Args:
+        input_dir: App definition directory
+        prefix: Package name prefix
+        suffix: Package name suffix
+        validation_cache: Optional cache shared between apps
+        digest_cache: Optional digest cache for copied input files
+
+    Returns:
+        Tuple of (app ID, mapping of staged path to "<mode>:<sha256>")
+
+    Raises:
+        PlanError: If validation fails
+    """
+    app_id, tree = stage_app(input_dir, prefix, suffix, validation_cache)
+    return app_id, staged_digests(tree, digest_cache)
+
+
+def changed_files(old: dict[str, str], new: dict[str, str]) -> list[str]:
+    """List the differences between two sets of planned digests.
+
+    Args:
+        old: Recorded digests
+        new: Current digests
+
+    Returns:
+        Sorted paths: modified as is, added with "+", removed with "-"
+    """
+    changes = []
+    for path in sorted(old.keys() | new.keys()):
+        if path not in old:
+            changes.append(f"+{path}")
+        elif path not in new:
+            changes.append(f"-{path}")
+        elif old[path] != new[path]:
+            changes.append(path)
+    return changes
+
+
+def plan_apps(
+    app_dirs: list[Path],
+    records: dict[str, dict[str, Any]],
+    prefix: str | None = None,
+    suffix: str = "container",
+    jobs: int | None = None,
+) -> list[AppPlan]:
+    """Plan builds of several apps concurrently.
+
+    Args:
+        app_dirs: App definition directories
+        records: Build records keyed by app ID (see multibuild.load_build_state)
+        prefix: Package name prefix
+        suffix: Package name suffix
+        jobs: Maximum concurrent plans (default: executor default)
+
+    Returns:
+        One plan per directory, in input order
+    """
+    validation_cache = ValidationCache()
+    digest_cache = FileDigestCache()
+
+    def plan(input_dir: Path) -> AppPlan:
+        try:
+            app_id, digests = planned_digests(
+                input_dir, prefix, suffix, validation_cache, digest_cache
+            )
+        except Exception as e:
+            logger.debug(f"Planning {input_dir} failed", exc_info=True)
+            return AppPlan(str(input_dir), input_dir.name, "invalid", error=str(e))
+
+        record = records.get(app_id)
+        if record is None:
+            return AppPlan(str(input_dir), app_id, "new")
+        if "files" not in record:
+            # Built before file digests were recorded
+            return AppPlan(str(input_dir), app_id, "changed")
+        changes = changed_files(record["files"], digests)
+        status = "changed" if changes else "unchanged"
+        return AppPlan(str(input_dir), app_id, status, files=changes)
+
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        return list(executor.map(plan, app_dirs))
+
+
+def format_plan(plans: list[AppPlan]) -> str:
+    """Format plans for the terminal.
+
+    Args:
+        plans: Per-app plans
+
+    Returns:
+        One line per app plus a summary line
+    """
+    lines = [plan.describe() for plan in plans]
+    counts = {
+        status: sum(1 for p in plans if p.status == status)
+        for status in ("changed", "new", "unchanged", "invalid")
+    }
+    lines.append(", ".join(f"{count} {status}" for status, count in counts.items()))
+    return "\n".join(lines) + "\n"
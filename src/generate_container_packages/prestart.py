@@ -1,10 +1,18 @@
 """Prestart script generation for container apps."""
 
+import hashlib
 from typing import Any
 
 from generate_container_packages.labels import find_port_env_var
 from generate_container_packages.loader import AppDefinition
 
+# Routing command provided by the installed reverse proxy package
+ROUTING_COMMAND = "/usr/bin/configure-container-routing"
+# Routing declarations installed by the packages and read by the proxy
+ROUTING_DIR = "/etc/halos/routing.d"
+# Compose overrides with routing labels written by the proxy
+ROUTING_LABELS_DIR = "/run/halos/routing-labels"
+
 
 def get_homarr_url_expression(
     web_ui: dict[str, Any], default_config: dict[str, str] | None
@@ -50,9 +58,12 @@ def generate_prestart_script(app_def: AppDefinition) -> str:
 
     The prestart script:
     1. Creates the runtime env directory
-    2. Loads existing env files to access config values
-    3. Computes runtime values (HOSTNAME, HALOS_DOMAIN, HOMARR_URL)
-    4. Writes computed values to runtime.env
+    2. Fingerprints its inputs (env file mtimes and sizes, hostname and the
+       script's own generation logic) and exits early if runtime.env was
+       already generated from the same inputs
+    3. Loads existing env files to access config values
+    4. Computes runtime values (HOSTNAME, HALOS_DOMAIN, HOMARR_URL)
+    5. Writes computed values to runtime.env and records the fingerprint
 
     Args:
         app_def: Application definition
@@ -70,18 +81,10 @@ def generate_prestart_script(app_def: AppDefinition) -> str:
     etc_dir = f"/etc/container-apps/{package_name}"
     run_dir = f"/run/container-apps/{package_name}"
     runtime_env = f"{run_dir}/runtime.env"
+    env_files = f'"{etc_dir}/env.defaults" "{etc_dir}/env"'
 
-    # Build script
-    lines = [
-        "#!/bin/bash",
-        f"# Prestart script for {package_name}",
-        "# Auto-generated by container-packaging-tools",
-        "set -e",
-        "",
-        "# Create runtime directory",
-        f'RUNTIME_ENV="{runtime_env}"',
-        'mkdir -p "$(dirname "$RUNTIME_ENV")"',
-        "",
+    # Lines that compute runtime.env once the inputs have changed
+    generate = [
         "# Load config values from env files",
         "set -a",
         f'[ -f "{etc_dir}/env.defaults" ] && . "{etc_dir}/env.defaults"',
@@ -89,7 +92,7 @@ def generate_prestart_script(app_def: AppDefinition) -> str:
         "set +a",
         "",
         "# Set hostname",
-        'HOSTNAME="$(hostname -s)"',
+        'HOSTNAME="$SHORT_HOSTNAME"',
         'echo "HOSTNAME=$HOSTNAME" > "$RUNTIME_ENV"',
     ]
 
@@ -97,7 +100,7 @@ def generate_prestart_script(app_def: AppDefinition) -> str:
     # (explicit traefik config or implicit from web_ui.enabled)
     has_traefik = bool(traefik) or (web_ui and web_ui.get("enabled", False))
     if has_traefik:
-        lines.extend(
+        generate.extend(
             [
                 "",
                 "# Set HALOS_DOMAIN for Traefik routing",
@@ -109,7 +112,7 @@ def generate_prestart_script(app_def: AppDefinition) -> str:
     # Add HOMARR_URL if web_ui is enabled
     homarr_url_expr = get_homarr_url_expression(web_ui, default_config)
     if homarr_url_expr:
-        lines.extend(
+        generate.extend(
             [
                 "",
                 "# Compute Homarr URL",
@@ -118,7 +121,147 @@ def generate_prestart_script(app_def: AppDefinition) -> str:
             ]
         )
 
-    # Final newline
-    lines.append("")
+    # A package upgrade that changes the generated values must regenerate
+    # runtime.env even if the env files and hostname are unchanged
+    generator = hashlib.sha256("\n".join(generate).encode("utf-8")).hexdigest()[:16]
+
+    # Build script
+    lines = [
+        "#!/bin/bash",
+        f"# Prestart script for {package_name}",
+        "# Auto-generated by container-packaging-tools",
+        "set -e",
+        "",
+        "# Create runtime directory",
+        f'RUNTIME_ENV="{runtime_env}"',
+        'FINGERPRINT_FILE="$RUNTIME_ENV.fingerprint"',
+        'mkdir -p "${RUNTIME_ENV%/*}"',
+        "",
+        *_hostname_lines(),
+        "",
+        "# Skip regeneration if env files and hostname are unchanged since the",
+        "# last run (stat prints nothing for missing files)",
+        *_fingerprint_check_lines(generator, env_files, "$RUNTIME_ENV"),
+        "",
+        *generate,
+        "",
+        "# Record inputs of this runtime.env",
+        'echo "$FINGERPRINT" > "$FINGERPRINT_FILE"',
+        # Final newline
+        "",
+    ]
+
+    return "\n".join(lines)
+
+
+def generate_routing_prestart_script(
+    package_name: str, app_id: str, routing_yml: str
+) -> str:
+    """Generate the routing prestart script for a routed container app.
+
+    The script wraps the proxy's /usr/bin/configure-container-routing and
+    skips it when its inputs are unchanged since the last run: the routing
+    declaration (digest computed at build time plus the installed file's
+    mtime), the env files, the hostname and the routing command itself (so
+    that proxy upgrades regenerate labels). It also guarantees that the
+    compose override passed by ExecStart/ExecStop exists, writing an empty
+    one if the proxy produced none.
+
+    Args:
+        package_name: Debian package name
+        app_id: App identifier used for routing file names
+        routing_yml: Generated routing.yml content
+
+    Returns:
+        Bash script content as string
+    """
+    etc_dir = f"/etc/container-apps/{package_name}"
+    run_dir = f"/run/container-apps/{package_name}"
+    routing_file = f"{ROUTING_DIR}/{app_id}.yml"
+    inputs = (
+        f'"{routing_file}" "{etc_dir}/env.defaults" "{etc_dir}/env" "{ROUTING_COMMAND}"'
+    )
+    digest = hashlib.sha256(routing_yml.encode("utf-8")).hexdigest()[:16]
+
+    lines = [
+        "#!/bin/bash",
+        f"# Routing prestart script for {package_name}",
+        "# Auto-generated by container-packaging-tools",
+        "set -e",
+        "",
+        f'OVERRIDE="{routing_override_path(app_id)}"',
+        f'FINGERPRINT_FILE="{run_dir}/routing.fingerprint"',
+        'mkdir -p "${FINGERPRINT_FILE%/*}"',
+        "",
+        *_hostname_lines(),
+        "",
+        "# Skip routing configuration if routing.yml, env files, hostname and",
+        "# the proxy's routing command are unchanged since the last run",
+        *_fingerprint_check_lines(digest, inputs, "$OVERRIDE"),
+        "",
+        f"{ROUTING_COMMAND} {app_id}",
+        "",
+        "# ExecStart always passes the override; use an empty one if the proxy",
+        "# did not generate labels",
+        'if [ ! -f "$OVERRIDE" ]; then',
+        '    mkdir -p "${OVERRIDE%/*}"',
+        '    echo "services: {}" > "$OVERRIDE"',
+        "fi",
+        "",
+        "# Record inputs of this routing configuration",
+        'echo "$FINGERPRINT" > "$FINGERPRINT_FILE"',
+        "",
+    ]
 
     return "\n".join(lines)
+
+
+def routing_override_path(app_id: str) -> str:
+    """Return the compose override with routing labels for an app.
+
+    Args:
+        app_id: App identifier
+
+    Returns:
+        Absolute path of the override file generated by the proxy
+    """
+    return f"{ROUTING_LABELS_DIR}/{app_id}.yml"
+
+
+def _hostname_lines() -> list[str]:
+    """Shell lines setting SHORT_HOSTNAME without forking where possible."""
+    return [
+        "# Short hostname (read from the kernel to avoid forking hostname -s)",
+        "if ! { read -r SHORT_HOSTNAME < /proc/sys/kernel/hostname; } 2>/dev/null; then",
+        '    SHORT_HOSTNAME="$(hostname -s)"',
+        "fi",
+        'SHORT_HOSTNAME="${SHORT_HOSTNAME%%.*}"',
+    ]
+
+
+def _fingerprint_check_lines(generator: str, inputs: str, output: str) -> list[str]:
+    """Shell lines that exit early if the output is up to date.
+
+    FINGERPRINT combines the build-time generator digest, SHORT_HOSTNAME and
+    name, size and mtime of each input file (stat prints nothing for
+    missing files). The stored fingerprint is cleared before regeneration so
+    that a failed run is retried on the next start.
+
+    Args:
+        generator: Digest of the build-time inputs
+        inputs: Space-separated, quoted input file paths
+        output: Shell expression for the generated file
+
+    Returns:
+        Script lines (expects FINGERPRINT_FILE and SHORT_HOSTNAME to be set)
+    """
+    return [
+        f'FINGERPRINT="{generator} $SHORT_HOSTNAME '
+        f"$(stat --printf '%n %s %y;' -- {inputs} 2>/dev/null || true)\"",
+        f'if [ -f "{output}" ] && [ -f "$FINGERPRINT_FILE" ] &&',
+        '    read -r STORED_FINGERPRINT < "$FINGERPRINT_FILE" &&',
+        '    [ "$STORED_FINGERPRINT" = "$FINGERPRINT" ]; then',
+        "    exit 0",
+        "fi",
+        ': > "$FINGERPRINT_FILE"',
+    ]
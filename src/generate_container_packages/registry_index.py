@@ -0,0 +1,260 @@
+"""Compiled index of the routing and webapp registry directories.
+
+Every routed package installs /etc/halos/routing.d/<app_id>.yml and every
+package with a web UI /etc/halos/webapps.d/<package>.toml. Instead of having
+the proxy and homarr-container-adapter re-read and re-parse all of them on
+every reconfiguration, merge_registry_index() maintains one JSON document
+holding the parsed entries of both directories:
+
+    {
+      "version": 1,
+      "digest": "<sha256 of the section digests>",
+      "sections": {
+        "routing": {"digest": "...", "entries": {"<app_id>": {...}}},
+        "webapps": {"digest": "...", "entries": {"<package>": {...}}}
+      }
+    }
+
+Consumers load all routes in one read and detect changes by comparing a
+single digest. The merge itself is incremental: size and mtime of each
+source file are stored in the index, so only added or modified files are
+parsed and the index is rewritten only when something changed.
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import sys
+import tomllib
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+import yaml
+
+from generate_container_packages.prestart import ROUTING_DIR
+
+logger = logging.getLogger(__name__)
+
+INDEX_VERSION = 1
+WEBAPPS_DIR = "/etc/halos/webapps.d"
+DEFAULT_INDEX_PATH = "/run/halos/registry-index.json"
+
+
+def _parse_yaml(text: str) -> Any:
+    return yaml.safe_load(text)
+
+
+# Section name -> (file suffix, parser)
+SECTIONS: dict[str, tuple[str, Callable[[str], Any]]] = {
+    "routing": (".yml", _parse_yaml),
+    "webapps": (".toml", tomllib.loads),
+}
+
+
+@dataclass
+class IndexMerge:
+    """Result of merge_registry_index().
+
+    Attributes:
+        digest: Digest of the merged index
+        parsed: Source files parsed in this merge ("section/file")
+        removed: Entries dropped because their file disappeared
+        errors: Files that could not be parsed (left out of the index)
+        written: Whether the index file was rewritten
+    """
+
+    digest: str
+    parsed: list[str] = field(default_factory=list)
+    removed: list[str] = field(default_factory=list)
+    errors: list[str] = field(default_factory=list)
+    written: bool = False
+
+
+def content_digest(data: Any) -> str:
+    """Digest JSON-serializable data independently of key order.
+
+    Args:
+        data: Data to digest
+
+    Returns:
+        Hex SHA-256 digest of the canonical JSON encoding
+    """
+    encoded = json.dumps(data, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def load_registry_index(index_path: Path) -> dict[str, Any] | None:
+    """Load a registry index.
+
+    Args:
+        index_path: Index file
+
+    Returns:
+        Index document, or None if missing, unreadable or of another version
+    """
+    try:
+        index = json.loads(index_path.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return None
+    except ValueError as e:
+        logger.warning(f"Ignoring unreadable registry index {index_path}: {e}")
+        return None
+    if not isinstance(index, dict) or index.get("version") != INDEX_VERSION:
+        return None
+    return index
+
+
+def merge_registry_index(index_path: Path, source_dirs: dict[str, Path]) -> IndexMerge:
+    """Bring an index up to date with its source directories.
+
+    Args:
+        index_path: Index file (created if missing)
+        source_dirs: Source directory per section name (see SECTIONS);
+            missing directories yield empty sections
+
+    Returns:
+        Summary of the merge
+
+    Raises:
+        ValueError: If a section name is unknown
+    """
+    previous = load_registry_index(index_path) or {}
+    old_sections = previous.get("sections", {})
+    sections: dict[str, Any] = {}
+    result = IndexMerge(digest="")
+
+    for name, source_dir in sorted(source_dirs.items()):
+        if name not in SECTIONS:
+            raise ValueError(f"Unknown registry index section: {name}")
+        suffix, parse = SECTIONS[name]
+        old = old_sections.get(name, {})
+        old_entries = old.get("entries", {})
+        old_sources = old.get("sources", {})
+        entries: dict[str, Any] = {}
+        sources: dict[str, list[int]] = {}
+
+        paths = sorted(source_dir.glob(f"*{suffix}")) if source_dir.is_dir() else []
+        for path in paths:
+            stat = path.stat()
+            key = path.stem
+            signature = [stat.st_size, stat.st_mtime_ns]
+            if old_sources.get(path.name) == signature and key in old_entries:
+                entries[key] = old_entries[key]
+                sources[path.name] = signature
+                continue
+            try:
+                parsed = parse(path.read_text(encoding="utf-8"))
+                # Round-trip so entries compare equal to those loaded from JSON
+                entries[key] = json.loads(json.dumps(parsed, default=str))
+            except (OSError, ValueError, yaml.YAMLError) as e:
+                logger.warning(f"Skipping unparsable {path}: {e}")
+                result.errors.append(f"{name}/{path.name}")
+                continue
+            sources[path.name] = signature
+            result.parsed.append(f"{name}/{path.name}")
+
+        result.removed.extend(
+            f"{name}/{key}" for key in sorted(set(old_entries) - set(entries))
+        )
+        sections[name] = {
+            "digest": content_digest(entries),
+            "entries": entries,
+            "sources": sources,
+        }
+
+    result.digest = content_digest({n: s["digest"] for n, s in sections.items()})
+    index = {"version": INDEX_VERSION, "digest": result.digest, "sections": sections}
+    if index != previous:
+        data = json.dumps(index, sort_keys=True, indent=1).encode("utf-8")
+        index_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = index_path.with_name(f".{index_path.name}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, index_path)
+        result.written = True
+
+    logger.info(
+        f"Registry index {result.digest[:12]}: {len(result.parsed)} parsed, "
+        f"{len(result.removed)} removed, {len(result.errors)} errors"
+    )
+    return result
+
+
+def registry_index_command(args: argparse.Namespace) -> int:
+    """Execute registry-index subcommand.
+
+    Args:
+        args: Parsed registry-index arguments
+
+    Returns:
+        Exit code (validation error if a source file could not be parsed;
+        the index is still written without it)
+    """
+    from generate_container_packages.cli import EXIT_SUCCESS, EXIT_VALIDATION_ERROR
+
+    result = merge_registry_index(
+        Path(args.output),
+        {"routing": Path(args.routing_dir), "webapps": Path(args.webapps_dir)},
+    )
+    for error in result.errors:
+        print(f"ERROR: Cannot parse {error}", file=sys.stderr)
+
+    if args.print_digest:
+        print(result.digest)
+    else:
+        state = "updated" if result.written else "up to date"
+        print(
+            f"Registry index {state}: {args.output} (digest {result.digest[:12]}, "
+            f"{len(result.parsed)} parsed, {len(result.removed)} removed)"
+        )
+    return EXIT_VALIDATION_ERROR if result.errors else EXIT_SUCCESS
+
+
+def create_registry_index_argument_parser() -> argparse.ArgumentParser:
+    """Create argument parser for the registry-index subcommand.
+
+    Returns:
+        Configured ArgumentParser instance
+    """
+    parser = argparse.ArgumentParser(
+        prog="generate-container-packages registry-index",
+        description=(
+            "Merge the routing and webapp registry directories into one "
+            "versioned JSON index with a content digest"
+        ),
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        metavar="FILE",
+        default=DEFAULT_INDEX_PATH,
+        help=f"Index file (default: {DEFAULT_INDEX_PATH})",
+    )
+    parser.add_argument(
+        "--routing-dir",
+        metavar="DIR",
+        default=ROUTING_DIR,
+        help=f"Routing declarations (default: {ROUTING_DIR})",
+    )
+    parser.add_argument(
+        "--webapps-dir",
+        metavar="DIR",
+        default=WEBAPPS_DIR,
+        help=f"Webapp registry files (default: {WEBAPPS_DIR})",
+    )
+    parser.add_argument(
+        "--print-digest",
+        action="store_true",
+        help="Only print the index digest (for change detection in scripts)",
+    )
+
+    verbosity = parser.add_mutually_exclusive_group()
+    verbosity.add_argument(
+        "-v", "--verbose", action="store_true", help="Verbose output"
+    )
+    verbosity.add_argument("--debug", action="store_true", help="Debug output")
+    verbosity.add_argument("-q", "--quiet", action="store_true", help="Errors only")
+    return parser
@@ -1,12 +1,22 @@
 """Jinja2 template rendering engine for package file generation."""
 
+import dataclasses
+import functools
+import hashlib
+import json
 import os
+import shlex
 from pathlib import Path
+from typing import Any
 
-from jinja2 import Environment, FileSystemLoader, TemplateError
+from jinja2 import Environment, FileSystemLoader, TemplateError, meta
 
 from generate_container_packages.loader import AppDefinition
 from generate_container_packages.template_context import build_context
+from generate_container_packages.timing import phase
+
+# Rendered debian/ files that must be installed executable (755)
+EXECUTABLE_DEBIAN_FILES = ("rules", "postinst", "prerm", "postrm")
 
 
 def setup_jinja_environment(template_dir: Path) -> Environment:
@@ -31,12 +41,17 @@ def setup_jinja_environment(template_dir: Path) -> Environment:
         lstrip_blocks=True,
         keep_trailing_newline=True,
     )
+    # Quote values embedded in maintainer scripts
+    env.filters["shquote"] = shlex.quote
 
     return env
 
 
 def render_all_templates(
-    app_def: AppDefinition, output_dir: Path, template_dir: Path | None = None
+    app_def: AppDefinition,
+    output_dir: Path,
+    template_dir: Path | None = None,
+    cache: "RenderCache | None" = None,
 ) -> None:
     """Render all templates and write to output directory.
 
@@ -44,49 +59,84 @@ def render_all_templates(
         app_def: Application definition with all parsed data
         output_dir: Directory to write rendered files
         template_dir: Template directory (defaults to installed location or local)
+        cache: Optional render cache for skipping unchanged templates
 
     Raises:
         TemplateError: If template rendering fails
         OSError: If file writing fails
     """
+    rendered = render_templates(app_def, template_dir, cache=cache)
+
+    # Create output directories
+    debian_dir = output_dir / "debian"
+    debian_dir.mkdir(parents=True, exist_ok=True)
+
+    for relative_path, content in rendered.items():
+        write_rendered_file(content, output_dir / relative_path)
+
+    # Set executable permissions on debian/rules and maintainer scripts
+    _set_executable_permissions(debian_dir)
+
+
+def render_templates(
+    app_def: AppDefinition,
+    template_dir: Path | None = None,
+    cache: "RenderCache | None" = None,
+) -> dict[str, str]:
+    """Render all templates in memory.
+
+    Args:
+        app_def: Application definition with all parsed data
+        template_dir: Template directory (defaults to installed location or local)
+        cache: Optional render cache. Templates whose referenced context
+            variables are unchanged since the previous call are not re-rendered.
+
+    Returns:
+        Mapping of output path relative to the source directory
+        (e.g., "debian/control") to rendered content, including static files
+
+    Raises:
+        TemplateError: If template rendering fails
+    """
     # Determine template directory
     if template_dir is None:
         template_dir = _find_template_directory()
 
-    # Set up Jinja2 environment
-    env = setup_jinja_environment(template_dir)
+    # Set up Jinja2 environment (reused across calls for compiled templates)
+    env = _get_environment(template_dir)
 
     # Build template context
-    context = build_context(app_def)
-
-    # Create output directories
-    debian_dir = output_dir / "debian"
-    debian_dir.mkdir(parents=True, exist_ok=True)
+    with phase("context"):
+        context = build_context(app_def)
+    package_name = context["package"]["name"]
 
     # Define templates to render
     templates = {
         # Debian control files
-        "debian/control.j2": debian_dir / "control",
-        "debian/rules.j2": debian_dir / "rules",
-        "debian/changelog.j2": debian_dir / "changelog",
-        "debian/copyright.j2": debian_dir / "copyright",
+        "debian/control.j2": "debian/control",
+        "debian/rules.j2": "debian/rules",
+        "debian/changelog.j2": "debian/changelog",
+        "debian/copyright.j2": "debian/copyright",
         # Maintainer scripts
-        "debian/postinst.j2": debian_dir / "postinst",
-        "debian/prerm.j2": debian_dir / "prerm",
-        "debian/postrm.j2": debian_dir / "postrm",
+        "debian/postinst.j2": "debian/postinst",
+        "debian/prerm.j2": "debian/prerm",
+        "debian/postrm.j2": "debian/postrm",
+        "debian/triggers.j2": "debian/triggers",
         # systemd service
-        "systemd/service.j2": debian_dir / f"{context['package']['name']}.service",
+        "systemd/service.j2": f"debian/{package_name}.service",
         # AppStream metadata
-        "appstream/metainfo.xml.j2": debian_dir
-        / f"{context['package']['name']}.metainfo.xml",
+        "appstream/metainfo.xml.j2": f"debian/{package_name}.metainfo.xml",
     }
 
+    rendered: dict[str, str] = {}
+
     # Render each template
     for template_path, output_path in templates.items():
         try:
-            template = env.get_template(template_path)
-            rendered = template.render(context)
-            write_rendered_file(rendered, output_path)
+            with phase(f"render:{template_path}"):
+                rendered[output_path] = _render_template(
+                    env, template_path, context, cache
+                )
         except TemplateError as e:
             raise TemplateError(
                 f"Failed to render template {template_path}: {e}"
@@ -94,13 +144,123 @@ def render_all_templates(
 
     # Render file watcher systemd units if configured
     if context.get("has_file_watchers"):
-        _render_file_watcher_templates(env, context, debian_dir)
+        with phase("render:file-watchers"):
+            rendered.update(_render_file_watcher_templates(env, context, cache))
 
     # Copy static files (compat)
-    _copy_static_files(template_dir, debian_dir)
+    rendered.update(_read_static_files(template_dir))
 
-    # Set executable permissions on debian/rules and maintainer scripts
-    _set_executable_permissions(debian_dir)
+    return rendered
+
+
+def render_metainfo(app_def: AppDefinition, template_dir: Path | None = None) -> str:
+    """Render only the AppStream metainfo of an app.
+
+    Args:
+        app_def: Application definition with all parsed data
+        template_dir: Template directory (defaults to installed location or local)
+
+    Returns:
+        Rendered metainfo XML
+
+    Raises:
+        TemplateError: If template rendering fails
+    """
+    env = _get_environment(template_dir or _find_template_directory())
+    with phase("context"):
+        context = build_context(app_def)
+    with phase("render:appstream/metainfo.xml.j2"):
+        return env.get_template("appstream/metainfo.xml.j2").render(context)
+
+
+class RenderCache:
+    """Memo of rendered template output for repeated renders of one app.
+
+    Each entry is keyed by the values of the context variables the template
+    actually references, so editing e.g. the web UI port re-renders the
+    templates that use it and leaves the rest untouched.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty cache."""
+        self._variables: dict[tuple[int, str], frozenset[str]] = {}
+        self._rendered: dict[tuple[int, str], tuple[str, str]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, env: Environment, template_path: str, context: dict) -> str:
+        """Render a template, reusing the previous output if inputs match.
+
+        Args:
+            env: Jinja2 environment
+            template_path: Template name relative to the template directory
+            context: Template context
+
+        Returns:
+            Rendered content
+        """
+        key = (id(env), template_path)
+        variables = self._variables.get(key)
+        if variables is None:
+            assert env.loader is not None
+            source = env.loader.get_source(env, template_path)[0]
+            variables = frozenset(meta.find_undeclared_variables(env.parse(source)))
+            self._variables[key] = variables
+
+        fingerprint = _context_fingerprint(context, variables)
+        cached = self._rendered.get(key)
+        if cached is not None and cached[0] == fingerprint:
+            self.hits += 1
+            return cached[1]
+
+        self.misses += 1
+        rendered = env.get_template(template_path).render(context)
+        self._rendered[key] = (fingerprint, rendered)
+        return rendered
+
+
+def _render_template(
+    env: Environment,
+    template_path: str,
+    context: dict,
+    cache: RenderCache | None,
+) -> str:
+    """Render one template, going through the cache if one is given."""
+    if cache is not None:
+        return cache.render(env, template_path, context)
+    return env.get_template(template_path).render(context)
+
+
+def _context_fingerprint(context: dict, variables: frozenset[str]) -> str:
+    """Digest the subset of a template context that a template references.
+
+    Args:
+        context: Template context
+        variables: Names of top-level context variables to include
+
+    Returns:
+        Hex digest of the referenced context values
+    """
+    subset = {name: context.get(name) for name in sorted(variables)}
+    encoded = json.dumps(subset, sort_keys=True, default=_fingerprint_default)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def _fingerprint_default(value: Any) -> Any:
+    """Serialize context values that JSON does not handle natively."""
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return dataclasses.asdict(value)
+    return repr(value)
+
+
+@functools.lru_cache(maxsize=8)
+def _get_environment(template_dir: Path) -> Environment:
+    """Return a shared Jinja2 environment for a template directory.
+
+    Jinja2 keeps compiled templates on the environment, so sharing it lets
+    repeated renders in one process skip template compilation.
+    """
+    return setup_jinja_environment(template_dir)
 
 
 def write_rendered_file(content: str, output_path: Path) -> None:
@@ -134,51 +294,59 @@ def _find_template_directory() -> Path:
 
 
 def _render_file_watcher_templates(
-    env: Environment, context: dict, debian_dir: Path
-) -> None:
+    env: Environment, context: dict, cache: RenderCache | None = None
+) -> dict[str, str]:
     """Render systemd path and watcher service templates for file watchers.
 
+    One unit pair is rendered per entry in context["watcher_units"], which
+    holds several watchers when coalesce_file_watchers is enabled.
+
     Args:
         env: Jinja2 environment
         context: Template context
-        debian_dir: Output directory for debian files
-    """
-    from typing import Any
-
-    path_template = env.get_template("systemd/path.j2")
-    service_template = env.get_template("systemd/watcher-service.j2")
+        cache: Optional render cache
 
+    Returns:
+        Mapping of output path relative to the source directory to content
+    """
     package_name = context["package"]["name"]
+    rendered: dict[str, str] = {}
 
-    for watcher in context["file_watchers"]:
+    for watcher in context["watcher_units"]:
         # Create watcher-specific context
         watcher_context: dict[str, Any] = {**context, "watcher": watcher}
+        unit_name = f"{package_name}-watcher-{watcher['name']}"
 
         # Render .path unit
-        path_output = debian_dir / f"{package_name}-watcher-{watcher['name']}.path"
-        rendered = path_template.render(watcher_context)
-        write_rendered_file(rendered, path_output)
+        rendered[f"debian/{unit_name}.path"] = _render_template(
+            env, "systemd/path.j2", watcher_context, cache
+        )
 
         # Render watcher .service unit
-        service_output = (
-            debian_dir / f"{package_name}-watcher-{watcher['name']}.service"
+        rendered[f"debian/{unit_name}.service"] = _render_template(
+            env, "systemd/watcher-service.j2", watcher_context, cache
         )
-        rendered = service_template.render(watcher_context)
-        write_rendered_file(rendered, service_output)
+
+    return rendered
 
 
-def _copy_static_files(template_dir: Path, output_dir: Path) -> None:
-    """Copy static template files (non-.j2 files).
+def _read_static_files(template_dir: Path) -> dict[str, str]:
+    """Read static template files (non-.j2 files).
 
     Args:
         template_dir: Source template directory
-        output_dir: Destination directory
+
+    Returns:
+        Mapping of output path relative to the source directory to content
     """
-    # Copy debian/compat (static file)
+    static_files: dict[str, str] = {}
+
+    # debian/compat (static file)
     compat_src = template_dir / "debian" / "compat"
     if compat_src.exists():
-        compat_dst = output_dir / "compat"
-        compat_dst.write_text(compat_src.read_text())
+        static_files["debian/compat"] = compat_src.read_text()
+
+    return static_files
 
 
 def _set_executable_permissions(debian_dir: Path) -> None:
@@ -187,15 +355,7 @@ def _set_executable_permissions(debian_dir: Path) -> None:
     Args:
         debian_dir: Path to debian/ directory
     """
-    # Scripts that need to be executable
-    executable_files = [
-        "rules",
-        "postinst",
-        "prerm",
-        "postrm",
-    ]
-
-    for filename in executable_files:
+    for filename in EXECUTABLE_DEBIAN_FILES:
         filepath = debian_dir / filename
         if filepath.exists():
             # Set executable: owner, group, others (755)
@@ -0,0 +1,442 @@
+"""Incremental APT repository index for a directory of built packages.
+
+The output directory of the build can be published as a flat APT repository
+(`deb [trusted=yes] https://example.com/apps ./`). Instead of re-reading the
+control member of every .deb on each publish, RepositoryIndex keeps a state
+file with the stanza and checksums of each package, keyed by file name, size
+and mtime. Only added or replaced packages are read; Packages, Packages.gz and
+Release are rewritten only when the package set changed.
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import logging
+import os
+import subprocess
+import sys
+from dataclasses import asdict, dataclass, field
+from datetime import UTC, datetime
+from email.utils import format_datetime
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+# State file kept next to the indices (not served to APT clients)
+STATE_FILE = ".repo-index.json"
+STATE_VERSION = 1
+
+# Checksum fields in Packages stanzas and Release sections
+CHECKSUMS = (
+    ("MD5sum", "MD5Sum", "md5"),
+    ("SHA1", "SHA1", "sha1"),
+    ("SHA256", "SHA256", "sha256"),
+)
+
+
+class RepositoryError(Exception):
+    """Raised when a package cannot be indexed."""
+
+
+@dataclass
+class PackageEntry:
+    """Indexed state of one .deb file.
+
+    Attributes:
+        filename: Path relative to the repository root
+        size: File size in bytes
+        mtime_ns: Modification time used to detect replaced files
+        package: Package name
+        version: Package version
+        architecture: Package architecture
+        stanza: Complete Packages stanza (without trailing blank line)
+    """
+
+    filename: str
+    size: int
+    mtime_ns: int
+    package: str
+    version: str
+    architecture: str
+    stanza: str
+
+
+@dataclass
+class IndexUpdate:
+    """Result of RepositoryIndex.update().
+
+    Attributes:
+        added: File names indexed for the first time
+        replaced: File names whose content changed
+        removed: File names no longer present
+        unchanged: Number of packages reused from the state file
+        written: Whether Packages/Packages.gz/Release were rewritten
+    """
+
+    added: list[str] = field(default_factory=list)
+    replaced: list[str] = field(default_factory=list)
+    removed: list[str] = field(default_factory=list)
+    unchanged: int = 0
+    written: bool = False
+
+    @property
+    def changed(self) -> bool:
+        """Whether the package set differs from the previous index."""
+        return bool(self.added or self.replaced or self.removed)
+
+
+class RepositoryIndex:
+    """Flat APT repository index maintained incrementally."""
+
+    def __init__(
+        self,
+        repo_dir: Path,
+        origin: str | None = None,
+        label: str | None = None,
+        suite: str | None = None,
+        codename: str | None = None,
+    ) -> None:
+        """Initialize index for a repository directory.
+
+        Args:
+            repo_dir: Directory containing the .deb files (searched recursively)
+            origin: Release Origin field
+            label: Release Label field
+            suite: Release Suite field
+            codename: Release Codename field
+
+        Release fields that are not given keep the values stored in the
+        state file by an earlier run.
+        """
+        self.repo_dir = repo_dir
+        self.release_fields = {
+            "Origin": origin,
+            "Label": label,
+            "Suite": suite,
+            "Codename": codename,
+        }
+        self.entries: dict[str, PackageEntry] = {}
+        self._stored_release: dict[str, str | None] = {}
+        self._load_state()
+
+    def update(self) -> IndexUpdate:
+        """Synchronize the index with the .deb files in the repository.
+
+        Returns:
+            Summary of the changes
+
+        Raises:
+            RepositoryError: If a new or changed package cannot be read
+        """
+        result = self.scan()
+        if (
+            result.changed
+            or self.release_fields != self._stored_release
+            or not (self.repo_dir / "Release").exists()
+        ):
+            self.write_indices()
+            result.written = True
+            self._save_state()
+            self._stored_release = dict(self.release_fields)
+
+        logger.info(
+            f"Repository index: {len(result.added)} added, "
+            f"{len(result.replaced)} replaced, {len(result.removed)} removed, "
+            f"{result.unchanged} unchanged"
+        )
+        return result
+
+    def scan(self) -> IndexUpdate:
+        """Synchronize the in-memory entries with the .deb files, writing nothing.
+
+        Returns:
+            Summary of the changes (written is always False)
+
+        Raises:
+            RepositoryError: If a new or changed package cannot be read
+        """
+        result = IndexUpdate()
+        found: dict[str, os.stat_result] = {}
+        for deb in sorted(self.repo_dir.rglob("*.deb")):
+            found[deb.relative_to(self.repo_dir).as_posix()] = deb.stat()
+
+        for filename in sorted(set(self.entries) - set(found)):
+            del self.entries[filename]
+            result.removed.append(filename)
+
+        for filename, stat in found.items():
+            entry = self.entries.get(filename)
+            if (
+                entry is not None
+                and entry.size == stat.st_size
+                and entry.mtime_ns == stat.st_mtime_ns
+            ):
+                result.unchanged += 1
+                continue
+            self.entries[filename] = self._index_package(filename, stat)
+            (result.added if entry is None else result.replaced).append(filename)
+        return result
+
+    def packages_text(self) -> str:
+        """Return the Packages file content (sorted by name, version, file)."""
+        entries = sorted(
+            self.entries.values(),
+            key=lambda e: (e.package, e.version, e.filename),
+        )
+        return "".join(f"{entry.stanza}\n\n" for entry in entries)
+
+    def write_indices(self, date: datetime | None = None) -> None:
+        """Write Packages, Packages.gz and Release.
+
+        Args:
+            date: Release date (default: now)
+        """
+        packages = self.packages_text().encode("utf-8")
+        # mtime=0 keeps Packages.gz identical for identical content
+        packages_gz = gzip.compress(packages, compresslevel=9, mtime=0)
+        _write_atomic(self.repo_dir / "Packages", packages)
+        _write_atomic(self.repo_dir / "Packages.gz", packages_gz)
+        _write_atomic(
+            self.repo_dir / "Release",
+            self._release_text(
+                {"Packages": packages, "Packages.gz": packages_gz},
+                date or datetime.now(UTC),
+            ).encode("utf-8"),
+        )
+
+    def _release_text(self, files: dict[str, bytes], date: datetime) -> str:
+        architectures = sorted({e.architecture for e in self.entries.values()})
+        lines = [
+            f"{name}: {value}" for name, value in self.release_fields.items() if value
+        ]
+        lines.append(f"Date: {format_datetime(date.astimezone(UTC), usegmt=True)}")
+        if architectures:
+            lines.append(f"Architectures: {' '.join(architectures)}")
+        for _, section, algorithm in CHECKSUMS:
+            lines.append(f"{section}:")
+            for name, data in files.items():
+                digest = hashlib.new(algorithm, data).hexdigest()
+                lines.append(f" {digest} {len(data):>16} {name}")
+        return "\n".join(lines) + "\n"
+
+    def _index_package(self, filename: str, stat: os.stat_result) -> PackageEntry:
+        path = self.repo_dir / filename
+        control = read_control_fields(path)
+        fields = parse_control(control)
+        for required in ("Package", "Version", "Architecture"):
+            if required not in fields:
+                raise RepositoryError(f"{filename}: control has no {required} field")
+
+        digests = _hash_file(path)
+        stanza = [
+            control.rstrip("\n"),
+            f"Filename: ./{filename}",
+            f"Size: {stat.st_size}",
+        ]
+        stanza.extend(
+            f"{name}: {digests[algorithm]}" for name, _, algorithm in CHECKSUMS
+        )
+
+        return PackageEntry(
+            filename=filename,
+            size=stat.st_size,
+            mtime_ns=stat.st_mtime_ns,
+            package=fields["Package"],
+            version=fields["Version"],
+            architecture=fields["Architecture"],
+            stanza="\n".join(stanza),
+        )
+
+    def _load_state(self) -> None:
+        path = self.repo_dir / STATE_FILE
+        try:
+            state = json.loads(path.read_text(encoding="utf-8"))
+            if state.get("version") != STATE_VERSION:
+                return
+            self.entries = {e["filename"]: PackageEntry(**e) for e in state["packages"]}
+            stored = state.get("release", {})
+            self._stored_release = dict(stored)
+            for name, value in self.release_fields.items():
+                if value is None:
+                    self.release_fields[name] = stored.get(name)
+        except FileNotFoundError:
+            return
+        except (ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Ignoring unreadable repository state {path}: {e}")
+            self.entries = {}
+
+    def _save_state(self) -> None:
+        state = {
+            "version": STATE_VERSION,
+            "release": self.release_fields,
+            "packages": [asdict(e) for e in self.entries.values()],
+        }
+        _write_atomic(
+            self.repo_dir / STATE_FILE,
+            json.dumps(state, indent=1, sort_keys=True).encode("utf-8"),
+        )
+
+
+def read_control_fields(deb_file: Path) -> str:
+    """Read the control paragraph of a .deb.
+
+    Args:
+        deb_file: Package file
+
+    Returns:
+        Control file text as printed by dpkg-deb
+
+    Raises:
+        RepositoryError: If dpkg-deb fails
+        FileNotFoundError: If dpkg-deb is not installed
+    """
+    try:
+        result = subprocess.run(
+            ["dpkg-deb", "--field", str(deb_file)],
+            capture_output=True,
+            text=True,
+            check=False,
+        )
+    except FileNotFoundError as e:
+        raise FileNotFoundError(
+            "dpkg-deb not found. Install with: apt install dpkg"
+        ) from e
+    if result.returncode != 0:
+        raise RepositoryError(
+            f"Cannot read control fields of {deb_file.name}: {result.stderr.strip()}"
+        )
+    return result.stdout
+
+
+def parse_control(text: str) -> dict[str, str]:
+    """Parse a single deb822 paragraph.
+
+    Continuation lines are joined with newlines.
+
+    Args:
+        text: Paragraph text
+
+    Returns:
+        Field name to value mapping
+    """
+    fields: dict[str, str] = {}
+    name = None
+    for line in text.splitlines():
+        if line[:1] in (" ", "\t") and name is not None:
+            fields[name] += "\n" + line
+        elif ":" in line:
+            name, value = line.split(":", 1)
+            fields[name] = value.strip()
+    return fields
+
+
+def _hash_file(path: Path) -> dict[str, str]:
+    hashes = {algorithm: hashlib.new(algorithm) for _, _, algorithm in CHECKSUMS}
+    with open(path, "rb") as f:
+        while chunk := f.read(1024 * 1024):
+            for h in hashes.values():
+                h.update(chunk)
+    return {algorithm: h.hexdigest() for algorithm, h in hashes.items()}
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    tmp = path.with_name(f".{path.name}.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+def repo_index_command(args: argparse.Namespace) -> int:
+    """Execute repo-index subcommand.
+
+    Args:
+        args: Parsed repo-index arguments
+
+    Returns:
+        Exit code
+    """
+    from generate_container_packages.cli import (
+        EXIT_BUILD_ERROR,
+        EXIT_DEPENDENCY_ERROR,
+        EXIT_SUCCESS,
+        EXIT_VALIDATION_ERROR,
+    )
+
+    repo_dir = Path(args.repo_dir).resolve()
+    if not repo_dir.is_dir():
+        print(f"ERROR: Not a directory: {repo_dir}", file=sys.stderr)
+        return EXIT_VALIDATION_ERROR
+
+    index = RepositoryIndex(
+        repo_dir,
+        origin=args.origin,
+        label=args.label,
+        suite=args.suite,
+        codename=args.codename,
+    )
+    try:
+        result = index.update()
+    except RepositoryError as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return EXIT_BUILD_ERROR
+    except FileNotFoundError as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return EXIT_DEPENDENCY_ERROR
+
+    print_index_update(result, repo_dir)
+    return EXIT_SUCCESS
+
+
+def print_index_update(result: IndexUpdate, repo_dir: Path) -> None:
+    """Print a one-line summary of an index update.
+
+    Args:
+        result: Update result
+        repo_dir: Repository directory
+    """
+    state = "updated" if result.written else "up to date"
+    print(
+        f"Repository index {state}: {repo_dir} "
+        f"({len(result.added)} added, {len(result.replaced)} replaced, "
+        f"{len(result.removed)} removed, {result.unchanged} unchanged)"
+    )
+
+
+def add_release_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add Release field options to a parser.
+
+    Args:
+        parser: Parser to extend
+    """
+    group = parser.add_argument_group("repository Release fields")
+    group.add_argument("--origin", metavar="TEXT", help="Release Origin field")
+    group.add_argument("--label", metavar="TEXT", help="Release Label field")
+    group.add_argument("--suite", metavar="NAME", help="Release Suite field")
+    group.add_argument("--codename", metavar="NAME", help="Release Codename field")
+
+
+def create_repo_index_argument_parser() -> argparse.ArgumentParser:
+    """Create argument parser for the repo-index subcommand.
+
+    Returns:
+        Configured ArgumentParser instance
+    """
+    parser = argparse.ArgumentParser(
+        prog="generate-container-packages repo-index",
+        description=(
+            "Incrementally update Packages, Packages.gz and Release for a "
+            "directory of built packages"
+        ),
+    )
+    parser.add_argument(
+        "repo_dir", metavar="DIR", help="Directory containing .deb files"
+    )
+    add_release_arguments(parser)
+
+    verbosity = parser.add_mutually_exclusive_group()
+    verbosity.add_argument(
+        "-v", "--verbose", action="store_true", help="Verbose output"
+    )
+    verbosity.add_argument("--debug", action="store_true", help="Debug output")
+    verbosity.add_argument("-q", "--quiet", action="store_true", help="Errors only")
+    return parser
@@ -0,0 +1,511 @@
+"""Long-running build daemon with a local JSON API.
+
+`generate-container-packages serve` keeps pydantic schemas, Jinja2 templates
+and per-file validation results warm and executes validate, render, build
+and convert jobs submitted over a Unix socket (one JSON object per line) or
+a localhost-only HTTP endpoint (POST /jobs). Jobs run concurrently on a
+bounded worker pool and report the same exit codes as the CLI.
+
+The Unix socket is only accessible to the user. HTTP requests must carry
+the token the daemon writes to a 0600 file at start-up, a JSON content
+type and a localhost Host header; requests with an Origin header are
+refused, so web pages cannot submit jobs (cross-site or via DNS rebinding).
+"""
+
+import argparse
+import errno
+import hmac
+import json
+import logging
+import os
+import secrets
+import socket
+import socketserver
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any
+
+from jinja2 import TemplateError
+from pydantic import ValidationError
+
+from generate_container_packages.builder import (
+    BuildError,
+    CompressionProfile,
+    build_staged_package,
+    package_digest,
+    package_sizes,
+    resolve_compression,
+    stage_package,
+)
+from generate_container_packages.client import (
+    EXIT_DEPENDENCY_ERROR,
+    JOB_TYPES,
+    default_socket_path,
+    default_token_path,
+)
+from generate_container_packages.loader import load_input_files
+from generate_container_packages.renderer import render_templates
+from generate_container_packages.template_context import VolumeOwnershipError
+from generate_container_packages.validator import (
+    ValidationCache,
+    validate_input_directory,
+)
+
+logger = logging.getLogger(__name__)
+
+# Largest accepted request body (bytes)
+MAX_REQUEST_SIZE = 1024 * 1024
+
+# Host header values accepted by the HTTP API (port stripped)
+ALLOWED_HOSTS = ("localhost", "127.0.0.1")
+
+
+class JobRunner:
+    """Execute jobs on a bounded thread pool with shared warm caches."""
+
+    def __init__(self, workers: int | None = None) -> None:
+        """Initialize runner.
+
+        Args:
+            workers: Maximum concurrent jobs (default: CPU count)
+        """
+        self.workers = workers or os.cpu_count() or 4
+        self.validation_cache = ValidationCache()
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix="job"
+        )
+
+    def run(self, job: Any) -> dict[str, Any]:
+        """Run one job on the pool and wait for its result.
+
+        Args:
+            job: Decoded job request
+
+        Returns:
+            Job result dictionary (always contains exit_code)
+        """
+        return self._executor.submit(run_job, job, self.validation_cache).result()
+
+    def shutdown(self) -> None:
+        """Wait for running jobs and stop the pool."""
+        self._executor.shutdown(wait=True)
+
+
+def run_job(
+    job: Any, validation_cache: ValidationCache | None = None
+) -> dict[str, Any]:
+    """Execute a single job request.
+
+    Job requests are JSON objects with a "type" of validate, render, build
+    or convert. validate/render/build take "input_dir" plus optional
+    "output_dir", "prefix", "suffix", "reproducible" and "compression"
+    (object with "type", "level" and "threads"); convert takes "source", "output_dir"
+    and optional "batch" and "download_assets".
+
+    Args:
+        job: Decoded job request
+        validation_cache: Optional cache shared between jobs
+
+    Returns:
+        Result with "exit_code" (CLI exit code), "status", "elapsed_seconds"
+        and job-specific fields ("errors", "warnings", "files", "deb_file",
+        "digest", "compression", "size", "installed_size", "error")
+    """
+    from generate_container_packages.cli import (
+        EXIT_BUILD_ERROR,
+        EXIT_DEPENDENCY_ERROR,
+        EXIT_TEMPLATE_ERROR,
+        EXIT_VALIDATION_ERROR,
+        check_dependencies,
+    )
+
+    start = time.perf_counter()
+
+    def finish(exit_code: int, **fields: Any) -> dict[str, Any]:
+        return {
+            "exit_code": exit_code,
+            "status": "success" if exit_code == 0 else "failed",
+            "elapsed_seconds": round(time.perf_counter() - start, 6),
+            **fields,
+        }
+
+    if not isinstance(job, dict) or job.get("type") not in JOB_TYPES:
+        return finish(
+            EXIT_VALIDATION_ERROR,
+            error=f"Invalid job: 'type' must be one of {', '.join(JOB_TYPES)}",
+        )
+
+    try:
+        if job["type"] == "convert":
+            return finish(_run_convert_job(job))
+
+        input_dir = Path(job["input_dir"])
+        validation = validate_input_directory(input_dir, cache=validation_cache)
+        warnings = [w.message for w in validation.warnings]
+        if not validation.success:
+            return finish(
+                EXIT_VALIDATION_ERROR,
+                error="Validation failed",
+                errors=list(validation.errors),
+                warnings=warnings,
+            )
+        if job["type"] == "validate":
+            return finish(0, warnings=warnings)
+
+        app_def = load_input_files(
+            input_dir,
+            prefix=job.get("prefix"),
+            suffix=job.get("suffix", "container"),
+            validation=validation,
+            reproducible=bool(job.get("reproducible")),
+        )
+        tree = stage_package(app_def, render_templates(app_def))
+        output_dir = Path(job.get("output_dir") or ".")
+
+        if job["type"] == "render":
+            source_dir = output_dir / (
+                f"{app_def.metadata['package_name']}-{app_def.metadata['version']}"
+            )
+            tree.write(source_dir)
+            return finish(
+                0,
+                warnings=warnings,
+                source_dir=str(source_dir),
+                files=sorted(tree.files),
+            )
+
+        try:
+            compression = resolve_compression(
+                app_def.metadata, CompressionProfile(**job.get("compression") or {})
+            )
+        except (TypeError, ValueError) as e:
+            return finish(EXIT_VALIDATION_ERROR, error=f"Invalid compression: {e}")
+
+        check_dependencies()
+        deb_file = build_staged_package(
+            tree,
+            app_def.metadata["package_name"],
+            app_def.metadata["version"],
+            output_dir,
+            source_date_epoch=app_def.source_date_epoch,
+            compression=compression,
+        )
+        size, installed_size = package_sizes(deb_file)
+        return finish(
+            0,
+            warnings=warnings,
+            deb_file=str(deb_file),
+            digest=package_digest(deb_file),
+            compression=str(compression),
+            size=size,
+            installed_size=installed_size,
+        )
+
+    except KeyError as e:
+        return finish(EXIT_VALIDATION_ERROR, error=f"Invalid job: missing field {e}")
+    except (ValidationError, VolumeOwnershipError) as e:
+        return finish(EXIT_VALIDATION_ERROR, error=str(e))
+    except TemplateError as e:
+        return finish(EXIT_TEMPLATE_ERROR, error=f"Template rendering failed: {e}")
+    except BuildError as e:
+        return finish(EXIT_BUILD_ERROR, error=f"Package build failed: {e}")
+    except (ImportError, FileNotFoundError) as e:
+        return finish(EXIT_DEPENDENCY_ERROR, error=str(e))
+    except ValueError as e:
+        return finish(EXIT_VALIDATION_ERROR, error=str(e))
+    except Exception as e:
+        logger.exception("Unexpected error in job")
+        return finish(EXIT_BUILD_ERROR, error=f"Unexpected error: {e}")
+
+
+def _run_convert_job(job: dict[str, Any]) -> int:
+    """Run a convert job through the convert-casaos command.
+
+    Args:
+        job: Convert job request
+
+    Returns:
+        Exit code
+
+    Raises:
+        ValueError: If the job does not form a valid convert command
+    """
+    from generate_container_packages.cli import (
+        convert_casaos_command,
+        create_argument_parser,
+    )
+
+    argv = [str(job["source"]), "-o", str(job.get("output_dir") or "."), "--quiet"]
+    if job.get("batch"):
+        argv.append("--batch")
+    if job.get("download_assets"):
+        argv.append("--download-assets")
+    try:
+        args = create_argument_parser().parse_args(argv)
+    except SystemExit as e:
+        # argparse exits on invalid arguments; keep the worker thread alive
+        raise ValueError(f"Invalid convert job: {' '.join(argv)}") from e
+    return convert_casaos_command(args)
+
+
+class _UnixJobHandler(socketserver.StreamRequestHandler):
+    """Handle newline-delimited JSON jobs on a Unix socket connection."""
+
+    server: "UnixJobServer"
+
+    def handle(self) -> None:
+        while True:
+            line = self.rfile.readline(MAX_REQUEST_SIZE)
+            if not line:
+                return
+            try:
+                result = self.server.runner.run(json.loads(line))
+            except json.JSONDecodeError as e:
+                result = {
+                    "exit_code": 1,
+                    "status": "failed",
+                    "error": f"Invalid JSON: {e}",
+                }
+            self.wfile.write(json.dumps(result).encode("utf-8") + b"\n")
+            self.wfile.flush()
+
+
+class UnixJobServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Unix socket server dispatching jobs to a JobRunner."""
+
+    daemon_threads = True
+
+    def __init__(self, socket_path: Path, runner: JobRunner) -> None:
+        """Bind the socket (replacing a stale one), accessible to the user only.
+
+        The socket is created with mode 0600 under a restrictive umask, so
+        there is no window in which other users can connect.
+
+        Args:
+            socket_path: Socket path
+            runner: Job runner
+
+        Raises:
+            OSError: If a daemon is already listening on the socket
+                (EADDRINUSE) or the socket cannot be bound
+        """
+        self.runner = runner
+        if _socket_in_use(socket_path):
+            raise OSError(errno.EADDRINUSE, "a daemon is already listening on it")
+        socket_path.unlink(missing_ok=True)
+        umask = os.umask(0o177)
+        try:
+            super().__init__(str(socket_path), _UnixJobHandler)
+        finally:
+            os.umask(umask)
+
+
+def _socket_in_use(socket_path: Path) -> bool:
+    """Check whether a server accepts connections on a Unix socket."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(str(socket_path))
+        except OSError:
+            return False
+    return True
+
+
+class _HTTPJobHandler(BaseHTTPRequestHandler):
+    """Handle POST /jobs and GET /health requests."""
+
+    server: "HTTPJobServer"
+
+    def do_GET(self) -> None:  # noqa: N802
+        if not self._check_origin():
+            return
+        if self.path == "/health":
+            self._send(200, {"status": "ok", "workers": self.server.runner.workers})
+        else:
+            self._send(404, {"error": "Not found"})
+
+    def do_POST(self) -> None:  # noqa: N802
+        if not self._check_origin():
+            return
+        if self.path != "/jobs":
+            self._send(404, {"error": "Not found"})
+            return
+        if not hmac.compare_digest(
+            self.headers.get("Authorization", ""), f"Bearer {self.server.token}"
+        ):
+            self._send(401, {"error": "Missing or invalid token"})
+            return
+        content_type = self.headers.get("Content-Type", "")
+        if content_type.split(";")[0].strip().lower() != "application/json":
+            self._send(415, {"error": "Content-Type must be application/json"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            length = -1
+        if length < 0:
+            self._send(400, {"error": "Invalid Content-Length"})
+            return
+        if length > MAX_REQUEST_SIZE:
+            self._send(413, {"error": "Request too large"})
+            return
+        try:
+            job = json.loads(self.rfile.read(length))
+        except json.JSONDecodeError as e:
+            self._send(
+                400, {"exit_code": 1, "status": "failed", "error": f"Invalid JSON: {e}"}
+            )
+            return
+        self._send(200, self.server.runner.run(job))
+
+    def _check_origin(self) -> bool:
+        """Refuse browser requests and non-local Host headers (DNS rebinding)."""
+        host = self.headers.get("Host", "")
+        if host.rsplit(":", 1)[0] not in ALLOWED_HOSTS or "Origin" in self.headers:
+            self._send(403, {"error": "Forbidden"})
+            return False
+        return True
+
+    def _send(self, status: int, body: dict[str, Any]) -> None:
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+        logger.debug(format % args)
+
+
+class HTTPJobServer(ThreadingHTTPServer):
+    """Localhost-only HTTP server dispatching jobs to a JobRunner."""
+
+    daemon_threads = True
+
+    def __init__(self, port: int, runner: JobRunner, token: str) -> None:
+        """Bind to 127.0.0.1.
+
+        Args:
+            port: TCP port (0 picks a free port)
+            runner: Job runner
+            token: Secret that job requests must send as a Bearer token
+        """
+        self.runner = runner
+        self.token = token
+        super().__init__(("127.0.0.1", port), _HTTPJobHandler)
+
+
+def write_token(token_path: Path) -> str:
+    """Generate an HTTP API token and write it to a file only the user can read.
+
+    Args:
+        token_path: Token file (replaced if it exists)
+
+    Returns:
+        The new token
+    """
+    token = secrets.token_urlsafe(32)
+    token_path.unlink(missing_ok=True)
+    fd = os.open(token_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(fd, "w") as f:
+        f.write(token + "\n")
+    return token
+
+
+def serve_command(args: argparse.Namespace) -> int:
+    """Execute serve subcommand.
+
+    Args:
+        args: Parsed serve arguments
+
+    Returns:
+        Exit code (after the server is interrupted)
+    """
+    runner = JobRunner(workers=args.workers)
+    server: UnixJobServer | HTTPJobServer
+    token_path = None
+    if args.port is not None:
+        token_path = Path(args.token_file) if args.token_file else default_token_path()
+        server = HTTPJobServer(args.port, runner, write_token(token_path))
+        print(
+            f"Serving on http://127.0.0.1:{server.server_address[1]}/jobs "
+            f"(token in {token_path})",
+            flush=True,
+        )
+    else:
+        socket_path = Path(args.socket) if args.socket else default_socket_path()
+        try:
+            server = UnixJobServer(socket_path, runner)
+        except OSError as e:
+            runner.shutdown()
+            print(
+                f"ERROR: Cannot serve on {socket_path}: {e.strerror or e}",
+                file=sys.stderr,
+            )
+            return EXIT_DEPENDENCY_ERROR
+        print(f"Serving on {socket_path}", flush=True)
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        runner.shutdown()
+        if isinstance(server, UnixJobServer):
+            Path(server.server_address).unlink(missing_ok=True)
+        if token_path is not None:
+            token_path.unlink(missing_ok=True)
+    return 0
+
+
+def create_serve_argument_parser() -> argparse.ArgumentParser:
+    """Create argument parser for the serve subcommand.
+
+    Returns:
+        Configured ArgumentParser instance
+    """
+    parser = argparse.ArgumentParser(
+        prog="generate-container-packages serve",
+        description=(
+            "Run a build daemon that accepts validate, render, build and "
+            "convert jobs as JSON"
+        ),
+    )
+    transport = parser.add_mutually_exclusive_group()
+    transport.add_argument(
+        "--socket",
+        metavar="PATH",
+        help=f"Unix socket path (default: {default_socket_path()})",
+    )
+    transport.add_argument(
+        "--port",
+        type=int,
+        metavar="PORT",
+        help="Serve HTTP on 127.0.0.1:PORT instead of a Unix socket",
+    )
+    parser.add_argument(
+        "--token-file",
+        metavar="PATH",
+        help=(
+            "Where to write the HTTP API token clients must send "
+            f"(default: {default_token_path()})"
+        ),
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        metavar="N",
+        help="Maximum number of concurrent jobs (default: CPU count)",
+    )
+
+    verbosity = parser.add_mutually_exclusive_group()
+    verbosity.add_argument(
+        "-v", "--verbose", action="store_true", help="Verbose output"
+    )
+    verbosity.add_argument("--debug", action="store_true", help="Debug output")
+    verbosity.add_argument("-q", "--quiet", action="store_true", help="Errors only")
+    return parser
@@ -0,0 +1,249 @@
+"""In-memory model of a package source directory.
+
+A StagedTree describes every file that will be placed in the
+dpkg-buildpackage source directory, either as generated content or as a
+reference to a file in the app's input directory. The tree can be digested,
+compared and written out without rendering or copying anything twice.
+"""
+
+import hashlib
+import shutil
+import stat
+from dataclasses import dataclass
+from pathlib import Path
+
+
+@dataclass(frozen=True)
+class StagedFile:
+    """A single file in a staged source tree.
+
+    Attributes:
+        content: Generated file content (mutually exclusive with source)
+        source: Input file to copy verbatim (mutually exclusive with content)
+        mode: Permission bits to apply, or None to keep the source file's mode
+    """
+
+    content: bytes | None = None
+    source: Path | None = None
+    mode: int | None = None
+
+    def effective_mode(self) -> int:
+        """Return the permission bits the file will have once written."""
+        if self.mode is not None:
+            return self.mode
+        if self.source is not None:
+            return stat.S_IMODE(self.source.stat().st_mode)
+        return 0o644
+
+
+class FileDigestCache:
+    """Memo of SHA256 digests of input files keyed by path, mtime and size.
+
+    Large asset and default-data trees are otherwise re-hashed on every
+    digest of a staged tree.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty cache."""
+        self._entries: dict[Path, tuple[int, int, str]] = {}
+
+    def digest(self, path: Path) -> str:
+        """Return the SHA256 digest of a file, hashing it only if it changed.
+
+        Args:
+            path: File to digest
+
+        Returns:
+            Hexadecimal SHA256 digest of the file content
+        """
+        st = path.stat()
+        cached = self._entries.get(path)
+        if (
+            cached is not None
+            and cached[0] == st.st_mtime_ns
+            and cached[1] == st.st_size
+        ):
+            return cached[2]
+
+        digest = hash_file(path)
+        self._entries[path] = (st.st_mtime_ns, st.st_size, digest)
+        return digest
+
+
+class StagedTree:
+    """Ordered collection of files making up a package source directory.
+
+    Paths are POSIX-style and relative to the source directory root
+    (e.g., "docker-compose.yml", "debian/control"). Directories copied from
+    the input tree are kept in `directories`, so that empty ones are
+    created as well.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty tree."""
+        self.files: dict[str, StagedFile] = {}
+        self.directories: set[str] = set()
+
+    def add_content(
+        self, path: str, content: str | bytes, mode: int | None = None
+    ) -> None:
+        """Add a generated file.
+
+        Args:
+            path: Relative destination path
+            content: File content (str is encoded as UTF-8)
+            mode: Permission bits (default: 0o644)
+        """
+        if isinstance(content, str):
+            content = content.encode("utf-8")
+        self.files[path] = StagedFile(content=content, mode=mode)
+
+    def add_source(self, path: str, source: Path, mode: int | None = None) -> None:
+        """Add a file copied verbatim from the input directory.
+
+        Args:
+            path: Relative destination path
+            source: Source file path
+            mode: Permission bits, or None to keep the source file's mode
+        """
+        self.files[path] = StagedFile(source=source, mode=mode)
+
+    def add_directory(self, path: str, source_dir: Path) -> None:
+        """Add every file and directory below a directory, preserving its structure.
+
+        Args:
+            path: Relative destination directory
+            source_dir: Source directory to copy recursively
+        """
+        self.directories.add(path)
+        for source in sorted(source_dir.rglob("*")):
+            relative = source.relative_to(source_dir).as_posix()
+            if source.is_dir():
+                self.directories.add(f"{path}/{relative}")
+            elif source.is_file():
+                self.add_source(f"{path}/{relative}", source)
+
+    def read_bytes(self, path: str) -> bytes:
+        """Return the content of a staged file.
+
+        Args:
+            path: Relative path of the staged file
+
+        Returns:
+            File content
+        """
+        staged = self.files[path]
+        if staged.content is not None:
+            return staged.content
+        assert staged.source is not None
+        return staged.source.read_bytes()
+
+    def digests(self, cache: FileDigestCache | None = None) -> dict[str, str]:
+        """Compute per-file SHA256 digests.
+
+        Args:
+            cache: Optional digest cache for files copied from the input tree
+
+        Returns:
+            Mapping of relative path to hexadecimal SHA256 digest, sorted by path
+        """
+        result: dict[str, str] = {}
+        for path in sorted(self.files):
+            staged = self.files[path]
+            if staged.content is not None:
+                result[path] = hashlib.sha256(staged.content).hexdigest()
+            elif cache is not None:
+                assert staged.source is not None
+                result[path] = cache.digest(staged.source)
+            else:
+                assert staged.source is not None
+                result[path] = hash_file(staged.source)
+        return result
+
+    def digest(self, cache: FileDigestCache | None = None) -> str:
+        """Compute a single digest covering paths, modes, content and directories.
+
+        Args:
+            cache: Optional digest cache for files copied from the input tree
+
+        Returns:
+            Hexadecimal SHA256 digest of the whole tree
+        """
+        entries = {
+            path: f"{self.files[path].effective_mode():o}:{file_digest}"
+            for path, file_digest in self.digests(cache).items()
+        }
+        entries.update({f"{path}/": "directory" for path in self.directories})
+        return combine_digests(entries)
+
+    def write(
+        self, dest_dir: Path, previous: dict[str, str] | None = None
+    ) -> list[str]:
+        """Write the tree to a directory.
+
+        Args:
+            dest_dir: Destination source directory
+            previous: Per-file digests of what is already in dest_dir (as
+                returned by digests()). Files whose digest is unchanged are
+                not rewritten and files no longer staged are removed.
+
+        Returns:
+            Relative paths of files that were written
+        """
+        dest_dir.mkdir(parents=True, exist_ok=True)
+        for path in sorted(self.directories):
+            (dest_dir / path).mkdir(parents=True, exist_ok=True)
+        current = self.digests() if previous is not None else {}
+        written: list[str] = []
+
+        for path, staged in self.files.items():
+            if previous is not None and previous.get(path) == current[path]:
+                continue
+
+            dest = dest_dir / path
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            if staged.content is not None:
+                dest.write_bytes(staged.content)
+            else:
+                assert staged.source is not None
+                shutil.copy2(staged.source, dest)
+            if staged.mode is not None:
+                dest.chmod(staged.mode)
+            written.append(path)
+
+        if previous is not None:
+            for path in previous.keys() - self.files.keys():
+                (dest_dir / path).unlink(missing_ok=True)
+
+        return written
+
+
+def combine_digests(digests: dict[str, str]) -> str:
+    """Combine per-file digests into a single order-independent digest.
+
+    Args:
+        digests: Mapping of relative path to file digest
+
+    Returns:
+        Hexadecimal SHA256 digest
+    """
+    sha256 = hashlib.sha256()
+    for path in sorted(digests):
+        sha256.update(f"{path}\0{digests[path]}\n".encode())
+    return sha256.hexdigest()
+
+
+def hash_file(path: Path) -> str:
+    """Compute the SHA256 digest of a file in chunks.
+
+    Args:
+        path: File to hash
+
+    Returns:
+        Hexadecimal SHA256 digest
+    """
+    sha256 = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            sha256.update(chunk)
+    return sha256.hexdigest()
@@ -6,6 +6,12 @@ from pathlib import Path
 from typing import Any
 
 from generate_container_packages.loader import AppDefinition
+from generate_container_packages.prestart import routing_override_path
+
+# dpkg trigger shared by all generated packages for a single systemctl
+# daemon-reload per transaction, and the queue of units it enables/starts
+SYSTEMD_TRIGGER = "halos-container-apps-systemd"
+SYSTEMD_QUEUE_DIR = "/run/container-apps/.systemd-queue"
 
 
 class VolumeOwnershipError(Exception):
@@ -218,8 +224,10 @@ def build_context(app_def: AppDefinition) -> dict[str, Any]:
     # Check if routing.yml should be generated
     has_routing = routing is not None or has_web_ui
 
+    package = _build_package_context(metadata)
+
     context = {
-        "package": _build_package_context(metadata),
+        "package": package,
         "service": _build_service_context(package_name, metadata, app_def.compose),
         "paths": _build_paths(package_name),
         "web_ui": web_ui,
@@ -244,23 +252,52 @@ def build_context(app_def: AppDefinition) -> dict[str, Any]:
             {"path": str(f.path), "executable": f.executable}
             for f in app_def.default_data_files
         ],
+        "default_data_dirs": _default_data_directories(app_def.default_data_files),
         # SSO configuration
         "is_oidc_app": is_oidc_app,
         "has_custom_forward_auth": has_custom_forward_auth,
         # Routing configuration
         "routing": routing,
         "has_routing": has_routing,
+        "routing_override": routing_override_path(package["app_id"]),
         # System binaries to install to /usr/bin/
         "system_bin": metadata.get("system_bin", []) or [],
         "has_system_bin": bool(metadata.get("system_bin")),
         # File watchers for systemd path units
         "file_watchers": _build_file_watchers_context(metadata.get("file_watchers")),
         "has_file_watchers": bool(metadata.get("file_watchers")),
+        # Deferred systemd reload (debian/triggers)
+        "systemd_trigger": SYSTEMD_TRIGGER,
+        "systemd_queue": SYSTEMD_QUEUE_DIR,
+        "watcher_units": _build_watcher_units_context(
+            _build_file_watchers_context(metadata.get("file_watchers")),
+            coalesce=bool(metadata.get("coalesce_file_watchers")),
+        ),
     }
 
     return context
 
 
+def _default_data_directories(files: list[Any]) -> list[str]:
+    """Compute the directory manifest for default-data files.
+
+    postinst creates and chowns these directories in one pass instead of
+    walking up from every copied file.
+
+    Args:
+        files: AssetFile entries with paths relative to default-data/
+
+    Returns:
+        Unique relative ancestor directories, sorted so parents precede
+        their children (the data root itself is not included)
+    """
+    dirs: set[str] = set()
+    for f in files:
+        dirs.update(str(parent) for parent in Path(f.path).parents)
+    dirs.discard(".")
+    return sorted(dirs)
+
+
 def _build_file_watchers_context(
     file_watchers: list[dict[str, Any]] | None,
 ) -> list[dict[str, Any]]:
@@ -293,6 +330,46 @@ def _build_file_watchers_context(
     return result
 
 
+def _build_watcher_units_context(
+    watchers: list[dict[str, Any]], coalesce: bool = False
+) -> list[dict[str, Any]]:
+    """Group file watchers into systemd path/service unit pairs.
+
+    Without coalescing every watcher gets its own units. With coalescing,
+    watchers sharing the same action (restart_service and script) are
+    merged into one unit pair named after the first watcher of the group,
+    whose .path unit carries one directive per watched path.
+
+    Args:
+        watchers: File watchers as returned by _build_file_watchers_context()
+        coalesce: Merge watchers with identical actions
+
+    Returns:
+        List of unit dicts with name, paths (watch_path/watch_type dicts),
+        restart_service and script, in order of first occurrence
+    """
+    units: dict[Any, dict[str, Any]] = {}
+    for watcher in watchers:
+        key = (
+            (watcher["restart_service"], watcher["script"])
+            if coalesce
+            else watcher["name"]
+        )
+        unit = units.setdefault(
+            key,
+            {
+                "name": watcher["name"],
+                "paths": [],
+                "restart_service": watcher["restart_service"],
+                "script": watcher["script"],
+            },
+        )
+        unit["paths"].append(
+            {"watch_path": watcher["watch_path"], "watch_type": watcher["watch_type"]}
+        )
+    return list(units.values())
+
+
 def _build_package_context(metadata: dict[str, Any]) -> dict[str, Any]:
     """Build package-level context from metadata.
 
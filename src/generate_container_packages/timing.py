@@ -0,0 +1,222 @@
+"""Per-phase timing instrumentation for builds and conversions.
+
+Code wraps interesting phases in `with phase("name"):`. Recording is off by
+default and the context manager then costs one attribute check; the CLI
+enables it for --timings/--profile runs and reports the collected spans as a
+summary table, a JSON document or a Chrome trace (chrome://tracing,
+https://ui.perfetto.dev).
+
+CPU time is split in two: the time of the thread running the phase, and the
+time of child processes (dpkg-buildpackage, compressors) that exited during
+it. Child time is process-wide, so phases running concurrently in other
+threads can be charged for each other's subprocesses.
+"""
+
+import json
+import os
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, TextIO
+
+
+@dataclass
+class Span:
+    """One recorded phase execution.
+
+    Attributes:
+        name: Phase name (e.g., "validate", "render:debian/control.j2")
+        start: Start time in seconds relative to the recorder start
+        wall: Elapsed wall-clock seconds
+        cpu: CPU seconds consumed by the recording thread
+        thread_id: Native ID of the thread that ran the phase
+        child_cpu: User and system CPU seconds of child processes that
+            exited during the phase
+        args: Extra attributes (e.g., app id)
+    """
+
+    name: str
+    start: float
+    wall: float
+    cpu: float
+    thread_id: int
+    child_cpu: float = 0.0
+    args: dict[str, Any] = field(default_factory=dict)
+
+
+class TimingRecorder:
+    """Thread-safe collector of phase spans."""
+
+    def __init__(self) -> None:
+        """Initialize a disabled recorder."""
+        self.enabled = False
+        self.spans: list[Span] = []
+        self._origin = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def enable(self) -> None:
+        """Start recording, discarding previously recorded spans."""
+        with self._lock:
+            self.spans = []
+            self._origin = time.perf_counter()
+            self.enabled = True
+
+    def disable(self) -> None:
+        """Stop recording (recorded spans are kept)."""
+        self.enabled = False
+
+    @contextmanager
+    def phase(self, name: str, **args: Any) -> Iterator[None]:
+        """Record the wall, thread CPU and child process CPU time of the enclosed block.
+
+        Args:
+            name: Phase name
+            **args: Extra attributes stored with the span
+        """
+        if not self.enabled:
+            yield
+            return
+
+        wall_start = time.perf_counter()
+        cpu_start = time.thread_time()
+        child_start = _children_cpu()
+        try:
+            yield
+        finally:
+            span = Span(
+                name=name,
+                start=wall_start - self._origin,
+                wall=time.perf_counter() - wall_start,
+                cpu=time.thread_time() - cpu_start,
+                thread_id=threading.get_native_id(),
+                child_cpu=_children_cpu() - child_start,
+                args=args,
+            )
+            with self._lock:
+                self.spans.append(span)
+
+    def summary(self) -> list[dict[str, Any]]:
+        """Aggregate spans by phase name in order of first occurrence.
+
+        Returns:
+            One dict per phase with name, count, wall, cpu, child_cpu and
+            max_wall
+        """
+        rows: dict[str, dict[str, Any]] = {}
+        with self._lock:
+            spans = list(self.spans)
+        for span in sorted(spans, key=lambda s: s.start):
+            row = rows.setdefault(
+                span.name,
+                {
+                    "name": span.name,
+                    "count": 0,
+                    "wall": 0.0,
+                    "cpu": 0.0,
+                    "child_cpu": 0.0,
+                    "max_wall": 0.0,
+                },
+            )
+            row["count"] += 1
+            row["wall"] += span.wall
+            row["cpu"] += span.cpu
+            row["child_cpu"] += span.child_cpu
+            row["max_wall"] = max(row["max_wall"], span.wall)
+        return list(rows.values())
+
+    def format_table(self) -> str:
+        """Format the summary as a plain-text table.
+
+        "CPU" is the in-process time of the phase's thread, "Child CPU" that
+        of the subprocesses it ran.
+
+        Returns:
+            Table with one line per phase
+        """
+        rows = self.summary()
+        width = max([len("Phase")] + [len(row["name"]) for row in rows])
+        lines = [
+            f"{'Phase':<{width}}  {'Count':>5}  {'Wall (ms)':>10}  {'CPU (ms)':>10}  "
+            f"{'Child CPU (ms)':>14}  {'Max (ms)':>10}"
+        ]
+        for row in rows:
+            lines.append(
+                f"{row['name']:<{width}}  {row['count']:>5}  "
+                f"{row['wall'] * 1000:>10.1f}  {row['cpu'] * 1000:>10.1f}  "
+                f"{row['child_cpu'] * 1000:>14.1f}  {row['max_wall'] * 1000:>10.1f}"
+            )
+        return "\n".join(lines)
+
+    def to_json(self) -> dict[str, Any]:
+        """Return spans and summary as a JSON-serializable document."""
+        with self._lock:
+            spans = [asdict(span) for span in self.spans]
+        return {"summary": self.summary(), "spans": spans}
+
+    def to_chrome_trace(self) -> dict[str, Any]:
+        """Return spans in Chrome Trace Event format (complete events)."""
+        pid = os.getpid()
+        with self._lock:
+            spans = list(self.spans)
+        events = [
+            {
+                "name": span.name,
+                "ph": "X",
+                "ts": round(span.start * 1e6, 3),
+                "dur": round(span.wall * 1e6, 3),
+                "pid": pid,
+                "tid": span.thread_id,
+                "args": {
+                    **span.args,
+                    "cpu_ms": round(span.cpu * 1000, 3),
+                    "child_cpu_ms": round(span.child_cpu * 1000, 3),
+                },
+            }
+            for span in spans
+        ]
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write(self, path: Path, format: str = "chrome") -> None:  # noqa: A002
+        """Write recorded timings to a file.
+
+        Args:
+            path: Output file
+            format: "chrome" for a Chrome trace, "json" for spans plus summary
+
+        Raises:
+            ValueError: If format is unknown
+        """
+        if format == "chrome":
+            document = self.to_chrome_trace()
+        elif format == "json":
+            document = self.to_json()
+        else:
+            raise ValueError(f"Unknown timing format: {format}")
+        path.write_text(json.dumps(document, indent=2), encoding="utf-8")
+
+    def print_table(self, stream: TextIO) -> None:
+        """Print the summary table with a heading.
+
+        Args:
+            stream: Output stream (e.g., sys.stderr)
+        """
+        print("\nTimings:", file=stream)
+        print(self.format_table(), file=stream)
+
+
+def _children_cpu() -> float:
+    """Return the user plus system CPU seconds of all waited-for children."""
+    times = os.times()
+    return times.children_user + times.children_system
+
+
+# Process-wide recorder used by the instrumented modules
+recorder = TimingRecorder()
+
+
+def phase(name: str, **args: Any):
+    """Record a phase on the process-wide recorder (see TimingRecorder.phase)."""
+    return recorder.phase(name, **args)
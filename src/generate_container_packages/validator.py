@@ -1,15 +1,28 @@
 """Input validation logic using Pydantic models."""
 
+import hashlib
+import threading
+from collections import OrderedDict
+from collections.abc import Callable
 from pathlib import Path
-from typing import Any, NamedTuple
+from typing import Any, NamedTuple, TypeVar
 
 import yaml
-from pydantic import ValidationError
+from pydantic import BaseModel, ValidationError
 
 from schemas.config import ConfigSchema
 from schemas.metadata import PackageMetadata
 from schemas.store import StoreConfig
 
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+# Documents validated in this process, keyed by model class and content digest
+TRUSTED_MODELS_MAX = 1024
+_trusted_models: OrderedDict[tuple[type[BaseModel], str], tuple[Any, BaseModel]] = (
+    OrderedDict()
+)
+_trusted_lock = threading.Lock()
+
 
 class ValidationWarning(NamedTuple):
     """Warning message from validation."""
@@ -28,13 +41,117 @@ class ValidationResult(NamedTuple):
     compose: dict[str, Any] | None = None
     errors: list[str] = []
     warnings: list[ValidationWarning] = []
+    raw_metadata: dict[str, Any] | None = None
+    raw_config: dict[str, Any] | None = None
+
+
+class ValidationCache:
+    """Memo of per-file validation outcomes keyed by file content.
+
+    Used by long-running callers (e.g., watch mode) so that editing one
+    input file only re-parses and re-validates that file. Failures are kept
+    as their type and details, and a new exception is raised on each hit.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty cache."""
+        self._entries: dict[Path, tuple[str, Any, tuple[type, Any] | None]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def validate(self, path: Path, validate_fn: Callable[[Path], Any]) -> Any:
+        """Validate a file, reusing the previous outcome if its content is unchanged.
+
+        Args:
+            path: File to validate
+            validate_fn: Validation function such as validate_metadata()
+
+        Returns:
+            Result of validate_fn
+
+        Raises:
+            Exception: Whatever validate_fn raised for this content
+        """
+        digest = hashlib.sha256(path.read_bytes()).hexdigest()
+        cached = self._entries.get(path)
+        if cached is not None and cached[0] == digest:
+            self.hits += 1
+            if cached[2] is not None:
+                raise _recreate_failure(cached[2])
+            return cached[1]
+
+        self.misses += 1
+        try:
+            value = validate_fn(path)
+        except (ValidationError, yaml.YAMLError, ValueError) as e:
+            self._entries[path] = (digest, None, _record_failure(e))
+            raise
+        self._entries[path] = (digest, value, None)
+        return value
+
 
+def _record_failure(error: Exception) -> tuple[type, Any]:
+    """Reduce a validation failure to its type and the details to recreate it."""
+    if isinstance(error, ValidationError):
+        return ValidationError, (error.title, error.errors(include_url=False))
+    if isinstance(error, yaml.YAMLError):
+        return yaml.YAMLError, str(error)
+    return ValueError, str(error)
+
+
+def _recreate_failure(failure: tuple[type, Any]) -> Exception:
+    """Create a new exception from a failure recorded by _record_failure()."""
+    error_type, details = failure
+    if error_type is ValidationError:
+        return ValidationError.from_exception_data(*details)
+    return error_type(details)
+
+
+def validate_document(model_cls: type[ModelT], content: bytes) -> tuple[Any, ModelT]:
+    """Parse and validate a YAML document once per distinct content.
+
+    Successfully validated documents are remembered by model class and the
+    SHA-256 of their bytes, so the same file content validated again
+    anywhere in the process (e.g. converter output that is built afterwards,
+    or unchanged apps in a long-running daemon) returns the trusted model
+    without re-validation. The parsed data and model are shared and must be
+    treated as read-only.
+
+    Args:
+        model_cls: Pydantic model class
+        content: Raw YAML document
+
+    Returns:
+        Tuple of (parsed data, validated model instance)
 
-def validate_input_directory(path: Path) -> ValidationResult:
+    Raises:
+        ValidationError: If validation fails (failures are not remembered)
+        yaml.YAMLError: If YAML is invalid
+    """
+    key = (model_cls, hashlib.sha256(content).hexdigest())
+    with _trusted_lock:
+        cached = _trusted_models.get(key)
+        if cached is not None:
+            _trusted_models.move_to_end(key)
+            return cached  # type: ignore[return-value]
+
+    data = yaml.safe_load(content)
+    model = model_cls.model_validate(data)
+    with _trusted_lock:
+        _trusted_models[key] = (data, model)
+        while len(_trusted_models) > TRUSTED_MODELS_MAX:
+            _trusted_models.popitem(last=False)
+    return data, model
+
+
+def validate_input_directory(
+    path: Path, cache: ValidationCache | None = None
+) -> ValidationResult:
     """Validate input directory contains all required files and valid data.
 
     Args:
         path: Path to input directory
+        cache: Optional cache to skip re-validating unchanged files
 
     Returns:
         ValidationResult with success flag, parsed data, and any errors/warnings
@@ -64,7 +181,9 @@ def validate_input_directory(path: Path) -> ValidationResult:
 
     # Validate each file
     try:
-        metadata = validate_metadata(required_files["metadata.yaml"])
+        raw_metadata, metadata = _validate_file(
+            _load_metadata, required_files["metadata.yaml"], cache
+        )
     except ValidationError as e:
         errors.append(format_pydantic_error("metadata.yaml", e))
         return ValidationResult(success=False, errors=errors)
@@ -73,7 +192,9 @@ def validate_input_directory(path: Path) -> ValidationResult:
         return ValidationResult(success=False, errors=errors)
 
     try:
-        config = validate_config(required_files["config.yml"])
+        raw_config, config = _validate_file(
+            _load_config, required_files["config.yml"], cache
+        )
     except ValidationError as e:
         errors.append(format_pydantic_error("config.yml", e))
         return ValidationResult(success=False, errors=errors)
@@ -82,7 +203,9 @@ def validate_input_directory(path: Path) -> ValidationResult:
         return ValidationResult(success=False, errors=errors)
 
     try:
-        compose = validate_compose(required_files["docker-compose.yml"])
+        compose = _validate_file(
+            validate_compose, required_files["docker-compose.yml"], cache
+        )
         compose_warnings = check_compose_warnings(compose)
         warnings.extend(compose_warnings)
     except yaml.YAMLError as e:
@@ -102,9 +225,20 @@ def validate_input_directory(path: Path) -> ValidationResult:
         config=config,
         compose=compose,
         warnings=warnings,
+        raw_metadata=raw_metadata,
+        raw_config=raw_config,
     )
 
 
+def _validate_file(
+    validate_fn: Callable[[Path], Any], path: Path, cache: ValidationCache | None
+) -> Any:
+    """Run a file validator, going through the cache if one is given."""
+    if cache is not None:
+        return cache.validate(path, validate_fn)
+    return validate_fn(path)
+
+
 def validate_metadata(path: Path) -> PackageMetadata:
     """Validate metadata.yaml file.
 
@@ -118,10 +252,12 @@ def validate_metadata(path: Path) -> PackageMetadata:
         ValidationError: If validation fails
         yaml.YAMLError: If YAML is invalid
     """
-    with open(path, encoding="utf-8") as f:
-        data = yaml.safe_load(f)
+    return _load_metadata(path)[1]
+
 
-    return PackageMetadata.model_validate(data)
+def _load_metadata(path: Path) -> tuple[Any, PackageMetadata]:
+    """Parse and validate metadata.yaml, keeping the parsed data."""
+    return validate_document(PackageMetadata, path.read_bytes())
 
 
 def validate_config(path: Path) -> ConfigSchema:
@@ -137,10 +273,12 @@ def validate_config(path: Path) -> ConfigSchema:
         ValidationError: If validation fails
         yaml.YAMLError: If YAML is invalid
     """
-    with open(path, encoding="utf-8") as f:
-        data = yaml.safe_load(f)
+    return _load_config(path)[1]
 
-    return ConfigSchema.model_validate(data)
+
+def _load_config(path: Path) -> tuple[Any, ConfigSchema]:
+    """Parse and validate config.yml, keeping the parsed data."""
+    return validate_document(ConfigSchema, path.read_bytes())
 
 
 def validate_compose(path: Path) -> dict[str, Any]:
@@ -243,10 +381,7 @@ def validate_store(path: Path) -> StoreConfig:
         ValidationError: If validation fails
         yaml.YAMLError: If YAML is invalid
     """
-    with open(path, encoding="utf-8") as f:
-        data = yaml.safe_load(f)
-
-    return StoreConfig.model_validate(data)
+    return validate_document(StoreConfig, path.read_bytes())[1]
 
 
 def check_compose_warnings(compose: dict[str, Any]) -> list[ValidationWarning]:
@@ -0,0 +1,458 @@
+"""Watch mode: rebuild a package incrementally when its input files change.
+
+The watcher keeps one warm process for the whole session. Parsed schemas,
+compiled templates, per-file validation results and input file digests are
+reused between rebuilds, and dpkg-buildpackage only runs when the staged
+package source tree actually differs from the last successful build.
+
+File change notification uses inotify on Linux and falls back to polling
+file modification times everywhere else.
+"""
+
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import struct
+import sys
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import NamedTuple
+
+from jinja2 import TemplateError
+from pydantic import ValidationError
+
+from generate_container_packages.builder import (
+    BuildError,
+    CompressionProfile,
+    build_staged_package,
+    resolve_compression,
+    stage_package,
+)
+from generate_container_packages.loader import AppDefinition, load_input_files
+from generate_container_packages.renderer import RenderCache, render_templates
+from generate_container_packages.staging import FileDigestCache
+from generate_container_packages.template_context import VolumeOwnershipError
+from generate_container_packages.validator import (
+    ValidationCache,
+    validate_input_directory,
+)
+
+logger = logging.getLogger(__name__)
+
+# Quiet period after the last change before a rebuild starts (seconds)
+DEFAULT_DEBOUNCE = 0.2
+
+# Interval between scans when polling for changes (seconds)
+DEFAULT_POLL_INTERVAL = 0.5
+
+# inotify event masks (see inotify(7))
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+_WATCH_MASK = (
+    IN_MODIFY
+    | IN_ATTRIB
+    | IN_CLOSE_WRITE
+    | IN_MOVED_FROM
+    | IN_MOVED_TO
+    | IN_CREATE
+    | IN_DELETE
+    | IN_DELETE_SELF
+)
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+class RebuildResult(NamedTuple):
+    """Outcome of one incremental rebuild."""
+
+    status: str  # "built", "unchanged", "validated" or "failed"
+    digest: str | None = None
+    deb_file: Path | None = None
+    errors: tuple[str, ...] = ()
+    elapsed_seconds: float = 0.0
+
+
+class IncrementalBuilder:
+    """Rebuild one application package, skipping stages whose inputs are unchanged.
+
+    Validation results are cached per file content, rendered templates per
+    referenced context values, and input file digests per mtime and size.
+    Build timestamps are pinned to the first build of the session so that
+    unchanged inputs produce a byte-identical staged tree; reproducible
+    builds take them from the inputs instead.
+    """
+
+    def __init__(
+        self,
+        input_dir: Path,
+        output_dir: Path,
+        prefix: str | None = None,
+        suffix: str = "container",
+        validate_only: bool = False,
+        keep_temp: bool = False,
+        reproducible: bool = False,
+        compression: CompressionProfile | None = None,
+        build_fn: Callable[..., Path] = build_staged_package,
+    ) -> None:
+        """Initialize builder.
+
+        Args:
+            input_dir: Application input directory
+            output_dir: Directory to place built packages
+            prefix: Optional package name prefix
+            suffix: Package name suffix
+            validate_only: Only validate inputs, never render or build
+            keep_temp: Keep temporary build directories
+            reproducible: Derive the build date from the inputs (see
+                load_input_files())
+            compression: Per-build compression profile, overriding the
+                app's compression field
+            build_fn: Function building a .deb from a staged tree
+        """
+        self.input_dir = input_dir
+        self.output_dir = output_dir
+        self.prefix = prefix
+        self.suffix = suffix
+        self.validate_only = validate_only
+        self.keep_temp = keep_temp
+        self.reproducible = reproducible
+        self.compression = compression
+        self.build_fn = build_fn
+
+        self.validation_cache = ValidationCache()
+        self.render_cache = RenderCache()
+        self.digest_cache = FileDigestCache()
+        self._last_build: tuple | None = None
+        self._reference: AppDefinition | None = None
+
+    def rebuild(self) -> RebuildResult:
+        """Run validation, rendering and (if needed) the package build.
+
+        Returns:
+            RebuildResult describing what was done
+        """
+        start = time.perf_counter()
+
+        def finish(status: str, **kwargs) -> RebuildResult:
+            return RebuildResult(
+                status=status,
+                elapsed_seconds=time.perf_counter() - start,
+                **kwargs,
+            )
+
+        validation = validate_input_directory(
+            self.input_dir, cache=self.validation_cache
+        )
+        if not validation.success:
+            return finish("failed", errors=tuple(validation.errors))
+        if self.validate_only:
+            return finish("validated")
+
+        try:
+            app_def = load_input_files(
+                self.input_dir,
+                prefix=self.prefix,
+                suffix=self.suffix,
+                validation=validation,
+                reproducible=self.reproducible,
+            )
+            compression = resolve_compression(app_def.metadata, self.compression)
+            self._pin_timestamps(app_def)
+            rendered = render_templates(app_def, cache=self.render_cache)
+            tree = stage_package(app_def, rendered)
+            digest = tree.digest(self.digest_cache)
+        except (
+            ValidationError,
+            TemplateError,
+            VolumeOwnershipError,
+            BuildError,
+            ValueError,
+            OSError,
+        ) as e:
+            return finish("failed", errors=(str(e),))
+
+        # Compression and the build date do not change the staged tree
+        build = (digest, compression, app_def.source_date_epoch)
+        if build == self._last_build:
+            return finish("unchanged", digest=digest)
+
+        try:
+            deb_file = self.build_fn(
+                tree,
+                app_def.metadata["package_name"],
+                app_def.metadata["version"],
+                self.output_dir,
+                keep_temp=self.keep_temp,
+                source_date_epoch=app_def.source_date_epoch,
+                compression=compression,
+            )
+        except BuildError as e:
+            return finish("failed", digest=digest, errors=(str(e),))
+
+        self._last_build = build
+        return finish("built", digest=digest, deb_file=deb_file)
+
+    def _pin_timestamps(self, app_def: AppDefinition) -> None:
+        """Reuse the build timestamps of the first build of this session."""
+        if app_def.source_date_epoch is not None:
+            return
+        if self._reference is None:
+            self._reference = app_def
+            return
+        app_def.timestamp = self._reference.timestamp
+        app_def.timestamp_rfc2822 = self._reference.timestamp_rfc2822
+        app_def.date_only = self._reference.date_only
+
+
+class PollingWatcher:
+    """Detect changes by comparing modification times and sizes of all files."""
+
+    def __init__(self, root: Path, interval: float = DEFAULT_POLL_INTERVAL) -> None:
+        """Initialize watcher.
+
+        Args:
+            root: Directory to watch recursively
+            interval: Seconds between scans
+        """
+        self.root = root
+        self.interval = interval
+        self._snapshot = self._scan()
+
+    def _scan(self) -> dict[Path, tuple[int, int]]:
+        """Return (mtime_ns, size) for every file below the root."""
+        snapshot: dict[Path, tuple[int, int]] = {}
+        for dirpath, _dirnames, filenames in os.walk(self.root):
+            for filename in filenames:
+                path = Path(dirpath) / filename
+                try:
+                    st = path.stat()
+                except FileNotFoundError:
+                    continue
+                snapshot[path] = (st.st_mtime_ns, st.st_size)
+        return snapshot
+
+    def wait(self, timeout: float | None = None) -> set[Path]:
+        """Block until files change or the timeout expires.
+
+        Args:
+            timeout: Maximum seconds to wait, or None to wait indefinitely
+
+        Returns:
+            Paths that were created, modified or deleted (empty on timeout)
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            current = self._scan()
+            changed = {
+                path
+                for path in current.keys() | self._snapshot.keys()
+                if current.get(path) != self._snapshot.get(path)
+            }
+            self._snapshot = current
+            if changed:
+                return changed
+
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return set()
+                time.sleep(min(self.interval, remaining))
+            else:
+                time.sleep(self.interval)
+
+    def close(self) -> None:
+        """Release resources (nothing to do for polling)."""
+
+
+class InotifyWatcher:
+    """Detect changes with Linux inotify, watching every directory below the root."""
+
+    def __init__(self, root: Path) -> None:
+        """Initialize watcher.
+
+        Args:
+            root: Directory to watch recursively
+
+        Raises:
+            OSError: If inotify is not available
+        """
+        libc_name = ctypes.util.find_library("c")
+        if not sys.platform.startswith("linux") or libc_name is None:
+            raise OSError("inotify is only available on Linux")
+
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        self._fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, f"inotify_init1 failed: {os.strerror(errno)}")
+
+        self.root = root
+        self._watches: dict[int, Path] = {}
+        for dirpath, _dirnames, _filenames in os.walk(root):
+            self._add_watch(Path(dirpath))
+
+    def _add_watch(self, directory: Path) -> None:
+        """Add an inotify watch for one directory."""
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), _WATCH_MASK)
+        if wd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, f"inotify_add_watch failed for {directory}")
+        self._watches[wd] = directory
+
+    def _read_events(self) -> set[Path]:
+        """Drain pending events and return the affected paths."""
+        changed: set[Path] = set()
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return changed
+
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            wd, mask, _cookie, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = data[offset : offset + length].rstrip(b"\0")
+            offset += length
+
+            directory = self._watches.get(wd)
+            if directory is None:
+                continue
+            path = directory / os.fsdecode(name) if name else directory
+            changed.add(path)
+
+            # Follow newly created subdirectories (e.g., assets/, default-data/)
+            if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+                try:
+                    self._add_watch(path)
+                except OSError:
+                    logger.debug(f"Could not watch new directory {path}")
+
+        return changed
+
+    def wait(self, timeout: float | None = None) -> set[Path]:
+        """Block until files change or the timeout expires.
+
+        Args:
+            timeout: Maximum seconds to wait, or None to wait indefinitely
+
+        Returns:
+            Paths that were created, modified or deleted (empty on timeout)
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return set()
+            ready, _, _ = select.select([self._fd], [], [], remaining)
+            if not ready:
+                return set()
+            changed = self._read_events()
+            if changed:
+                return changed
+
+    def close(self) -> None:
+        """Close the inotify file descriptor."""
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+def create_watcher(root: Path, poll: bool = False) -> InotifyWatcher | PollingWatcher:
+    """Create the best available file watcher for a directory.
+
+    Args:
+        root: Directory to watch recursively
+        poll: Force the polling watcher
+
+    Returns:
+        InotifyWatcher if available and not disabled, else PollingWatcher
+    """
+    if not poll:
+        try:
+            return InotifyWatcher(root)
+        except (OSError, AttributeError) as e:
+            logger.info(f"inotify unavailable ({e}), falling back to polling")
+    return PollingWatcher(root)
+
+
+def wait_for_changes(
+    watcher: InotifyWatcher | PollingWatcher,
+    debounce: float = DEFAULT_DEBOUNCE,
+) -> set[Path]:
+    """Wait for a change, then keep collecting until changes stop for `debounce`.
+
+    Editors typically write a file in several steps (truncate, write, rename),
+    so rebuilding on the first event would build from a half-written file.
+
+    Args:
+        watcher: File watcher
+        debounce: Quiet period in seconds
+
+    Returns:
+        All paths changed during the burst
+    """
+    changed = watcher.wait()
+    while True:
+        more = watcher.wait(timeout=debounce)
+        if not more:
+            return changed
+        changed |= more
+
+
+def watch(
+    builder: IncrementalBuilder,
+    poll: bool = False,
+    debounce: float = DEFAULT_DEBOUNCE,
+    report: Callable[[RebuildResult, set[Path]], None] | None = None,
+    max_rebuilds: int | None = None,
+) -> None:
+    """Build once, then rebuild whenever files in the input directory change.
+
+    Runs until interrupted (KeyboardInterrupt) or max_rebuilds is reached.
+
+    Args:
+        builder: Incremental builder for the application
+        poll: Force polling instead of inotify
+        debounce: Quiet period in seconds before rebuilding
+        report: Callback receiving each rebuild result and the changed paths
+        max_rebuilds: Stop after this many rebuilds after the initial one
+    """
+    report = report or _print_result
+    watcher = create_watcher(builder.input_dir, poll=poll)
+    try:
+        report(builder.rebuild(), set())
+        rebuilds = 0
+        while max_rebuilds is None or rebuilds < max_rebuilds:
+            changed = wait_for_changes(watcher, debounce=debounce)
+            logger.debug(f"Changed: {', '.join(sorted(str(p) for p in changed))}")
+            report(builder.rebuild(), changed)
+            rebuilds += 1
+    finally:
+        watcher.close()
+
+
+def _print_result(result: RebuildResult, changed: set[Path]) -> None:
+    """Default reporter: print one line per rebuild."""
+    elapsed = f"{result.elapsed_seconds * 1000:.0f} ms"
+    if result.status == "built":
+        print(f"Built {result.deb_file} ({elapsed})", flush=True)
+    elif result.status == "unchanged":
+        print(f"Package unchanged, build skipped ({elapsed})", flush=True)
+    elif result.status == "validated":
+        print(f"Validation passed ({elapsed})", flush=True)
+    else:
+        print(f"Rebuild failed ({elapsed}):", file=sys.stderr, flush=True)
+        for error in result.errors:
+            print(f"  - {error}", file=sys.stderr, flush=True)
@@ -1,5 +1,7 @@
 """Pydantic models for validating metadata.yaml files."""
 
+import functools
+import re
 import subprocess
 from typing import Literal
 
@@ -13,7 +15,90 @@ from pydantic import (
 )
 
 # Valid watch types for systemd .path units
-WatchType = Literal["directory_modified", "path_changed", "path_exists"]
+WatchType = Literal[
+    "directory_modified", "path_changed", "path_exists", "directory_not_empty"
+]
+
+# Package compressors supported by dpkg-deb
+CompressionType = Literal["xz", "zstd", "gzip", "none"]
+
+# Compression levels accepted by dpkg-deb per compressor (inclusive)
+COMPRESSION_LEVELS: dict[str, tuple[int, int]] = {
+    "xz": (0, 9),
+    "zstd": (1, 22),
+    "gzip": (1, 9),
+}
+
+
+def check_compression_level(compressor: str, level: int | None) -> None:
+    """Check that a compression level is valid for a compressor.
+
+    Args:
+        compressor: Compressor name
+        level: Compression level, or None for the compressor's default
+
+    Raises:
+        ValueError: If the level is out of range or the compressor has none
+    """
+    if level is None:
+        return
+    if compressor not in COMPRESSION_LEVELS:
+        raise ValueError(f"compression '{compressor}' does not take a level")
+    low, high = COMPRESSION_LEVELS[compressor]
+    if not low <= level <= high:
+        raise ValueError(
+            f"{compressor} compression level must be between {low} and {high}, got {level}"
+        )
+
+
+@functools.lru_cache(maxsize=1024)
+def _dpkg_check_version(version: str) -> bool | None:
+    """Check a version string with dpkg, once per distinct version.
+
+    Compares the version to itself: dpkg exits 0 for valid versions and
+    prints "bad syntax" warnings or errors for invalid ones. A timeout is
+    raised rather than returned so that it is not cached.
+
+    Args:
+        version: Version string to check
+
+    Returns:
+        Whether dpkg accepts the version, or None if dpkg is unavailable
+
+    Raises:
+        subprocess.TimeoutExpired: If dpkg did not answer in time
+    """
+    try:
+        result = subprocess.run(
+            ["dpkg", "--compare-versions", version, "eq", version],
+            capture_output=True,
+            check=False,
+            timeout=1,
+            text=True,
+        )
+    except FileNotFoundError:
+        return None
+    if result.stderr and (
+        "bad syntax" in result.stderr or "error" in result.stderr.lower()
+    ):
+        return False
+    return result.returncode == 0
+
+
+def _dpkg_version_valid(version: str) -> bool | None:
+    """Check a version string with dpkg.
+
+    Args:
+        version: Version string to check
+
+    Returns:
+        Whether dpkg accepts the version, or None if dpkg is unavailable
+        or timed out
+    """
+    try:
+        return _dpkg_check_version(version)
+    except subprocess.TimeoutExpired:
+        return None
 
 
 class WebUI(BaseModel):
@@ -275,7 +360,8 @@ class FileWatcher(BaseModel):
             "Type of change to watch for: "
             "directory_modified (contents changed), "
             "path_changed (file modified), "
-            "path_exists (file/dir created)"
+            "path_exists (file/dir created), "
+            "directory_not_empty (directory contains files)"
         ),
     )
     on_change: FileWatcherAction = Field(
@@ -291,6 +377,25 @@ class FileWatcher(BaseModel):
         return v
 
 
+class Compression(BaseModel):
+    """Compression of the package archive (dpkg-deb -Z and -z).
+
+    zstd decompresses several times faster than xz on low-end devices, at a
+    slightly larger package size.
+    """
+
+    type: CompressionType = Field(description="Compressor: xz, zstd, gzip or none")
+    level: int | None = Field(
+        None, description="Compression level (default: the compressor's default)"
+    )
+
+    @model_validator(mode="after")
+    def validate_level(self) -> "Compression":
+        """Ensure the level is valid for the compressor."""
+        check_compression_level(self.type, self.level)
+        return self
+
+
 class SourceMetadata(BaseModel):
     """Metadata about the source of a converted app.
 
@@ -489,6 +594,19 @@ class PackageMetadata(BaseModel):
             "Each watcher generates a systemd .path unit."
         ),
     )
+    coalesce_file_watchers: bool = Field(
+        False,
+        description=(
+            "Merge file watchers with the same on_change action into a single "
+            ".path unit (named after the first watcher) with one directive per "
+            "watched path"
+        ),
+    )
+
+    # Package compression (can be overridden per build)
+    compression: Compression | None = Field(
+        None, description="Package compression profile (default: dpkg-deb's)"
+    )
 
     @field_validator("file_watchers")
     @classmethod
@@ -538,42 +656,21 @@ class PackageMetadata(BaseModel):
             raise ValueError("Version cannot be empty or whitespace")
 
         # Validate using dpkg --compare-versions
-        # We compare the version to itself to check if it's a valid version string
-        try:
-            result = subprocess.run(
-                ["dpkg", "--compare-versions", v, "eq", v],
-                capture_output=True,
-                check=False,
-                timeout=1,
-                text=True,
+        valid = _dpkg_version_valid(v)
+        if valid is False:
+            raise ValueError(
+                f"Invalid Debian version format: '{v}'. "
+                "Version must be valid according to Debian policy. "
+                "Examples: 1.2.3, 20250113, 2025.01.13, 5.8.4+git20250113"
             )
-            # Check for warnings in stderr (indicates bad syntax)
-            # dpkg prints warnings like "version 'v1.0' has bad syntax"
-            if result.stderr and (
-                "bad syntax" in result.stderr or "error" in result.stderr.lower()
-            ):
-                raise ValueError(
-                    f"Invalid Debian version format: '{v}'. "
-                    "Version must be valid according to Debian policy. "
-                    "Examples: 1.2.3, 20250113, 2025.01.13, 5.8.4+git20250113"
-                )
-            # Exit code 0 means versions are equal (valid format)
-            if result.returncode != 0:
-                raise ValueError(
-                    f"Invalid Debian version format: '{v}'. "
-                    "Version must be valid according to Debian policy. "
-                    "Examples: 1.2.3, 20250113, 2025.01.13, 5.8.4+git20250113"
-                )
-        except (subprocess.TimeoutExpired, FileNotFoundError) as e:
+        if valid is None:
             # If dpkg is not available or times out, do basic validation
             # Allow alphanumeric, dots, dashes, plus signs, tildes, and colons
-            import re
-
             if not re.match(r"^[0-9][0-9a-zA-Z.+~:-]*$", v):
                 raise ValueError(
                     f"Invalid version format: '{v}'. "
                     "Version must start with a digit and contain only "
                     "alphanumeric characters, dots, dashes, plus signs, tildes, and colons"
-                ) from e
+                )
 
         return v
@@ -5,6 +5,7 @@ in parallel with proper error handling and progress tracking.
 """
 
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import pytest
@@ -297,6 +298,128 @@ class TestBatchConverter:
         assert len(result.errors) == result.failure_count
 
 
+class TestStreamingBatch:
+    """Tests for bounded submission and JSON Lines reporting."""
+
+    def _make_apps(self, batch_dir: Path, valid: int, invalid: int) -> None:
+        import shutil
+
+        batch_dir.mkdir()
+        for i in range(valid):
+            shutil.copytree(FIXTURES_DIR / "simple-app", batch_dir / f"good{i}")
+        for i in range(invalid):
+            bad = batch_dir / f"bad{i}"
+            bad.mkdir()
+            (bad / "docker-compose.yml").write_text("invalid: :::")
+
+    def test_submission_window_bounds_in_flight_jobs(
+        self, tmp_path: Path, monkeypatch
+    ) -> None:
+        """Test that no more than max_pending jobs are in flight at once."""
+        import threading
+
+        batch_dir = tmp_path / "apps"
+        self._make_apps(batch_dir, valid=0, invalid=12)
+
+        converter = BatchConverter(max_workers=2)
+        lock = threading.Lock()
+        in_flight = 0
+        peak = 0
+        original_submit = ThreadPoolExecutor.submit
+
+        def tracking_submit(executor, fn, *args, **kwargs):
+            nonlocal in_flight, peak
+            with lock:
+                in_flight += 1
+                peak = max(peak, in_flight)
+            future = original_submit(executor, fn, *args, **kwargs)
+            return future
+
+        def on_progress(job: ConversionJob) -> None:
+            nonlocal in_flight
+            with lock:
+                in_flight -= 1
+
+        monkeypatch.setattr(ThreadPoolExecutor, "submit", tracking_submit)
+        result = converter.convert_batch(
+            source_dir=batch_dir,
+            output_dir=tmp_path / "output",
+            progress_callback=on_progress,
+            max_pending=3,
+        )
+
+        assert result.total == 12
+        assert peak <= 3
+
+    def test_report_streams_results(self, tmp_path: Path) -> None:
+        """Test that per-app results go to the JSONL report, not the result lists."""
+        import json
+
+        batch_dir = tmp_path / "apps"
+        self._make_apps(batch_dir, valid=1, invalid=2)
+        report = tmp_path / "report.jsonl"
+
+        result = BatchConverter(max_workers=2).convert_batch(
+            source_dir=batch_dir,
+            output_dir=tmp_path / "output",
+            report_path=report,
+        )
+
+        records = [json.loads(line) for line in report.read_text().splitlines()]
+        assert len(records) == 3
+        assert sum(r["status"] == "failed" for r in records) == 2
+        assert all(r["error"] for r in records if r["status"] == "failed")
+        assert result.failure_count == 2
+        assert result.errors == []
+        assert result.warnings == []
+        assert result.report_path == report
+        assert result.warning_count == sum(len(r["warnings"]) for r in records)
+
+    def test_unchanged_rerun_counts(self, tmp_path: Path) -> None:
+        """Test that converting twice writes files once and then skips them."""
+        batch_dir = tmp_path / "apps"
+        self._make_apps(batch_dir, valid=1, invalid=1)
+        converter = BatchConverter(max_workers=2)
+
+        first = converter.convert_batch(batch_dir, tmp_path / "output")
+        second = converter.convert_batch(batch_dir, tmp_path / "output")
+
+        assert (first.files_written, first.files_unchanged) == (3, 0)
+        assert (second.files_written, second.files_unchanged) == (0, 3)
+
+    def test_transformer_shared_across_apps(self, tmp_path: Path, monkeypatch) -> None:
+        """Test that one transformer (and its memos) serves the whole batch."""
+        from generate_container_packages.converters.casaos import batch
+
+        batch_dir = tmp_path / "apps"
+        self._make_apps(batch_dir, valid=2, invalid=0)
+        created = []
+        original = batch.MetadataTransformer
+
+        def counting(*args, **kwargs):
+            created.append(original(*args, **kwargs))
+            return created[-1]
+
+        monkeypatch.setattr(batch, "MetadataTransformer", counting)
+        result = BatchConverter(max_workers=1).convert_batch(
+            batch_dir, tmp_path / "output"
+        )
+
+        assert result.success_count == 2
+        assert len(created) == 1
+        assert created[0]._field_type_memo
+
+    def test_invalid_max_pending(self, tmp_path: Path) -> None:
+        """Test that a non-positive window is rejected."""
+        batch_dir = tmp_path / "apps"
+        self._make_apps(batch_dir, valid=0, invalid=1)
+
+        with pytest.raises(ValueError, match="max_pending must be positive"):
+            BatchConverter().convert_batch(
+                source_dir=batch_dir, output_dir=tmp_path / "out", max_pending=0
+            )
+
+
 class TestBatchResult:
     """Tests for BatchResult dataclass."""
 
@@ -913,3 +913,50 @@ class TestConvertCasaOSExitCodes:
         )
 
         assert result.returncode != 0
+
+    def test_sync_reads_each_upstream_file_once(self, tmp_path: Path) -> None:
+        """Test that sync hashes and converts from a single read per file."""
+        import argparse
+        import shutil
+
+        from generate_container_packages import cli
+        from generate_container_packages.converters.casaos.constants import (
+            get_default_mappings_dir,
+        )
+        from generate_container_packages.converters.casaos.source import (
+            SourceDocument,
+        )
+
+        upstream_dir = tmp_path / "upstream"
+        shutil.copytree(FIXTURES_DIR / "simple-app", upstream_dir / "app1")
+        shutil.copytree(FIXTURES_DIR / "complex-app", upstream_dir / "app2")
+        converted_dir = tmp_path / "converted"
+        converted_dir.mkdir()
+        args = argparse.Namespace(
+            quiet=True,
+            debug=False,
+            download_assets=False,
+            upstream_url="https://github.com/IceWhaleTech/CasaOS-AppStore",
+        )
+
+        with (
+            patch.object(SourceDocument, "read", wraps=SourceDocument.read) as read,
+            patch(
+                "generate_container_packages.converters.casaos.transformer"
+                ".compute_file_hash"
+            ) as compute_file_hash,
+        ):
+            exit_code = cli._convert_sync(
+                upstream_dir,
+                converted_dir,
+                cli.CasaOSParser(),
+                cli.MetadataTransformer(get_default_mappings_dir()),
+                args,
+            )
+
+        assert exit_code == 0
+        assert sorted(c.args[0].parent.name for c in read.call_args_list) == [
+            "app1",
+            "app2",
+        ]
+        compute_file_hash.assert_not_called()
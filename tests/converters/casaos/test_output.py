@@ -5,6 +5,7 @@ and docker-compose.yml files with validation.
 """
 
 from pathlib import Path
+from unittest.mock import patch
 
 import pytest
 import yaml
@@ -12,6 +13,8 @@ from pydantic import ValidationError
 
 from generate_container_packages.converters.casaos.models import ConversionContext
 from generate_container_packages.converters.casaos.output import OutputWriter
+from generate_container_packages.validator import validate_metadata
+from schemas.metadata import PackageMetadata
 
 
 class TestOutputWriterInit:
@@ -388,6 +391,131 @@ class TestWritePackage:
         assert metadata_yaml["screenshots"] == ["screenshot1.png", "screenshot2.png"]
 
 
+class TestSkipUnchanged:
+    """Tests for skipping writes of unchanged output files."""
+
+    @pytest.fixture
+    def package(self) -> tuple[dict, dict, dict]:
+        """Minimal metadata, config and compose with a conversion timestamp."""
+        metadata = {
+            "name": "Test App",
+            "app_id": "test-app",
+            "version": "1.0.0",
+            "description": "Test application",
+            "maintainer": "Test Developer <test@example.com>",
+            "license": "MIT",
+            "tags": ["role::container-app"],
+            "debian_section": "net",
+            "architecture": "all",
+            "source_metadata": {
+                "type": "casaos",
+                "app_id": "test-app",
+                "source_url": "https://github.com/IceWhaleTech/CasaOS-AppStore",
+                "upstream_hash": "0" * 64,
+                "conversion_timestamp": "2024-01-01T00:00:00+00:00",
+            },
+        }
+        config = {"version": "1.0", "groups": []}
+        compose = {"services": {"app": {"image": "nginx:alpine"}}}
+        return metadata, config, compose
+
+    def write(self, output_dir: Path, metadata, config, compose) -> OutputWriter:
+        """Write a package and return the writer."""
+        writer = OutputWriter(output_dir)
+        writer.write_package(
+            metadata,
+            config,
+            compose,
+            ConversionContext(source_format="casaos", app_id="test-app"),
+        )
+        return writer
+
+    def test_unchanged_package_not_rewritten(self, tmp_path: Path, package) -> None:
+        """Test that only the timestamp changing leaves files untouched."""
+        metadata, config, compose = package
+        self.write(tmp_path, metadata, config, compose)
+        before = {
+            p.name: (p.stat().st_mtime_ns, p.read_bytes()) for p in tmp_path.iterdir()
+        }
+
+        metadata["source_metadata"]["conversion_timestamp"] = (
+            "2025-06-01T12:00:00+00:00"
+        )
+        with patch("os.replace") as replace:
+            writer = self.write(tmp_path, metadata, config, compose)
+
+        replace.assert_not_called()
+        assert writer.written == []
+        assert sorted(writer.unchanged) == sorted(before)
+        after = {
+            p.name: (p.stat().st_mtime_ns, p.read_bytes()) for p in tmp_path.iterdir()
+        }
+        assert after == before
+
+    def test_changed_file_rewritten(self, tmp_path: Path, package) -> None:
+        """Test that a real change rewrites only the affected file."""
+        metadata, config, compose = package
+        self.write(tmp_path, metadata, config, compose)
+
+        compose["services"]["app"]["image"] = "nginx:1.27"
+        writer = self.write(tmp_path, metadata, config, compose)
+
+        assert writer.written == ["docker-compose.yml"]
+        assert sorted(writer.unchanged) == ["config.yml", "metadata.yaml"]
+        written = yaml.safe_load((tmp_path / "docker-compose.yml").read_text())
+        assert written["services"]["app"]["image"] == "nginx:1.27"
+        assert sorted(p.name for p in tmp_path.iterdir()) == [
+            "config.yml",
+            "docker-compose.yml",
+            "metadata.yaml",
+        ]
+
+    def test_skip_disabled(self, tmp_path: Path, package) -> None:
+        """Test that skip_unchanged=False always writes."""
+        metadata, config, compose = package
+        self.write(tmp_path, metadata, config, compose)
+
+        writer = OutputWriter(tmp_path, skip_unchanged=False)
+        written = writer.write_package(
+            metadata,
+            config,
+            compose,
+            ConversionContext(source_format="casaos", app_id="test-app"),
+        )
+
+        assert len(written) == 3
+        assert writer.unchanged == []
+
+
+class TestTrustedOutput:
+    """Tests for reuse of models validated while writing."""
+
+    def test_written_metadata_not_revalidated(self, tmp_path: Path) -> None:
+        """Test that validating the written metadata reuses the trusted model."""
+        metadata = {
+            "name": "Trusted Output",
+            "app_id": "trusted-output",
+            "version": "2.0.0",
+            "description": "Converted app",
+            "maintainer": "Test <test@example.com>",
+            "license": "MIT",
+            "tags": ["role::container-app"],
+            "debian_section": "net",
+            "architecture": "all",
+        }
+        config = {"version": "1.0", "groups": []}
+        context = ConversionContext(source_format="casaos", app_id="trusted-output")
+        OutputWriter(tmp_path).write_package(
+            metadata, config, {"services": {"app": {"image": "x"}}}, context
+        )
+
+        with patch.object(PackageMetadata, "model_validate") as model_validate:
+            validated = validate_metadata(tmp_path / "metadata.yaml")
+
+        model_validate.assert_not_called()
+        assert validated.app_id == "trusted-output"
+
+
 class TestYAMLFormatting:
     """Tests for YAML formatting behavior."""
 
@@ -7,6 +7,7 @@ from pydantic import ValidationError
 
 from generate_container_packages.converters.casaos.models import CasaOSApp
 from generate_container_packages.converters.casaos.parser import CasaOSParser
+from generate_container_packages.converters.casaos.source import SourceDocument
 from generate_container_packages.converters.exceptions import (
     ValidationError as ConverterValidationError,
 )
@@ -348,6 +349,38 @@ x-casaos:
             assert "invalid.yml" in str(e)
 
 
+class TestParseDocument:
+    """Tests for parsing from SourceDocument."""
+
+    def test_parse_document_stores_mapping(self):
+        """Test that the parsed mapping is kept on the document."""
+        compose_file = FIXTURES_DIR / "simple-app" / "docker-compose.yml"
+        document = SourceDocument.read(compose_file)
+
+        app = CasaOSParser().parse_document(document)
+
+        assert app.id == "nginx-test"
+        assert document.data["name"] == "nginx-test"
+
+    def test_parsed_document_not_decoded_again(self):
+        """Test that a document with a parsed mapping ignores its bytes."""
+        compose_file = FIXTURES_DIR / "simple-app" / "docker-compose.yml"
+        document = SourceDocument.read(compose_file)
+        parser = CasaOSParser()
+        parser.parse_document(document)
+        document.content = b"\xff not yaml"
+
+        assert parser.parse_document(document).id == "nginx-test"
+
+    def test_invalid_utf8(self, tmp_path):
+        """Test that undecodable content is a validation error with context."""
+        compose_file = tmp_path / "docker-compose.yml"
+        compose_file.write_bytes(b"name: \xff\n")
+
+        with pytest.raises(ConverterValidationError, match="docker-compose.yml"):
+            CasaOSParser().parse_document(SourceDocument.read(compose_file))
+
+
 class TestParserEdgeCases:
     """Tests for parser edge cases and error handling."""
 
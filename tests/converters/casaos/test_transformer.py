@@ -20,11 +20,25 @@ from generate_container_packages.converters.casaos.models import (
     CasaOSVolume,
     ConversionContext,
 )
+from generate_container_packages.converters.casaos.source import SourceDocument
 from generate_container_packages.converters.casaos.transformer import (
+    PATH_RULES_MAX,
     MetadataTransformer,
+    _LRUMemo,
 )
 
 
+def write_mappings(target: Path, patterns: list[dict]) -> None:
+    """Copy the default mappings with custom field type patterns."""
+    import shutil
+
+    import yaml
+
+    for name in ("categories.yaml", "paths.yaml"):
+        shutil.copy(get_default_mappings_dir() / name, target / name)
+    (target / "field_types.yaml").write_text(yaml.safe_dump({"patterns": patterns}))
+
+
 @pytest.fixture
 def mappings_dir() -> Path:
     """Return path to test mapping files."""
@@ -488,6 +502,83 @@ class TestFieldTypeInference:
         assert field_type == "string"
 
 
+class TestFieldTypeMatcher:
+    """Tests for the combined field type pattern matcher."""
+
+    NAMES = [
+        "WEBUI_PORT",
+        "PORT",
+        "DB_HOSTNAME",
+        "BASE_URL",
+        "ADMIN_PASSWORD",
+        "API_KEY",
+        "API_TOKEN",
+        "DB_USER",
+        "CONFIG_DIR",
+        "MEDIA_FOLDER",
+        "PUID",
+        "PGID",
+        "TZ",
+        "ENABLE_SSL",
+        "RANDOM_VAR",
+        "lower_case_port",
+    ]
+
+    def test_same_result_as_linear_scan(self, transformer: MetadataTransformer) -> None:
+        """Test that the combined regex picks the first matching pattern."""
+        for name in self.NAMES:
+            expected = next(
+                (p for p in transformer._compiled_patterns if p["regex"].match(name)),
+                None,
+            )
+            assert transformer._match_field_pattern(name) is expected, name
+
+    def test_results_memoized(self, transformer: MetadataTransformer) -> None:
+        """Test that a name is matched against the patterns only once."""
+        transformer._match_field_pattern("PUID")
+        transformer._field_type_matcher = None
+        transformer._compiled_patterns = []
+
+        assert transformer._match_field_pattern("PUID")["group"] == "system"
+
+    def test_first_match_wins_when_combined(self, tmp_path: Path) -> None:
+        """Test that overlapping patterns keep file order."""
+        write_mappings(
+            tmp_path,
+            [
+                {"pattern": "^ADMIN_.*$", "type": "string", "group": "admin"},
+                {"pattern": "^[A-Z_]*PASSWORD$", "type": "password"},
+            ],
+        )
+        transformer = MetadataTransformer(tmp_path)
+
+        assert transformer._field_type_matcher is not None
+        field_type, _, group = transformer._infer_field_type(
+            CasaOSEnvVar(name="ADMIN_PASSWORD", default="")
+        )
+        assert (field_type, group) == ("string", "admin")
+        field_type, _, _ = transformer._infer_field_type(
+            CasaOSEnvVar(name="DB_PASSWORD", default="")
+        )
+        assert field_type == "password"
+
+    def test_backreference_falls_back_to_linear_scan(self, tmp_path: Path) -> None:
+        """Test that patterns with backreferences are matched one by one."""
+        write_mappings(
+            tmp_path,
+            [
+                {"pattern": "^(A)_\\1$", "type": "integer"},
+                {"pattern": "^B$", "type": "boolean"},
+            ],
+        )
+        transformer = MetadataTransformer(tmp_path)
+
+        assert transformer._field_type_matcher is None
+        assert transformer._match_field_pattern("A_A")["type"] == "integer"
+        assert transformer._match_field_pattern("B")["type"] == "boolean"
+        assert transformer._match_field_pattern("A_B") is None
+
+
 class TestPathTransformation:
     """Test path transformation from CasaOS to HaLOS conventions."""
 
@@ -627,6 +718,64 @@ class TestPathTransformation:
         assert result == "${CONTAINER_DATA_ROOT}/AppData/MyApp/config"
 
 
+class TestPathRuleMatcher:
+    """Tests for the compiled path transformation rules."""
+
+    def test_earlier_rule_wins_over_longer_prefix(self, tmp_path: Path) -> None:
+        """Test that rule order, not prefix length, decides the match."""
+        write_mappings(tmp_path, [])
+        (tmp_path / "paths.yaml").write_text(
+            "transforms:\n"
+            "  - {from: /DATA/, to: /first/}\n"
+            "  - {from: '/DATA/AppData/{app}/', to: /second/}\n"
+            "  - {from: /config, to: /cfg}\n"
+        )
+        transformer = MetadataTransformer(tmp_path)
+
+        assert transformer._transform_path("/DATA/AppData/x/a", "x") == (
+            "/first/AppData/x/a"
+        )
+        assert transformer._transform_path("/configuration", "x") == "/cfguration"
+        assert transformer._transform_path("/other", "x") == "/other"
+
+    def test_rules_resolved_per_app(self, transformer: MetadataTransformer) -> None:
+        """Test that app placeholders in rules are resolved for each app."""
+        assert (
+            transformer._transform_path("/DATA/AppData/one/db", "one")
+            == "${CONTAINER_DATA_ROOT}/db"
+        )
+        assert (
+            transformer._transform_path("/DATA/AppData/one/db", "two")
+            == "${CONTAINER_DATA_ROOT}/AppData/one/db"
+        )
+        assert len(transformer._app_path_rules) == 2
+
+    def test_results_cached(self, transformer: MetadataTransformer) -> None:
+        """Test that a path is transformed once per app."""
+        first = transformer._transform_path("/AppData/app/config", "app")
+        transformer._app_path_rules = _LRUMemo(PATH_RULES_MAX)
+        transformer._path_transforms = []
+
+        assert transformer._transform_path("/AppData/app/config", "app") == first
+        assert len(transformer._app_path_rules) == 0
+
+    def test_memos_bounded(self, transformer: MetadataTransformer) -> None:
+        """Test that memos keep a bounded number of apps and paths."""
+        for i in range(PATH_RULES_MAX + 10):
+            transformer._transform_path(f"/DATA/AppData/app{i}/db", f"app{i}")
+
+        assert len(transformer._app_path_rules) == PATH_RULES_MAX
+        assert len(transformer._path_cache) == PATH_RULES_MAX + 10
+
+        transformer._path_cache.maxsize = 5
+        transformer._transform_path("/DATA/AppData/last/db", "last")
+        assert len(transformer._path_cache) == 5
+        assert (
+            transformer._transform_path("/DATA/AppData/last/db", "last")
+            == "${CONTAINER_DATA_ROOT}/db"
+        )
+
+
 class TestTransformerIntegration:
     """Integration tests for full transformation."""
 
@@ -1198,3 +1347,30 @@ class TestVersionExtraction:
 
         # Should use first service (web/nginx) since no name contains "myapp"
         assert result["metadata"]["version"] == "1.25.3"
+
+
+class TestSourceTracking:
+    """Tests for source_metadata generation."""
+
+    def test_upstream_hash_from_source_document(
+        self,
+        transformer: MetadataTransformer,
+        conversion_context: ConversionContext,
+        simple_casaos_app: CasaOSApp,
+        tmp_path: Path,
+    ) -> None:
+        """Test that the document digest is used without re-reading the file."""
+        document = SourceDocument.from_bytes(
+            tmp_path / "missing" / "docker-compose.yml", b"name: nginx-test\n"
+        )
+
+        result = transformer.transform(
+            simple_casaos_app,
+            conversion_context,
+            source_url="https://example.com/apps",
+            source=document,
+        )
+
+        source_metadata = result["metadata"]["source_metadata"]
+        assert source_metadata["upstream_hash"] == document.digest
+        assert source_metadata["source_url"] == "https://example.com/apps"
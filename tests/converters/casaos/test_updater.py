@@ -125,6 +125,24 @@ x-casaos:
         assert apps["jellyfin"].app_id == "jellyfin"
         assert apps["jellyfin"].compose_path.name == "docker-compose.yml"
 
+    def test_scan_upstream_keeps_document(
+        self, tmp_path: Path, upstream_app: Path
+    ) -> None:
+        """Test that the compose file is read once and kept for conversion."""
+        detector = CasaOSUpdateDetector(upstream_app, tmp_path / "converted")
+
+        detector.detect_changes()
+
+        app = detector.upstream_apps["jellyfin"]
+        compose_file = upstream_app / "jellyfin" / "docker-compose.yml"
+        assert app.document.content == compose_file.read_bytes()
+        assert app.compose_hash == app.document.digest
+        assert app.compose_hash == compute_file_hash(compose_file)
+
+        detector.release_document("jellyfin")
+        assert app.document is None
+        assert app.compose_path == compose_file
+
     def test_scan_upstream_empty_directory(self, tmp_path: Path) -> None:
         """Test that empty upstream directory returns no apps."""
         upstream_dir = tmp_path / "upstream"
@@ -534,6 +552,9 @@ class TestChangeDetection:
         assert len(report.new_apps) == 0
         assert len(report.updated_apps) == 0
         assert len(report.removed_apps) == 0
+        # Unchanged apps are not converted and keep only path and hash
+        assert detector.upstream_apps["unchanged"].document is None
+        assert detector.upstream_apps["unchanged"].compose_hash == compose_hash
 
     def test_detect_removed_apps(self, tmp_path: Path) -> None:
         """Test detection of apps removed from upstream."""
@@ -0,0 +1,213 @@
+"""Tests for the aggregated AppStream collection."""
+
+import argparse
+import gzip
+import io
+import shutil
+import tarfile
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from PIL import Image
+
+from generate_container_packages import appstream
+from generate_container_packages.appstream import (
+    AppStreamCatalog,
+    AppStreamError,
+    appstream_catalog_command,
+    metainfo_to_component,
+)
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures" / "valid"
+
+METAINFO = """<?xml version="1.0" encoding="UTF-8"?>
+<component type="webapp">
+  <id>demo-container</id>
+  <name>Demo</name>
+  <summary>Demo app</summary>
+  <icon type="local">/usr/share/pixmaps/demo-container.png</icon>
+  <releases>
+    <release version="1.0" date="2025-01-01" />
+  </releases>
+</component>
+"""
+
+
+def write_png(path: Path, size=(200, 100)) -> Path:
+    """Write a PNG icon."""
+    Image.new("RGBA", size, (255, 0, 0, 255)).save(path, format="PNG")
+    return path
+
+
+def read_collection(catalog_dir: Path, origin: str = "container-apps") -> ET.Element:
+    """Parse the compressed collection."""
+    return ET.fromstring(
+        gzip.decompress((catalog_dir / f"{origin}.xml.gz").read_bytes())
+    )
+
+
+def tar_members(path: Path) -> list[str]:
+    """Return member names of a tar.gz."""
+    with tarfile.open(path) as tar:
+        return tar.getnames()
+
+
+class TestMetainfoToComponent:
+    """Tests for metainfo_to_component function."""
+
+    def test_pkgname_and_cached_icons(self):
+        """Test that pkgname is added and the local icon replaced."""
+        component = ET.fromstring(
+            metainfo_to_component("demo-container", METAINFO, [64, 128])
+        )
+
+        assert component.findtext("pkgname") == "demo-container"
+        icons = component.findall("icon")
+        assert [(i.get("type"), i.get("width"), i.text) for i in icons] == [
+            ("cached", "64", "demo-container.png"),
+            ("cached", "128", "demo-container.png"),
+        ]
+
+    def test_local_icon_kept_without_cache(self):
+        """Test that the local icon stays when no cached icons exist."""
+        component = ET.fromstring(metainfo_to_component("demo-container", METAINFO))
+
+        assert component.find("icon").get("type") == "local"
+
+    def test_invalid_xml(self):
+        """Test that malformed metainfo raises AppStreamError."""
+        with pytest.raises(AppStreamError):
+            metainfo_to_component("demo-container", "<component>")
+
+
+class TestAppStreamCatalog:
+    """Tests for AppStreamCatalog."""
+
+    def test_collection_and_icon_tarballs(self, tmp_path):
+        """Test the collection and cached icon layout."""
+        catalog = AppStreamCatalog(tmp_path / "catalog", origin="halos")
+        icon = write_png(tmp_path / "icon.png")
+
+        catalog.add("demo-container", METAINFO, icon)
+        changed = catalog.write()
+
+        assert len(changed) == 3
+        collection = read_collection(tmp_path / "catalog", "halos")
+        assert collection.get("origin") == "halos"
+        assert [c.findtext("id") for c in collection] == ["demo-container"]
+        for size in (64, 128):
+            tarball = tmp_path / "catalog" / f"icons-{size}x{size}.tar.gz"
+            with tarfile.open(tarball) as tar:
+                data = tar.extractfile("demo-container.png").read()
+            assert Image.open(io.BytesIO(data)).size == (size, size)
+
+    def test_unchanged_app_not_reprocessed(self, tmp_path):
+        """Test that re-adding identical inputs skips icon scaling and writes."""
+        catalog = AppStreamCatalog(tmp_path / "catalog")
+        icon = write_png(tmp_path / "icon.png")
+        assert catalog.add("demo-container", METAINFO, icon)
+        catalog.write()
+
+        with patch.object(appstream, "_scaled_icons") as scaled:
+            assert not catalog.add("demo-container", METAINFO, icon)
+        scaled.assert_not_called()
+        assert catalog.write() == []
+
+    def test_outputs_are_reproducible(self, tmp_path):
+        """Test that two catalogs from the same inputs are byte-identical."""
+        icon = write_png(tmp_path / "icon.png")
+        outputs = []
+        for name in ("a", "b"):
+            catalog = AppStreamCatalog(tmp_path / name)
+            catalog.add("demo-container", METAINFO, icon)
+            catalog.write()
+            outputs.append(
+                [p.read_bytes() for p in sorted((tmp_path / name).glob("*.gz"))]
+            )
+
+        assert outputs[0] == outputs[1]
+
+    def test_remove(self, tmp_path):
+        """Test that removed packages disappear from all outputs."""
+        catalog = AppStreamCatalog(tmp_path / "catalog")
+        icon = write_png(tmp_path / "icon.png")
+        catalog.add("demo-container", METAINFO, icon)
+        catalog.add("other-container", METAINFO.replace("demo", "other"))
+        catalog.write()
+
+        catalog.remove("demo-container")
+        catalog.write()
+
+        assert catalog.packages() == ["other-container"]
+        assert len(read_collection(tmp_path / "catalog")) == 1
+        assert tar_members(tmp_path / "catalog" / "icons-64x64.tar.gz") == []
+
+    @pytest.mark.skipif(
+        shutil.which("rsvg-convert") is not None, reason="rsvg-convert installed"
+    )
+    def test_svg_without_rasterizer(self, tmp_path):
+        """Test that SVG icons stay local icons without rsvg-convert."""
+        catalog = AppStreamCatalog(tmp_path / "catalog")
+        catalog.add("demo-container", METAINFO, FIXTURES_DIR / "full-app" / "icon.svg")
+        catalog.write()
+
+        component = read_collection(tmp_path / "catalog")[0]
+        assert component.find("icon").get("type") == "local"
+
+
+class TestAppStreamCatalogCommand:
+    """Tests for appstream_catalog_command function."""
+
+    def _args(self, app_dirs, output, prune=False):
+        return argparse.Namespace(
+            app_dirs=[str(d) for d in app_dirs],
+            output=str(output),
+            origin="container-apps",
+            prune=prune,
+            prefix=None,
+            suffix="container",
+        )
+
+    def test_incremental_render(self, tmp_path, capsys):
+        """Test that a second run renders nothing for unchanged apps."""
+        apps = [FIXTURES_DIR / "simple-app", FIXTURES_DIR / "watcher-app"]
+        output = tmp_path / "catalog"
+
+        assert appstream_catalog_command(self._args(apps, output)) == 0
+        assert "2 components, 2 rendered" in capsys.readouterr().out
+
+        with patch(
+            "generate_container_packages.renderer.render_metainfo"
+        ) as render_metainfo:
+            assert appstream_catalog_command(self._args(apps, output)) == 0
+        render_metainfo.assert_not_called()
+        assert "0 rendered, 0 files updated" in capsys.readouterr().out
+
+        ids = [c.findtext("id") for c in read_collection(output)]
+        assert ids == ["simple-test-app-container", "watcher-test-app-container"]
+
+    def test_prune(self, tmp_path, capsys):
+        """Test that --prune drops apps not given on the command line."""
+        output = tmp_path / "catalog"
+        appstream_catalog_command(
+            self._args([FIXTURES_DIR / "simple-app", FIXTURES_DIR / "full-app"], output)
+        )
+
+        appstream_catalog_command(
+            self._args([FIXTURES_DIR / "simple-app"], output, prune=True)
+        )
+
+        assert [c.findtext("pkgname") for c in read_collection(output)] == [
+            "simple-test-app-container"
+        ]
+
+    def test_invalid_app_dir(self, tmp_path, capsys):
+        """Test that a missing app definition is reported."""
+        exit_code = appstream_catalog_command(
+            self._args([tmp_path / "missing"], tmp_path / "catalog")
+        )
+
+        assert exit_code == 1
+        assert "ERROR" in capsys.readouterr().err
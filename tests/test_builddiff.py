@@ -0,0 +1,269 @@
+"""Tests for diffing staged package trees."""
+
+import argparse
+import shlex
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from generate_container_packages.builddiff import (
+    DiffError,
+    check_tool,
+    checkout,
+    diff_apps,
+    diff_command,
+    diff_snapshots,
+    dump_snapshot,
+    load_snapshot,
+    stage_snapshot,
+)
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+VALID_FIXTURES = FIXTURES_DIR / "valid"
+
+TOOL = shlex.join([sys.executable, "-m", "generate_container_packages"])
+
+
+def git(cwd: Path, *args: str) -> None:
+    """Run a git command in a test repository."""
+    subprocess.run(
+        ["git", "-c", "user.name=Test", "-c", "user.email=test@example.com", *args],
+        cwd=cwd,
+        check=True,
+        capture_output=True,
+    )
+
+
+def diff_args(app_dirs, **overrides):
+    """Create diff arguments."""
+    values = {
+        "app_dirs": [str(p) for p in app_dirs],
+        "from_ref": None,
+        "to_ref": None,
+        "from_tool": None,
+        "to_tool": None,
+        "jobs": 2,
+        "stat": False,
+        "exit_code": False,
+        "prefix": None,
+        "suffix": "container",
+    }
+    values.update(overrides)
+    return argparse.Namespace(**values)
+
+
+@pytest.fixture
+def repo(tmp_path):
+    """Git repository with two apps committed."""
+    apps = tmp_path / "apps"
+    shutil.copytree(VALID_FIXTURES / "simple-app", apps / "simple-app")
+    shutil.copytree(VALID_FIXTURES / "full-app", apps / "full-app")
+    git(tmp_path, "init", "-q")
+    git(tmp_path, "add", ".")
+    git(tmp_path, "commit", "-q", "-m", "initial")
+    return tmp_path
+
+
+def bump_version(app_dir: Path) -> None:
+    """Change the version in an app's metadata."""
+    metadata = app_dir / "metadata.yaml"
+    text = metadata.read_text()
+    old = next(line for line in text.splitlines() if line.startswith("version:"))
+    metadata.write_text(text.replace(old, 'version: "99.0.0"'))
+
+
+class TestDiffSnapshots:
+    """Tests for diff_snapshots function."""
+
+    def test_identical(self):
+        """Test that identical trees produce no diff."""
+        files = {"debian/control": (0o644, b"Package: x\n")}
+
+        result = diff_snapshots("x", files, dict(files))
+
+        assert result.files == []
+        assert result.lines == []
+
+    def test_modified_added_removed(self):
+        """Test unified diff headers for changed, new and removed files."""
+        old = {"a.txt": (0o644, b"one\ntwo\n"), "gone.txt": (0o644, b"x\n")}
+        new = {"a.txt": (0o644, b"one\nthree\n"), "new.txt": (0o644, b"y\n")}
+
+        result = diff_snapshots("app", old, new)
+        text = "".join(result.lines)
+
+        assert result.files == ["a.txt", "gone.txt", "new.txt"]
+        assert "--- a/app/a.txt\n+++ b/app/a.txt\n" in text
+        assert "-two\n+three\n" in text
+        assert "--- a/app/gone.txt\n+++ /dev/null\n" in text
+        assert "--- /dev/null\n+++ b/app/new.txt\n" in text
+
+    def test_mode_and_binary(self):
+        """Test that mode changes and binary files are reported."""
+        old = {"run.sh": (0o644, b"#!/bin/sh\n"), "icon.png": (0o644, b"\x89\0")}
+        new = {"run.sh": (0o755, b"#!/bin/sh\n"), "icon.png": (0o644, b"\x89\0\1")}
+
+        text = "".join(diff_snapshots("app", old, new).lines)
+
+        assert "mode a/app/run.sh 644 -> 755\n" in text
+        assert "Binary files a/app/icon.png and b/app/icon.png differ\n" in text
+
+
+class TestStageSnapshot:
+    """Tests for staging one side of a diff."""
+
+    def test_in_process(self):
+        """Test that the app is staged with its debian files."""
+        app_id, files = stage_snapshot(VALID_FIXTURES / "simple-app", None, "container")
+
+        assert app_id == "simple-test-app"
+        assert "debian/control" in files
+
+    def test_invalid_app(self):
+        """Test that validation failures raise DiffError."""
+        with pytest.raises(DiffError):
+            stage_snapshot(FIXTURES_DIR / "invalid" / "missing-metadata", None, "c")
+
+    def test_dump_roundtrip(self):
+        """Test that stage-dump output parses back to the same snapshot."""
+        app_id, files = stage_snapshot(VALID_FIXTURES / "simple-app", None, "container")
+
+        assert load_snapshot(dump_snapshot(app_id, files)) == (app_id, files)
+
+    def test_external_tool(self):
+        """Test that a tool command stages the same tree as this process."""
+        app_dir = VALID_FIXTURES / "simple-app"
+
+        assert stage_snapshot(app_dir, None, "container", TOOL) == stage_snapshot(
+            app_dir, None, "container"
+        )
+
+    def test_external_tool_failure(self):
+        """Test that a failing tool command raises DiffError."""
+        with pytest.raises(DiffError):
+            stage_snapshot(
+                FIXTURES_DIR / "invalid" / "missing-metadata", None, "c", TOOL
+            )
+
+
+class TestCheckTool:
+    """Tests for checking that a tool command provides stage-dump."""
+
+    def test_current_tool(self):
+        """Test that this version of the tool passes."""
+        check_tool(TOOL)
+
+    def test_tool_without_stage_dump(self):
+        """Test that an older tool that builds instead is rejected."""
+        old_tool = shlex.join(
+            [sys.executable, "-c", "print('usage: generate-container-packages')"]
+        )
+
+        with pytest.raises(DiffError, match="no stage-dump subcommand"):
+            check_tool(old_tool)
+
+    def test_missing_command(self, tmp_path):
+        """Test that a command that cannot be run raises DiffError."""
+        with pytest.raises(DiffError, match="Cannot run"):
+            check_tool(str(tmp_path / "no-such-tool"))
+
+
+class TestCheckout:
+    """Tests for extracting app directories from a git revision."""
+
+    def test_extracts_committed_state(self, repo, tmp_path):
+        """Test that committed files are extracted and missing apps skipped."""
+        app_dir = repo / "apps" / "simple-app"
+        bump_version(app_dir)
+        missing = repo / "apps" / "new-app"
+        missing.mkdir()
+
+        extracted = checkout("HEAD", [app_dir, missing], tmp_path / "out")
+
+        assert list(extracted) == [app_dir]
+        committed = (extracted[app_dir] / "metadata.yaml").read_text()
+        assert "99.0.0" not in committed
+
+    def test_unknown_ref(self, repo, tmp_path):
+        """Test that an unknown revision raises DiffError."""
+        with pytest.raises(DiffError):
+            checkout("no-such-ref", [repo / "apps" / "simple-app"], tmp_path / "out")
+
+
+class TestDiffApps:
+    """Tests for diff_apps function."""
+
+    def test_results_in_input_order(self, repo):
+        """Test that results keep input order and new apps diff from empty."""
+        simple = repo / "apps" / "simple-app"
+        full = repo / "apps" / "full-app"
+
+        results = diff_apps([(full, full), (None, simple)], jobs=2)
+
+        assert results[0].files == []
+        assert results[1].app_id == "simple-test-app"
+        assert "debian/control" in results[1].files
+
+    def test_processes_match_single_worker(self, repo):
+        """Test that worker processes produce the same diffs as one thread."""
+        simple = repo / "apps" / "simple-app"
+        full = repo / "apps" / "full-app"
+        pairs = [(None, full), (simple, full), (FIXTURES_DIR / "nope", full)]
+
+        assert diff_apps(pairs, jobs=3) == diff_apps(pairs, jobs=1)
+
+
+class TestDiffCommand:
+    """Tests for the diff subcommand."""
+
+    def test_working_tree_against_head(self, repo, capsys):
+        """Test that only the edited app differs from HEAD."""
+        bump_version(repo / "apps" / "simple-app")
+        args = diff_args([repo / "apps"], from_ref="HEAD", exit_code=True)
+
+        assert diff_command(args) == 1
+
+        captured = capsys.readouterr()
+        assert "+++ b/simple-test-app/debian/changelog" in captured.out
+        assert "99.0.0" in captured.out
+        assert "full-app" not in captured.out
+        assert "1 of 2 apps differ" in captured.err
+
+    def test_no_changes(self, repo, capsys):
+        """Test that identical revisions produce no output."""
+        args = diff_args([repo / "apps"], from_ref="HEAD", to_ref="HEAD")
+
+        assert diff_command(args) == 0
+        captured = capsys.readouterr()
+        assert captured.out == ""
+        assert "0 of 2 apps differ" in captured.err
+
+    def test_stat(self, repo, capsys):
+        """Test that --stat lists the changed files only."""
+        bump_version(repo / "apps" / "simple-app")
+        args = diff_args([repo / "apps" / "simple-app"], from_ref="HEAD", stat=True)
+
+        assert diff_command(args) == 0
+        assert "simple-test-app/debian/changelog\n" in capsys.readouterr().out
+
+    def test_invalid_app(self, repo, capsys):
+        """Test that an app that cannot be staged fails the command."""
+        (repo / "apps" / "simple-app" / "metadata.yaml").write_text("app_id: [\n")
+        args = diff_args([repo / "apps" / "simple-app"], from_ref="HEAD")
+
+        assert diff_command(args) == 1
+        assert "ERROR: simple-app" in capsys.readouterr().err
+
+    def test_tool_without_stage_dump(self, repo, capsys):
+        """Test that a tool lacking stage-dump fails before staging."""
+        old_tool = shlex.join([sys.executable, "-c", "pass"])
+        args = diff_args([repo / "apps"], from_tool=old_tool)
+
+        assert diff_command(args) == 1
+
+        captured = capsys.readouterr()
+        assert "no stage-dump subcommand" in captured.err
+        assert "apps differ" not in captured.err
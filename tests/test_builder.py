@@ -8,12 +8,16 @@ import pytest
 
 from generate_container_packages.builder import (
     BuildError,
+    CompressionProfile,
     build_package,
     collect_artifacts,
     copy_rendered_files,
     copy_source_files,
     generate_env_template,
+    normalize_mtimes,
+    package_digest,
     prepare_build_directory,
+    resolve_compression,
     run_dpkg_buildpackage,
     set_permissions,
 )
@@ -340,6 +344,35 @@ class TestRunDpkgBuildpackage:
         call_args = mock_run.call_args
         assert call_args.kwargs["cwd"] == tmp_path
 
+    @mock.patch("generate_container_packages.builder.subprocess.run")
+    def test_source_date_epoch_exported(self, mock_run, tmp_path):
+        """Test that reproducible builds export SOURCE_DATE_EPOCH."""
+        mock_run.return_value = subprocess.CompletedProcess(
+            args=["dpkg-buildpackage"], returncode=0, stdout="", stderr=""
+        )
+
+        run_dpkg_buildpackage(tmp_path)
+        assert mock_run.call_args.kwargs["env"] is None
+
+        run_dpkg_buildpackage(tmp_path, source_date_epoch=1700000000)
+        assert mock_run.call_args.kwargs["env"]["SOURCE_DATE_EPOCH"] == "1700000000"
+
+    @mock.patch("generate_container_packages.builder.subprocess.run")
+    def test_compression_exported(self, mock_run, tmp_path):
+        """Test that the compression profile is passed to dpkg-deb."""
+        mock_run.return_value = subprocess.CompletedProcess(
+            args=["dpkg-buildpackage"], returncode=0, stdout="", stderr=""
+        )
+
+        run_dpkg_buildpackage(
+            tmp_path, compression=CompressionProfile("zstd", 3, threads=4)
+        )
+
+        env = mock_run.call_args.kwargs["env"]
+        assert env["DPKG_DEB_COMPRESSOR_TYPE"] == "zstd"
+        assert env["DPKG_DEB_COMPRESSOR_LEVEL"] == "3"
+        assert env["DPKG_DEB_THREADS_MAX"] == "4"
+
     @mock.patch("generate_container_packages.builder.subprocess.run")
     def test_build_failure(self, mock_run, tmp_path):
         """Test dpkg-buildpackage failure."""
@@ -362,6 +395,94 @@ class TestRunDpkgBuildpackage:
             run_dpkg_buildpackage(tmp_path)
 
 
+class TestCompressionProfile:
+    """Tests for per-app and per-build compression profiles."""
+
+    def test_app_profile(self):
+        """Test that the metadata compression field is used."""
+        metadata = {"compression": {"type": "zstd", "level": 19}}
+
+        profile = resolve_compression(metadata)
+
+        assert profile == CompressionProfile("zstd", 19)
+        assert str(profile) == "zstd level 19"
+
+    def test_build_override(self):
+        """Test that per-build options take precedence field by field."""
+        metadata = {"compression": {"type": "xz", "level": 9}}
+
+        threads = resolve_compression(metadata, CompressionProfile(threads=0))
+        level = resolve_compression(metadata, CompressionProfile(level=6))
+        other = resolve_compression(metadata, CompressionProfile("zstd"))
+
+        assert threads == CompressionProfile("xz", 9, 0)
+        assert str(threads) == "xz level 9, all threads"
+        assert level == CompressionProfile("xz", 6)
+        # A different compressor does not inherit the app's xz level
+        assert other == CompressionProfile("zstd")
+
+    def test_default(self):
+        """Test that no profile leaves dpkg-deb's defaults alone."""
+        profile = resolve_compression({})
+
+        assert profile.environment() == {}
+        assert str(profile) == "dpkg default (xz)"
+
+    def test_invalid(self):
+        """Test level and thread validation."""
+        with pytest.raises(ValueError, match="between 1 and 22"):
+            CompressionProfile("zstd", 0)
+        with pytest.raises(ValueError, match="between 0 and 9"):
+            resolve_compression({}, CompressionProfile(level=12))
+        with pytest.raises(ValueError, match="threads"):
+            CompressionProfile(threads=-1)
+
+    def test_level_checked_against_app_compressor(self):
+        """Test that a per-build level is validated after merging with the app."""
+        metadata = {"compression": {"type": "zstd"}}
+
+        profile = resolve_compression(metadata, CompressionProfile(level=19))
+
+        assert profile == CompressionProfile("zstd", 19)
+
+
+class TestReproducibleStaging:
+    """Tests for timestamp normalization and package digests."""
+
+    def test_normalize_mtimes(self, tmp_path):
+        """Test that files and directories all get the fixed mtime."""
+        (tmp_path / "debian").mkdir()
+        (tmp_path / "debian" / "control").write_text("Package: x\n")
+        (tmp_path / "metadata.yaml").write_text("name: x\n")
+
+        normalize_mtimes(tmp_path, 1700000000)
+
+        paths = [tmp_path, *tmp_path.rglob("*")]
+        assert {int(p.stat().st_mtime) for p in paths} == {1700000000}
+
+    def test_same_inputs_same_staged_tree(self, tmp_path, monkeypatch):
+        """Test that two reproducible stagings are byte-identical."""
+        from generate_container_packages.builder import stage_package
+        from generate_container_packages.renderer import render_templates
+
+        monkeypatch.setenv("SOURCE_DATE_EPOCH", "1700000000")
+        trees = []
+        for _ in range(2):
+            app_def = load_input_files(VALID_FIXTURES / "full-app")
+            trees.append(stage_package(app_def, render_templates(app_def)))
+
+        assert trees[0].digests() == trees[1].digests()
+
+    def test_package_digest(self, tmp_path):
+        """Test the digest format of built packages."""
+        deb = tmp_path / "x.deb"
+        deb.write_bytes(b"")
+
+        assert package_digest(deb) == (
+            "sha256:e3b0c44298fc1c149afbf4c8996fb92427ae41e4649b934ca495991b7852b855"
+        )
+
+
 class TestCollectArtifacts:
     """Tests for collect_artifacts function."""
 
@@ -707,3 +828,32 @@ class TestGeneratePrestartFile:
         content = prestart_file.read_text()
         assert content == custom_content
         assert prestart_file.stat().st_mode & 0o755
+
+
+class TestGenerateRoutingFile:
+    """Tests for generate_routing_file function."""
+
+    def test_writes_routing_prestart_script(self, tmp_path):
+        """Test that routed apps get an executable configure-routing.sh."""
+        from generate_container_packages.builder import generate_routing_file
+
+        app_def = load_input_files(Path("tests/fixtures/valid/watcher-app"))
+        generate_routing_file(app_def, tmp_path)
+
+        script = tmp_path / "configure-routing.sh"
+        assert (tmp_path / "routing.yml").exists()
+        assert script.stat().st_mode & 0o777 == 0o755
+        assert "/usr/bin/configure-container-routing watcher-test-app" in (
+            script.read_text()
+        )
+
+    def test_no_script_without_routing(self, tmp_path):
+        """Test that apps without routing get no routing files."""
+        from generate_container_packages.builder import generate_routing_file
+
+        app_def = load_input_files(Path("tests/fixtures/valid/simple-app"))
+        app_def.metadata.pop("web_ui", None)
+        app_def.metadata.pop("routing", None)
+        generate_routing_file(app_def, tmp_path)
+
+        assert not (tmp_path / "configure-routing.sh").exists()
@@ -0,0 +1,194 @@
+"""Tests for bulk validation of many app definitions."""
+
+import argparse
+import json
+import shutil
+import subprocess
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+import pytest
+
+from generate_container_packages.bulkvalidate import (
+    GitError,
+    changed_files,
+    find_validation_dirs,
+    results_to_junit,
+    select_changed,
+    validate_all_command,
+    validate_apps,
+)
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+VALID_FIXTURES = FIXTURES_DIR / "valid"
+
+
+@pytest.fixture
+def apps(tmp_path):
+    """Catalog with two valid apps and one missing metadata.yaml."""
+    root = tmp_path / "apps"
+    shutil.copytree(VALID_FIXTURES / "simple-app", root / "simple-app")
+    shutil.copytree(VALID_FIXTURES / "full-app", root / "full-app")
+    shutil.copytree(
+        FIXTURES_DIR / "invalid" / "missing-metadata", tmp_path / "missing-metadata"
+    )
+    return tmp_path
+
+
+def git(cwd: Path, *args: str) -> None:
+    """Run a git command in a test repository."""
+    subprocess.run(
+        ["git", "-c", "user.name=Test", "-c", "user.email=test@example.com", *args],
+        cwd=cwd,
+        check=True,
+        capture_output=True,
+    )
+
+
+def validate_args(app_dirs, **overrides):
+    """Create validate-all arguments."""
+    values = {
+        "app_dirs": [str(p) for p in app_dirs],
+        "jobs": 2,
+        "format": "text",
+        "output": None,
+        "changed_since": None,
+    }
+    values.update(overrides)
+    return argparse.Namespace(**values)
+
+
+class TestFindValidationDirs:
+    """Tests for find_validation_dirs function."""
+
+    def test_expands_catalogs_and_keeps_broken_apps(self, apps):
+        """Test that catalogs expand and non-app directories are kept."""
+        dirs = find_validation_dirs(
+            [apps / "apps", apps / "missing-metadata", apps / "apps" / "full-app"]
+        )
+
+        assert [d.name for d in dirs] == ["full-app", "simple-app", "missing-metadata"]
+
+
+class TestValidateApps:
+    """Tests for validate_apps function."""
+
+    def test_results_in_input_order(self, apps):
+        """Test that every directory gets a result, in order."""
+        dirs = [apps / "missing-metadata", apps / "apps" / "simple-app"]
+
+        results = validate_apps(dirs, jobs=2)
+
+        assert [Path(r.input_dir).name for r in results] == [
+            "missing-metadata",
+            "simple-app",
+        ]
+        assert not results[0].success
+        assert "metadata.yaml" in results[0].errors[0]
+        assert results[1].success
+
+
+class TestReports:
+    """Tests for report formats."""
+
+    def test_junit(self, apps):
+        """Test that failures become JUnit failures with the error text."""
+        results = validate_apps(
+            [apps / "apps" / "simple-app", apps / "missing-metadata"]
+        )
+
+        suite = ET.fromstring(results_to_junit(results, 1.5))
+
+        assert suite.get("tests") == "2"
+        assert suite.get("failures") == "1"
+        cases = {case.get("name"): case for case in suite.iter("testcase")}
+        assert cases["simple-app"].find("failure") is None
+        failure = cases["missing-metadata"].find("failure")
+        assert "metadata.yaml" in failure.text
+
+    def test_json_command_output(self, apps, capsys):
+        """Test JSON report content and the failing exit code."""
+        args = validate_args([apps / "apps", apps / "missing-metadata"], format="json")
+
+        exit_code = validate_all_command(args)
+
+        assert exit_code == 1
+        report = json.loads(capsys.readouterr().out)
+        assert (report["total"], report["passed"], report["failed"]) == (3, 2, 1)
+        assert report["apps"][0]["input_dir"].endswith("full-app")
+        assert "elapsed_seconds" in report
+
+    def test_report_file(self, apps, tmp_path, capsys):
+        """Test that --output writes the report and prints a summary."""
+        report = tmp_path / "report.xml"
+        args = validate_args([apps / "apps"], format="junit", output=str(report))
+
+        assert validate_all_command(args) == 0
+
+        assert ET.parse(report).getroot().get("tests") == "2"
+        assert "2 passed, 0 failed" in capsys.readouterr().out
+
+
+class TestChangedSince:
+    """Tests for validating only changed apps."""
+
+    @pytest.fixture
+    def repo(self, apps):
+        """Git repository with the test catalog committed."""
+        git(apps, "init", "-q")
+        git(apps, "add", ".")
+        git(apps, "commit", "-q", "-m", "initial")
+        return apps
+
+    def test_changed_and_untracked_files(self, repo):
+        """Test that modified and untracked files are reported."""
+        metadata = repo / "apps" / "full-app" / "metadata.yaml"
+        metadata.write_text(metadata.read_text() + "\n")
+        (repo / "apps" / "simple-app" / "notes.txt").write_text("new\n")
+
+        changed = changed_files("HEAD", repo)
+
+        assert metadata.resolve() in changed
+        assert (repo / "apps" / "simple-app" / "notes.txt").resolve() in changed
+
+    def test_select_changed(self, repo):
+        """Test that only apps containing changed files are selected."""
+        (repo / "apps" / "simple-app" / "docker-compose.yml").write_text("x: 1\n")
+        dirs = find_validation_dirs([(repo / "apps").resolve()])
+
+        selected = select_changed(dirs, changed_files("HEAD", repo))
+
+        assert [d.name for d in selected] == ["simple-app"]
+
+    def test_untracked_from_subdirectory(self, repo):
+        """Test that untracked files are found when run below the top."""
+        (repo / "apps" / "simple-app" / "notes.txt").write_text("new\n")
+
+        changed = changed_files("HEAD", repo / "apps")
+
+        assert (repo / "apps" / "simple-app" / "notes.txt").resolve() in changed
+
+    def test_unknown_ref(self, repo):
+        """Test that an unknown ref raises GitError."""
+        with pytest.raises(GitError):
+            changed_files("no-such-ref", repo)
+
+    def test_command_outside_repository(
+        self, repo, tmp_path_factory, monkeypatch, capsys
+    ):
+        """Test that the repository is found from the app directories."""
+        (repo / "apps" / "full-app" / "notes.txt").write_text("new\n")
+        monkeypatch.chdir(tmp_path_factory.mktemp("elsewhere"))
+        args = validate_args([repo / "apps"], changed_since="HEAD", format="json")
+
+        assert validate_all_command(args) == 0
+        report = json.loads(capsys.readouterr().out)
+        assert [Path(app["input_dir"]).name for app in report["apps"]] == ["full-app"]
+
+    def test_command_without_changes(self, repo, monkeypatch, capsys):
+        """Test that nothing is validated when nothing changed."""
+        monkeypatch.chdir(repo)
+        args = validate_args([repo / "apps"], changed_since="HEAD")
+
+        assert validate_all_command(args) == 0
+        assert "0 passed, 0 failed" in capsys.readouterr().out
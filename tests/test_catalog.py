@@ -0,0 +1,286 @@
+"""Tests for the store catalog index."""
+
+import argparse
+import json
+import shutil
+import subprocess
+from pathlib import Path
+
+import pytest
+import yaml
+
+from generate_container_packages.catalog import (
+    CatalogError,
+    CatalogPackage,
+    build_catalog_index,
+    collect_packages,
+    matches_filter,
+    package_from_control,
+    store_index_command,
+    write_catalog_index,
+)
+from schemas.store import StoreConfig, StoreFilter
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+requires_dpkg_deb = pytest.mark.skipif(
+    shutil.which("dpkg-deb") is None, reason="dpkg-deb not available"
+)
+
+
+def write_app(root: Path, app_id: str, section: str = "net", tags=None) -> Path:
+    """Write a minimal app definition directory."""
+    app_dir = root / app_id
+    app_dir.mkdir(parents=True)
+    metadata = {
+        "name": app_id.title(),
+        "app_id": app_id,
+        "version": "1.0.0",
+        "description": f"{app_id} app",
+        "debian_section": section,
+        "tags": tags or ["role::container-app"],
+    }
+    (app_dir / "metadata.yaml").write_text(yaml.safe_dump(metadata))
+    return app_dir
+
+
+def make_store(**filters) -> StoreConfig:
+    """Create a store definition with the given filters."""
+    return StoreConfig.model_validate(
+        {
+            "id": "marine",
+            "name": "Marine",
+            "description": "Marine apps",
+            "filters": {"include_origins": ["Hat Labs"], **filters},
+            "category_metadata": [
+                {"id": "navigation", "label": "Navigation", "icon": "MapIcon"},
+                {"id": "empty", "label": "Empty", "icon": "Icon"},
+            ],
+        }
+    )
+
+
+def make_package(name: str, **fields) -> CatalogPackage:
+    """Create a catalog package."""
+    values = {
+        "version": "1.0",
+        "section": "net",
+        "summary": "",
+        "display_name": name,
+        "tags": ["role::container-app"],
+    }
+    values.update(fields)
+    return CatalogPackage(name=name, **values)
+
+
+class TestPackageSources:
+    """Tests for reading packages."""
+
+    def test_metadata_directory(self):
+        """Test reading an app definition directory."""
+        packages = collect_packages([FIXTURES_DIR / "valid" / "simple-app"])
+
+        assert len(packages) == 1
+        package = packages[0]
+        assert package.name == "simple-test-app-container"
+        assert package.section == "net"
+        assert package.display_name == "Simple Test App"
+        assert "role::container-app" in package.tags
+        assert package.origin is None
+
+    def test_metadata_prefix_and_origin(self, tmp_path):
+        """Test that prefix and origin are applied to app definitions."""
+        write_app(tmp_path, "grafana")
+
+        (package,) = collect_packages(
+            [tmp_path / "grafana"], prefix="marine", origin="Hat Labs"
+        )
+
+        assert package.name == "marine-grafana-container"
+        assert package.origin == "Hat Labs"
+
+    def test_missing_field(self, tmp_path):
+        """Test that incomplete metadata raises CatalogError."""
+        (tmp_path / "metadata.yaml").write_text("app_id: broken\n")
+
+        with pytest.raises(CatalogError, match="missing field"):
+            collect_packages([tmp_path / "metadata.yaml"])
+
+    def test_missing_source(self, tmp_path):
+        """Test that a nonexistent source raises CatalogError."""
+        with pytest.raises(CatalogError, match="not found"):
+            collect_packages([tmp_path / "missing"])
+
+    def test_control_paragraph(self):
+        """Test reading tags, display name and summary from control fields."""
+        package = package_from_control(
+            "Package: signalk-container\n"
+            "Version: 2.0-1\n"
+            "Section: net\n"
+            "Description: Signal K server\n"
+            " Long text.\n"
+            "Tag: role::container-app, field::marine,\n"
+            " x-display-name::Signal K\n",
+            origin="Hat Labs",
+        )
+
+        assert package.name == "signalk-container"
+        assert package.summary == "Signal K server"
+        assert package.display_name == "Signal K"
+        assert package.tags == ["role::container-app", "field::marine"]
+        assert package.origin == "Hat Labs"
+
+    @requires_dpkg_deb
+    def test_repository_directory(self, tmp_path):
+        """Test reading a repository with several versions of a package."""
+        repo = tmp_path / "repo"
+        repo.mkdir()
+        for version in ("1.0", "1.10", "1.9"):
+            root = tmp_path / f"root-{version}"
+            (root / "DEBIAN").mkdir(parents=True)
+            (root / "DEBIAN" / "control").write_text(
+                "Package: demo-container\n"
+                f"Version: {version}\n"
+                "Architecture: all\n"
+                "Maintainer: Test <test@example.com>\n"
+                "Section: web\n"
+                "Description: Demo\n"
+                "Tag: role::container-app, x-display-name::Demo\n"
+            )
+            subprocess.run(
+                ["dpkg-deb", "--build", str(root), str(repo / f"demo_{version}.deb")],
+                check=True,
+                capture_output=True,
+            )
+
+        (repo / "Release").write_text("Origin: Published\nLabel: Apps\n")
+        before = sorted(p.name for p in repo.iterdir())
+
+        (package,) = collect_packages([repo])
+        (overridden,) = collect_packages([repo], origin="Hat Labs")
+
+        assert package.version == "1.10"
+        assert package.section == "web"
+        assert package.origin == "Published"
+        assert overridden.origin == "Hat Labs"
+        # The repository is read, never written
+        assert sorted(p.name for p in repo.iterdir()) == before
+        assert (repo / "Release").read_text() == "Origin: Published\nLabel: Apps\n"
+
+
+class TestMatchesFilter:
+    """Tests for matches_filter function."""
+
+    def test_origin(self):
+        """Test that packages from other origins are excluded."""
+        filters = StoreFilter(include_origins=["Hat Labs"])
+
+        assert matches_filter(make_package("a", origin="Hat Labs"), filters)
+        assert matches_filter(make_package("a"), filters)
+        assert not matches_filter(make_package("a", origin="Debian"), filters)
+
+    def test_or_within_and_between_types(self):
+        """Test OR within a filter type and AND between types."""
+        filters = StoreFilter(
+            include_origins=["Hat Labs"],
+            include_sections=["net", "web"],
+            include_tags=["field::marine", "field::sailing"],
+        )
+
+        assert matches_filter(
+            make_package("a", section="web", tags=["field::sailing"]), filters
+        )
+        assert not matches_filter(
+            make_package("a", section="web", tags=["field::other"]), filters
+        )
+        assert not matches_filter(
+            make_package("a", section="games", tags=["field::marine"]), filters
+        )
+
+    def test_include_packages(self):
+        """Test explicit package names."""
+        filters = StoreFilter(include_origins=["Hat Labs"], include_packages=["a"])
+
+        assert matches_filter(make_package("a"), filters)
+        assert not matches_filter(make_package("b"), filters)
+
+
+class TestBuildCatalogIndex:
+    """Tests for build_catalog_index function."""
+
+    def test_posting_lists(self):
+        """Test section, tag and category posting lists."""
+        packages = [
+            make_package("alpha", section="net", tags=["category::navigation"]),
+            make_package("beta", section="web", tags=["field::marine"]),
+            make_package("gamma", section="net", origin="Debian"),
+            make_package(
+                "delta", section="web", tags=["category::navigation", "field::marine"]
+            ),
+        ]
+
+        index = build_catalog_index(make_store(), packages)
+
+        assert [p["name"] for p in index["packages"]] == ["alpha", "beta", "delta"]
+        assert index["sections"] == {"net": [0], "web": [1, 2]}
+        assert index["tags"]["field::marine"] == [1, 2]
+        assert index["categories"][0]["id"] == "navigation"
+        assert index["categories"][0]["packages"] == [0, 2]
+        assert index["categories"][1]["packages"] == []
+        assert index["store"] == {
+            "id": "marine",
+            "name": "Marine",
+            "description": "Marine apps",
+        }
+
+    def test_write_skips_unchanged(self, tmp_path):
+        """Test that an identical index is not rewritten."""
+        index = build_catalog_index(make_store(), [make_package("alpha")])
+        path = tmp_path / "out" / "marine.catalog.json"
+
+        assert write_catalog_index(index, path)
+        assert not write_catalog_index(index, path)
+        assert json.loads(path.read_text()) == index
+
+
+class TestStoreIndexCommand:
+    """Tests for store_index_command function."""
+
+    def _args(self, store, sources, output):
+        return argparse.Namespace(
+            store=str(store),
+            sources=[str(s) for s in sources],
+            output=str(output),
+            origin=None,
+            prefix=None,
+            suffix="container",
+        )
+
+    def test_command_success(self, tmp_path, capsys):
+        """Test building an index from app definitions and a store fixture."""
+        write_app(tmp_path / "apps", "plotter", tags=["field::marine"])
+        write_app(tmp_path / "apps", "game", section="games")
+        store = tmp_path / "marine.yaml"
+        store.write_text(
+            yaml.safe_dump(make_store(include_sections=["net"]).model_dump())
+        )
+        output = tmp_path / "catalog.json"
+
+        exit_code = store_index_command(
+            self._args(
+                store,
+                [tmp_path / "apps" / "plotter", tmp_path / "apps" / "game"],
+                output,
+            )
+        )
+
+        assert exit_code == 0
+        assert "1 of 2 packages" in capsys.readouterr().out
+        index = json.loads(output.read_text())
+        assert [p["name"] for p in index["packages"]] == ["plotter-container"]
+
+    def test_invalid_store(self, tmp_path):
+        """Test that an invalid store definition is a validation error."""
+        store = FIXTURES_DIR / "stores" / "invalid" / "missing-origins.yaml"
+
+        assert store_index_command(self._args(store, [], tmp_path / "out")) == 1
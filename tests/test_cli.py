@@ -332,7 +332,11 @@ class TestMain:
 
         # Create a mock AppDefinition
         mock_app_def = mock.Mock(spec=AppDefinition)
-        mock_app_def.metadata = {"package_name": "test-app", "version": "1.0.0"}
+        mock_app_def.metadata = {
+            "app_id": "test-app",
+            "package_name": "test-app",
+            "version": "1.0.0",
+        }
         mock_load.return_value = mock_app_def
 
         # Make render_all_templates raise TemplateError
@@ -359,7 +363,11 @@ class TestMain:
 
         # Create a mock AppDefinition
         mock_app_def = mock.Mock(spec=AppDefinition)
-        mock_app_def.metadata = {"package_name": "test-app", "version": "1.0.0"}
+        mock_app_def.metadata = {
+            "app_id": "test-app",
+            "package_name": "test-app",
+            "version": "1.0.0",
+        }
         mock_load.return_value = mock_app_def
 
         # Make build_package raise BuildError
@@ -386,7 +394,11 @@ class TestMain:
 
         # Create a mock AppDefinition
         mock_app_def = mock.Mock(spec=AppDefinition)
-        mock_app_def.metadata = {"package_name": "test-app", "version": "1.0.0"}
+        mock_app_def.metadata = {
+            "app_id": "test-app",
+            "package_name": "test-app",
+            "version": "1.0.0",
+        }
         mock_load.return_value = mock_app_def
 
         # Simulate KeyboardInterrupt
@@ -413,7 +425,11 @@ class TestMain:
 
         # Create a mock AppDefinition
         mock_app_def = mock.Mock(spec=AppDefinition)
-        mock_app_def.metadata = {"package_name": "test-app", "version": "1.0.0"}
+        mock_app_def.metadata = {
+            "app_id": "test-app",
+            "package_name": "test-app",
+            "version": "1.0.0",
+        }
         mock_load.return_value = mock_app_def
 
         # Simulate unexpected exception
@@ -442,7 +458,11 @@ class TestMain:
 
         # Create a mock AppDefinition
         mock_app_def = mock.Mock(spec=AppDefinition)
-        mock_app_def.metadata = {"package_name": "test-app", "version": "1.0.0"}
+        mock_app_def.metadata = {
+            "app_id": "test-app",
+            "package_name": "test-app",
+            "version": "1.0.0",
+        }
         mock_load.return_value = mock_app_def
 
         # Mock successful build
@@ -486,7 +506,11 @@ class TestMain:
             from generate_container_packages.loader import AppDefinition
 
             mock_app_def = mock.Mock(spec=AppDefinition)
-            mock_app_def.metadata = {"package_name": "test-app", "version": "1.0.0"}
+            mock_app_def.metadata = {
+                "app_id": "test-app",
+                "package_name": "test-app",
+                "version": "1.0.0",
+            }
             mock_load.return_value = mock_app_def
 
             deb_file = output_dir / "test-app_1.0.0_all.deb"
@@ -524,14 +548,19 @@ class TestMain:
             mock_mkdtemp.return_value = str(temp_dir)
 
             mock_app_def = mock.Mock(spec=AppDefinition)
-            mock_app_def.metadata = {"package_name": "test-app", "version": "1.0.0"}
+            mock_app_def.metadata = {
+                "app_id": "test-app",
+                "package_name": "test-app",
+                "version": "1.0.0",
+            }
             mock_load.return_value = mock_app_def
 
             deb_file = tmp_path / "test-app_1.0.0_all.deb"
             deb_file.write_text("mock")
             mock_build.return_value = deb_file
 
-            with mock.patch.object(sys, "argv", ["prog", input_dir]):
+            argv = ["prog", input_dir, "-o", str(tmp_path)]
+            with mock.patch.object(sys, "argv", argv):
                 exit_code = main()
 
             assert exit_code == EXIT_SUCCESS
@@ -558,7 +587,11 @@ class TestMain:
             mock_mkdtemp.return_value = str(temp_dir)
 
             mock_app_def = mock.Mock(spec=AppDefinition)
-            mock_app_def.metadata = {"package_name": "test-app", "version": "1.0.0"}
+            mock_app_def.metadata = {
+                "app_id": "test-app",
+                "package_name": "test-app",
+                "version": "1.0.0",
+            }
             mock_load.return_value = mock_app_def
 
             # Raise error during rendering
@@ -570,3 +603,45 @@ class TestMain:
             assert exit_code == EXIT_TEMPLATE_ERROR
             # Verify cleanup was still called
             mock_rmtree.assert_called_once()
+
+
+class TestRecordState:
+    """Tests for recording single-app builds in the build state."""
+
+    def _build(self, tmp_path, *options):
+        output_dir = tmp_path / "out"
+        output_dir.mkdir(exist_ok=True)
+        deb_file = output_dir / "simple-test-app-container_1.0.0_all.deb"
+        deb_file.write_text("mock")
+        argv = ["prog", str(VALID_FIXTURES / "simple-app"), "-o", str(output_dir)]
+        with (
+            mock.patch("generate_container_packages.cli.check_dependencies"),
+            mock.patch(
+                "generate_container_packages.cli.build_package",
+                return_value=deb_file,
+            ),
+            mock.patch.object(sys, "argv", [*argv, *options]),
+        ):
+            assert main() == EXIT_SUCCESS
+        return output_dir
+
+    def test_not_recorded_by_default(self, tmp_path):
+        """Test that a plain build writes no build state."""
+        output_dir = self._build(tmp_path)
+
+        assert not (output_dir / ".build-state.json").exists()
+
+    def test_record_state(self, tmp_path):
+        """Test that --record-state records the digests --plan compares to."""
+        from generate_container_packages.multibuild import (
+            load_build_state,
+            staged_files,
+        )
+
+        output_dir = self._build(tmp_path, "--record-state")
+
+        record = load_build_state(output_dir)["simple-test-app"]
+        assert record["files"] == staged_files(
+            VALID_FIXTURES / "simple-app", None, "container"
+        )
+        assert record["digest"].startswith("sha256:")
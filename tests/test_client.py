@@ -0,0 +1,53 @@
+"""Unit tests for the build daemon client."""
+
+from pathlib import Path
+
+from generate_container_packages.client import (
+    EXIT_DEPENDENCY_ERROR,
+    build_job,
+    create_client_argument_parser,
+    main,
+)
+
+
+class TestBuildJob:
+    """Tests for build_job."""
+
+    def test_build_job_resolves_paths(self):
+        """Test that relative paths are resolved for the daemon."""
+        args = create_client_argument_parser().parse_args(
+            ["build", "my-app", "-o", "out", "--prefix", "marine"]
+        )
+
+        job = build_job(args)
+
+        assert job["type"] == "build"
+        assert job["input_dir"] == str(Path("my-app").resolve())
+        assert job["output_dir"] == str(Path("out").resolve())
+        assert job["prefix"] == "marine"
+        assert job["suffix"] == "container"
+
+    def test_convert_job(self):
+        """Test convert jobs carry the source and batch flag."""
+        args = create_client_argument_parser().parse_args(
+            ["convert", "apps", "--batch"]
+        )
+
+        job = build_job(args)
+
+        assert job["source"] == str(Path("apps").resolve())
+        assert job["batch"] is True
+        assert "output_dir" not in job
+
+
+class TestMain:
+    """Tests for the client entry point."""
+
+    def test_unreachable_daemon(self, tmp_path, capsys):
+        """Test that a missing daemon yields the dependency exit code."""
+        exit_code = main(
+            ["validate", str(tmp_path), "--socket", str(tmp_path / "none.sock")]
+        )
+
+        assert exit_code == EXIT_DEPENDENCY_ERROR
+        assert "Cannot reach build daemon" in capsys.readouterr().err
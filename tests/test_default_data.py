@@ -199,6 +199,31 @@ class TestDefaultDataTemplateContext:
 
         assert context["default_data_files"] == []
 
+    def test_default_data_dirs_manifest(self):
+        """Test the directory manifest lists each ancestor directory once."""
+        from generate_container_packages.template_context import build_context
+
+        app_def = load_input_files(VALID_FIXTURES / "app-with-default-data")
+        context = build_context(app_def)
+
+        assert context["default_data_dirs"] == [".signalk", "scripts"]
+
+    def test_default_data_dirs_parents_before_children(self):
+        """Test nested directories are listed once with parents first."""
+        from generate_container_packages.loader import AssetFile
+        from generate_container_packages.template_context import (
+            _default_data_directories,
+        )
+
+        files = [
+            AssetFile(Path("a/b/c/deep.json"), False),
+            AssetFile(Path("a/b/other.json"), False),
+            AssetFile(Path("a/top.json"), False),
+            AssetFile(Path("root.json"), False),
+        ]
+
+        assert _default_data_directories(files) == ["a", "a/b", "a/b/c"]
+
 
 class TestDefaultDataIntegration:
     """Integration tests for default-data feature."""
@@ -282,7 +307,162 @@ class TestDefaultDataIntegration:
         assert "default-data" in content
         assert "CONTAINER_DATA_ROOT" in content
         # Should only copy if destination doesn't exist
-        assert '[ ! -f "$dst_file" ]' in content
+        assert '[ -f "$CONTAINER_DATA_ROOT/$rel_file" ] ||' in content
+
+    @pytest.mark.integration
+    def test_postinst_uses_build_time_manifest(self, tmp_path):
+        """Test that postinst embeds the manifest instead of walking the tree."""
+        from generate_container_packages.loader import load_input_files
+        from generate_container_packages.renderer import render_all_templates
+
+        app_def = load_input_files(VALID_FIXTURES / "app-with-default-data")
+        output_dir = tmp_path / "rendered"
+
+        render_all_templates(app_def, output_dir)
+
+        content = (output_dir / "debian" / "postinst").read_text()
+
+        assert "find " not in content
+        assert "dirname" not in content
+        assert "                .signalk/security.json \\\n" in content
+        assert "                scripts; do\n" in content
+        assert content.count("cp -p --parents") == 1
+
+    @pytest.mark.integration
+    def test_postinst_copy_runs_under_posix_sh(self, tmp_path):
+        """Test the rendered copy function copies only missing files."""
+        import shutil
+        import subprocess
+
+        from generate_container_packages.loader import load_input_files
+        from generate_container_packages.renderer import render_templates
+
+        if shutil.which("sh") is None:
+            pytest.skip("sh not available")
+
+        app_def = load_input_files(VALID_FIXTURES / "app-with-default-data")
+        postinst = render_templates(app_def)["debian/postinst"]
+        function = postinst[
+            postinst.index("copy_default_data() {") : postinst.index(
+                "        copy_default_data\n"
+            )
+        ]
+        function = function.replace(
+            "/var/lib/container-apps/app-with-default-data-container/default-data",
+            str(app_def.default_data_dir),
+        )
+
+        data_root = tmp_path / "data"
+        (data_root / ".signalk").mkdir(parents=True)
+        (data_root / ".signalk" / "security.json").write_text("user")
+
+        subprocess.run(
+            ["sh", "-c", function + "copy_default_data"],
+            env={"CONTAINER_DATA_ROOT": str(data_root), "PATH": "/usr/bin:/bin"},
+            check=True,
+        )
+
+        assert (data_root / ".signalk" / "security.json").read_text() == "user"
+        assert (data_root / ".signalk" / "defaults.json").exists()
+        assert (data_root / "scripts" / "init.sh").exists()
+
+    @pytest.mark.integration
+    def test_postinst_copy_chowns_parent_directories(self, tmp_path):
+        """Test that copied files and all their parent directories get the owner."""
+        import os
+        import shutil
+        import subprocess
+
+        from generate_container_packages.renderer import render_templates
+
+        if shutil.which("sh") is None or os.geteuid() != 0:
+            pytest.skip("needs sh and root to chown")
+
+        app_dir = tmp_path / "app"
+        shutil.copytree(VALID_FIXTURES / "app-with-default-data", app_dir)
+        compose = app_dir / "docker-compose.yml"
+        compose.write_text(
+            compose.read_text().replace(
+                "${CONTAINER_DATA_ROOT:-./.signalk}", "${CONTAINER_DATA_ROOT}/signalk"
+            )
+        )
+        app_def = load_input_files(app_dir)
+        postinst = render_templates(app_def)["debian/postinst"]
+        function = postinst[
+            postinst.index("copy_default_data() {") : postinst.index(
+                "        copy_default_data\n"
+            )
+        ]
+        function = function.replace(
+            "/var/lib/container-apps/app-with-default-data-container/default-data",
+            str(app_def.default_data_dir),
+        )
+
+        # An existing directory and user file stay as they are, except that
+        # the directory a default file is copied into gets the owner
+        data_root = tmp_path / "data"
+        (data_root / ".signalk").mkdir(parents=True)
+        (data_root / ".signalk" / "security.json").write_text("user")
+        subprocess.run(
+            ["sh", "-e", "-c", function + "copy_default_data"],
+            env={"CONTAINER_DATA_ROOT": str(data_root), "PATH": "/usr/bin:/bin"},
+            check=True,
+        )
+
+        def owner(path: Path) -> tuple[int, int]:
+            st = path.stat()
+            return st.st_uid, st.st_gid
+
+        assert owner(data_root / ".signalk") == (1000, 1000)
+        assert owner(data_root / ".signalk" / "defaults.json") == (1000, 1000)
+        assert owner(data_root / "scripts" / "init.sh") == (1000, 1000)
+        assert owner(data_root / ".signalk" / "security.json") == (0, 0)
+        assert owner(data_root) == (0, 0)
+
+    @pytest.mark.integration
+    def test_postinst_copy_large_manifest(self, tmp_path):
+        """Test that thousands of files are copied without exceeding ARG_MAX."""
+        import shutil
+        import subprocess
+
+        from generate_container_packages.renderer import render_templates
+
+        if shutil.which("sh") is None or shutil.which("xargs") is None:
+            pytest.skip("sh or xargs not available")
+
+        app_dir = tmp_path / "app"
+        shutil.copytree(VALID_FIXTURES / "app-with-default-data", app_dir)
+        many = app_dir / "default-data" / ("long-directory-name-" * 5)
+        many.mkdir()
+        for i in range(3000):
+            (many / f"default-data-file-with-a-long-name-{i:05}.json").write_text("{}")
+
+        app_def = load_input_files(app_dir)
+        postinst = render_templates(app_def)["debian/postinst"]
+        function = postinst[
+            postinst.index("copy_default_data() {") : postinst.index(
+                "        copy_default_data\n"
+            )
+        ]
+        function = function.replace(
+            "/var/lib/container-apps/app-with-default-data-container/default-data",
+            str(app_def.default_data_dir),
+        )
+
+        script = tmp_path / "copy.sh"
+        # A 1 MiB stack limits the arguments of each exec to 256 KiB, below
+        # the ~435 KiB of file names in the manifest
+        script.write_text("ulimit -s 1024\n" + function + "copy_default_data\n")
+        data_root = tmp_path / "data"
+        subprocess.run(
+            ["sh", "-e", str(script)],
+            env={"CONTAINER_DATA_ROOT": str(data_root), "PATH": "/usr/bin:/bin"},
+            check=True,
+        )
+
+        copied = data_root / many.relative_to(app_dir / "default-data")
+        assert len(list(copied.iterdir())) == 3000
+        assert (data_root / "scripts" / "init.sh").exists()
 
     @pytest.mark.integration
     def test_postinst_no_default_data_when_none_exist(self, tmp_path):
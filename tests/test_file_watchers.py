@@ -5,9 +5,10 @@ from pathlib import Path
 import pytest
 
 from generate_container_packages.loader import load_input_files
-from generate_container_packages.renderer import render_all_templates
+from generate_container_packages.renderer import render_all_templates, render_templates
 from generate_container_packages.template_context import (
     _build_file_watchers_context,
+    _build_watcher_units_context,
     build_context,
 )
 from generate_container_packages.validator import validate_input_directory
@@ -419,7 +420,7 @@ class TestFileWatchersRendering:
         assert "watcher-test-app-container-watcher-config-reload.service" in content
 
     def test_postinst_enables_and_starts_path_units(self, tmp_path):
-        """Test that postinst enables and starts path units."""
+        """Test that postinst queues path units for batched enable and start."""
         fixture_dir = VALID_FIXTURES / "watcher-app"
 
         app_def = load_input_files(fixture_dir)
@@ -428,25 +429,19 @@ class TestFileWatchersRendering:
         postinst_file = tmp_path / "debian" / "postinst"
         content = postinst_file.read_text()
 
-        # Check enable
-        assert (
-            "systemctl enable watcher-test-app-container-watcher-config-reload.path"
-            in content
-        )
-        assert (
-            "systemctl enable watcher-test-app-container-watcher-oidc-clients.path"
-            in content
+        paths = (
+            "watcher-test-app-container-watcher-config-reload.path "
+            "watcher-test-app-container-watcher-oidc-clients.path "
+            "watcher-test-app-container-watcher-combined-watcher.path"
         )
 
-        # Check start
-        assert (
-            "systemctl start watcher-test-app-container-watcher-config-reload.path"
-            in content
-        )
-        assert (
-            "systemctl start watcher-test-app-container-watcher-oidc-clients.path"
-            in content
-        )
+        # Service and all path units are queued for one enable call
+        assert f'echo "watcher-test-app-container.service {paths}"' in content
+        # All path units are queued for one start call
+        assert f'echo "{paths}"' in content
+        # The trigger handler enables and starts the queue in one call each
+        assert "systemctl enable $ENABLE_UNITS" in content
+        assert "systemctl start $START_UNITS" in content
 
     def test_prerm_stops_watcher_units(self, tmp_path):
         """Test that prerm stops path and service units."""
@@ -458,22 +453,99 @@ class TestFileWatchersRendering:
         prerm_file = tmp_path / "debian" / "prerm"
         content = prerm_file.read_text()
 
-        # Check path units stopped and disabled
-        assert (
-            "systemctl stop watcher-test-app-container-watcher-config-reload.path"
-            in content
+        stop_line = next(
+            line
+            for line in content.splitlines()
+            if "systemctl stop" in line and "-watcher-" in line
         )
-        assert (
-            "systemctl disable watcher-test-app-container-watcher-config-reload.path"
-            in content
+        disable_line = next(
+            line
+            for line in content.splitlines()
+            if "systemctl disable" in line and "-watcher-" in line
         )
 
+        # Check path units stopped and disabled
+        assert "watcher-test-app-container-watcher-config-reload.path" in stop_line
+        assert "watcher-test-app-container-watcher-config-reload.path" in disable_line
+
         # Check watcher services also stopped
-        assert (
-            "systemctl stop watcher-test-app-container-watcher-config-reload.service"
-            in content
+        assert "watcher-test-app-container-watcher-config-reload.service" in stop_line
+
+
+class TestCoalescedFileWatchers:
+    """Tests for merging watchers with identical actions into one unit."""
+
+    WATCHERS = [
+        {
+            "name": "config-reload",
+            "watch_path": "/etc/myapp/",
+            "on_change": {"restart_service": True},
+        },
+        {
+            "name": "oidc-clients",
+            "watch_path": "/etc/halos/oidc-clients.d/",
+            "watch_type": "path_changed",
+            "on_change": {"script": "/usr/bin/reload-oidc"},
+        },
+        {
+            "name": "spool",
+            "watch_path": "/var/spool/myapp/",
+            "watch_type": "directory_not_empty",
+            "on_change": {"restart_service": True},
+        },
+    ]
+
+    def test_units_not_coalesced_by_default(self):
+        """Test that each watcher gets its own unit without coalescing."""
+        units = _build_watcher_units_context(
+            _build_file_watchers_context(self.WATCHERS)
+        )
+
+        assert [u["name"] for u in units] == ["config-reload", "oidc-clients", "spool"]
+        assert all(len(u["paths"]) == 1 for u in units)
+
+    def test_units_coalesced_by_action(self):
+        """Test that watchers with the same action share one unit."""
+        units = _build_watcher_units_context(
+            _build_file_watchers_context(self.WATCHERS), coalesce=True
+        )
+
+        assert [u["name"] for u in units] == ["config-reload", "oidc-clients"]
+        assert units[0]["paths"] == [
+            {"watch_path": "/etc/myapp/", "watch_type": "directory_modified"},
+            {"watch_path": "/var/spool/myapp/", "watch_type": "directory_not_empty"},
+        ]
+        assert units[0]["restart_service"] is True
+        assert units[1]["script"] == "/usr/bin/reload-oidc"
+
+    def test_render_coalesced_units(self):
+        """Test rendering a coalesced path unit and the batched postinst."""
+        app_def = load_input_files(VALID_FIXTURES / "watcher-app")
+        app_def.metadata["coalesce_file_watchers"] = True
+        app_def.metadata["file_watchers"].append(
+            {
+                "name": "spool",
+                "watch_path": "/var/spool/watcher-app/",
+                "watch_type": "directory_not_empty",
+                "on_change": {"restart_service": True},
+            }
         )
 
+        rendered = render_templates(app_def)
+
+        prefix = "debian/watcher-test-app-container-watcher-"
+        assert f"{prefix}spool.path" not in rendered
+        path_unit = rendered[f"{prefix}config-reload.path"]
+        assert "PathModified=/etc/halos/watcher-app.d/" in path_unit
+        assert "DirectoryNotEmpty=/var/spool/watcher-app/" in path_unit
+        assert "spool.path" not in rendered["debian/postinst"]
+        assert "spool.path" not in rendered["debian/rules"]
+
+    def test_coalesce_option_in_schema(self):
+        """Test that coalesce_file_watchers is accepted by the schema."""
+        field = PackageMetadata.model_fields["coalesce_file_watchers"]
+        assert field.default is False
+
 
 class TestNoFileWatchers:
     """Tests for apps without file watchers."""
@@ -1,5 +1,9 @@
 """Unit tests for file loader module."""
 
+import os
+import shutil
+import subprocess
+from datetime import UTC, datetime
 from pathlib import Path
 
 import pytest
@@ -9,7 +13,9 @@ from generate_container_packages.loader import (
     find_optional_files,
     load_input_files,
     load_yaml,
+    resolve_source_date,
 )
+from generate_container_packages.validator import validate_input_directory
 
 # Test fixtures directory
 FIXTURES_DIR = Path(__file__).parent / "fixtures"
@@ -83,6 +89,72 @@ class TestAppDefinition:
         assert "Z" in app_def.timestamp or "+" in app_def.timestamp
 
 
+class TestSourceDate:
+    """Tests for reproducible build dates."""
+
+    @pytest.fixture
+    def app_dir(self, tmp_path, monkeypatch):
+        """Copy of simple-app outside any git checkout."""
+        monkeypatch.delenv("SOURCE_DATE_EPOCH", raising=False)
+        monkeypatch.setenv("GIT_CEILING_DIRECTORIES", str(tmp_path))
+        app_dir = tmp_path / "simple-app"
+        shutil.copytree(VALID_FIXTURES / "simple-app", app_dir)
+        return app_dir
+
+    def test_current_time_by_default(self, app_dir):
+        """Test that regular builds have no fixed date."""
+        assert resolve_source_date(app_dir) is None
+        assert load_input_files(app_dir).source_date_epoch is None
+
+    def test_source_date_epoch(self, app_dir, monkeypatch):
+        """Test that SOURCE_DATE_EPOCH sets all timestamps."""
+        monkeypatch.setenv("SOURCE_DATE_EPOCH", "1700000000")
+
+        app_def = load_input_files(app_dir)
+
+        assert app_def.source_date_epoch == 1700000000
+        assert app_def.timestamp == "2023-11-14T22:13:20+00:00"
+        assert app_def.timestamp_rfc2822 == "Tue, 14 Nov 2023 22:13:20 +00:00"
+        assert app_def.date_only == "2023-11-14"
+
+    def test_invalid_source_date_epoch(self, app_dir, monkeypatch):
+        """Test that a malformed SOURCE_DATE_EPOCH is rejected."""
+        monkeypatch.setenv("SOURCE_DATE_EPOCH", "yesterday")
+
+        with pytest.raises(ValueError, match="SOURCE_DATE_EPOCH"):
+            resolve_source_date(app_dir)
+
+    def test_newest_input_mtime(self, app_dir):
+        """Test the input mtime fallback outside a git checkout."""
+        for path in app_dir.rglob("*"):
+            os.utime(path, (1600000000, 1600000000))
+        os.utime(app_dir / "config.yml", (1650000000, 1650000000))
+
+        date = resolve_source_date(app_dir, reproducible=True)
+
+        assert date == datetime.fromtimestamp(1650000000, UTC)
+
+    def test_git_commit_date(self, app_dir):
+        """Test that the last commit date wins over file mtimes."""
+
+        def git(*args):
+            subprocess.run(
+                ["git", "-c", "user.name=T", "-c", "user.email=t@example.com", *args],
+                cwd=app_dir,
+                check=True,
+                capture_output=True,
+                env={**os.environ, "GIT_COMMITTER_DATE": "@1500000000 +0000"},
+            )
+
+        git("init", "-q")
+        git("add", ".")
+        git("commit", "-q", "-m", "initial")
+
+        date = resolve_source_date(app_dir, reproducible=True)
+
+        assert date == datetime.fromtimestamp(1500000000, UTC)
+
+
 class TestLoadInputFiles:
     """Tests for load_input_files function."""
 
@@ -142,6 +214,57 @@ class TestLoadInputFiles:
         assert "fields" in app_def.config["groups"][0]
 
 
+class TestLoadFromValidation:
+    """Tests for loading from a validation result."""
+
+    @pytest.mark.parametrize(
+        "fixture", sorted(p.name for p in VALID_FIXTURES.iterdir() if p.is_dir())
+    )
+    def test_same_data_as_reading_files(self, fixture):
+        """Test that dumping trusted models matches the parsed input files."""
+        input_dir = VALID_FIXTURES / fixture
+        validation = validate_input_directory(input_dir)
+        assert validation.success
+
+        from_files = load_input_files(input_dir, prefix="marine")
+        from_models = load_input_files(
+            input_dir, prefix="marine", validation=validation
+        )
+
+        assert from_models.metadata == from_files.metadata
+        assert from_models.config == from_files.config
+        assert from_models.compose == from_files.compose
+
+    def test_raw_values_kept(self, tmp_path):
+        """Test that values are packaged as written, not as normalized by models."""
+        input_dir = tmp_path / "app"
+        shutil.copytree(VALID_FIXTURES / "simple-app", input_dir)
+        metadata = input_dir / "metadata.yaml"
+        metadata.write_text(
+            metadata.read_text().replace(
+                "https://example.com/simple-app", "https://Example.com"
+            )
+        )
+        validation = validate_input_directory(input_dir)
+
+        app_def = load_input_files(input_dir, validation=validation)
+
+        assert app_def.metadata["homepage"] == "https://Example.com"
+
+    def test_input_files_not_reread(self, monkeypatch):
+        """Test that a validation result replaces reading the input files."""
+        validation = validate_input_directory(VALID_FIXTURES / "simple-app")
+
+        def fail(path):
+            raise AssertionError(f"read {path}")
+
+        monkeypatch.setattr("generate_container_packages.loader.load_yaml", fail)
+        app_def = load_input_files(VALID_FIXTURES / "simple-app", validation=validation)
+
+        assert app_def.metadata["package_name"] == "simple-test-app-container"
+        assert app_def.compose is not validation.compose
+
+
 class TestLoadYaml:
     """Tests for load_yaml function."""
 
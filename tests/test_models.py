@@ -1,8 +1,12 @@
 """Unit tests for Pydantic schema models."""
 
+import subprocess
+from unittest.mock import patch
+
 import pytest
 from pydantic import ValidationError
 
+from schemas import metadata as metadata_module
 from schemas.config import ConfigField, ConfigGroup, ConfigSchema
 from schemas.metadata import Layout, PackageMetadata, WebUI
 
@@ -170,6 +174,51 @@ class TestPackageMetadata:
             "architecture": "all",
         }
 
+    def test_version_checked_with_dpkg_once(self, valid_metadata):
+        """Test that dpkg runs once per distinct version string."""
+        metadata_module._dpkg_check_version.cache_clear()
+        valid_metadata["version"] = "7.7.7+cached1"
+
+        with patch.object(
+            metadata_module.subprocess, "run", wraps=metadata_module.subprocess.run
+        ) as run:
+            for app_id in ("first-app", "second-app"):
+                valid_metadata["app_id"] = app_id
+                PackageMetadata(**valid_metadata)  # type: ignore[arg-type]
+
+        assert run.call_count == 1
+
+    def test_dpkg_timeout_not_cached(self, valid_metadata):
+        """Test that a dpkg timeout is retried on the next validation."""
+        metadata_module._dpkg_check_version.cache_clear()
+        valid_metadata["version"] = "7.7.7+timeout1"
+        timeout = subprocess.TimeoutExpired(cmd="dpkg", timeout=1)
+        answer = subprocess.CompletedProcess(args=[], returncode=0, stderr="")
+
+        with patch.object(
+            metadata_module.subprocess, "run", side_effect=[timeout, answer]
+        ) as run:
+            PackageMetadata(**valid_metadata)  # type: ignore[arg-type]
+            PackageMetadata(**valid_metadata)  # type: ignore[arg-type]
+            PackageMetadata(**valid_metadata)  # type: ignore[arg-type]
+
+        assert run.call_count == 2
+
+    def test_compression(self, valid_metadata):
+        """Test the compression profile and its per-compressor level range."""
+        valid_metadata["compression"] = {"type": "zstd", "level": 19}
+        metadata = PackageMetadata(**valid_metadata)  # type: ignore[arg-type]
+        assert metadata.compression is not None
+        assert metadata.compression.type == "zstd"
+
+        valid_metadata["compression"] = {"type": "xz", "level": 19}
+        with pytest.raises(ValidationError, match="between 0 and 9"):
+            PackageMetadata(**valid_metadata)  # type: ignore[arg-type]
+
+        valid_metadata["compression"] = {"type": "none", "level": 1}
+        with pytest.raises(ValidationError, match="does not take a level"):
+            PackageMetadata(**valid_metadata)  # type: ignore[arg-type]
+
     def test_valid_minimal_metadata(self, valid_metadata):
         """Test minimal valid metadata passes validation."""
         metadata = PackageMetadata(**valid_metadata)  # type: ignore[arg-type]
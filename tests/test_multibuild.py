@@ -0,0 +1,273 @@
+"""Tests for dependency-aware multi-app builds."""
+
+import argparse
+import threading
+from pathlib import Path
+
+import pytest
+import yaml
+
+from generate_container_packages import multibuild
+from generate_container_packages.multibuild import (
+    DependencyError,
+    DependencyGraph,
+    app_references,
+    build_all_command,
+    build_waves,
+    find_app_dirs,
+    load_build_state,
+)
+
+
+def write_app(root: Path, app_id: str, **deps) -> Path:
+    """Write a metadata.yaml with dependency fields."""
+    app_dir = root / app_id
+    app_dir.mkdir(parents=True)
+    (app_dir / "metadata.yaml").write_text(yaml.safe_dump({"app_id": app_id, **deps}))
+    return app_dir
+
+
+@pytest.fixture
+def store(tmp_path):
+    """Store with influxdb <- grafana <- dashboard and an independent app."""
+    root = tmp_path / "apps"
+    write_app(root, "influxdb")
+    write_app(root, "grafana", depends=["@influxdb", "docker.io (>= 20)"])
+    write_app(root, "dashboard", recommends=["@grafana"], suggests=["@influxdb"])
+    write_app(root, "signalk")
+    return root
+
+
+@pytest.fixture
+def fake_run_job(monkeypatch):
+    """Replace the per-app build with a recorder that fails selected apps."""
+    calls: list[str] = []
+    failing: set[str] = set()
+    lock = threading.Lock()
+
+    def run_job(job, cache=None):
+        app_id = Path(job["input_dir"]).name
+        with lock:
+            calls.append(app_id)
+        if app_id in failing:
+            return {"exit_code": 3, "status": "failed", "error": "boom"}
+        deb = Path(job["output_dir"]) / f"{app_id}-container_1.0_all.deb"
+        run_job.jobs.append(job)
+        return {
+            "exit_code": 0,
+            "status": "success",
+            "deb_file": str(deb),
+            "size": 2048,
+            "compression": (job.get("compression") or {}).get("type") or "default",
+        }
+
+    monkeypatch.setattr(multibuild, "run_job", run_job)
+    run_job.calls = calls
+    run_job.failing = failing
+    run_job.jobs = []
+    return run_job
+
+
+def build_args(store, output, **overrides):
+    """Create build-all arguments."""
+    values = {
+        "app_dirs": [str(store)],
+        "output": str(output),
+        "jobs": 2,
+        "changed_only": False,
+        "dry_run": False,
+        "prefix": None,
+        "suffix": "container",
+        "plan": False,
+        "reproducible": False,
+        "compression": None,
+        "compression_level": None,
+        "compression_threads": None,
+    }
+    values.update(overrides)
+    return argparse.Namespace(**values)
+
+
+class TestAppReferences:
+    """Tests for app_references function."""
+
+    def test_extracts_app_ids(self):
+        """Test that only @ references are returned, without constraints."""
+        refs = app_references(["@influxdb", "docker.io", "@grafana (>= 2.0)"])
+
+        assert refs == {"influxdb", "grafana"}
+
+
+class TestDependencyGraph:
+    """Tests for DependencyGraph."""
+
+    def test_waves(self, store):
+        """Test topological waves with parallel independent apps."""
+        graph = DependencyGraph.from_app_dirs(find_app_dirs([store]))
+        graph.check()
+
+        assert graph.waves() == [["influxdb", "signalk"], ["grafana"], ["dashboard"]]
+
+    def test_suggests_do_not_order(self, tmp_path):
+        """Test that mutual suggests are not a cycle."""
+        write_app(tmp_path, "a", suggests=["@b"])
+        write_app(tmp_path, "b", suggests=["@a"])
+        graph = DependencyGraph.from_app_dirs(find_app_dirs([tmp_path]))
+
+        graph.check()
+        assert graph.waves() == [["a", "b"]]
+
+    def test_missing_reference(self, tmp_path):
+        """Test that unknown @ targets are reported up front."""
+        write_app(tmp_path, "a", suggests=["@nowhere"])
+        graph = DependencyGraph.from_app_dirs(find_app_dirs([tmp_path]))
+
+        assert graph.missing() == {"a": ["nowhere"]}
+        with pytest.raises(DependencyError, match="@nowhere"):
+            graph.check()
+
+    def test_cycles(self, tmp_path):
+        """Test cycle detection including self-dependencies."""
+        write_app(tmp_path, "a", depends=["@b"])
+        write_app(tmp_path, "b", recommends=["@c"])
+        write_app(tmp_path, "c", depends=["@a"])
+        write_app(tmp_path, "d", depends=["@d"])
+        write_app(tmp_path, "e", depends=["@a"])
+        graph = DependencyGraph.from_app_dirs(find_app_dirs([tmp_path]))
+
+        assert graph.cycles() == [["a", "b", "c"], ["d"]]
+        with pytest.raises(DependencyError, match="cycle"):
+            graph.check()
+        with pytest.raises(DependencyError):
+            graph.waves()
+
+    def test_duplicate_app_id(self, tmp_path):
+        """Test that two directories with one app_id are rejected."""
+        write_app(tmp_path / "one", "a")
+        write_app(tmp_path / "two", "a")
+
+        with pytest.raises(DependencyError, match="Duplicate"):
+            DependencyGraph.from_app_dirs(
+                [tmp_path / "one" / "a", tmp_path / "two" / "a"]
+            )
+
+    def test_dependents_closure(self, store):
+        """Test that changed apps pull in their transitive dependents only."""
+        graph = DependencyGraph.from_app_dirs(find_app_dirs([store]))
+
+        assert graph.dependents_closure({"influxdb"}) == {
+            "influxdb",
+            "grafana",
+            "dashboard",
+        }
+        assert graph.dependents_closure({"signalk"}) == {"signalk"}
+        assert graph.waves({"grafana", "dashboard"}) == [["grafana"], ["dashboard"]]
+
+
+class TestBuildWaves:
+    """Tests for build_waves function."""
+
+    def test_failure_skips_dependents(self, store, tmp_path, fake_run_job):
+        """Test that dependents of a failed app are skipped, others built."""
+        graph = DependencyGraph.from_app_dirs(find_app_dirs([store]))
+        fake_run_job.failing.add("influxdb")
+
+        results = build_waves(graph, graph.waves(), tmp_path / "out", jobs=2)
+
+        assert results["influxdb"]["status"] == "failed"
+        assert results["grafana"]["status"] == "skipped"
+        assert results["dashboard"]["status"] == "skipped"
+        assert results["signalk"]["status"] == "success"
+        assert sorted(fake_run_job.calls) == ["influxdb", "signalk"]
+        assert set(load_build_state(tmp_path / "out")) == {"signalk"}
+
+
+class TestBuildAllCommand:
+    """Tests for build_all_command function."""
+
+    def test_changed_only(self, store, tmp_path, fake_run_job, capsys):
+        """Test that --changed-only rebuilds changed apps and dependents."""
+        output = tmp_path / "out"
+        assert build_all_command(build_args(store, output)) == 0
+        assert len(fake_run_job.calls) == 4
+
+        fake_run_job.calls.clear()
+        assert build_all_command(build_args(store, output, changed_only=True)) == 0
+        assert fake_run_job.calls == []
+
+        (store / "grafana" / "docker-compose.yml").write_text("services: {}\n")
+        assert build_all_command(build_args(store, output, changed_only=True)) == 0
+        assert fake_run_job.calls == ["grafana", "dashboard"]
+        assert "1 changed, 1 dependents, 2 unchanged" in capsys.readouterr().out
+
+    def test_dry_run(self, store, tmp_path, fake_run_job, capsys):
+        """Test that --dry-run only prints the waves."""
+        exit_code = build_all_command(build_args(store, tmp_path / "out", dry_run=True))
+
+        assert exit_code == 0
+        assert fake_run_job.calls == []
+        assert "Wave 1: influxdb signalk" in capsys.readouterr().out
+
+    def test_graph_errors_fail_before_building(self, tmp_path, fake_run_job):
+        """Test that a missing @ target aborts with a validation error."""
+        write_app(tmp_path / "apps", "a", depends=["@missing"])
+
+        exit_code = build_all_command(build_args(tmp_path / "apps", tmp_path / "out"))
+
+        assert exit_code == 1
+        assert fake_run_job.calls == []
+
+    def test_compression_options(self, store, tmp_path, fake_run_job, capsys):
+        """Test that compression options reach every job and the summary."""
+        args = build_args(
+            store,
+            tmp_path / "out",
+            compression="zstd",
+            compression_level=19,
+            compression_threads=0,
+        )
+
+        assert build_all_command(args) == 0
+
+        assert {str(j["compression"]) for j in fake_run_job.jobs} == {
+            str({"type": "zstd", "level": 19, "threads": 0})
+        }
+        assert "signalk-container_1.0_all.deb (2.0 KiB, zstd)" in (
+            capsys.readouterr().out
+        )
+
+    def test_invalid_compression_level(self, store, tmp_path, fake_run_job):
+        """Test that an out-of-range level fails before building."""
+        args = build_args(
+            store, tmp_path / "out", compression="zstd", compression_level=30
+        )
+
+        assert build_all_command(args) == 1
+        assert fake_run_job.calls == []
+
+    def test_plan_after_build(self, tmp_path, fake_run_job, capsys):
+        """Test that builds record staged files that --plan compares to."""
+        import shutil
+
+        fixtures = Path(__file__).parent / "fixtures" / "valid"
+        apps = tmp_path / "apps"
+        for name in ("simple-app", "full-app"):
+            shutil.copytree(fixtures / name, apps / name)
+        output = tmp_path / "out"
+
+        assert build_all_command(build_args(apps, output)) == 0
+        capsys.readouterr()
+        (apps / "simple-app" / "prestart.sh").write_text("#!/bin/sh\n")
+
+        assert build_all_command(build_args(apps, output, plan=True)) == 0
+
+        out = capsys.readouterr().out
+        assert "simple-test-app: changed (prestart.sh)" in out
+        assert "1 changed, 0 new, 1 unchanged, 0 invalid" in out
+        assert len(fake_run_job.calls) == 2
+
+    def test_failure_exit_code(self, store, tmp_path, fake_run_job):
+        """Test that the first failing app's exit code is returned."""
+        fake_run_job.failing.add("signalk")
+
+        assert build_all_command(build_args(store, tmp_path / "out")) == 3
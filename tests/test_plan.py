@@ -0,0 +1,120 @@
+"""Tests for build plans."""
+
+import argparse
+import shutil
+from pathlib import Path
+
+import pytest
+
+from generate_container_packages.cli import plan_command
+from generate_container_packages.multibuild import (
+    load_build_state,
+    save_build_record,
+    staged_files,
+)
+from generate_container_packages.plan import (
+    changed_files,
+    plan_apps,
+    planned_digests,
+)
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+VALID_FIXTURES = FIXTURES_DIR / "valid"
+
+
+@pytest.fixture
+def app_dir(tmp_path):
+    """Writable copy of the simple-app fixture."""
+    app_dir = tmp_path / "simple-app"
+    shutil.copytree(VALID_FIXTURES / "simple-app", app_dir)
+    return app_dir
+
+
+def record(output_dir: Path, app_dir: Path) -> None:
+    """Record a build of an app as the CLI does after building it."""
+    app_id, files = planned_digests(app_dir)
+    save_build_record(output_dir, app_id, {"files": files})
+
+
+class TestPlannedDigests:
+    """Tests for planned_digests function."""
+
+    def test_staged_files_digested(self, app_dir):
+        """Test that generated and rendered files are included."""
+        app_id, digests = planned_digests(app_dir)
+
+        assert app_id == "simple-test-app"
+        for path in ("docker-compose.yml", "env.template", "prestart.sh"):
+            assert path in digests
+        assert "debian/control" in digests
+        assert digests["prestart.sh"].startswith("755:")
+
+    def test_stable_across_runs(self, app_dir):
+        """Test that build timestamps do not change planned digests."""
+        assert planned_digests(app_dir) == planned_digests(app_dir)
+
+
+class TestChangedFiles:
+    """Tests for changed_files function."""
+
+    def test_added_removed_modified(self):
+        """Test the markers for added and removed files."""
+        old = {"a": "1", "b": "2", "c": "3"}
+        new = {"a": "1", "b": "9", "d": "4"}
+
+        assert changed_files(old, new) == ["b", "-c", "+d"]
+
+
+class TestPlanApps:
+    """Tests for plan_apps function."""
+
+    def test_new_unchanged_changed(self, app_dir, tmp_path):
+        """Test the plan before a build, after it and after an edit."""
+        output = tmp_path / "out"
+        output.mkdir()
+
+        assert plan_apps([app_dir], load_build_state(output))[0].status == "new"
+
+        record(output, app_dir)
+        assert plan_apps([app_dir], load_build_state(output))[0].status == ("unchanged")
+
+        compose = app_dir / "docker-compose.yml"
+        compose.write_text(
+            compose.read_text().replace(
+                "restart:", "stop_grace_period: 30s\n    restart:"
+            )
+        )
+        plan = plan_apps([app_dir], load_build_state(output))[0]
+
+        assert plan.status == "changed"
+        assert "docker-compose.yml" in plan.files
+        assert plan.describe().startswith("simple-test-app: changed (")
+
+    def test_invalid_app(self, tmp_path):
+        """Test that an app failing validation is reported, not raised."""
+        broken = tmp_path / "broken"
+        shutil.copytree(FIXTURES_DIR / "invalid" / "missing-metadata", broken)
+
+        plan = plan_apps([broken], {})[0]
+
+        assert plan.status == "invalid"
+        assert plan.app_id == "broken"
+        assert plan.error
+
+
+class TestPlanCommand:
+    """Tests for the single-app --plan option."""
+
+    def test_plan_output(self, app_dir, tmp_path, capsys):
+        """Test the report of an app recorded with staged_files()."""
+        output = tmp_path / "out"
+        output.mkdir()
+        files = staged_files(app_dir, None, "container")
+        save_build_record(output, "simple-test-app", {"files": files})
+        args = argparse.Namespace(output=str(output), prefix=None, suffix="container")
+
+        assert plan_command(args, app_dir) == 0
+
+        out = capsys.readouterr().out
+        assert "simple-test-app: unchanged" in out
+        assert "0 changed, 0 new, 1 unchanged, 0 invalid" in out
@@ -1,11 +1,20 @@
 """Unit tests for prestart script generation."""
 
+import shutil
+import subprocess
 from unittest import mock
 
+import pytest
+
 from generate_container_packages.loader import AppDefinition
 from generate_container_packages.prestart import (
+    ROUTING_COMMAND,
+    ROUTING_DIR,
+    ROUTING_LABELS_DIR,
     generate_prestart_script,
+    generate_routing_prestart_script,
     get_homarr_url_expression,
+    routing_override_path,
 )
 
 
@@ -198,3 +207,183 @@ class TestGeneratePrestartScript:
         assert script.startswith("#!/bin/bash")
         # No unclosed quotes (basic check)
         assert script.count('"') % 2 == 0
+
+
+class TestPrestartFingerprint:
+    """Tests for runtime.env regeneration skipping in the prestart script."""
+
+    @pytest.fixture
+    def run_prestart(self, tmp_path):
+        """Write the script with /etc and /run redirected below tmp_path."""
+        if shutil.which("bash") is None or shutil.which("stat") is None:
+            pytest.skip("bash and stat are required")
+
+        app_def = mock.Mock(spec=AppDefinition)
+        app_def.metadata = {
+            "package_name": "test-app-container",
+            "name": "Test App",
+            "web_ui": {"enabled": True, "protocol": "http", "port": 8080},
+            "default_config": {"APP_PORT": "8080"},
+        }
+        script = generate_prestart_script(app_def)
+        script = script.replace("/etc/container-apps", str(tmp_path / "etc"))
+        script = script.replace("/run/container-apps", str(tmp_path / "run"))
+        script_path = tmp_path / "prestart.sh"
+        script_path.write_text(script)
+
+        etc_dir = tmp_path / "etc" / "test-app-container"
+        etc_dir.mkdir(parents=True)
+        (etc_dir / "env.defaults").write_text("APP_PORT=8080\n")
+
+        def run():
+            subprocess.run(["bash", str(script_path)], check=True)
+            return tmp_path / "run" / "test-app-container" / "runtime.env"
+
+        return run, etc_dir
+
+    def test_script_fingerprints_inputs(self):
+        """Test that the script checks a fingerprint before regenerating."""
+        app_def = mock.Mock(spec=AppDefinition)
+        app_def.metadata = {"package_name": "test-app-container", "name": "Test"}
+
+        script = generate_prestart_script(app_def)
+
+        assert 'FINGERPRINT_FILE="$RUNTIME_ENV.fingerprint"' in script
+        assert "/proc/sys/kernel/hostname" in script
+        assert script.index("exit 0") < script.index('&& . "')
+
+    def test_generation_change_changes_fingerprint(self):
+        """Test that different generated values use a different fingerprint."""
+        app_def = mock.Mock(spec=AppDefinition)
+        app_def.metadata = {"package_name": "test-app-container", "name": "Test"}
+        without_web_ui = generate_prestart_script(app_def)
+        app_def.metadata["web_ui"] = {"enabled": True, "port": 8080}
+        with_web_ui = generate_prestart_script(app_def)
+
+        def fingerprint_line(script):
+            return next(
+                line for line in script.splitlines() if line.startswith("FINGERPRINT=")
+            )
+
+        assert fingerprint_line(without_web_ui) != fingerprint_line(with_web_ui)
+
+    def test_unchanged_inputs_skip_regeneration(self, run_prestart):
+        """Test that a second run keeps the existing runtime.env."""
+        run, _ = run_prestart
+        runtime_env = run()
+        assert "HOMARR_URL=http://" in runtime_env.read_text()
+
+        runtime_env.write_text("MARKER=1\n")
+        run()
+
+        assert runtime_env.read_text() == "MARKER=1\n"
+
+    def test_env_change_regenerates(self, run_prestart):
+        """Test that editing the env file regenerates runtime.env."""
+        run, etc_dir = run_prestart
+        runtime_env = run()
+        runtime_env.write_text("MARKER=1\n")
+
+        (etc_dir / "env").write_text("APP_PORT=9090\n")
+        run()
+
+        content = runtime_env.read_text()
+        assert "MARKER" not in content
+        assert ":9090" in content
+
+    def test_missing_runtime_env_regenerates(self, run_prestart):
+        """Test that a deleted runtime.env is regenerated."""
+        run, _ = run_prestart
+        runtime_env = run()
+        runtime_env.unlink()
+
+        run()
+
+        assert "HOSTNAME=" in runtime_env.read_text()
+
+
+class TestRoutingPrestartScript:
+    """Tests for the configure-container-routing wrapper script."""
+
+    def test_script_structure(self):
+        """Test that the script fingerprints routing inputs before configuring."""
+        script = generate_routing_prestart_script(
+            "test-app-container", "test-app", "routing:\n  subdomain: test\n"
+        )
+
+        assert script.startswith("#!/bin/bash")
+        assert f'OVERRIDE="{ROUTING_LABELS_DIR}/test-app.yml"' in script
+        assert f"{ROUTING_DIR}/test-app.yml" in script
+        assert script.index("exit 0") < script.index(f"{ROUTING_COMMAND} test-app")
+
+    def test_routing_change_changes_fingerprint(self):
+        """Test that different routing.yml content uses a different digest."""
+        first = generate_routing_prestart_script("a-container", "a", "port: 80\n")
+        second = generate_routing_prestart_script("a-container", "a", "port: 81\n")
+
+        assert first != second
+
+    def test_override_path(self):
+        """Test the compose override path for an app."""
+        assert routing_override_path("grafana") == f"{ROUTING_LABELS_DIR}/grafana.yml"
+
+    @pytest.fixture
+    def run_routing(self, tmp_path):
+        """Write the script with system paths redirected below tmp_path."""
+        if shutil.which("bash") is None or shutil.which("stat") is None:
+            pytest.skip("bash and stat are required")
+
+        command = tmp_path / "configure-container-routing"
+        calls = tmp_path / "calls.log"
+        command.write_text(f'#!/bin/sh\necho "$1" >> "{calls}"\n')
+        command.chmod(0o755)
+
+        routing_dir = tmp_path / "routing.d"
+        routing_dir.mkdir()
+        (routing_dir / "test-app.yml").write_text("subdomain: test\n")
+
+        script = generate_routing_prestart_script(
+            "test-app-container", "test-app", "subdomain: test\n"
+        )
+        for old, new in (
+            (ROUTING_COMMAND, str(command)),
+            (ROUTING_DIR, str(routing_dir)),
+            (ROUTING_LABELS_DIR, str(tmp_path / "labels")),
+            ("/etc/container-apps", str(tmp_path / "etc")),
+            ("/run/container-apps", str(tmp_path / "run")),
+        ):
+            script = script.replace(old, new)
+        script_path = tmp_path / "configure-routing.sh"
+        script_path.write_text(script)
+
+        def run():
+            subprocess.run(["bash", str(script_path)], check=True)
+            return calls.read_text().splitlines() if calls.exists() else []
+
+        return run, routing_dir, tmp_path / "labels" / "test-app.yml"
+
+    def test_unchanged_inputs_skip_routing_command(self, run_routing):
+        """Test that the routing command runs only once for unchanged inputs."""
+        run, _, override = run_routing
+
+        assert run() == ["test-app"]
+        assert run() == ["test-app"]
+        assert override.read_text() == "services: {}\n"
+
+    def test_routing_file_change_reruns_command(self, run_routing):
+        """Test that editing the installed routing.yml reruns the command."""
+        run, routing_dir, _ = run_routing
+        run()
+
+        (routing_dir / "test-app.yml").write_text("subdomain: other\n")
+
+        assert run() == ["test-app", "test-app"]
+
+    def test_missing_override_reruns_command(self, run_routing):
+        """Test that a removed override file (e.g., after reboot) is regenerated."""
+        run, _, override = run_routing
+        run()
+        override.unlink()
+
+        assert run() == ["test-app", "test-app"]
+        assert override.exists()
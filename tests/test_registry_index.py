@@ -0,0 +1,158 @@
+"""Tests for the compiled routing and webapp registry index."""
+
+import argparse
+import json
+import os
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from generate_container_packages import registry_index
+from generate_container_packages.registry import generate_registry_toml
+from generate_container_packages.registry_index import (
+    load_registry_index,
+    merge_registry_index,
+    registry_index_command,
+)
+from generate_container_packages.routing import generate_routing_yml
+
+METADATA = {
+    "name": "Grafana",
+    "app_id": "grafana",
+    "package_name": "grafana-container",
+    "description": "Dashboards",
+    "tags": ["role::container-app"],
+    "web_ui": {"enabled": True, "port": 3000, "path": "/"},
+}
+COMPOSE = {
+    "services": {"grafana": {"image": "grafana/grafana", "ports": ["3000:3000"]}}
+}
+
+
+@pytest.fixture
+def sources(tmp_path):
+    """Routing and webapps directories with one generated app each."""
+    routing = tmp_path / "routing.d"
+    webapps = tmp_path / "webapps.d"
+    routing.mkdir()
+    webapps.mkdir()
+    (routing / "grafana.yml").write_text(
+        generate_routing_yml(METADATA, COMPOSE, "grafana-container")
+    )
+    (webapps / "grafana-container.toml").write_text(
+        generate_registry_toml(METADATA, COMPOSE)
+    )
+    return {"routing": routing, "webapps": webapps}
+
+
+class TestMergeRegistryIndex:
+    """Tests for merge_registry_index function."""
+
+    def test_initial_merge(self, tmp_path, sources):
+        """Test that generated routing and registry files are indexed."""
+        index_path = tmp_path / "index.json"
+
+        result = merge_registry_index(index_path, sources)
+
+        assert result.written
+        assert sorted(result.parsed) == [
+            "routing/grafana.yml",
+            "webapps/grafana-container.toml",
+        ]
+        index = load_registry_index(index_path)
+        assert index["digest"] == result.digest
+        routing = index["sections"]["routing"]["entries"]["grafana"]
+        assert routing["app_id"] == "grafana"
+        assert "grafana-container" in index["sections"]["webapps"]["entries"]
+
+    def test_unchanged_sources_not_reparsed(self, tmp_path, sources):
+        """Test that a second merge parses nothing and keeps the file."""
+        index_path = tmp_path / "index.json"
+        first = merge_registry_index(index_path, sources)
+        mtime = index_path.stat().st_mtime_ns
+
+        with patch.object(registry_index.yaml, "safe_load") as safe_load:
+            second = merge_registry_index(index_path, sources)
+
+        safe_load.assert_not_called()
+        assert second.parsed == []
+        assert not second.written
+        assert second.digest == first.digest
+        assert index_path.stat().st_mtime_ns == mtime
+
+    def test_digest_tracks_content_not_mtime(self, tmp_path, sources):
+        """Test that touching a file keeps the digest, editing changes it."""
+        index_path = tmp_path / "index.json"
+        first = merge_registry_index(index_path, sources)
+        routing_file = sources["routing"] / "grafana.yml"
+
+        os.utime(routing_file, ns=(1, 1))
+        touched = merge_registry_index(index_path, sources)
+        assert touched.parsed == ["routing/grafana.yml"]
+        assert touched.digest == first.digest
+
+        routing_file.write_text(routing_file.read_text() + "# edited\nextra: 1\n")
+        edited = merge_registry_index(index_path, sources)
+        assert edited.digest != first.digest
+
+    def test_removed_file(self, tmp_path, sources):
+        """Test that entries of deleted files are dropped."""
+        index_path = tmp_path / "index.json"
+        merge_registry_index(index_path, sources)
+        (sources["webapps"] / "grafana-container.toml").unlink()
+
+        result = merge_registry_index(index_path, sources)
+
+        assert result.removed == ["webapps/grafana-container"]
+        index = load_registry_index(index_path)
+        assert index["sections"]["webapps"]["entries"] == {}
+
+    def test_unparsable_file_skipped(self, tmp_path, sources):
+        """Test that a broken file is reported and left out."""
+        (sources["webapps"] / "broken.toml").write_text("not = [valid")
+
+        result = merge_registry_index(tmp_path / "index.json", sources)
+
+        assert result.errors == ["webapps/broken.toml"]
+        index = load_registry_index(tmp_path / "index.json")
+        assert "broken" not in index["sections"]["webapps"]["entries"]
+
+    def test_missing_directory(self, tmp_path):
+        """Test that missing source directories give empty sections."""
+        result = merge_registry_index(
+            tmp_path / "index.json", {"routing": tmp_path / "missing"}
+        )
+
+        index = json.loads((tmp_path / "index.json").read_text())
+        assert index["sections"]["routing"]["entries"] == {}
+        assert result.errors == []
+
+    def test_unknown_section(self, tmp_path):
+        """Test that unknown section names are rejected."""
+        with pytest.raises(ValueError):
+            merge_registry_index(tmp_path / "index.json", {"other": tmp_path})
+
+    def test_other_version_ignored(self, tmp_path):
+        """Test that an index of another format version is not loaded."""
+        (tmp_path / "index.json").write_text('{"version": 0}')
+
+        assert load_registry_index(tmp_path / "index.json") is None
+
+
+class TestRegistryIndexCommand:
+    """Tests for registry_index_command function."""
+
+    def test_print_digest(self, tmp_path, sources, capsys):
+        """Test that --print-digest prints only the digest."""
+        args = argparse.Namespace(
+            output=str(tmp_path / "index.json"),
+            routing_dir=str(sources["routing"]),
+            webapps_dir=str(sources["webapps"]),
+            print_digest=True,
+        )
+
+        assert registry_index_command(args) == 0
+
+        digest = capsys.readouterr().out.strip()
+        assert digest == load_registry_index(Path(args.output))["digest"]
@@ -357,3 +357,171 @@ class TestRenderAllTemplates:
         assert "/bin/chown" not in content, (
             "systemd service should not set ownership - this is handled by postinst"
         )
+
+
+class TestRenderCache:
+    """Tests for RenderCache."""
+
+    def test_only_affected_templates_rerendered(self):
+        """Test that changing one context value re-renders only templates using it."""
+        from generate_container_packages.renderer import RenderCache, render_templates
+
+        app_dir = Path(__file__).parent / "fixtures" / "valid" / "simple-app"
+        from generate_container_packages.loader import load_input_files
+
+        app_def = load_input_files(app_dir)
+        cache = RenderCache()
+
+        first = render_templates(app_def, cache=cache)
+        assert cache.hits == 0
+        second = render_templates(app_def, cache=cache)
+        assert second == first
+        assert cache.misses == cache.hits
+
+        app_def.metadata["description"] = "Changed description"
+        misses = cache.misses
+        third = render_templates(app_def, cache=cache)
+        assert cache.hits > 0
+        assert cache.misses > misses
+        assert third["debian/control"] != first["debian/control"]
+
+
+class TestRenderMetainfo:
+    """Tests for render_metainfo function."""
+
+    def test_matches_full_render_and_is_well_formed(self):
+        """Test that the metainfo is valid XML and equals the full render."""
+        import xml.etree.ElementTree as ET
+
+        from generate_container_packages.loader import load_input_files
+        from generate_container_packages.renderer import (
+            render_metainfo,
+            render_templates,
+        )
+
+        app_dir = Path(__file__).parent / "fixtures" / "valid" / "full-app"
+        app_def = load_input_files(app_dir)
+
+        metainfo = render_metainfo(app_def)
+
+        package_name = app_def.metadata["package_name"]
+        assert (
+            metainfo == render_templates(app_def)[f"debian/{package_name}.metainfo.xml"]
+        )
+        component = ET.fromstring(metainfo)
+        assert component.findtext("developer_name").endswith("<fullstack@example.com>")
+
+
+class TestSystemdTrigger:
+    """Tests for the shared dpkg trigger that batches systemd reloads."""
+
+    def _render(self, fixture):
+        from generate_container_packages.loader import load_input_files
+        from generate_container_packages.renderer import render_templates
+
+        app_dir = Path(__file__).parent / "fixtures" / "valid" / fixture
+        return render_templates(load_input_files(app_dir))
+
+    def test_triggers_file_rendered(self):
+        """Test that every package declares and activates the shared trigger."""
+        from generate_container_packages.template_context import SYSTEMD_TRIGGER
+
+        triggers = self._render("simple-app")["debian/triggers"]
+
+        assert f"interest-noawait {SYSTEMD_TRIGGER}\n" in triggers
+        assert f"activate-noawait {SYSTEMD_TRIGGER}\n" in triggers
+
+    def test_configure_does_not_reload(self):
+        """Test that configure queues units instead of reloading systemd."""
+        postinst = self._render("simple-app")["debian/postinst"]
+        configure = postinst[: postinst.index("    triggered)")]
+
+        assert "systemctl daemon-reload" not in configure
+        assert "systemctl enable" not in configure
+        assert "simple-test-app-container.service" in configure
+
+    def test_rules_disable_debhelper_systemd_snippets(self):
+        """Test that dh_installsystemd adds no reload, enable or start snippets."""
+        rules = self._render("watcher-app")["debian/rules"]
+
+        override = rules[rules.index("override_dh_installsystemd:") :]
+        commands = [line for line in override.splitlines()[1:] if line.startswith("\t")]
+        assert all(line.lstrip().startswith("#") for line in commands)
+        assert "dh_installsystemd" not in override.replace(
+            "override_dh_installsystemd:", ""
+        )
+
+    def test_trigger_reloads_once_per_transaction(self, tmp_path):
+        """Test that two packages' trigger runs reload and enable only once."""
+        import shutil
+        import subprocess
+
+        if shutil.which("sh") is None:
+            pytest.skip("sh not available")
+
+        from generate_container_packages.template_context import SYSTEMD_QUEUE_DIR
+
+        systemd_dir = tmp_path / "systemd"
+        systemd_dir.mkdir()
+        bin_dir = tmp_path / "bin"
+        bin_dir.mkdir()
+        log = tmp_path / "systemctl.log"
+        systemctl = bin_dir / "systemctl"
+        systemctl.write_text(f'#!/bin/sh\necho "$*" >> "{log}"\n')
+        systemctl.chmod(0o755)
+
+        def script(fixture):
+            postinst = self._render(fixture)["debian/postinst"]
+            postinst = postinst.replace("/run/systemd/system", str(systemd_dir))
+            postinst = postinst.replace(SYSTEMD_QUEUE_DIR, str(tmp_path / "queue"))
+            # Only the configure and triggered branches are exercised
+            start = postinst.index("        # Only interact with systemd")
+            end = postinst.index("esac")
+            path = tmp_path / f"{fixture}.sh"
+            path.write_text(
+                'case "$1" in\n    configure)\n' + postinst[start:end] + "esac\n"
+            )
+            return path
+
+        env = {"PATH": f"{bin_dir}:/usr/bin:/bin"}
+        scripts = [script("simple-app"), script("watcher-app")]
+        for path in scripts:
+            subprocess.run(["sh", str(path), "configure"], env=env, check=True)
+        assert not log.exists()
+
+        for path in scripts:
+            subprocess.run(["sh", str(path), "triggered"], env=env, check=True)
+
+        calls = log.read_text().splitlines()
+        assert calls.count("daemon-reload") == 1
+        enable = [c for c in calls if c.startswith("enable ")]
+        assert len(enable) == 1
+        assert "simple-test-app-container.service" in enable[0]
+        assert "watcher-test-app-container.service" in enable[0]
+        assert len([c for c in calls if c.startswith("start ")]) == 1
+
+
+class TestRoutedServiceUnit:
+    """Tests for the systemd unit of apps with routing."""
+
+    def test_fixed_override_without_shell(self):
+        """Test that ExecStart passes the override without sh -c, ExecStop omits it."""
+        from generate_container_packages.loader import load_input_files
+        from generate_container_packages.renderer import render_templates
+
+        app_dir = Path(__file__).parent / "fixtures" / "valid" / "watcher-app"
+        rendered = render_templates(load_input_files(app_dir))
+        service = rendered["debian/watcher-test-app-container.service"]
+
+        override = "/run/halos/routing-labels/watcher-test-app.yml"
+        assert f"ExecStart=docker compose -f docker-compose.yml -f {override} up" in (
+            service
+        )
+        assert "ExecStop=docker compose -f docker-compose.yml down" in service
+        assert f"-f {override} down" not in service
+        assert "sh -c" not in service
+        assert (
+            "ExecStartPre=/var/lib/container-apps/watcher-test-app-container/"
+            "configure-routing.sh" in service
+        )
+        assert "configure-routing.sh" in rendered["debian/rules"]
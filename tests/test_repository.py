@@ -0,0 +1,219 @@
+"""Tests for the incremental APT repository index."""
+
+import argparse
+import gzip
+import hashlib
+import os
+import shutil
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from generate_container_packages import repository
+from generate_container_packages.repository import (
+    STATE_FILE,
+    RepositoryError,
+    RepositoryIndex,
+    parse_control,
+    repo_index_command,
+)
+
+pytestmark = pytest.mark.skipif(
+    shutil.which("dpkg-deb") is None, reason="dpkg-deb not available"
+)
+
+
+def build_deb(
+    repo_dir: Path, name: str, version: str = "1.0.0", description: str = "Test"
+) -> Path:
+    """Build a minimal .deb into repo_dir."""
+    root = repo_dir.parent / f"pkgroot-{name}-{version}"
+    (root / "DEBIAN").mkdir(parents=True, exist_ok=True)
+    (root / "DEBIAN" / "control").write_text(
+        f"Package: {name}\n"
+        f"Version: {version}\n"
+        "Architecture: all\n"
+        "Maintainer: Test <test@example.com>\n"
+        f"Description: {description}\n"
+        " Long description line.\n"
+    )
+    deb = repo_dir / f"{name}_{version}_all.deb"
+    subprocess.run(
+        ["dpkg-deb", "--build", "--root-owner-group", str(root), str(deb)],
+        check=True,
+        capture_output=True,
+    )
+    return deb
+
+
+@pytest.fixture
+def repo_dir(tmp_path):
+    """Repository directory with two packages."""
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    build_deb(repo, "alpha-container")
+    build_deb(repo, "beta-container")
+    return repo
+
+
+@pytest.fixture
+def count_reads(monkeypatch):
+    """Count calls to read_control_fields."""
+    calls: list[Path] = []
+    original = repository.read_control_fields
+
+    def counting(deb_file):
+        calls.append(deb_file)
+        return original(deb_file)
+
+    monkeypatch.setattr(repository, "read_control_fields", counting)
+    return calls
+
+
+class TestParseControl:
+    """Tests for parse_control function."""
+
+    def test_fields_and_continuation_lines(self):
+        """Test simple fields and multi-line values."""
+        fields = parse_control("Package: a\nDescription: short\n long\n .\n")
+
+        assert fields["Package"] == "a"
+        assert fields["Description"] == "short\n long\n ."
+
+
+class TestRepositoryIndex:
+    """Tests for RepositoryIndex."""
+
+    def test_initial_index(self, repo_dir):
+        """Test that the first update indexes all packages and writes files."""
+        result = RepositoryIndex(repo_dir).update()
+
+        assert sorted(result.added) == [
+            "alpha-container_1.0.0_all.deb",
+            "beta-container_1.0.0_all.deb",
+        ]
+        assert result.written
+        packages = (repo_dir / "Packages").read_text()
+        assert "Package: alpha-container\n" in packages
+        assert "Filename: ./alpha-container_1.0.0_all.deb\n" in packages
+        assert packages.index("alpha-container") < packages.index("beta-container")
+        deb = repo_dir / "alpha-container_1.0.0_all.deb"
+        sha256 = hashlib.sha256(deb.read_bytes()).hexdigest()
+        assert f"SHA256: {sha256}\n" in packages
+        assert f"Size: {deb.stat().st_size}\n" in packages
+
+    def test_packages_gz_matches_packages(self, repo_dir):
+        """Test that Packages.gz decompresses to Packages."""
+        RepositoryIndex(repo_dir).update()
+
+        packages = (repo_dir / "Packages").read_bytes()
+        assert gzip.decompress((repo_dir / "Packages.gz").read_bytes()) == packages
+
+    def test_release_checksums(self, repo_dir):
+        """Test that Release lists checksums of both index files."""
+        RepositoryIndex(repo_dir, origin="HaLOS", suite="stable").update()
+
+        release = (repo_dir / "Release").read_text()
+        assert "Origin: HaLOS\n" in release
+        assert "Suite: stable\n" in release
+        assert "Architectures: all\n" in release
+        for name in ("Packages", "Packages.gz"):
+            data = (repo_dir / name).read_bytes()
+            digest = hashlib.sha256(data).hexdigest()
+            assert f" {digest} {len(data):>16} {name}\n" in release
+
+    def test_unchanged_packages_not_reread(self, repo_dir, count_reads):
+        """Test that a second update reads no control files and writes nothing."""
+        RepositoryIndex(repo_dir).update()
+        assert len(count_reads) == 2
+        release_mtime = (repo_dir / "Release").stat().st_mtime_ns
+
+        result = RepositoryIndex(repo_dir).update()
+
+        assert len(count_reads) == 2
+        assert result.unchanged == 2
+        assert not result.written
+        assert (repo_dir / "Release").stat().st_mtime_ns == release_mtime
+
+    def test_only_changed_package_reread(self, repo_dir, count_reads):
+        """Test that adding and replacing packages reads only those files."""
+        RepositoryIndex(repo_dir).update()
+        count_reads.clear()
+
+        build_deb(repo_dir, "gamma-container")
+        beta = build_deb(repo_dir, "beta-container", description="Changed")
+        os.utime(beta, ns=(1, 1))
+
+        result = RepositoryIndex(repo_dir).update()
+
+        assert result.added == ["gamma-container_1.0.0_all.deb"]
+        assert result.replaced == ["beta-container_1.0.0_all.deb"]
+        assert result.unchanged == 1
+        assert sorted(p.name for p in count_reads) == [
+            "beta-container_1.0.0_all.deb",
+            "gamma-container_1.0.0_all.deb",
+        ]
+        assert "Description: Changed" in (repo_dir / "Packages").read_text()
+
+    def test_removed_package(self, repo_dir):
+        """Test that deleted .deb files are dropped from the index."""
+        RepositoryIndex(repo_dir).update()
+        (repo_dir / "alpha-container_1.0.0_all.deb").unlink()
+
+        result = RepositoryIndex(repo_dir).update()
+
+        assert result.removed == ["alpha-container_1.0.0_all.deb"]
+        assert "alpha-container" not in (repo_dir / "Packages").read_text()
+
+    def test_release_fields_persist(self, repo_dir):
+        """Test that later updates keep Release fields from the state file."""
+        RepositoryIndex(repo_dir, origin="HaLOS").update()
+        build_deb(repo_dir, "gamma-container")
+
+        RepositoryIndex(repo_dir).update()
+
+        assert "Origin: HaLOS\n" in (repo_dir / "Release").read_text()
+
+    def test_corrupt_state_reindexes(self, repo_dir, count_reads):
+        """Test that an unreadable state file triggers a full re-index."""
+        RepositoryIndex(repo_dir).update()
+        (repo_dir / STATE_FILE).write_text("{not json")
+        count_reads.clear()
+
+        RepositoryIndex(repo_dir).update()
+
+        assert len(count_reads) == 2
+
+    def test_invalid_deb_raises(self, repo_dir):
+        """Test that an unreadable .deb raises RepositoryError."""
+        (repo_dir / "broken_1.0_all.deb").write_bytes(b"not a deb")
+
+        with pytest.raises(RepositoryError):
+            RepositoryIndex(repo_dir).update()
+
+
+class TestRepoIndexCommand:
+    """Tests for repo_index_command function."""
+
+    def _args(self, repo_dir, **overrides):
+        values = {
+            "repo_dir": str(repo_dir),
+            "origin": None,
+            "label": None,
+            "suite": None,
+            "codename": None,
+        }
+        values.update(overrides)
+        return argparse.Namespace(**values)
+
+    def test_command_success(self, repo_dir, capsys):
+        """Test that the command indexes the directory and prints a summary."""
+        assert repo_index_command(self._args(repo_dir, label="Apps")) == 0
+
+        assert "2 added" in capsys.readouterr().out
+        assert "Label: Apps\n" in (repo_dir / "Release").read_text()
+
+    def test_command_missing_directory(self, tmp_path):
+        """Test that a missing directory is a validation error."""
+        assert repo_index_command(self._args(tmp_path / "missing")) == 1
@@ -0,0 +1,238 @@
+"""Unit tests for the build daemon."""
+
+import errno
+import http.client
+import json
+import stat
+import threading
+from pathlib import Path
+
+import pytest
+
+from generate_container_packages.client import send_job
+from generate_container_packages.server import (
+    HTTPJobServer,
+    JobRunner,
+    UnixJobServer,
+    run_job,
+    write_token,
+)
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+SIMPLE_APP = FIXTURES_DIR / "valid" / "simple-app"
+
+
+class TestRunJob:
+    """Tests for run_job."""
+
+    def test_validate_success(self):
+        """Test validate job on a valid app."""
+        result = run_job({"type": "validate", "input_dir": str(SIMPLE_APP)})
+
+        assert result["exit_code"] == 0
+        assert result["status"] == "success"
+        assert "elapsed_seconds" in result
+
+    def test_validate_failure_exit_code(self):
+        """Test validate job reports the CLI validation exit code."""
+        result = run_job(
+            {
+                "type": "validate",
+                "input_dir": str(FIXTURES_DIR / "invalid" / "missing-metadata"),
+            }
+        )
+
+        assert result["exit_code"] == 1
+        assert result["errors"]
+
+    def test_render_writes_source_tree(self, tmp_path):
+        """Test render job writes the package source directory."""
+        result = run_job(
+            {
+                "type": "render",
+                "input_dir": str(SIMPLE_APP),
+                "output_dir": str(tmp_path),
+            }
+        )
+
+        assert result["exit_code"] == 0
+        source_dir = Path(result["source_dir"])
+        assert (source_dir / "debian" / "control").exists()
+        assert "docker-compose.yml" in result["files"]
+
+    def test_unknown_job_type(self):
+        """Test unknown job types are rejected."""
+        result = run_job({"type": "deploy"})
+
+        assert result["exit_code"] == 1
+        assert "type" in result["error"]
+
+    def test_missing_field(self):
+        """Test jobs missing required fields are rejected."""
+        result = run_job({"type": "validate"})
+
+        assert result["exit_code"] == 1
+        assert "input_dir" in result["error"]
+
+    def test_invalid_convert_job(self):
+        """Test that argparse errors in convert jobs become failed results."""
+        result = run_job({"type": "convert", "source": "--no-such-option"})
+
+        assert result["exit_code"] == 1
+        assert result["status"] == "failed"
+        assert "Invalid convert job" in result["error"]
+
+
+@pytest.fixture
+def runner():
+    """Job runner shut down after the test."""
+    job_runner = JobRunner(workers=2)
+    yield job_runner
+    job_runner.shutdown()
+
+
+def _serve(server):
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return thread
+
+
+class TestServers:
+    """Round-trip tests through the socket and HTTP transports."""
+
+    def test_unix_socket_round_trip(self, tmp_path, runner):
+        """Test a job submitted over the Unix socket."""
+        socket_path = tmp_path / "daemon.sock"
+        server = UnixJobServer(socket_path, runner)
+        _serve(server)
+        try:
+            result = send_job(
+                {"type": "validate", "input_dir": str(SIMPLE_APP)},
+                socket_path=socket_path,
+                timeout=10,
+            )
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        assert result["exit_code"] == 0
+
+    def test_unix_socket_in_use(self, tmp_path, runner):
+        """Test that a second server does not take over a live socket."""
+        socket_path = tmp_path / "daemon.sock"
+        server = UnixJobServer(socket_path, runner)
+        _serve(server)
+        try:
+            with pytest.raises(OSError) as excinfo:
+                UnixJobServer(socket_path, runner)
+            result = send_job(
+                {"type": "validate", "input_dir": str(SIMPLE_APP)},
+                socket_path=socket_path,
+                timeout=10,
+            )
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        assert excinfo.value.errno == errno.EADDRINUSE
+        assert result["exit_code"] == 0
+
+    def test_unix_socket_stale_and_private(self, tmp_path, runner):
+        """Test that a stale socket is replaced by one only the user can use."""
+        socket_path = tmp_path / "daemon.sock"
+        UnixJobServer(socket_path, runner).server_close()
+        assert socket_path.exists()
+
+        server = UnixJobServer(socket_path, runner)
+        server.server_close()
+
+        assert stat.S_IMODE(socket_path.stat().st_mode) == 0o600
+
+    def test_http_round_trip(self, runner):
+        """Test a job submitted over localhost HTTP."""
+        server = HTTPJobServer(0, runner, "secret")
+        _serve(server)
+        try:
+            result = send_job(
+                {"type": "validate", "input_dir": str(SIMPLE_APP)},
+                port=server.server_address[1],
+                timeout=10,
+                token="secret",
+            )
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        assert result["exit_code"] == 0
+        assert server.server_address[0] == "127.0.0.1"
+
+
+class TestHTTPRequestChecks:
+    """Tests for rejection of untrusted HTTP requests."""
+
+    JOB = json.dumps({"type": "validate", "input_dir": str(SIMPLE_APP)})
+
+    @pytest.fixture
+    def port(self, runner):
+        """Port of a running HTTP server with token "secret"."""
+        server = HTTPJobServer(0, runner, "secret")
+        _serve(server)
+        yield server.server_address[1]
+        server.shutdown()
+        server.server_close()
+
+    def post(self, port, headers, body=JOB):
+        """POST to /jobs and return the response status."""
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+        try:
+            conn.putrequest("POST", "/jobs", skip_host=True)
+            for name, value in headers.items():
+                conn.putheader(name, value)
+            conn.endheaders(body.encode())
+            return conn.getresponse().status
+        finally:
+            conn.close()
+
+    def headers(self, port, **overrides):
+        """Headers of a valid request with overrides (None removes)."""
+        headers = {
+            "Host": f"127.0.0.1:{port}",
+            "Authorization": "Bearer secret",
+            "Content-Type": "application/json",
+            "Content-Length": str(len(self.JOB)),
+        }
+        headers.update(overrides)
+        return {k: v for k, v in headers.items() if v is not None}
+
+    def test_valid_request(self, port):
+        """Test that a request passing all checks runs the job."""
+        assert self.post(port, self.headers(port)) == 200
+
+    @pytest.mark.parametrize(
+        ("overrides", "status"),
+        [
+            ({"Authorization": None}, 401),
+            ({"Authorization": "Bearer wrong"}, 401),
+            ({"Content-Type": "text/plain"}, 415),
+            ({"Host": "evil.example:8080"}, 403),
+            ({"Origin": "http://127.0.0.1"}, 403),
+            ({"Content-Length": "abc"}, 400),
+        ],
+    )
+    def test_rejected(self, port, overrides, status):
+        """Test that cross-site, unauthenticated and malformed requests fail."""
+        assert self.post(port, self.headers(port, **overrides)) == status
+
+
+class TestWriteToken:
+    """Tests for the HTTP API token file."""
+
+    def test_private_file(self, tmp_path):
+        """Test that the token is written to a user-only file."""
+        path = tmp_path / "daemon.token"
+        path.write_text("old\n")
+
+        token = write_token(path)
+
+        assert path.read_text().strip() == token != "old"
+        assert path.stat().st_mode & 0o777 == 0o600
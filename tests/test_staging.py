@@ -0,0 +1,112 @@
+"""Unit tests for staged package source trees."""
+
+import shutil
+from pathlib import Path
+
+from generate_container_packages.builder import prepare_build_directory, stage_package
+from generate_container_packages.loader import load_input_files
+from generate_container_packages.renderer import render_all_templates, render_templates
+from generate_container_packages.staging import FileDigestCache, StagedTree
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures" / "valid"
+
+
+class TestStagedTree:
+    """Tests for StagedTree."""
+
+    def test_digest_stable_and_content_sensitive(self, tmp_path):
+        """Test tree digest only changes when content or mode changes."""
+        source = tmp_path / "icon.png"
+        source.write_bytes(b"png")
+
+        def make_tree(content: str, mode: int | None = None) -> StagedTree:
+            tree = StagedTree()
+            tree.add_content("a.txt", content, mode=mode)
+            tree.add_source("icon.png", source)
+            return tree
+
+        assert make_tree("x").digest() == make_tree("x").digest()
+        assert make_tree("x").digest() != make_tree("y").digest()
+        assert make_tree("x").digest() != make_tree("x", mode=0o755).digest()
+
+    def test_write_skips_unchanged_and_removes_stale(self, tmp_path):
+        """Test incremental write with previous digests."""
+        dest = tmp_path / "out"
+        tree = StagedTree()
+        tree.add_content("keep.txt", "same")
+        tree.add_content("old.txt", "stale")
+        assert sorted(tree.write(dest)) == ["keep.txt", "old.txt"]
+        previous = tree.digests()
+
+        tree = StagedTree()
+        tree.add_content("keep.txt", "same")
+        tree.add_content("debian/new.txt", "new", mode=0o755)
+        written = tree.write(dest, previous=previous)
+
+        assert written == ["debian/new.txt"]
+        assert not (dest / "old.txt").exists()
+        assert (dest / "debian" / "new.txt").stat().st_mode & 0o777 == 0o755
+
+    def test_digest_cache_reuses_unchanged_files(self, tmp_path):
+        """Test FileDigestCache re-hashes only modified files."""
+        path = tmp_path / "data.bin"
+        path.write_bytes(b"one")
+        cache = FileDigestCache()
+
+        first = cache.digest(path)
+        assert cache.digest(path) == first
+
+        path.write_bytes(b"two!")
+        assert cache.digest(path) != first
+
+    def test_empty_directories_kept(self, tmp_path):
+        """Test add_directory stages and writes empty subdirectories."""
+        source_dir = tmp_path / "default-data"
+        (source_dir / "logs").mkdir(parents=True)
+        (source_dir / "config.ini").write_text("x")
+        tree = StagedTree()
+        tree.add_directory("default-data", source_dir)
+        without = StagedTree()
+        without.add_source("default-data/config.ini", source_dir / "config.ini")
+
+        tree.write(tmp_path / "out")
+
+        assert (tmp_path / "out" / "default-data" / "logs").is_dir()
+        assert tree.digest() != without.digest()
+
+
+class TestStagePackage:
+    """Tests for stage_package parity with the on-disk build directory."""
+
+    def test_matches_prepare_build_directory(self, tmp_path):
+        """Test staged tree describes exactly what prepare_build_directory writes."""
+        app_dir = tmp_path / "app"
+        shutil.copytree(FIXTURES_DIR / "app-with-default-data", app_dir)
+        (app_dir / "default-data" / "empty").mkdir()
+        app_def = load_input_files(app_dir)
+
+        rendered_dir = tmp_path / "rendered"
+        render_all_templates(app_def, rendered_dir)
+        source_dir = tmp_path / "source"
+        prepare_build_directory(app_def, rendered_dir, source_dir)
+
+        tree = stage_package(app_def, render_templates(app_def))
+        written_dir = tmp_path / "written"
+        tree.write(written_dir)
+
+        def directories(root: Path) -> set[str]:
+            return {
+                p.relative_to(root).as_posix() for p in root.rglob("*") if p.is_dir()
+            }
+
+        assert directories(written_dir) == directories(source_dir)
+        on_disk = {
+            path.relative_to(source_dir).as_posix(): path.read_bytes()
+            for path in source_dir.rglob("*")
+            if path.is_file()
+        }
+        assert set(tree.files) == set(on_disk)
+        for path, content in on_disk.items():
+            assert tree.read_bytes(path) == content, path
+            mode = (source_dir / path).stat().st_mode & 0o777
+            assert tree.files[path].effective_mode() & 0o111 == mode & 0o111, path
@@ -0,0 +1,131 @@
+"""Unit tests for phase timing instrumentation."""
+
+import json
+import subprocess
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+from generate_container_packages.loader import load_input_files
+from generate_container_packages.renderer import render_templates
+from generate_container_packages.timing import TimingRecorder, recorder
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures" / "valid"
+
+
+@pytest.fixture
+def enabled_recorder():
+    """Enable the process-wide recorder for one test."""
+    recorder.enable()
+    yield recorder
+    recorder.disable()
+
+
+class TestTimingRecorder:
+    """Tests for TimingRecorder."""
+
+    def test_disabled_records_nothing(self):
+        """Test that phases are not recorded unless enabled."""
+        timings = TimingRecorder()
+        with timings.phase("validate"):
+            pass
+
+        assert timings.spans == []
+
+    def test_records_nested_phases(self):
+        """Test wall/CPU recording and aggregation by name."""
+        timings = TimingRecorder()
+        timings.enable()
+        with timings.phase("build"):
+            for _ in range(2):
+                with timings.phase("render", template="a"):
+                    sum(range(1000))
+
+        summary = {row["name"]: row for row in timings.summary()}
+        assert summary["render"]["count"] == 2
+        assert summary["build"]["wall"] >= summary["render"]["wall"]
+        assert all(span.cpu >= 0 for span in timings.spans)
+        assert "render" in timings.format_table()
+
+    def test_records_child_process_cpu(self):
+        """Test that CPU spent in subprocesses is recorded separately."""
+        timings = TimingRecorder()
+        timings.enable()
+        with timings.phase("dpkg"):
+            subprocess.run([sys.executable, "-c", "sum(range(3_000_000))"], check=True)
+
+        span = timings.spans[0]
+        assert span.child_cpu > 0
+        assert span.child_cpu > span.cpu
+        assert timings.summary()[0]["child_cpu"] == span.child_cpu
+        assert "Child CPU (ms)" in timings.format_table()
+
+    def test_thread_safe(self):
+        """Test recording from several threads."""
+        timings = TimingRecorder()
+        timings.enable()
+
+        def work():
+            for _ in range(50):
+                with timings.phase("convert:parse"):
+                    pass
+
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(timings.spans) == 200
+
+    def test_write_chrome_trace(self, tmp_path):
+        """Test Chrome trace output format."""
+        timings = TimingRecorder()
+        timings.enable()
+        with timings.phase("dpkg", app="demo"):
+            pass
+
+        path = tmp_path / "trace.json"
+        timings.write(path)
+        trace = json.loads(path.read_text())
+
+        event = trace["traceEvents"][0]
+        assert event["name"] == "dpkg"
+        assert event["ph"] == "X"
+        assert event["args"]["app"] == "demo"
+        assert "cpu_ms" in event["args"]
+        assert "child_cpu_ms" in event["args"]
+
+    def test_write_json(self, tmp_path):
+        """Test plain JSON output format."""
+        timings = TimingRecorder()
+        timings.enable()
+        with timings.phase("load"):
+            pass
+
+        path = tmp_path / "timings.json"
+        timings.write(path, format="json")
+        document = json.loads(path.read_text())
+
+        assert document["summary"][0]["name"] == "load"
+        assert document["spans"][0]["name"] == "load"
+
+    def test_unknown_format(self, tmp_path):
+        """Test unknown output formats are rejected."""
+        with pytest.raises(ValueError):
+            TimingRecorder().write(tmp_path / "x", format="xml")
+
+
+class TestInstrumentation:
+    """Tests for phases recorded by the pipeline."""
+
+    def test_render_records_per_template_phases(self, enabled_recorder):
+        """Test that rendering records context and per-template phases."""
+        app_def = load_input_files(FIXTURES_DIR / "simple-app")
+        render_templates(app_def)
+
+        names = {row["name"] for row in enabled_recorder.summary()}
+        assert "context" in names
+        assert "render:debian/control.j2" in names
@@ -1,18 +1,24 @@
 """Unit tests for input validator module."""
 
 from pathlib import Path
+from unittest.mock import patch
 
 import pytest
+import yaml
+from pydantic import ValidationError
 
 from generate_container_packages.validator import (
+    ValidationCache,
     ValidationWarning,
     format_pydantic_error,
     validate_compose,
     validate_config,
+    validate_document,
     validate_input_directory,
     validate_metadata,
     validate_store,
 )
+from schemas.metadata import PackageMetadata
 
 # Test fixtures directory
 FIXTURES_DIR = Path(__file__).parent / "fixtures"
@@ -120,6 +126,114 @@ class TestValidateMetadata:
         assert metadata.web_ui is not None
 
 
+class TestValidationCache:
+    """Tests for ValidationCache."""
+
+    def test_cached_failure_raises_new_exception(self):
+        """Test a cached failure raises a fresh, equivalent error on each hit."""
+        path = INVALID_FIXTURES / "bad-app-id" / "metadata.yaml"
+        cache = ValidationCache()
+
+        raised = []
+        for _ in range(3):
+            with pytest.raises(ValidationError) as exc_info:
+                cache.validate(path, validate_metadata)
+            raised.append(exc_info.value)
+
+        assert cache.misses == 1
+        assert cache.hits == 2
+        assert raised[1] is not raised[0]
+        assert raised[2] is not raised[1]
+        messages = {format_pydantic_error("metadata.yaml", e) for e in raised}
+        assert len(messages) == 1
+
+    def test_cached_yaml_failure(self, tmp_path):
+        """Test a cached YAML parse failure keeps its type and message."""
+        path = tmp_path / "metadata.yaml"
+        path.write_text("name: [unclosed\n")
+        cache = ValidationCache()
+
+        with pytest.raises(yaml.YAMLError) as first:
+            cache.validate(path, validate_metadata)
+        with pytest.raises(yaml.YAMLError) as second:
+            cache.validate(path, validate_metadata)
+
+        assert second.value is not first.value
+        assert str(second.value) == str(first.value)
+        assert cache.hits == 1
+
+
+class TestValidateDocument:
+    """Tests for content-keyed trusted model validation."""
+
+    @staticmethod
+    def metadata(app_id: str) -> dict:
+        """Valid metadata with a test-specific app_id."""
+        return {
+            "name": "Trusted App",
+            "app_id": app_id,
+            "version": "1.0.0",
+            "description": "Trusted model test",
+            "maintainer": "Test <test@example.com>",
+            "license": "MIT",
+            "tags": ["role::container-app"],
+            "debian_section": "net",
+            "architecture": "all",
+        }
+
+    def content(self, app_id: str, **overrides) -> bytes:
+        """Metadata YAML document."""
+        return yaml.safe_dump({**self.metadata(app_id), **overrides}).encode()
+
+    def test_same_content_validated_once(self):
+        """Test that equal bytes return the trusted model without validation."""
+        content = self.content("trusted-once")
+
+        with patch.object(
+            PackageMetadata, "model_validate", wraps=PackageMetadata.model_validate
+        ) as model_validate:
+            first = validate_document(PackageMetadata, content)
+            second = validate_document(PackageMetadata, content)
+
+        assert second[1] is first[1]
+        assert second[0] == self.metadata("trusted-once")
+        assert model_validate.call_count == 1
+
+    def test_changed_content_revalidated(self):
+        """Test that different content is validated again."""
+        _, first = validate_document(PackageMetadata, self.content("trusted-a"))
+        _, second = validate_document(PackageMetadata, self.content("trusted-b"))
+
+        assert second is not first
+        assert second.app_id == "trusted-b"
+
+    def test_equivalent_encodings_not_shared(self):
+        """Test that an invalid document never gets a model cached for another."""
+        validate_document(PackageMetadata, self.content("trusted-typed", name="123"))
+
+        with pytest.raises(ValidationError):
+            validate_document(PackageMetadata, self.content("trusted-typed", name=123))
+
+    def test_failures_not_remembered(self):
+        """Test that invalid content raises on every validation."""
+        content = self.content("trusted-invalid", tags=[])
+
+        for _ in range(2):
+            with pytest.raises(ValidationError):
+                validate_document(PackageMetadata, content)
+
+    def test_file_validation_uses_trusted_model(self, tmp_path):
+        """Test that a file with already validated content is not revalidated."""
+        content = self.content("trusted-file")
+        _, model = validate_document(PackageMetadata, content)
+        path = tmp_path / "metadata.yaml"
+        path.write_bytes(content)
+
+        with patch.object(PackageMetadata, "model_validate") as model_validate:
+            assert validate_metadata(path) is model
+        model_validate.assert_not_called()
+
+
 class TestValidateConfig:
     """Tests for validate_config function."""
 
@@ -0,0 +1,187 @@
+"""Unit tests for watch mode."""
+
+import shutil
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from generate_container_packages.builder import CompressionProfile
+from generate_container_packages.watch import (
+    IncrementalBuilder,
+    InotifyWatcher,
+    PollingWatcher,
+    RebuildResult,
+    create_watcher,
+    wait_for_changes,
+)
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures" / "valid"
+
+
+@pytest.fixture
+def app_dir(tmp_path):
+    """Copy of the simple-app fixture that tests can edit."""
+    path = tmp_path / "app"
+    shutil.copytree(FIXTURES_DIR / "simple-app", path)
+    return path
+
+
+class FakeBuild:
+    """Stand-in for build_staged_package that records calls."""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, tree, pkg_name, version, output_dir, keep_temp=False, **kwargs):
+        self.calls.append(tree)
+        self.options = kwargs
+        return output_dir / f"{pkg_name}_{version}_all.deb"
+
+
+class TestIncrementalBuilder:
+    """Tests for IncrementalBuilder."""
+
+    def test_unchanged_inputs_skip_build(self, app_dir, tmp_path):
+        """Test that a rebuild without changes does not invoke the build."""
+        build = FakeBuild()
+        builder = IncrementalBuilder(app_dir, tmp_path / "out", build_fn=build)
+
+        first = builder.rebuild()
+        second = builder.rebuild()
+
+        assert first.status == "built"
+        assert second.status == "unchanged"
+        assert second.digest == first.digest
+        assert len(build.calls) == 1
+
+    def test_edit_rebuilds_and_reuses_caches(self, app_dir, tmp_path):
+        """Test that editing compose re-validates only that file and rebuilds."""
+        build = FakeBuild()
+        builder = IncrementalBuilder(app_dir, tmp_path / "out", build_fn=build)
+        first = builder.rebuild()
+        misses = builder.validation_cache.misses
+
+        compose = app_dir / "docker-compose.yml"
+        compose.write_text(compose.read_text().replace("nginx:alpine", "nginx:1"))
+        result = builder.rebuild()
+
+        assert result.status == "built"
+        assert result.digest != first.digest
+        assert builder.validation_cache.misses == misses + 1
+        assert builder.render_cache.hits > 0
+        assert len(build.calls) == 2
+
+    def test_comment_only_edit_skips_build(self, app_dir, tmp_path):
+        """Test that an edit not affecting any output does not rebuild."""
+        build = FakeBuild()
+        builder = IncrementalBuilder(app_dir, tmp_path / "out", build_fn=build)
+        builder.rebuild()
+
+        compose = app_dir / "docker-compose.yml"
+        compose.write_text(compose.read_text() + "\n# comment\n")
+
+        assert builder.rebuild().status == "unchanged"
+        assert len(build.calls) == 1
+
+    def test_validation_failure_reported(self, app_dir, tmp_path):
+        """Test that invalid input yields a failed result instead of raising."""
+        build = FakeBuild()
+        builder = IncrementalBuilder(app_dir, tmp_path / "out", build_fn=build)
+        (app_dir / "metadata.yaml").write_text("name: [unclosed\n")
+
+        result = builder.rebuild()
+
+        assert result.status == "failed"
+        assert result.errors
+        assert build.calls == []
+
+    def test_default_errors_immutable(self):
+        """Test that results without errors share no mutable default."""
+        assert RebuildResult("built").errors == ()
+
+    def test_validate_only(self, app_dir, tmp_path):
+        """Test validate-only mode never renders or builds."""
+        build = FakeBuild()
+        builder = IncrementalBuilder(
+            app_dir, tmp_path / "out", validate_only=True, build_fn=build
+        )
+
+        assert builder.rebuild().status == "validated"
+        assert build.calls == []
+
+    def test_build_options_passed(self, app_dir, tmp_path, monkeypatch):
+        """Test that compression and the reproducible build date reach the build."""
+        monkeypatch.setenv("SOURCE_DATE_EPOCH", "1700000000")
+        build = FakeBuild()
+        builder = IncrementalBuilder(
+            app_dir,
+            tmp_path / "out",
+            reproducible=True,
+            compression=CompressionProfile(type="zstd", level=3),
+            build_fn=build,
+        )
+
+        assert builder.rebuild().status == "built"
+        assert build.options == {
+            "source_date_epoch": 1700000000,
+            "compression": CompressionProfile(type="zstd", level=3),
+        }
+
+    def test_compression_change_rebuilds(self, app_dir, tmp_path):
+        """Test that editing only the app's compression field rebuilds."""
+        build = FakeBuild()
+        builder = IncrementalBuilder(app_dir, tmp_path / "out", build_fn=build)
+        builder.rebuild()
+
+        metadata = app_dir / "metadata.yaml"
+        metadata.write_text(metadata.read_text() + "compression:\n  type: gzip\n")
+
+        assert builder.rebuild().status == "built"
+        assert build.options["compression"] == CompressionProfile(type="gzip")
+
+
+class TestWatchers:
+    """Tests for file watchers."""
+
+    def test_polling_watcher_detects_changes(self, app_dir):
+        """Test polling watcher reports modified and new files."""
+        watcher = PollingWatcher(app_dir, interval=0.01)
+        assert watcher.wait(timeout=0.05) == set()
+
+        (app_dir / "new.txt").write_text("x")
+        assert app_dir / "new.txt" in watcher.wait(timeout=1)
+
+    def test_inotify_watcher_detects_changes(self, app_dir):
+        """Test inotify watcher reports modified files."""
+        try:
+            watcher = InotifyWatcher(app_dir)
+        except OSError:
+            pytest.skip("inotify not available")
+        try:
+            (app_dir / "metadata.yaml").write_text("changed")
+            assert app_dir / "metadata.yaml" in watcher.wait(timeout=1)
+        finally:
+            watcher.close()
+
+    def test_create_watcher_poll_forced(self, app_dir):
+        """Test --poll selects the polling watcher."""
+        watcher = create_watcher(app_dir, poll=True)
+        assert isinstance(watcher, PollingWatcher)
+
+    def test_wait_for_changes_debounces(self, app_dir):
+        """Test a burst of writes is collected into one change set."""
+        watcher = PollingWatcher(app_dir, interval=0.01)
+
+        def edit():
+            for name in ("a.txt", "b.txt"):
+                (app_dir / name).write_text(name)
+                time.sleep(0.03)
+
+        thread = threading.Thread(target=edit)
+        thread.start()
+        changed = wait_for_changes(watcher, debounce=0.15)
+        thread.join()
+
+        assert {app_dir / "a.txt", app_dir / "b.txt"} <= changed